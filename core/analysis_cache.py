@@ -0,0 +1,189 @@
+"""
+Analysis Cache
+Content-addressed cache for evidence analysis results (memory LRU + SQLite)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_COUNT = 8
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_BYTES = 64 * 1024 * 1024
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "cybermentor_analysis_cache.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    namespace TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def fingerprint(data) -> str:
+    """Size plus a hash of a few evenly spaced chunks: O(1) in the evidence size"""
+    size = len(data)
+    sampler = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=16)
+
+    if size <= SAMPLE_SIZE * SAMPLE_COUNT:
+        sampler.update(data)
+    else:
+        step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT - 1)
+        view = memoryview(data)
+        for i in range(SAMPLE_COUNT):
+            sampler.update(view[i * step:i * step + SAMPLE_SIZE])
+
+    return f"{size:x}-{sampler.hexdigest()}"
+
+
+def full_digest(data) -> str:
+    """One fast pass over everything; guards against two files sharing samples"""
+    return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+
+class AnalysisCache:
+    """Results keyed by (namespace, fingerprint), confirmed by the full digest.
+
+    One instance is shared by every Streamlit session in the process; the SQLite
+    file outlives restarts and can be shared by several app processes (WAL)."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {'memory': 0, 'disk': 0, 'miss': 0}
+
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Last buffer we digested, so several lookups on one rerun hash it once
+        self._last: Optional[Tuple[Any, str, str]] = None
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def _identify(self, data) -> Tuple[str, str]:
+        last = self._last
+        if last is not None and last[0] is data:
+            return last[1], last[2]
+        key = fingerprint(data)
+        digest = full_digest(data)
+        self._last = (data, key, digest)
+        return key, digest
+
+    def get_or_compute(self, namespace: str, data, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for `data` or run `compute()` and store it.
+
+        Values are stored as JSON; anything JSON cannot express is kept as str."""
+        with self._lock:
+            key, digest = self._identify(data)
+            slot = (namespace, key)
+
+            cached = self._memory.get(slot)
+            if cached is not None and cached[0] == digest:
+                self._memory.move_to_end(slot)
+                self.stats['memory'] += 1
+                return cached[1]
+
+            row = self._db.execute(
+                "SELECT digest, value FROM results WHERE namespace = ? AND fingerprint = ?", slot
+            ).fetchone()
+            if row is not None and row[0] == digest:
+                value = json.loads(row[1])
+                self._db.execute(
+                    "UPDATE results SET last_used = ? WHERE namespace = ? AND fingerprint = ?",
+                    (time.time(), namespace, key)
+                )
+                self._db.commit()
+                self._remember(slot, digest, value)
+                self.stats['disk'] += 1
+                return value
+
+        # Compute outside the lock: other sessions keep getting hits meanwhile
+        encoded = json.dumps(compute(), default=str, ensure_ascii=False)
+        value = json.loads(encoded)
+
+        with self._lock:
+            self.stats['miss'] += 1
+            self._store(slot, digest, encoded)
+            self._remember(slot, digest, value)
+        return value
+
+    def _remember(self, slot: Tuple[str, str], digest: str, value: Any):
+        self._memory[slot] = (digest, value)
+        self._memory.move_to_end(slot)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _store(self, slot: Tuple[str, str], digest: str, encoded: str):
+        size = len(encoded.encode('utf-8'))
+        previous = self._db.execute(
+            "SELECT size FROM results WHERE namespace = ? AND fingerprint = ?", slot
+        ).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            (slot[0], slot[1], digest, encoded, size, time.time())
+        )
+        self._disk_bytes += size - (previous[0] if previous else 0)
+
+        # Size-based eviction, least recently used first
+        while self._disk_bytes > self.max_disk_bytes:
+            victims = self._db.execute(
+                "SELECT namespace, fingerprint, size FROM results ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not victims:
+                break
+            for namespace, key, victim_size in victims:
+                self._db.execute("DELETE FROM results WHERE namespace = ? AND fingerprint = ?", (namespace, key))
+                self._memory.pop((namespace, key), None)
+                self._disk_bytes -= victim_size
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+        self._db.commit()
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.stats.values())
+        return (self.stats['memory'] + self.stats['disk']) / total if total else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            return dict(self.stats, hit_rate=self.hit_rate, entries=entries, disk_bytes=self._disk_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._last = None
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+            self._disk_bytes = 0
+
+
+_shared: Optional[AnalysisCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_cache() -> AnalysisCache:
+    """Process-wide instance; Streamlit imports core modules once per server"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = AnalysisCache()
+        return _shared
@@ -0,0 +1,277 @@
+"""
+Header Audit
+Bulk asynchronous security-header audit with per-host and total concurrency caps
+"""
+
+import csv
+import io
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from core.http_client import HEAD_FALLBACK, USER_AGENT, normalize_url
+from core.security_headers import SECURITY_HEADERS, HeaderReport, analyze
+
+DEFAULT_CONCURRENCY = 100
+DEFAULT_PER_HOST = 4
+DEFAULT_TIMEOUT = 10.0
+MAX_URLS = 50000
+
+
+class AuditResult(NamedTuple):
+    url: str
+    report: Optional[HeaderReport]
+    method: str
+    elapsed: float
+    error: str
+
+    @property
+    def score(self) -> int:
+        return self.report.score if self.report else -1
+
+    def as_row(self) -> Dict[str, str]:
+        if self.report:
+            row = self.report.as_row()
+            row['URL'] = self.url
+        else:
+            row = {'URL': self.url, 'Status': 'erro', 'Score': '', 'Nota': ''}
+            row.update({rule.header: '' for rule in SECURITY_HEADERS})
+            row['Exposição'] = ''
+        row['Método'] = self.method
+        row['Tempo (ms)'] = f"{self.elapsed * 1000:.0f}"
+        row['Erro'] = self.error or '-'
+        return row
+
+
+class AuditReport(NamedTuple):
+    results: List[AuditResult]
+    invalid: List[str]
+    elapsed: float
+    concurrency: int
+    per_host: int
+
+    @property
+    def failed(self) -> List[AuditResult]:
+        return [r for r in self.results if r.error]
+
+    @property
+    def per_minute(self) -> float:
+        return len(self.results) / self.elapsed * 60 if self.elapsed else 0.0
+
+    def sorted(self) -> List[AuditResult]:
+        """Worst first: that is where the fixes are"""
+        return sorted(self.results, key=lambda r: (r.report is not None, r.score, r.url))
+
+
+def parse_urls(text: str, limit: int = MAX_URLS) -> Tuple[List[str], List[str]]:
+    """One URL per line, '#' comments allowed; returns (unique URLs in order, invalid lines)"""
+    urls: "OrderedDict[str, None]" = OrderedDict()
+    invalid = []
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        try:
+            url = normalize_url(line)
+            valid = bool(urlsplit(url).hostname)  # urlsplit raises on a broken IPv6 literal
+        except ValueError:
+            valid = False
+        if not valid:
+            invalid.append(line)
+            continue
+        urls[url] = None
+        if len(urls) >= limit:
+            break
+    return list(urls), invalid
+
+
+def interleave(urls: Iterable[str]) -> List[str]:
+    """Round-robin across hosts so one big site can't hold every worker at its per-host cap"""
+    by_host: "OrderedDict[str, List[str]]" = OrderedDict()
+    for url in urls:
+        by_host.setdefault(urlsplit(url).netloc.lower(), []).append(url)
+    queues = [list(reversed(group)) for group in by_host.values()]
+    ordered = []
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop())
+        queues = [queue for queue in queues if queue]
+    return ordered
+
+
+async def fetch_headers(session: aiohttp.ClientSession, url: str) -> AuditResult:
+    """HEAD, or a GET whose body is never read when the server refuses HEAD"""
+    started = time.perf_counter()
+    method = 'HEAD'
+    try:
+        async with session.head(url, allow_redirects=True) as response:
+            status, headers, final = response.status, response.headers, str(response.url)
+        if status in HEAD_FALLBACK:
+            method = 'GET'
+            async with session.get(url, allow_redirects=True) as response:
+                status, headers, final = response.status, response.headers, str(response.url)
+                response.close()  # drop the body unread
+        return AuditResult(url, analyze(headers, final, status), method, time.perf_counter() - started, '')
+    except asyncio.TimeoutError:
+        return AuditResult(url, None, method, time.perf_counter() - started, 'tempo esgotado')
+    except aiohttp.ClientError as e:
+        return AuditResult(url, None, method, time.perf_counter() - started, str(e) or type(e).__name__)
+    except ValueError as e:
+        # One malformed URL (bad IDNA label, invalid port...) must not abort the rest of the audit
+        return AuditResult(url, None, method, time.perf_counter() - started, f"URL inválida: {e or type(e).__name__}")
+
+
+async def audit(urls: Iterable[str], concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+                timeout: float = DEFAULT_TIMEOUT, on_result=None, verify: bool = True) -> AuditReport:
+    """Audit every URL with at most `concurrency` requests in flight and `per_host` per host.
+
+    A fixed pool of workers drains a host-interleaved queue; the connector
+    enforces both caps and keeps connections alive between URLs of the same
+    host. `on_result(result, done, total)` is called as each URL finishes."""
+    if concurrency < 1 or per_host < 1:
+        raise ValueError("Concorrência deve ser pelo menos 1")
+    urls = list(urls)
+    ordered = interleave(urls)
+    total = len(ordered)
+    queue: asyncio.Queue = asyncio.Queue()
+    for url in ordered:
+        queue.put_nowait(url)
+    results: List[AuditResult] = []
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300,
+                                     ssl=None if verify else False)
+    client_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=min(timeout, 5.0))
+    started = time.perf_counter()
+
+    async def worker(session: aiohttp.ClientSession):
+        while True:
+            try:
+                url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result = await fetch_headers(session, url)
+            results.append(result)
+            if on_result is not None:
+                on_result(result, len(results), total)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        await asyncio.gather(*(worker(session) for _ in range(min(concurrency, total))))
+
+    return AuditReport(results, [], time.perf_counter() - started, concurrency, per_host)
+
+
+def run_audit(text: str, concurrency: int = DEFAULT_CONCURRENCY, per_host: int = DEFAULT_PER_HOST,
+              timeout: float = DEFAULT_TIMEOUT, on_result=None) -> AuditReport:
+    """Synchronous entry point for scripts and Streamlit: parse a URL list and audit it"""
+    urls, invalid = parse_urls(text)
+    report = asyncio.run(audit(urls, concurrency, per_host, timeout, on_result))
+    return report._replace(invalid=invalid)
+
+
+def to_csv(results: Iterable[AuditResult]) -> str:
+    rows = [r.as_row() for r in results]
+    if not rows:
+        return ''
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+# Header sets the stand-in sites cycle through, from hardened to careless
+STAND_IN_PROFILES = (
+    {'Content-Security-Policy': "default-src 'self'; frame-ancestors 'none'", 'X-Content-Type-Options': 'nosniff',
+     'Referrer-Policy': 'no-referrer'},
+    {'X-Frame-Options': 'DENY', 'X-Content-Type-Options': 'nosniff', 'Server': 'nginx'},
+    {'Server': 'Apache/2.4.41 (Ubuntu)', 'X-Powered-By': 'PHP/7.4.3'},
+    {},
+)
+
+
+class HeaderStandIns:
+    """Loopback HTTP sites on ephemeral ports, each a distinct host for the per-host cap.
+
+    Every response waits `latency` seconds, like a real server across the
+    internet; HEAD is refused by every fourth site to exercise the GET fallback."""
+
+    def __init__(self, sites: int = 20, latency: float = 0.05, host: str = '127.0.0.1'):
+        self.sites = sites
+        self.latency = latency
+        self.host = host
+        self.ports: List[int] = []
+        self.hits = 0
+        self._runners = []
+
+    def _app(self, index: int):
+        from aiohttp import web
+
+        profile = STAND_IN_PROFILES[index % len(STAND_IN_PROFILES)]
+        refuse_head = index % 4 == 3
+
+        async def handle(request):
+            self.hits += 1
+            await asyncio.sleep(self.latency)
+            if request.method == 'HEAD' and refuse_head:
+                return web.Response(status=405, headers={'Allow': 'GET'})
+            return web.Response(text='<html>stand-in</html>', content_type='text/html', headers=profile)
+
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', handle)
+        return app
+
+    async def __aenter__(self) -> 'HeaderStandIns':
+        from aiohttp import web
+
+        for index in range(self.sites):
+            runner = web.AppRunner(self._app(index), access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, self.host, 0)
+            await site.start()
+            self._runners.append(runner)
+            self.ports.append(runner.addresses[0][1])
+        return self
+
+    async def __aexit__(self, *exc):
+        for runner in self._runners:
+            await runner.cleanup()
+
+    def urls(self, count: int) -> List[str]:
+        """`count` distinct URLs spread over the sites"""
+        return [f"http://{self.host}:{self.ports[i % len(self.ports)]}/pagina/{i}" for i in range(count)]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.header_audit [urls.txt]
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8') as f:
+            report = run_audit(f.read())
+        for item in report.sorted():
+            row = item.as_row()
+            print(f"  {row['Score']:>3} {row['Nota']:<9} {row['Status']:<5} {item.url}  {row['Erro']}")
+        print(f"{len(report.results)} URLs em {report.elapsed:.2f}s ({report.per_minute:,.0f}/min), "
+              f"{len(report.failed)} com erro, {len(report.invalid)} linhas inválidas")
+        sys.exit()
+
+    async def benchmark(count: int):
+        async with HeaderStandIns() as lab:
+            urls = lab.urls(count)
+            print(f"{count} URLs em {len(lab.ports)} sites locais ({lab.latency * 1000:.0f} ms por resposta)")
+            for concurrency, per_host in ((10, 1), (40, 2), (100, 5), (200, 10)):
+                lab.hits = 0
+                report = await audit(urls, concurrency, per_host)
+                fallbacks = sum(1 for r in report.results if r.method == 'GET')
+                print(f"  concorrência {concurrency:>3} (por host {per_host:>2}): {report.elapsed:6.2f}s  "
+                      f"{report.per_minute:>9,.0f} URLs/min  erros {len(report.failed)}  "
+                      f"fallback GET {fallbacks}  requisições {lab.hits}")
+            worst = report.sorted()[0].as_row()
+            print(f"  pior resultado: {worst['URL']} score {worst['Score']} ({worst['Exposição']})")
+
+    asyncio.run(benchmark(2000))
@@ -0,0 +1,127 @@
+"""
+Hex Viewer
+Paged, memory-mapped hex/ASCII viewer with offset jumps and byte-pattern search
+"""
+
+import os
+import re
+import mmap
+from typing import Iterator, Optional, Tuple, Union
+
+# Non-printable bytes are shown as '.' in the ASCII column
+_ASCII_TABLE = bytes(b if 0x20 <= b < 0x7F else 0x2E for b in range(256))
+
+_HEX_TOKEN = re.compile(r'^(?:[0-9A-Fa-f]{2}|\?\?)$')
+
+
+def parse_hex_pattern(text: str) -> "re.Pattern":
+    """Compile a hex pattern like 'FF D8 ?? E0' into a bytes regex ('??' = any byte)"""
+    tokens = text.replace(',', ' ').split()
+    if not tokens:
+        raise ValueError("Padrão hexadecimal vazio")
+
+    parts = []
+    for token in tokens:
+        if not _HEX_TOKEN.match(token):
+            raise ValueError(f"Token hexadecimal inválido: {token}")
+        parts.append(b'.' if token == '??' else re.escape(bytes.fromhex(token)))
+
+    return re.compile(b''.join(parts), re.DOTALL)
+
+
+class HexViewer:
+    """Read-only view over a file (mmap) or an in-memory buffer"""
+
+    def __init__(self, source: Union[str, bytes, bytearray, memoryview], width: int = 16):
+        self.width = width
+        self._file = None
+        self._mmap = None
+
+        if isinstance(source, (str, os.PathLike)):
+            self._file = open(source, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.buffer = self._mmap
+            else:
+                self.buffer = b''
+        else:
+            self.buffer = source
+
+        self.size = len(self.buffer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def page_count(self, rows: int) -> int:
+        page_bytes = rows * self.width
+        return max(1, -(-self.size // page_bytes))
+
+    def align(self, offset: int) -> int:
+        """Clamp an offset to the file and round it down to a row boundary"""
+        offset = max(0, min(offset, max(self.size - 1, 0)))
+        return offset - offset % self.width
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Copy only the requested window out of the buffer"""
+        return bytes(self.buffer[offset:offset + length])
+
+    def rows(self, offset: int, rows: int = 16) -> Iterator[Tuple[int, str, str]]:
+        """Yield (offset, hex, ascii) for each row of the visible window"""
+        start = self.align(offset)
+        window = self.read(start, rows * self.width)
+
+        for i in range(0, len(window), self.width):
+            chunk = window[i:i + self.width]
+            yield start + i, chunk.hex(' ').upper(), chunk.translate(_ASCII_TABLE).decode('ascii')
+
+    def render(self, offset: int, rows: int = 16, highlight: Optional[Tuple[int, int]] = None) -> str:
+        """Render the window as classic hexdump text; cost depends on rows only"""
+        hex_width = self.width * 3 - 1
+        lines = []
+
+        for row_offset, hex_part, ascii_part in self.rows(offset, rows):
+            marker = ' '
+            if highlight and row_offset <= highlight[0] + highlight[1] - 1 and highlight[0] < row_offset + self.width:
+                marker = '>'
+            lines.append(f"{marker}{row_offset:010X}  {hex_part:<{hex_width}}  |{ascii_part}|")
+
+        return '\n'.join(lines)
+
+    def find(self, pattern: bytes, start: int = 0) -> int:
+        """Find a literal byte pattern without copying the buffer (-1 if absent)"""
+        if isinstance(self.buffer, memoryview):
+            # memoryview has no find(); the regex engine scans it in place
+            match = re.compile(re.escape(pattern)).search(self.buffer, start)
+            return match.start() if match else -1
+        return self.buffer.find(pattern, start)
+
+    def find_all(self, pattern: bytes, start: int = 0, limit: int = 100) -> Iterator[int]:
+        """Yield up to `limit` offsets of a literal pattern"""
+        found = 0
+        position = self.find(pattern, start)
+        while position != -1 and found < limit:
+            yield position
+            found += 1
+            position = self.find(pattern, position + 1)
+
+    def search(self, regex: Union[bytes, "re.Pattern"], start: int = 0, limit: int = 100) -> Iterator[Tuple[int, bytes]]:
+        """Run a compiled bytes regex directly over the mapped buffer"""
+        if isinstance(regex, bytes):
+            regex = re.compile(regex, re.DOTALL)
+
+        for found, match in enumerate(regex.finditer(self.buffer, start)):
+            if found >= limit:
+                break
+            yield match.start(), match.group()
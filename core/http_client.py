@@ -0,0 +1,360 @@
+"""
+HTTP Client
+Pooled session with HEAD-first requests, capped bodies and a validating LRU cache
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+USER_AGENT = 'CyberMentor-AI/1.0 (+educational security scanner)'
+DEFAULT_TIMEOUT = (3.05, 10)  # connect, read
+DEFAULT_TTL = 300.0
+MAX_BODY_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+CACHE_ENTRIES = 256
+POOL_SIZE = 16
+
+# Servers that refuse HEAD answer with one of these; the same URL is retried with GET
+HEAD_FALLBACK = {400, 403, 405, 501}
+# Heuristically cacheable statuses (RFC 9111 §4.2.2)
+CACHEABLE = {200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501}
+
+
+class HttpResponse(NamedTuple):
+    url: str
+    status: int
+    reason: str
+    headers: CaseInsensitiveDict
+    body: bytes
+    truncated: bool
+    method: str
+    elapsed: float
+    source: str  # 'rede', 'cache' or 'revalidado'
+
+    @property
+    def text(self) -> str:
+        charset = 'utf-8'
+        for part in self.headers.get('content-type', '').split(';')[1:]:
+            name, _, value = part.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"')
+        try:
+            return self.body.decode(charset, errors='replace')
+        except LookupError:
+            return self.body.decode('utf-8', errors='replace')
+
+    @property
+    def size(self) -> Optional[int]:
+        """Announced size when the body was skipped or cut short"""
+        length = self.headers.get('content-length', '')
+        if length.isdigit():
+            return int(length)
+        return None if self.truncated or self.method == 'HEAD' else len(self.body)
+
+
+class _Entry(NamedTuple):
+    response: HttpResponse
+    expires: float
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if 'etag' in self.response.headers:
+            headers['If-None-Match'] = self.response.headers['etag']
+        if 'last-modified' in self.response.headers:
+            headers['If-Modified-Since'] = self.response.headers['last-modified']
+        return headers
+
+
+def cache_directives(headers) -> Dict[str, str]:
+    directives = {}
+    for part in headers.get('cache-control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def freshness_lifetime(headers, default_ttl: float = DEFAULT_TTL) -> Optional[float]:
+    """Seconds a stored response may be reused without asking the server (RFC 9111 §4.2.1).
+
+    None means it must not be stored at all. Without explicit freshness the
+    client's own TTL applies, which is how private caches usually behave."""
+    directives = cache_directives(headers)
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    if 'max-age' in directives:
+        try:
+            return max(0.0, float(directives['max-age']))
+        except ValueError:
+            return 0.0
+    if 'expires' in headers:
+        try:
+            expires = parsedate_to_datetime(headers['expires'])
+            date = parsedate_to_datetime(headers['date']) if 'date' in headers else None
+            now = date.timestamp() if date else time.time()
+            return max(0.0, expires.timestamp() - now)
+        except (TypeError, ValueError, IndexError):
+            return 0.0  # invalid Expires means already stale
+    return default_ttl
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip()
+    if not url:
+        raise ValueError("URL vazia")
+    if '://' not in url:
+        url = 'https://' + url
+    elif not url.lower().startswith(('http://', 'https://')):
+        raise ValueError(f"Somente URLs http:// ou https:// são suportadas: {url}")
+    return url
+
+
+class HttpClient:
+    """One requests.Session shared by every analysis.
+
+    Keep-alive reuses DNS, TCP and TLS across calls to the same host; only
+    headers are fetched unless the caller asks for the body, which is streamed
+    and cut at `max_body`. Responses are kept in an LRU and reused while fresh;
+    stale ones with an ETag or Last-Modified are revalidated with a conditional
+    request, so an unchanged page costs a 304 instead of a full download."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, max_body: int = MAX_BODY_BYTES, ttl: float = DEFAULT_TTL,
+                 cache_entries: int = CACHE_ENTRIES, pool_size: int = POOL_SIZE, verify: bool = True):
+        self.timeout = timeout
+        self.max_body = max_body
+        self.ttl = ttl
+        self.cache_entries = cache_entries
+        self.stats = {'rede': 0, 'cache': 0, 'revalidado': 0, 'fallback': 0}
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self.session.verify = verify
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, url: str, body: bool) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None or (body and entry.response.method == 'HEAD'):
+                return None
+            self._cache.move_to_end(url)
+            return entry
+
+    def _remember(self, url: str, response: HttpResponse):
+        lifetime = freshness_lifetime(response.headers, self.ttl)
+        if lifetime is None or response.status not in CACHEABLE:
+            return
+        with self._lock:
+            previous = self._cache.get(url)
+            # A headers-only answer must not evict a stored body for the same URL
+            if previous is not None and response.method == 'HEAD' and previous.response.method != 'HEAD':
+                response = previous.response
+            self._cache[url] = _Entry(response, time.monotonic() + lifetime)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def _request(self, method: str, url: str, limit: int, headers: Optional[Dict[str, str]] = None,
+                 allow_redirects: bool = True) -> HttpResponse:
+        started = time.perf_counter()
+        raw = self.session.request(method, url, headers=headers, timeout=self.timeout, stream=True,
+                                   allow_redirects=allow_redirects)
+        chunks, size, truncated = [], 0, False
+        try:
+            if method == 'HEAD':
+                raw.content  # nothing to read; marks the body consumed so the connection is pooled
+            elif limit > 0:
+                for chunk in raw.iter_content(CHUNK_SIZE):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > limit:
+                        truncated = True
+                        break
+            else:
+                truncated = raw.headers.get('content-length') != '0'
+        finally:
+            # A fully read body hands the connection back to the pool; a cut one drops it
+            raw.close()
+        return HttpResponse(raw.url, raw.status_code, raw.reason or '', raw.headers, b''.join(chunks)[:limit],
+                            truncated, method, time.perf_counter() - started, 'rede')
+
+    def fetch(self, url: str, body: bool = False, max_body: Optional[int] = None,
+              allow_redirects: bool = True) -> HttpResponse:
+        """Headers (HEAD, falling back to GET) or headers plus up to `max_body` bytes of body"""
+        limit = self.max_body if max_body is None else max_body
+        entry = self._cached(url, body)
+        if entry is not None and (not body or not entry.response.truncated or len(entry.response.body) >= limit):
+            if time.monotonic() < entry.expires:
+                self.stats['cache'] += 1
+                return entry.response._replace(source='cache', elapsed=0.0)
+
+            validators = entry.validators
+            if validators:
+                response = self._request(entry.response.method, url, limit if body else 0, validators,
+                                         allow_redirects)
+                if response.status == 304:
+                    # RFC 9111 §4.3.4: keep the stored body, update the stored headers
+                    merged = CaseInsensitiveDict(entry.response.headers)
+                    merged.update((k, v) for k, v in response.headers.items() if k.lower() != 'content-length')
+                    refreshed = entry.response._replace(headers=merged, elapsed=response.elapsed)
+                    self._remember(url, refreshed)
+                    self.stats['revalidado'] += 1
+                    return refreshed._replace(source='revalidado')
+                self.stats['rede'] += 1
+                self._remember(url, response)
+                return response
+
+        if body:
+            response = self._request('GET', url, limit, allow_redirects=allow_redirects)
+        else:
+            response = self._request('HEAD', url, 0, allow_redirects=allow_redirects)
+            if response.status in HEAD_FALLBACK:
+                self.stats['fallback'] += 1
+                response = self._request('GET', url, 0, allow_redirects=allow_redirects)
+        self.stats['rede'] += 1
+        self._remember(url, response)
+        return response
+
+    def head(self, url: str) -> HttpResponse:
+        return self.fetch(url, body=False)
+
+    def get(self, url: str, max_body: Optional[int] = None) -> HttpResponse:
+        return self.fetch(url, body=True, max_body=max_body)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._cache)
+        total = self.stats['rede'] + self.stats['cache'] + self.stats['revalidado']
+        hits = self.stats['cache'] + self.stats['revalidado']
+        return dict(self.stats, entries=entries, hit_rate=hits / total if total else 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        self.clear()
+        self.session.close()
+
+
+_shared: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Process-wide instance; Streamlit imports core modules once per server"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpClient()
+        return _shared
+
+
+if __name__ == "__main__":
+    import sys
+    import hashlib
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from core.security_headers import analyze
+
+    # Benchmark: python -m core.http_client [analyses]
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    page = b'<html>' + b'x' * (256 * 1024) + b'</html>'
+    etag = '"' + hashlib.sha1(page).hexdigest()[:16] + '"'
+    # Cache-Control per route: fresh for a second, always revalidate, never store
+    policies = {'/': 'max-age=1', '/revalidar': 'no-cache', '/sem-cache': 'no-store'}
+    counters = {'connections': 0, 'requests': 0}
+
+    class StandIn(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        handshake = 0.02  # what a new TCP+TLS connection costs against a nearby real server
+
+        def setup(self):
+            counters['connections'] += 1
+            time.sleep(self.handshake)
+            super().setup()
+
+        def _respond(self, send_body: bool):
+            counters['requests'] += 1
+            policy = policies.get(self.path, 'no-store')
+            validated = policy != 'no-store'
+            if validated and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', policy)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.send_header('Content-Security-Policy', "default-src 'self'")
+            self.send_header('X-Content-Type-Options', 'nosniff')
+            self.send_header('Server', 'StandIn/1.0')
+            self.send_header('Cache-Control', policy)
+            if validated:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            if send_body:
+                self.wfile.write(page)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        def handle_error(self, request, client_address):
+            pass  # capped reads hang up mid-body on purpose
+
+    server = Server(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def measure(label, analyse):
+        for key in counters:
+            counters[key] = 0
+        received = 0
+        started = time.perf_counter()
+        for _ in range(runs):
+            received += analyse()
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<40} {elapsed / runs * 1000:7.2f} ms/análise  conexões {counters['connections']:4}  "
+              f"requisições {counters['requests']:4}  corpo lido {received / 1024 / 1024:6.1f} MiB")
+
+    def naive(path):
+        response = requests.get(base + path, timeout=10)
+        analyze(response.headers, base)
+        return len(response.content)
+
+    def pooled(path, body=False, max_body=None):
+        response = client.fetch(base + path, body=body, max_body=max_body)
+        analyze(response.headers, base)
+        return len(response.body) if response.source == 'rede' else 0
+
+    print(f"{runs} análises contra {base} ({StandIn.handshake * 1000:.0f} ms por conexão nova, página de "
+          f"{len(page) // 1024} KiB)")
+    client = HttpClient()
+    measure("requests.get sem sessão (antes)", lambda: naive('/sem-cache'))
+    measure("pool + HEAD, resposta no-store", lambda: pooled('/sem-cache'))
+    measure("pool + HEAD + cache (max-age=1)", lambda: pooled('/'))
+    measure("corpo com revalidação por ETag (304)", lambda: pooled('/revalidar', body=True))
+    measure("corpo no-store limitado a 64 KiB", lambda: pooled('/sem-cache', body=True, max_body=64 * 1024))
+    print(f"  estatísticas do cliente: {client.summary()}")
+    server.shutdown()
@@ -0,0 +1,366 @@
+"""
+HTTP Timing
+Per-phase request timing (DNS, TCP connect, TLS, first byte, transfer) with cold and keep-alive percentiles
+"""
+
+import math
+import socket
+import ssl
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from core.http_client import USER_AGENT
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_SAMPLES = 10
+CHUNK_SIZE = 64 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+PERCENTILES = (50, 95, 99)
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+PHASE_NAMES = {
+    'dns': 'DNS', 'connect': 'Conexão TCP', 'tls': 'Handshake TLS', 'ttfb': 'Primeiro byte',
+    'transfer': 'Transferência', 'total': 'Total',
+}
+MODES = ('frio', 'quente')  # new connection per request, or one keep-alive connection reused
+
+
+class TimingSample(NamedTuple):
+    dns: float
+    connect: float
+    tls: float
+    ttfb: float  # request sent until the first response byte: server think time plus one round trip
+    transfer: float  # first byte until the end of the body
+    status: int
+    bytes: int
+    reused: bool
+
+    @property
+    def total(self) -> float:
+        return self.dns + self.connect + self.tls + self.ttfb + self.transfer
+
+    def as_row(self) -> Dict[str, object]:
+        row: Dict[str, object] = {f"{PHASE_NAMES[phase]} (ms)": round(getattr(self, phase) * 1000, 2)
+                                  for phase in PHASES + ('total',)}
+        row.update({'Status': self.status, 'Bytes': self.bytes, 'Reutilizada': 'sim' if self.reused else 'não'})
+        return row
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile, same convention as the load harness"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class TimingReport(NamedTuple):
+    url: str
+    mode: str
+    samples: List[TimingSample]
+    errors: int
+
+    def percentile(self, phase: str, p: float) -> float:
+        return percentile([getattr(sample, phase) for sample in self.samples], p)
+
+    def summary(self) -> List[Dict[str, object]]:
+        return [{'Modo': self.mode, 'Fase': PHASE_NAMES[phase],
+                 **{f"p{p} (ms)": round(self.percentile(phase, p) * 1000, 2) for p in PERCENTILES}}
+                for phase in PHASES + ('total',)]
+
+    def waterfall(self, p: float = 50) -> List[Tuple[str, float, float]]:
+        """(phase, start, end) in seconds, each phase starting where the previous one ends. Percentiles are taken
+        per phase, so the last end is close to, not exactly, the percentile of the total"""
+        bars = []
+        start = 0.0
+        for phase in PHASES:
+            duration = self.percentile(phase, p)
+            bars.append((phase, start, start + duration))
+            start += duration
+        return bars
+
+
+class _Stream:
+    """Receive buffer over a socket that counts and discards body bytes instead of keeping them"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = bytearray()
+
+    def fill(self) -> bool:
+        data = self.sock.recv(CHUNK_SIZE)
+        self.buffer += data
+        return bool(data)
+
+    def read_until(self, marker: bytes, limit: int) -> bytes:
+        while True:
+            end = self.buffer.find(marker)
+            if end >= 0:
+                line = bytes(self.buffer[:end])
+                del self.buffer[:end + len(marker)]
+                return line
+            if len(self.buffer) > limit:
+                raise ValueError("Cabeçalho HTTP grande demais")
+            if not self.fill():
+                raise ConnectionError("Conexão fechada no meio da resposta")
+
+    def skip(self, count: int) -> int:
+        left = count
+        while left:
+            if not self.buffer and not self.fill():
+                raise ConnectionError("Conexão fechada no meio do corpo")
+            taken = min(left, len(self.buffer))
+            del self.buffer[:taken]
+            left -= taken
+        return count
+
+    def drain(self) -> int:
+        count = len(self.buffer)
+        self.buffer.clear()
+        while True:
+            data = self.sock.recv(CHUNK_SIZE)
+            if not data:
+                return count
+            count += len(data)
+
+
+class TimingProbe:
+    """One HTTP/1.1 connection measured phase by phase; `sample(reuse=True)` keeps it alive between requests"""
+
+    def __init__(self, url: str, timeout: float = DEFAULT_TIMEOUT, context: Optional[ssl.SSLContext] = None,
+                 method: str = 'GET'):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f"URL inválida para medição: {url}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.tls = parts.scheme == 'https'
+        self.context = context or (ssl.create_default_context() if self.tls else None)
+        self.timeout = timeout
+        self.method = method
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        default_port = self.port == (443 if self.tls else 80)
+        host_header = self.host if default_port else f"{self.host}:{self.port}"
+        if ':' in self.host:
+            host_header = f"[{self.host}]" if default_port else f"[{self.host}]:{self.port}"
+        self.request = (f"{method} {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {USER_AGENT}\r\n"
+                        f"Accept: */*\r\nAccept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n").encode()
+        self._sock = None
+        self._stream: Optional[_Stream] = None
+
+    def _open(self) -> Tuple[float, float, float]:
+        started = time.perf_counter()
+        addresses = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+        resolved = time.perf_counter()
+        # Addresses in resolver order, as socket.create_connection does; failed attempts count as connect time
+        for index, (family, kind, proto, _, address) in enumerate(addresses):
+            sock = socket.socket(family, kind, proto)
+            try:
+                sock.settimeout(self.timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.connect(address)
+                break
+            except OSError:
+                sock.close()
+                if index == len(addresses) - 1:
+                    raise
+        connected = time.perf_counter()
+        try:
+            if self.tls:
+                sock = self.context.wrap_socket(sock, server_hostname=self.host)
+        except BaseException:
+            sock.close()
+            raise
+        handshaken = time.perf_counter()
+        self._sock = sock
+        self._stream = _Stream(sock)
+        return resolved - started, connected - resolved, handshaken - connected
+
+    def _exchange(self) -> Tuple[float, float, int, int, bool]:
+        """Send the request and read the whole response: (ttfb, transfer, status, body bytes, keep-alive)"""
+        stream = self._stream
+        sent = time.perf_counter()
+        self._sock.sendall(self.request)
+        if not stream.fill():
+            raise ConnectionResetError("Servidor fechou a conexão sem responder")
+        first = time.perf_counter()
+        while True:
+            head = stream.read_until(b'\r\n\r\n', MAX_HEADER_BYTES).decode('iso-8859-1')
+            status_line, _, header_block = head.partition('\r\n')
+            version, _, rest = status_line.partition(' ')
+            if not version.startswith('HTTP/') or not rest[:3].isdigit():
+                raise ValueError(f"Resposta HTTP inválida: {status_line[:60]!r}")
+            status = int(rest[:3])
+            if status >= 200 or status == 101:
+                break  # 1xx interim responses come before the real one
+        headers = {}
+        for line in header_block.split('\r\n'):
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = 'close' not in connection and (version != 'HTTP/1.0' or 'keep-alive' in connection)
+        if self.method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            size = 0
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            size = 0
+            while True:
+                chunk = int(stream.read_until(b'\r\n', MAX_HEADER_BYTES).split(b';')[0].strip() or b'0', 16)
+                if not chunk:
+                    while stream.read_until(b'\r\n', MAX_HEADER_BYTES):
+                        pass  # trailers
+                    break
+                size += stream.skip(chunk)
+                stream.read_until(b'\r\n', 2)
+        elif headers.get('content-length', '').isdigit():
+            size = stream.skip(int(headers['content-length']))
+        else:
+            size = stream.drain()
+            keep_alive = False
+        return first - sent, time.perf_counter() - first, status, size, keep_alive
+
+    def sample(self, reuse: bool = True) -> TimingSample:
+        reused = reuse and self._sock is not None
+        if reused:
+            try:
+                ttfb, transfer, status, size, keep_alive = self._exchange()
+                timings = (0.0, 0.0, 0.0)
+            except (ConnectionError, socket.timeout):
+                # The server dropped the idle connection: count it as a cold request, like a real client would
+                reused = False
+        if not reused:
+            self.close()
+            timings = self._open()
+            try:
+                ttfb, transfer, status, size, keep_alive = self._exchange()
+            except BaseException:
+                self.close()
+                raise
+        if not (reuse and keep_alive):
+            self.close()
+        return TimingSample(*timings, ttfb, transfer, status, size, reused)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = None
+        self._stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def probe(url: str, samples: int = DEFAULT_SAMPLES, reuse: bool = False, timeout: float = DEFAULT_TIMEOUT,
+          context: Optional[ssl.SSLContext] = None) -> TimingReport:
+    """`samples` timed requests; with `reuse` a first untimed request opens the keep-alive connection"""
+    if samples < 1:
+        raise ValueError("Número de amostras deve ser positivo")
+    measured: List[TimingSample] = []
+    errors = 0
+    last_error: Optional[Exception] = None
+    with TimingProbe(url, timeout, context) as timing:
+        if reuse:
+            timing.sample(reuse=True)
+        for _ in range(samples):
+            try:
+                measured.append(timing.sample(reuse))
+            except (OSError, ValueError) as e:
+                errors += 1
+                last_error = e
+    if not measured:
+        raise last_error
+    return TimingReport(url, 'quente' if reuse else 'frio', measured, errors)
+
+
+def compare(url: str, samples: int = DEFAULT_SAMPLES, timeout: float = DEFAULT_TIMEOUT,
+            context: Optional[ssl.SSLContext] = None) -> Dict[str, TimingReport]:
+    """Cold (new connection per request) against warm (keep-alive) timings of the same URL"""
+    return {mode: probe(url, samples, mode == 'quente', timeout, context) for mode in MODES}
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import shutil
+    import tempfile
+    import threading
+    import subprocess
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    # Benchmark: python -m core.http_timing [url] [amostras]
+    args = sys.argv[1:]
+    target = args.pop(0) if args and not args[0].isdigit() else None
+    count = int(args[0]) if args else 50
+
+    def show(reports: Dict[str, TimingReport]):
+        for report in reports.values():
+            print(f"  {report.mode:<6} {report.url}  ({len(report.samples)} amostras, {report.errors} erros)")
+            for row in report.summary():
+                print(f"    {row['Fase']:<15}" + ''.join(f"  p{p} {row[f'p{p} (ms)']:8.2f} ms" for p in PERCENTILES))
+
+    if target:
+        show(compare(target, count))
+        sys.exit()
+
+    body = b'x' * (256 * 1024)
+
+    class StandIn(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+        think = 0.005  # server-side work before the first byte
+
+        def do_GET(self):
+            time.sleep(self.think)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            if self.path == '/chunked':
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for start in range(0, len(body), 16 * 1024):
+                    piece = body[start:start + 16 * 1024]
+                    self.wfile.write(b'%x\r\n%s\r\n' % (len(piece), piece))
+                self.wfile.write(b'0\r\n\r\n')
+            else:
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    def serve(context: Optional[ssl.SSLContext] = None) -> ThreadingHTTPServer:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+        if context:
+            server.socket = context.wrap_socket(server.socket, server_side=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    http_server = serve()
+    print(f"{count} amostras por modo contra stand-ins locais (resposta de {len(body) // 1024} KiB, "
+          f"{StandIn.think * 1000:.0f} ms de processamento no servidor)")
+    show(compare(f"http://localhost:{http_server.server_port}/", count))
+    show({'chunked': probe(f"http://localhost:{http_server.server_port}/chunked", count, reuse=True)})
+
+    # HTTPS with a throwaway self-signed certificate; the client trusts exactly that certificate
+    if shutil.which('openssl'):
+        directory = tempfile.mkdtemp()
+        cert, key = os.path.join(directory, 'cert.pem'), os.path.join(directory, 'key.pem')
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1', '-subj',
+                        '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost', '-keyout', key, '-out', cert],
+                       check=True, capture_output=True)
+        server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        server_context.load_cert_chain(cert, key)
+        https_server = serve(server_context)
+        show(compare(f"https://localhost:{https_server.server_port}/", count,
+                     context=ssl.create_default_context(cafile=cert)))
+        https_server.shutdown()
+        shutil.rmtree(directory)
+    else:
+        print("  openssl não encontrado: medição HTTPS pulada")
+    http_server.shutdown()
@@ -0,0 +1,646 @@
+"""
+Injection Detector
+libinjection-style SQLi/XSS detection: tokenize, fold, match fingerprints of known attack shapes
+"""
+
+import re
+import html
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote_plus
+
+FINGERPRINT_TOKENS = 5
+SQL_CONTEXTS = ('', "'", '"')  # input placed as is, inside '...' and inside "..."
+
+TOKEN_TYPES = {
+    's': 'string', '1': 'número', 'n': 'identificador', 'k': 'palavra-chave', 'E': 'comando SQL',
+    'U': 'UNION', '&': 'lógico', 'o': 'operador', 'f': 'função', 'v': 'variável', 'c': 'comentário',
+    'B': 'agrupamento', '(': 'parêntese', ')': 'parêntese', ',': 'vírgula', ';': 'fim de comando',
+}
+
+_KEYWORDS: Dict[str, str] = {}
+for _type, _words in (
+    ('E', 'SELECT INSERT UPDATE DELETE DROP CREATE ALTER TRUNCATE EXEC EXECUTE DECLARE SHUTDOWN GRANT MERGE CALL'),
+    ('U', 'UNION'),
+    ('&', 'AND OR XOR'),
+    ('o', 'NOT LIKE RLIKE REGEXP IS IN BETWEEN DIV MOD SOUNDS COLLATE ESCAPE'),
+    ('k', 'FROM WHERE INTO VALUES SET TABLE AS ON JOIN CASE WHEN THEN ELSE END WAITFOR DELAY OUTFILE DUMPFILE '
+          'PROCEDURE DISTINCT ALL TOP BY ASC DESC'),
+    ('B', 'HAVING LIMIT OFFSET'),
+    ('1', 'TRUE FALSE NULL'),
+):
+    for _word in _words.split():
+        _KEYWORDS[_word] = _type
+
+_NUMBER = re.compile(r'0x[0-9a-f]+|0b[01]+|(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?', re.IGNORECASE)
+_WORD = re.compile(r'[^\W\d][\w$]*(?:\.[\w$]+)*')
+_VARIABLE = re.compile(r'@@?[\w$.]*')
+_OPERATORS = ('<=>', '<>', '!=', '<=', '>=', '||', '&&', ':=', '<<', '>>', '==')
+_LOGIC_OPERATORS = ('||', '&&')
+_UNARY = ('+', '-', '~', '!')
+_TIME_FUNCTIONS = ('SLEEP', 'BENCHMARK', 'PG_SLEEP', 'WAITFOR')
+_ERROR_FUNCTIONS = ('EXTRACTVALUE', 'UPDATEXML', 'CONVERT', 'CAST', 'EXP', 'GTID_SUBSET', 'JSON_KEYS')
+
+# Attack shapes the fingerprint set is compiled from. A leading quote means the payload
+# closes a string the application opened; the same shape with the other quote is added too.
+SQLI_TEMPLATES = (
+    # Tautologias
+    "' OR '1'='1", "' OR '1'='1'--", "' OR '1'='1' /*", "' OR 1=1--", "' OR 1=1#", "' OR 1=1", "' OR 'a'='a",
+    "' OR ''='", "' OR 1--", "' OR TRUE--", "' OR 1=1 LIMIT 1--", "') OR ('1'='1", "') OR 1=1--", "')) OR 1=1--",
+    "' OR 'x' LIKE 'x", "' OR 2>1--", "' OR username IS NOT NULL--", "' OR 1 IN (1)--", "' || '1'='1",
+    "admin' OR '1'='1", "admin' OR 1=1--", "' OR 1=1 OR '", "' OR '1", "1 OR 1=1", "1 OR 1=1--", "1) OR (1=1",
+    "-1 OR 1=1", "1 OR '1'='1", "1 OR TRUE", "' OR NOT 1=2--", "' OR 1<2--", "' OR 1=1;--",
+    # Comentário corta a verificação da senha
+    "admin'--", "admin'#", "admin'/*", "admin')--", "admin'))--", "' --", "'#", "admin' -- -", "admin' LIMIT 1--",
+    # UNION e contagem de colunas
+    "' UNION SELECT NULL--", "' UNION SELECT username, password FROM users--", "' UNION ALL SELECT 1,2,3--",
+    "' UNION SELECT @@version--", "' UNION SELECT table_name FROM information_schema.tables--",
+    "' UNION SELECT number, balance FROM accounts WHERE balance > 1000000--", "' AND 1=2 UNION SELECT 1,2--",
+    "' UNION SELECT 1,CONCAT(username,0x3a,password) FROM users--", "' UNION (SELECT 1,2)--", "') UNION SELECT 1,2--",
+    "1 UNION SELECT 1,2--", "-1 UNION SELECT username, password FROM users", "1 UNION ALL SELECT NULL,NULL",
+    "' ORDER BY 1--", "' ORDER BY 3#", "1 ORDER BY 2", "' GROUP BY 1--", "' HAVING 1=1--",
+    "' UNION SELECT 'a','b'--", "' UNION SELECT username FROM users WHERE 'a'='a",
+    # Consultas empilhadas
+    "'; DROP TABLE users--", "1; DROP TABLE users", "'; UPDATE users SET role='admin'--",
+    "'; INSERT INTO users VALUES (1,'x')--", "'; EXEC xp_cmdshell('dir')--", "'; SHUTDOWN--", "1; SELECT SLEEP(5)",
+    "'; DELETE FROM users--", "'; SELECT * FROM users--", "1; EXEC xp_cmdshell 'dir'",
+    # Blind por tempo
+    "' AND SLEEP(5)--", "' OR SLEEP(5)--", "' OR SLEEP(5)='", "1 AND SLEEP(5)", "1 OR SLEEP(5)",
+    "' AND (SELECT SLEEP(5))--", "'; WAITFOR DELAY '0:0:5'--", "1; WAITFOR DELAY '0:0:5'",
+    "' AND BENCHMARK(1000000,MD5(1))--", "1 AND IF(1=1,SLEEP(5),0)", "' AND IF(1=1,SLEEP(5),0)--", "' OR pg_sleep(5)--",
+    "' AND 1=(SELECT 1 FROM (SELECT SLEEP(5))x)--", "' AND SLEEP(5) AND '1'='1", "1 AND (SELECT SLEEP(5))",
+    # Blind booleana
+    "' AND 1=1--", "' AND 1=2--", "' AND 'a'='a", "1 AND 1=1", "1 AND 1=2", "1 AND '1'='1", "' AND SUBSTRING(password,1,1)='a'--",
+    "' AND ASCII(SUBSTRING((SELECT password FROM users LIMIT 1),1,1))>64--", "1 AND (SELECT COUNT(*) FROM users)>0",
+    "' AND EXISTS(SELECT 1 FROM users)--", "' AND LENGTH(password)>5--", "' AND (SELECT 1)=1--",
+    "admin' AND '1'='1", "admin' AND 1=1--", "' AND password LIKE 'a%",
+    # Baseada em erro
+    "' AND EXTRACTVALUE(1,CONCAT(0x7e,VERSION()))--", "' AND UPDATEXML(1,CONCAT(0x7e,USER()),1)--",
+    "' AND 1=CONVERT(int,@@version)--", "' AND 1=CAST((SELECT password FROM users LIMIT 1) AS int)--",
+    "1 AND EXTRACTVALUE(1,CONCAT(0x7e,DATABASE()))", "' OR 1 GROUP BY CONCAT(VERSION(),FLOOR(RAND(0)*2))--",
+)
+
+# Base XSS payloads; the benchmark mutates them, the detector itself is rule-based
+XSS_TEMPLATES = (
+    "<script>alert('XSS')</script>", "<img src=x onerror=alert('XSS')>", "<svg onload=alert('XSS')>",
+    "<body onload=alert(1)>", "<iframe src=\"javascript:alert(1)\"></iframe>", "<a href=\"javascript:alert(1)\">x</a>",
+    "\"><script>alert(1)</script>", "'><img src=x onerror=alert(1)>", "\" onmouseover=\"alert(1)",
+    "' onfocus='alert(1)' autofocus='", "<details open ontoggle=alert(1)>", "<input autofocus onfocus=alert(1)>",
+    "<video><source onerror=alert(1)></video>", "<object data=\"javascript:alert(1)\">", "<embed src=\"data:text/html,x\">",
+    "<math><a xlink:href=\"javascript:alert(1)\">x</a></math>", "<div style=\"width:expression(alert(1))\">",
+    "<form action=\"javascript:alert(1)\"><button>x</button></form>", "<base href=\"javascript:alert(1)//\">",
+    "';alert('XSS');//", "\";alert(1);//", "</title><script>alert(1)</script>", "<iframe srcdoc=\"<script>alert(1)</script>\">",
+    "<meta http-equiv=\"refresh\" content=\"0;url=javascript:alert(1)\">", "<marquee onstart=alert(1)>",
+)
+
+# Payloads from public cheat sheets kept out of SQLI_TEMPLATES: the benchmark measures misses on
+# them, which says how far the fingerprints generalise beyond the shapes they were compiled from
+HELD_OUT_SQLI = (
+    "' or 'abc'='abc'--", "admin' or '1'='1'#", "' or 1=1 limit 1 -- -+", "1' and 1=1 and '1'='1", "' or 3>2--",
+    "\" OR \"\"=\"", "') OR '1'='1'--", "1 OR 2=2", "' OR 'x'='x'#", "admin'/**/OR/**/1=1#", "1' or '1'='1",
+    "' OR EXISTS(SELECT * FROM users WHERE name='admin')--", "1' ORDER BY 10--+", "1' UNION SELECT null,null,null--+",
+    "' UNION SELECT user(),database()#", "1 AND 1=0 UNION ALL SELECT table_schema,table_name FROM information_schema.tables",
+    "' AND 1=0 UNION SELECT 'a',password FROM users WHERE 'x'='x", "' UNION SELECT 1,@@version,3#",
+    "' HAVING 1=1#", "' GROUP BY columnnames HAVING 1=1 --", "'; EXEC master..xp_cmdshell 'ping 127.0.0.1'--",
+    "1;DROP TABLE users--", "'; TRUNCATE TABLE logs--", "1); DROP TABLE users--",
+    "' AND (SELECT * FROM (SELECT(SLEEP(5)))bAKL)--", "1) AND SLEEP(5)#", "1 AND (SELECT 4567 FROM (SELECT(SLEEP(5)))abc)",
+    "'; waitfor delay '0:0:10'--", "' OR BENCHMARK(5000000,SHA1(1))#", "1' AND pg_sleep(5)--",
+    "' AND 1=(SELECT COUNT(*) FROM tablenames); --", "1' AND LENGTH(database())=8--", "' AND MID(version(),1,1)='5'#",
+    "1' AND extractvalue(rand(),concat(0x3a,(SELECT version())))--", "' AND updatexml(null,concat(0x0a,version()),null)--",
+)
+HELD_OUT_XSS = (
+    "<svg/onload=alert(1)>", "<img src=1 onerror=confirm(1)>", "<body onpageshow=alert(1)>",
+    "<a href=\"jAvAsCrIpT&colon;alert(1)\">x</a>", "<iframe src=javascript:alert(1)>", "<x onclick=alert(1)>click",
+    "<svg><animate onbegin=alert(1) attributeName=x dur=1s>", "\"autofocus onfocus=alert(1)//",
+    "<select autofocus onfocus=alert(1)>", "<textarea autofocus onfocus=alert(1)>", "<svg><script>alert(1)</script>",
+    "<form><button formaction=javascript:alert(1)>x", "<object data=data:text/html;base64,PHNjcmlwdD5hbGVydCgxKTwvc2NyaXB0Pg==>",
+    "'-alert(1)-'", "\";confirm(document.cookie)//", "<img src=x:alert(alt) onerror=eval(src) alt=0>",
+    "<audio src=x onerror=alert(1)>", "<marquee onfinish=alert(1)>x</marquee>", "</textarea><script>alert(1)</script>",
+    "<a href=\"&#x6A;avascript:alert(1)\">x</a>",
+)
+
+TECHNIQUES = {
+    'tautologia': ('Tautologia', "O OR com uma condição sempre verdadeira torna o WHERE inteiro verdadeiro: "
+                                 "a consulta devolve todas as linhas e o login passa sem senha."),
+    'comentario': ('Comentário', "A aspa fecha a string e o comentário (-- ou #) descarta o resto da consulta, "
+                                 "inclusive a verificação da senha."),
+    'union': ('UNION', "UNION SELECT anexa o resultado de outra consulta ao original: com o mesmo número de "
+                       "colunas, qualquer tabela do banco aparece na página. ORDER BY n descobre esse número."),
+    'empilhada': ('Consultas empilhadas', "O ponto e vírgula encerra a consulta original e começa outra: DROP, "
+                                          "UPDATE ou INSERT arbitrários, se o driver aceitar várias instruções."),
+    'tempo': ('Blind por tempo', "SLEEP, BENCHMARK ou WAITFOR atrasam a resposta só quando a condição é "
+                                 "verdadeira: o tempo vaza os dados um bit por vez."),
+    'booleana': ('Blind booleana', "Um AND com condição escolhida pelo atacante alterna a resposta entre "
+                                   "verdadeiro e falso: dá para extrair dados sem vê-los."),
+    'erro': ('Baseada em erro', "Funções como EXTRACTVALUE ou CAST forçam um erro cuja mensagem contém o dado "
+                                "pedido."),
+    'script': ('Tag <script>', "O navegador executa o conteúdo da tag como JavaScript."),
+    'tag': ('Tag perigosa', "A tag carrega ou executa conteúdo ativo (iframe, object, svg, style, base...)."),
+    'evento': ('Atributo de evento', "onerror, onload e afins rodam JavaScript quando o evento dispara, "
+                                     "sem precisar de <script>."),
+    'url': ('URL executável', "javascript:, vbscript: ou data: em href/src/action roda código quando o link ou "
+                              "o recurso é ativado."),
+    'estilo': ('CSS ativo', "expression() ou javascript: dentro de style executa código em navegadores antigos."),
+    'js': ('Quebra de string JavaScript', "A aspa fecha a string do script da página e o código seguinte roda "
+                                          "com os privilégios do site."),
+    'comentario_html': ('Comentário condicional', "Comentários condicionais e declarações ativam parsers "
+                                                  "legados que executam o conteúdo."),
+}
+
+XSS_CONTEXTS = (
+    ('texto HTML', ''),
+    ('atributo sem aspas', '<x y='),
+    ('atributo entre aspas simples', "<x y='"),
+    ('atributo entre aspas duplas', '<x y="'),
+    ('URL de link', '<a href="'),
+)
+# Two bare values joined by AND/OR are as common in prose ("10 or 11") as in tautologies: these
+# shapes only count when a comment cuts off the rest of the query
+_BARE_LOGIC = frozenset(('1&1', 's&s', '1&s', 's&1'))
+SQL_CONTEXT_NAMES = {'': 'sem aspas', "'": 'dentro de aspas simples', '"': 'dentro de aspas duplas'}
+
+_BLACK_TAGS = frozenset(('applet', 'base', 'comment', 'embed', 'frame', 'frameset', 'handler', 'iframe', 'import',
+                         'isindex', 'link', 'listener', 'meta', 'noscript', 'object', 'script', 'style', 'vmlframe',
+                         'xml', 'xss'))
+_BLACK_TAG_PREFIXES = ('svg', 'xsl')
+_URL_ATTRIBUTES = frozenset(('href', 'src', 'action', 'formaction', 'data', 'xlink:href', 'background', 'dynsrc',
+                             'lowsrc', 'poster', 'codebase', 'code', 'content', 'from', 'to', 'values', 'by'))
+_EVENT = re.compile(r'on(?:load\w*|error|(?:dbl)?click|mouse\w+|key\w+|focus\w*|blur|change|submit|reset|select\w*|'
+                    r'input|invalid|toggle|animation\w+|transition\w+|begin|end|repeat|page\w+|hashchange|popstate|'
+                    r'pointer\w+|wheel|scroll\w*|resize|unload|beforeunload|message|copy|cut|paste|drag\w*|drop|'
+                    r'play\w*|pause|canplay\w*|ended|progress|touch\w+|auxclick|contextmenu|formdata|search|show|'
+                    r'afterprint|beforeprint|readystatechange|start|finish|bounce|abort|storage|online|offline|'
+                    r'durationchange|emptied|seek\w+|stalled|suspend|timeupdate|volumechange|waiting|cancel|close)$')
+_DANGEROUS_SCHEME = re.compile(r'(?:javascript|vbscript|livescript):|data:(?!image/(?:png|gif|jpe?g|webp))[\w.+-]+/[\w.+-]+[;,]')
+_CONTROL = re.compile(r'[\x00-\x20]+')
+_TAG_NAME = re.compile(r'[^\s/>\x00]+')
+_ATTRIBUTE_NAME = re.compile(r'=?[^\s/>=\x00]*')
+_UNQUOTED_VALUE = re.compile(r'[^\s>]*')
+_JS_CALL = re.compile(r"[^\W\d][\w$.]*\s*(?:\(|`|\[)|</script")
+
+
+class Token(NamedTuple):
+    type: str
+    value: str
+
+    def as_row(self) -> Dict[str, str]:
+        return {'Token': self.value, 'Classe': TOKEN_TYPES.get(self.type, self.type), 'Código': self.type}
+
+
+class Detection(NamedTuple):
+    kind: str  # 'sqli', 'xss' or '' when nothing matched
+    technique: str  # key of TECHNIQUES
+    context: str
+    fingerprint: str  # folded SQL token classes, or the HTML construct that fired
+    tokens: List[Token]
+
+    @property
+    def detected(self) -> bool:
+        return bool(self.kind)
+
+    @property
+    def name(self) -> str:
+        return TECHNIQUES[self.technique][0] if self.technique else '-'
+
+    @property
+    def explanation(self) -> str:
+        return TECHNIQUES[self.technique][1] if self.technique else 'Nenhum padrão de ataque reconhecido.'
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Ataque': {'sqli': 'SQL Injection', 'xss': 'XSS'}.get(self.kind, 'nenhum'),
+            'Técnica': self.name,
+            'Contexto': self.context or '-',
+            'Fingerprint': self.fingerprint or '-',
+        }
+
+
+def _string_end(text: str, start: int, quote: str) -> int:
+    """Index of the quote closing a string that starts at `start`; backslash and doubled quotes escape"""
+    i = start
+    while True:
+        j = text.find(quote, i)
+        if j < 0:
+            return len(text)
+        slashes = 0
+        while j - slashes - 1 >= start and text[j - slashes - 1] == '\\':
+            slashes += 1
+        if slashes % 2:
+            i = j + 1
+        elif j + 1 < len(text) and text[j + 1] == quote:
+            i = j + 2
+        else:
+            return j
+
+
+def sql_tokens(text: str, quote: str = '') -> List[Token]:
+    """SQL tokens of `text` as the database would read it after an opening `quote` (none for '')"""
+    tokens: List[Token] = []
+    n = len(text)
+    i = 0
+    executable = False
+    if quote:
+        end = _string_end(text, 0, quote)
+        tokens.append(Token('s', text[:end]))
+        i = end + 1
+    while i < n:
+        c = text[i]
+        if c.isspace() or c == '\x00':
+            i += 1
+        elif c in '\'"':
+            end = _string_end(text, i + 1, c)
+            tokens.append(Token('s', text[i + 1:end]))
+            i = end + 1
+        elif c == '`':
+            end = text.find('`', i + 1)
+            end = n if end < 0 else end
+            tokens.append(Token('n', text[i + 1:end]))
+            i = end + 1
+        elif c == '#' or text.startswith('--', i):
+            tokens.append(Token('c', text[i:]))
+            break
+        elif text.startswith('/*', i):
+            if text.startswith('/*!', i):  # MySQL executable comment: its content is code
+                i += 3
+                while i < n and text[i].isdigit():
+                    i += 1
+                executable = True
+                continue
+            end = text.find('*/', i + 2)
+            if end < 0:
+                tokens.append(Token('c', text[i:]))
+                break
+            i = end + 2  # inline comments separate tokens like whitespace
+        elif executable and text.startswith('*/', i):
+            executable = False
+            i += 2
+        elif c.isdigit() or (c == '.' and i + 1 < n and text[i + 1].isdigit()):
+            match = _NUMBER.match(text, i)
+            tokens.append(Token('1', match.group()))
+            i = match.end()
+        elif c == '@':
+            match = _VARIABLE.match(text, i)
+            tokens.append(Token('v', match.group()))
+            i = match.end()
+        elif c in '(),;':
+            tokens.append(Token(c, c))
+            i += 1
+        else:
+            match = _WORD.match(text, i)
+            if match:
+                word = match.group()
+                i = match.end()
+                j = i
+                while j < n and text[j].isspace():
+                    j += 1
+                kind = _KEYWORDS.get(word.upper(), 'n')
+                if j < n and text[j] == '(' and kind in ('n', 'k', 'B', '1'):
+                    kind = 'f'
+                tokens.append(Token(kind, word))
+                continue
+            operator = next((op for op in _OPERATORS if text.startswith(op, i)), c)
+            tokens.append(Token('&' if operator in _LOGIC_OPERATORS else 'o', operator))
+            i += len(operator)
+    return tokens
+
+
+def fold(tokens: List[Token]) -> List[Token]:
+    """Collapse what doesn't change the shape of the query: UNION ALL, GROUP BY, NOT LIKE, unary signs,
+    'a' 'b' string concatenation"""
+    folded: List[Token] = []
+    for token in tokens:
+        previous = folded[-1] if folded else None
+        upper = token.value.upper()
+        if previous is not None:
+            if previous.type == 'U' and upper in ('ALL', 'DISTINCT'):
+                continue
+            if upper == 'BY' and previous.value.upper() in ('GROUP', 'ORDER'):
+                folded[-1] = Token('B', f"{previous.value} {token.value}")
+                continue
+            if token.type == previous.type == 'o' and token.value.isalpha() and previous.value.isalpha():
+                folded[-1] = Token('o', f"{previous.value} {token.value}")  # IS NOT, NOT LIKE, NOT IN
+                continue
+            if token.type == previous.type == 'k' and previous.value.upper() == 'WAITFOR':
+                folded[-1] = Token('k', f"{previous.value} {token.value}")
+                continue
+            if token.type == previous.type == 's':
+                folded[-1] = Token('s', previous.value + token.value)
+                continue
+            if (previous.type == 'o' and previous.value in _UNARY and token.type in '1nfsv('
+                    and (len(folded) == 1 or folded[-2].type in 'o&(,Ek;B')):
+                folded[-1] = token
+                continue
+        folded.append(token)
+    return folded
+
+
+def fingerprint(tokens: List[Token]) -> str:
+    return ''.join(token.type for token in tokens[:FINGERPRINT_TOKENS])
+
+
+def _template_fingerprints() -> Dict[str, str]:
+    """fingerprint -> the template it was compiled from"""
+    fingerprints: Dict[str, str] = {}
+    for template in SQLI_TEMPLATES:
+        variants = [template]
+        if '1=1' in template:
+            variants.append(template.replace('1=1', "'1'='1'"))
+        variants += [variant.replace("'", '"') for variant in variants if "'" in variant]
+        for variant in variants:
+            quote = next((q for q in ("'", '"') if q in variant.split(' ', 1)[0]), '')
+            # Up to the first quote is the value the application wrapped in quotes
+            tokens = fold(sql_tokens(variant, quote))
+            fingerprints.setdefault(fingerprint(tokens), template)
+    return fingerprints
+
+
+SQLI_FINGERPRINTS = _template_fingerprints()
+
+
+def _sql_technique(tokens: List[Token]) -> str:
+    types = ''.join(token.type for token in tokens)
+    words = {token.value.upper() for token in tokens if token.type in 'fk&'}
+    if any(word.startswith(_TIME_FUNCTIONS) for word in words):
+        return 'tempo'
+    if any(word in _ERROR_FUNCTIONS for word in words):
+        return 'erro'
+    if ';' in types and re.search(r';[(]*[EkUf]', types):
+        return 'empilhada'
+    if 'U' in types or 'B' in types:
+        return 'union'
+    logic = [token.value.upper() for token in tokens if token.type == '&']
+    if logic:
+        return 'booleana' if logic[0] in ('AND', '&&') else 'tautologia'
+    return 'comentario'
+
+
+def _decoded_variants(text: str) -> List[str]:
+    """The text itself and, when it looks URL-encoded, its decoded form"""
+    variants = [text]
+    if '%' in text or '+' in text:
+        decoded = unquote_plus(text)
+        if decoded != text:
+            variants.append(decoded)
+    return variants
+
+
+def detect_sqli(text: str) -> Detection:
+    for candidate in _decoded_variants(text):
+        for quote in SQL_CONTEXTS:
+            tokens = fold(sql_tokens(candidate, quote))
+            shape = fingerprint(tokens)
+            # A trailing comment only discards the rest of the query, the shape before it decides
+            if shape in _BARE_LOGIC:
+                continue
+            if shape in SQLI_FINGERPRINTS or (shape.endswith('c') and shape[:-1] in SQLI_FINGERPRINTS):
+                return Detection('sqli', _sql_technique(tokens), SQL_CONTEXT_NAMES[quote], shape, tokens)
+    tokens = fold(sql_tokens(text))
+    return Detection('', '', '', fingerprint(tokens), tokens)
+
+
+def _html_events(text: str) -> Iterator[Tuple[str, str, str]]:
+    """(kind, name, value) for tags, attributes, comments and declarations, following HTML5 tokenizing rules
+    closely enough for the constructs browsers execute"""
+    n = len(text)
+    i = 0
+    while i < n:
+        lt = text.find('<', i)
+        if lt < 0 or lt + 1 >= n:
+            return
+        i = lt + 1
+        c = text[i]
+        if c == '!':
+            if text.startswith('!--', i):
+                end = text.find('-->', i + 3)
+                end = n if end < 0 else end
+                yield 'comment', text[i + 3:end], ''
+                i = end + 3
+            else:
+                end = text.find('>', i)
+                end = n if end < 0 else end
+                yield 'declaration', text[i + 1:end], ''
+                i = end + 1
+            continue
+        if c in '/?':
+            end = text.find('>', i)
+            i = n if end < 0 else end + 1
+            continue
+        if not c.isalpha():
+            continue  # '<' followed by anything else is text
+        name = _TAG_NAME.match(text, i)
+        yield 'tag', name.group().lower(), ''
+        i = name.end()
+        while i < n:
+            while i < n and (text[i].isspace() or text[i] in '/\x00'):
+                i += 1
+            if i >= n:
+                return
+            if text[i] == '>':
+                i += 1
+                break
+            attribute = _ATTRIBUTE_NAME.match(text, i)
+            i = max(attribute.end(), i + 1)
+            while i < n and text[i].isspace():
+                i += 1
+            value = ''
+            if i < n and text[i] == '=':
+                i += 1
+                while i < n and text[i].isspace():
+                    i += 1
+                if i < n and text[i] in '"\'':
+                    end = text.find(text[i], i + 1)
+                    end = n if end < 0 else end
+                    value = text[i + 1:end]
+                    i = end + 1
+                else:
+                    unquoted = _UNQUOTED_VALUE.match(text, i)
+                    value = unquoted.group()
+                    i = unquoted.end()
+            yield 'attr', attribute.group().lower(), value
+
+
+def _html_danger(kind: str, name: str, value: str) -> Optional[str]:
+    if kind == 'tag':
+        if name == 'script':
+            return 'script'
+        if name in _BLACK_TAGS or name.startswith(_BLACK_TAG_PREFIXES):
+            return 'tag'
+    elif kind == 'attr':
+        if _EVENT.match(name):
+            return 'evento'
+        if name == 'srcdoc':
+            return 'tag'
+        if name in _URL_ATTRIBUTES or name == 'style':
+            # Browsers decode entities and drop tabs/newlines before reading the scheme
+            normalized = _CONTROL.sub('', html.unescape(value)).lower()
+            if name == 'style':
+                if 'expression(' in normalized or 'javascript:' in normalized or 'behavior:' in normalized:
+                    return 'estilo'
+            elif _DANGEROUS_SCHEME.match(normalized) or (name == 'content' and 'url=javascript:' in normalized):
+                return 'url'
+    elif kind == 'comment':
+        lowered = value.lower()
+        if '[if' in lowered or '<![endif' in lowered or '`' in value or 'import' in lowered:
+            return 'comentario_html'
+    elif kind == 'declaration' and value.lower().startswith(('entity', '[cdata[', 'element')):
+        return 'comentario_html'
+    return None
+
+
+def _js_breakout(text: str, quote: str) -> bool:
+    """Does the input close a JavaScript string and go on to call something?"""
+    end = _string_end(text, 0, quote)
+    if end >= len(text):
+        return False
+    rest = text[end + 1:].lstrip()
+    return bool(rest) and rest[0] in ';+-*/,|&)^%<>=?:' and _JS_CALL.search(rest) is not None
+
+
+def detect_xss(text: str) -> Detection:
+    for candidate in _decoded_variants(text):
+        for context, prefix in XSS_CONTEXTS:
+            for kind, name, value in _html_events(prefix + candidate):
+                technique = _html_danger(kind, name, value)
+                if technique:
+                    shown = f"<{name}>" if kind == 'tag' else f"{name}={value!r}" if kind == 'attr' else f"<!{kind}>"
+                    return Detection('xss', technique, context, shown, [])
+        for quote in ("'", '"'):
+            if _js_breakout(candidate, quote):
+                return Detection('xss', 'js', 'string JavaScript', f"{quote}...;chamada()", [])
+    return Detection('', '', '', '', [])
+
+
+def detect(text: str) -> Detection:
+    """SQLi first, then XSS; a benign result still carries the SQL tokens for display"""
+    sqli = detect_sqli(text)
+    if sqli.detected:
+        return sqli
+    xss = detect_xss(text)
+    return xss if xss.detected else sqli
+
+
+def mutate_sqli(payload: str, rng) -> str:
+    """Equivalent spelling of a SQLi payload: case, whitespace/comment tricks, other constants and operators"""
+    text = re.sub(r'[A-Za-z_]+', lambda m: ''.join(ch.upper() if rng.random() < 0.5 else ch.lower()
+                                                      for ch in m.group()) if m.group().upper() in _KEYWORDS
+                  or m.group().upper() in ('SLEEP', 'BENCHMARK', 'CONCAT', 'SUBSTRING') else m.group(), payload)
+    n = rng.randint(2, 99)
+    text = re.sub(r'\b1=1\b', lambda m: rng.choice((f"{n}={n}", f"{n + 1}>{n}", f"{n}<>{n + 1}", f"'{n}'='{n}'")),
+                  text)
+    if rng.random() < 0.5:
+        text = re.sub(r'\bOR\b', '||', text, flags=re.IGNORECASE)
+    spacer = rng.choice((' ', '/**/', '\t', '\n', '  ', '/*x*/', ' /**/ '))
+    text = text.replace(' ', spacer)
+    if rng.random() < 0.3 and not re.search(r'(--|#)\s*-?$', text):
+        text += rng.choice(('-- -', '#', '--+'))
+    if rng.random() < 0.2:
+        text = ''.join(f"%{ord(ch):02X}" if ch in " '=#" else ch for ch in text)
+    return text
+
+
+def mutate_xss(payload: str, rng) -> str:
+    """Equivalent spelling of an XSS payload: case, separators, entities, other events and quotes"""
+    text = re.sub(r'<(/?)([a-z]+)', lambda m: '<' + m.group(1) + ''.join(
+        ch.upper() if rng.random() < 0.5 else ch for ch in m.group(2)), payload)
+    text = re.sub(r'\bon[a-z]+=', lambda m: ''.join(ch.upper() if rng.random() < 0.3 else ch for ch in m.group()),
+                  text)
+    if rng.random() < 0.4:
+        text = re.sub(r'(<[A-Za-z]+) ', lambda m: m.group(1) + rng.choice(('/', '\n', '\t', ' /', '  ')), text)
+    if rng.random() < 0.4:
+        text = text.replace('javascript:', rng.choice(('java\tscript:', 'JaVaScRiPt:', '&#106;avascript:',
+                                                       'jav&#x09;ascript:', '  javascript:')))
+    if rng.random() < 0.3:
+        text = text.replace('alert(1)', rng.choice(('confirm`1`', 'prompt(1)', 'alert(document.domain)',
+                                                    'top["al"+"ert"](1)')))
+    if rng.random() < 0.2:
+        text = ''.join(f"%{ord(ch):02X}" if ch in '<>"\' ' else ch for ch in text)
+    return text
+
+
+def benign_corpus(count: int, seed: int = 1) -> List[str]:
+    """Realistic form input: names with apostrophes, prose, searches, addresses, passwords, harmless markup"""
+    import random
+
+    rng = random.Random(seed)
+    names = ("Ana Souza", "O'Brien", "D'Ávila", "João d'Arc", "Mary-Jane", "José", "Renée O'Connor", "Zoë")
+    words = ("segurança", "rede", "senha", "união", "select", "order", "from", "drop", "table", "update", "and", "or",
+             "not", "like", "where", "the", "my", "one", "online", "only", "script", "alert", "delete", "account",
+             "mouse", "teclado", "notebook", "loja", "entrega", "rápida", "sleep", "exec", "if", "case", "end",
+             "by", "group", "limit", "null", "true")
+    fixed = (
+        "Rock 'n' Roll", "5' 11\"", "I'm #1 - really", "a < b && c > d", "Tom & Jerry", "50% off -- today only",
+        "C:\\Program Files\\app", "x=1; y=2", "don't stop believing", "1 or 2 items", "it's 10 o'clock",
+        "<b>negrito</b> e <i>itálico</i>", "Veja https://example.com/a?b=1&c=2", "user@example.com",
+        "P@ss'w0rd!", "Rua 7 de Setembro, 123 - apto 4", "-- sem comentários --", "Preço: R$ 1.299,00 (à vista)",
+        "Select the best option or none", "Order by price, please", "\"quoted\" text", "Union Station", "#hashtag",
+        "email me at a@b.co; thanks!", "3 < 5 and 7 > 2", "Joana's café", "I <3 Python", "Drop me a line",
+        "Update: my order 12345 arrived", "if (x) then y", "-1 point", "10 - 5 = 5", "'quoted'", "1=1 is true",
+        "10 or 11", "1 and 2", "he said 'or' and left", "3 or 4", "'this' or 'that'", "she wrote 'and' twice",
+        "1 or 2", "2 and 3 or 4",
+    )
+    corpus = []
+    for i in range(count):
+        shape = i % 6
+        if shape == 0:
+            corpus.append(rng.choice(fixed))
+        elif shape == 1:
+            corpus.append(rng.choice(names))
+        elif shape == 2:
+            corpus.append(' '.join(rng.choice(words) for _ in range(rng.randint(1, 12))))
+        elif shape == 3:
+            corpus.append(f"{rng.choice(names)} {rng.choice(words)} {rng.randint(1, 9999)}")
+        elif shape == 4:
+            corpus.append(''.join(rng.choice("abcdefXYZ0123456789!@#$%&*-_=+.,'") for _ in range(rng.randint(6, 16))))
+        else:
+            corpus.append(f"{rng.choice(words).capitalize()}, {rng.choice(words)}'s {rng.choice(words)}. "
+                          f"{rng.choice(fixed)}")
+    return corpus
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import random
+
+    # Benchmark: python -m core.injection_detect [amostras]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(42)
+    sqli = [mutate_sqli(rng.choice(SQLI_TEMPLATES), rng) for _ in range(count // 2)]
+    xss = [mutate_xss(rng.choice(XSS_TEMPLATES), rng) for _ in range(count // 2)]
+    # Mutating the templates only shows the fingerprints survive respelling; the held-out
+    # payloads never went into SQLI_FINGERPRINTS and give the real miss rate
+    held_sqli = list(HELD_OUT_SQLI) + [mutate_sqli(rng.choice(HELD_OUT_SQLI), rng) for _ in range(count // 4)]
+    held_xss = list(HELD_OUT_XSS) + [mutate_xss(rng.choice(HELD_OUT_XSS), rng) for _ in range(count // 4)]
+    benign = benign_corpus(count)
+    print(f"{len(SQLI_FINGERPRINTS)} fingerprints SQLi de {len(SQLI_TEMPLATES)} modelos; "
+          f"{len(sqli)} SQLi e {len(xss)} XSS mutados, {len(held_sqli)} SQLi e {len(held_xss)} XSS fora dos modelos, "
+          f"{len(benign)} entradas benignas")
+
+    # The substring checks the playgrounds used before
+    legacy_sql = ("' OR '1'='1", "' OR 1=1--", "admin'--", "' UNION SELECT * FROM users--")
+
+    def legacy(text: str) -> str:
+        if any(payload in text for payload in legacy_sql):
+            return 'sqli'
+        return 'xss' if '<script>' in text.lower() or 'javascript:' in text.lower() else ''
+
+    def engine(text: str) -> str:
+        return detect(text).kind
+
+    for label, classify in (('substrings (antes)', legacy), ('tokenizador', engine)):
+        started = time.perf_counter()
+        missed_sqli = sum(1 for text in sqli if classify(text) != 'sqli')
+        missed_xss = sum(1 for text in xss if classify(text) != 'xss')
+        held_missed_sqli = sum(1 for text in held_sqli if classify(text) != 'sqli')
+        held_missed_xss = sum(1 for text in held_xss if classify(text) != 'xss')
+        false_alarms = [text for text in benign if classify(text)]
+        elapsed = time.perf_counter() - started
+        total = len(sqli) + len(xss) + len(held_sqli) + len(held_xss) + len(benign)
+        print(f"  {label:<20} {total / elapsed:>9,.0f} entradas/s  "
+              f"FN SQLi {missed_sqli / len(sqli):6.1%} (fora {held_missed_sqli / len(held_sqli):6.1%})  "
+              f"FN XSS {missed_xss / len(xss):6.1%} (fora {held_missed_xss / len(held_xss):6.1%})  "
+              f"FP {len(false_alarms) / len(benign):6.2%}")
+    for text in sorted(set(false_alarms))[:5]:
+        print(f"    falso positivo: {text!r} -> {detect(text).as_row()}")
+    misses = [text for text in sqli + xss + list(HELD_OUT_SQLI) + list(HELD_OUT_XSS) if not detect(text).detected]
+    for text in misses[:10]:
+        print(f"    não detectado: {text!r}")
@@ -0,0 +1,380 @@
+"""
+Integrity Baseline
+Directory-tree baselines with incremental verification and change monitoring
+"""
+
+import os
+import stat
+import time
+import struct
+import ctypes
+import ctypes.util
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_MAGIC = b"CMIB\x01"
+CHUNK_SIZE = 1024 * 1024
+
+# size, mtime_ns, inode, path_offset, path_len, md5, sha256
+_RECORD = struct.Struct("<QqQII16s32s")
+_HEADER = struct.Struct("<5sQQ")
+
+
+class FileRecord:
+    """Stat signature and digests of one file in the baseline"""
+
+    __slots__ = ("size", "mtime_ns", "inode", "md5", "sha256")
+
+    def __init__(self, size: int, mtime_ns: int, inode: int, md5: bytes, sha256: bytes):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.inode = inode
+        self.md5 = md5
+        self.sha256 = sha256
+
+    def signature(self) -> Tuple[int, int, int]:
+        return (self.size, self.mtime_ns, self.inode)
+
+
+class VerifyReport:
+    """Result of comparing a tree against its baseline"""
+
+    def __init__(self):
+        self.unchanged = 0
+        self.rehashed = 0
+        self.modified: List[str] = []
+        self.touched: List[str] = []
+        self.added: List[str] = []
+        self.removed: List[str] = []
+        self.elapsed = 0.0
+
+    @property
+    def is_clean(self) -> bool:
+        return not (self.modified or self.added or self.removed)
+
+
+def hash_file(path: str) -> Tuple[bytes, bytes]:
+    """Return (md5, sha256) digests of a file, read in fixed-size chunks"""
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            md5.update(view[:n])
+            sha256.update(view[:n])
+
+    return md5.digest(), sha256.digest()
+
+
+def walk_files(root: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """Yield (relative path, stat) for every regular file under root"""
+    stack = [root]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            rel = os.path.relpath(entry.path, root)
+                            yield rel, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class Baseline:
+    """Mapping of relative path -> FileRecord for one directory tree"""
+
+    def __init__(self, root: str, records: Optional[Dict[str, FileRecord]] = None):
+        self.root = os.path.abspath(root)
+        self.records: Dict[str, FileRecord] = records or {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def build(cls, root: str) -> "Baseline":
+        """Hash every file under root and record its stat signature"""
+        baseline = cls(root)
+        for rel, st in walk_files(baseline.root):
+            try:
+                md5, sha256 = hash_file(os.path.join(baseline.root, rel))
+            except OSError:
+                continue
+            baseline.records[rel] = FileRecord(st.st_size, st.st_mtime_ns, st.st_ino, md5, sha256)
+        return baseline
+
+    def check_file(self, rel: str, report: VerifyReport, update: bool = False):
+        """Compare one file against its record, rehashing only on stat change"""
+        path = os.path.join(self.root, rel)
+        record = self.records.get(rel)
+
+        try:
+            st = os.stat(path, follow_symlinks=False)
+            gone = not stat.S_ISREG(st.st_mode)  # symlinks, FIFOs, sockets: never opened, as in walk_files
+        except OSError:
+            gone = True
+        if gone:
+            if record is not None:
+                report.removed.append(rel)
+                if update:
+                    del self.records[rel]
+            return
+
+        if record is not None and record.signature() == (st.st_size, st.st_mtime_ns, st.st_ino):
+            report.unchanged += 1
+            return
+
+        try:
+            md5, sha256 = hash_file(path)
+        except OSError:
+            return
+        report.rehashed += 1
+
+        if record is None:
+            report.added.append(rel)
+        elif record.sha256 != sha256:
+            report.modified.append(rel)
+        else:
+            # Metadata changed but content is identical (touch, copy-back)
+            report.touched.append(rel)
+
+        if update:
+            self.records[rel] = FileRecord(st.st_size, st.st_mtime_ns, st.st_ino, md5, sha256)
+
+    def verify(self, update: bool = False) -> VerifyReport:
+        """Stat-walk the tree and rehash only files whose signature changed"""
+        report = VerifyReport()
+        started = time.perf_counter()
+        seen = set()
+
+        for rel, st in walk_files(self.root):
+            seen.add(rel)
+            record = self.records.get(rel)
+            if record is not None and record.signature() == (st.st_size, st.st_mtime_ns, st.st_ino):
+                report.unchanged += 1
+            else:
+                self.check_file(rel, report, update)
+
+        for rel in [r for r in self.records if r not in seen]:
+            report.removed.append(rel)
+            if update:
+                del self.records[rel]
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def save(self, manifest_path: str):
+        """Write the manifest: header, fixed-size record table, path blob"""
+        paths = list(self.records)
+        table = bytearray(_RECORD.size * len(paths))
+        blob = bytearray()
+
+        for i, rel in enumerate(paths):
+            record = self.records[rel]
+            encoded = rel.encode('utf-8', 'surrogateescape')
+            _RECORD.pack_into(
+                table, i * _RECORD.size,
+                record.size, record.mtime_ns, record.inode,
+                len(blob), len(encoded), record.md5, record.sha256
+            )
+            blob += encoded
+
+        root = self.root.encode('utf-8', 'surrogateescape')
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MANIFEST_MAGIC, len(paths), len(root)))
+            f.write(root)
+            f.write(table)
+            f.write(blob)
+        os.replace(tmp_path, manifest_path)
+
+    @classmethod
+    def load(cls, manifest_path: str) -> "Baseline":
+        """Load a manifest written by save() with a single read"""
+        with open(manifest_path, 'rb') as f:
+            data = f.read()
+
+        magic, count, root_len = _HEADER.unpack_from(data, 0)
+        if magic != MANIFEST_MAGIC:
+            raise ValueError(f"Manifesto inválido: {manifest_path}")
+
+        offset = _HEADER.size
+        root = data[offset:offset + root_len].decode('utf-8', 'surrogateescape')
+        offset += root_len
+        table_end = offset + count * _RECORD.size
+        blob = memoryview(data)[table_end:]
+
+        records = {}
+        for size, mtime_ns, inode, p_off, p_len, md5, sha256 in _RECORD.iter_unpack(data[offset:table_end]):
+            rel = bytes(blob[p_off:p_off + p_len]).decode('utf-8', 'surrogateescape')
+            records[rel] = FileRecord(size, mtime_ns, inode, md5, sha256)
+
+        return cls(root, records)
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify (no third-party packages)"""
+
+    MASK = 0x00000002 | 0x00000004 | 0x00000008 | 0x00000040 | 0x00000080 | 0x00000100 | 0x00000200
+    IN_ISDIR = 0x40000000
+    IN_CREATE = 0x00000100
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: str):
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError("libc não encontrada")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, 'inotify_init1'):
+            raise OSError("inotify indisponível")
+
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.root = root
+        self.watches: Dict[int, str] = {}
+        self.overflowed = False
+
+        self.add_tree(root)
+
+    def add_watch(self, directory: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def add_tree(self, directory: str):
+        self.add_watch(directory)
+        for dirpath, dirnames, _ in os.walk(directory):
+            for name in dirnames:
+                self.add_watch(os.path.join(dirpath, name))
+
+    def drop_tree(self, directory: str):
+        """Forget the watches of a directory that left the tree (their paths no longer apply)"""
+        for wd, watched in list(self.watches.items()):
+            if watched == directory or watched.startswith(directory + os.sep):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def rewatch(self):
+        """Start over from the current tree, after events were lost"""
+        self.drop_tree(self.root)
+        self.add_tree(self.root)
+        self.overflowed = False
+
+    def read(self, timeout: float) -> List[str]:
+        """Wait up to timeout seconds and return changed paths (relative to root).
+
+        A path ending in os.sep stands for everything recorded under a directory
+        moved out of the tree. If the kernel queue overflowed, `overflowed` is set
+        and the returned list is incomplete."""
+        import select
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            wd, mask, _, name_len = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_tree(path)
+                    changed.extend(os.path.relpath(os.path.join(d, f), self.root)
+                                   for d, _, files in os.walk(path) for f in files)
+                elif mask & self.IN_MOVED_FROM:
+                    self.drop_tree(path)
+                    changed.append(os.path.relpath(path, self.root) + os.sep)
+                continue
+            changed.append(os.path.relpath(path, self.root))
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class IntegrityMonitor:
+    """Continuous monitoring: inotify when available, stat-walk polling otherwise"""
+
+    def __init__(self, baseline: Baseline, interval: float = 2.0, use_inotify: bool = True):
+        self.baseline = baseline
+        self.interval = interval
+        self.backend = None
+
+        if use_inotify:
+            try:
+                self.backend = _Inotify(baseline.root)
+            except (OSError, AttributeError):
+                self.backend = None
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self.backend else "polling"
+
+    def poll_once(self) -> VerifyReport:
+        """Wait one interval and return a report of what changed"""
+        if self.backend is None:
+            time.sleep(self.interval)
+            return self.baseline.verify(update=True)
+
+        changed = self.backend.read(self.interval)
+        if self.backend.overflowed:
+            # The kernel dropped events: only a full walk against the baseline knows what changed
+            self.backend.rewatch()
+            return self.baseline.verify(update=True)
+
+        report = VerifyReport()
+        started = time.perf_counter()
+        for rel in dict.fromkeys(changed):
+            if rel.endswith(os.sep):
+                for recorded in [r for r in self.baseline.records if r.startswith(rel)]:
+                    self.baseline.check_file(recorded, report, update=True)
+            else:
+                self.baseline.check_file(rel, report, update=True)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def watch(self, max_events: Optional[int] = None) -> Iterator[VerifyReport]:
+        """Yield a report each time the tree deviates from the baseline"""
+        emitted = 0
+        try:
+            while max_events is None or emitted < max_events:
+                report = self.poll_once()
+                if not report.is_clean or report.touched:
+                    emitted += 1
+                    yield report
+        finally:
+            if self.backend is not None:
+                self.backend.close()
@@ -0,0 +1,411 @@
+"""
+Log Analyzer
+Streaming auth.log / Apache-Nginx / JSON-lines analysis with sliding-window detectors
+"""
+
+import io
+import os
+import re
+import gzip
+import json
+import time
+import heapq
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from typing import IO, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import unquote_plus
+
+DEFAULT_WINDOW = 60
+BRUTE_FORCE_THRESHOLD = 5
+SCAN_THRESHOLD = 20
+CLEANUP_EVERY = 50_000
+
+SEVERITY_ORDER = {'crítica': 0, 'alta': 1, 'média': 2, 'baixa': 3}
+
+_MONTHS = {m: i for i, m in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+SYSLOG_LINE = re.compile(
+    r'^(?P<month>[A-Z][a-z]{2})\s+(?P<day>\d{1,2}) (?P<time>\d\d:\d\d:\d\d) (?P<host>\S+) '
+    r'(?P<program>[\w\-./]+)(?:\[\d+\])?: (?P<message>.*)$'
+)
+SSH_FAILED = re.compile(r'^Failed \S+ for (?:invalid user )?(?P<user>\S*) from (?P<ip>[\da-fA-F.:]+)')
+SSH_ACCEPTED = re.compile(r'^Accepted \S+ for (?P<user>\S+) from (?P<ip>[\da-fA-F.:]+)')
+SSH_INVALID = re.compile(r'^Invalid user (?P<user>\S*) from (?P<ip>[\da-fA-F.:]+)')
+
+ACCESS_LINE = re.compile(
+    r'^(?P<ip>\S+) \S+ (?P<user>\S+) \[(?P<ts>[^\]]+)\] '
+    r'"(?P<method>[A-Z]+) (?P<path>\S+)[^"]*" (?P<status>\d{3}) \S+'
+    r'(?: "(?P<referer>[^"]*)" "(?P<agent>[^"]*)")?'
+)
+
+# One pass per request path; named groups tell the attack family
+ATTACK_PATTERN = re.compile(
+    r"(?P<sqli>union(?:\s|/\*.*?\*/)+(?:all\s+)?select|'\s*(?:or|and)\s+'?\w+'?\s*=|\bor\s+1\s*=\s*1\b"
+    r"|(?:sleep|benchmark|pg_sleep)\s*\(|information_schema|;\s*drop\s+table|'\s*--)"
+    r"|(?P<xss><\s*script|javascript\s*:|\bon(?:error|load|mouseover)\s*=|<\s*(?:img|svg|iframe)\b[^>]*\bsrc)"
+    r"|(?P<traversal>(?:\.\.[/\\]){2,}|/etc/passwd)",
+    re.IGNORECASE
+)
+ATTACK_LABELS = {'sqli': 'SQL Injection', 'xss': 'XSS', 'traversal': 'Path Traversal'}
+# Any ATTACK_PATTERN match, once whitespace is removed, contains one of these; substring
+# tests run in C and let ordinary requests skip the regex entirely
+_ATTACK_HINTS = ("'", '<', '(', '..', 'union', 'passwd', 'schema', 'script', 'or1=1', 'drop',
+                 'onerror', 'onload', 'onmouseover')
+
+_JSON_TIME = ('timestamp', '@timestamp', 'time', 'ts', 'date')
+_JSON_IP = ('ip', 'src_ip', 'client_ip', 'remote_addr', 'source_ip')
+_JSON_PATH = ('path', 'url', 'uri', 'request')
+
+
+class LogEvent(NamedTuple):
+    """One normalised log line"""
+    timestamp: float
+    kind: str          # auth_fail, auth_ok, http
+    ip: str
+    user: str
+    path: str
+    status: int
+    source: str
+
+
+class Incident(NamedTuple):
+    """A detector hit, grown while the burst lasts and closed once the source goes quiet"""
+    start: float
+    end: float
+    severity: str
+    kind: str
+    ip: str
+    count: int
+    detail: str
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Início': datetime.fromtimestamp(self.start).strftime('%Y-%m-%d %H:%M:%S'),
+            'Fim': datetime.fromtimestamp(self.end).strftime('%Y-%m-%d %H:%M:%S'),
+            'Severidade': self.severity,
+            'Tipo': self.kind,
+            'Origem': self.ip,
+            'Eventos': self.count,
+            'Detalhe': self.detail
+        }
+
+
+@lru_cache(maxsize=4096)
+def _syslog_time(year: int, month: str, day: str, clock: str) -> float:
+    # Lines in a burst share the same second: cached instead of re-parsing
+    hour, minute, second = clock.split(':')
+    return datetime(year, _MONTHS.get(month, 1), int(day), int(hour), int(minute), int(second)).timestamp()
+
+
+@lru_cache(maxsize=4096)
+def _access_time(value: str) -> float:
+    return datetime.strptime(value, '%d/%b/%Y:%H:%M:%S %z').timestamp()
+
+
+def _json_time(value) -> float:
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def open_log(source: Union[str, IO[bytes]]) -> IO[str]:
+    """Text stream over a plain or gzip-rotated log; gzip is decompressed on the fly"""
+    raw = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    head = raw.peek(2)[:2] if hasattr(raw, 'peek') else raw.read(2)
+    if not hasattr(raw, 'peek'):
+        raw.seek(0)
+    if head == b'\x1f\x8b':
+        raw = gzip.GzipFile(fileobj=raw)
+    return io.TextIOWrapper(raw, encoding='utf-8', errors='replace')
+
+
+def rotation_order(paths: Iterable[str]) -> List[str]:
+    """auth.log.3.gz, auth.log.2.gz, auth.log.1, auth.log: oldest first"""
+    def key(path):
+        numbers = re.findall(r'\.(\d+)(?:\.gz)?$', os.path.basename(path))
+        return (os.path.basename(path).split('.')[0], -int(numbers[0]) if numbers else 0)
+    return sorted(paths, key=key)
+
+
+def _parse_access(lines: Iterable[str], source: str, counter: List[int]) -> Iterator[LogEvent]:
+    match_line = ACCESS_LINE.match
+    for line in lines:
+        counter[0] += 1
+        match = match_line(line)
+        if match is None:
+            continue
+        ip, user, stamp, path, status = match.group('ip', 'user', 'ts', 'path', 'status')
+        try:
+            timestamp = _access_time(stamp)
+        except ValueError:
+            continue
+        yield LogEvent(timestamp, 'http', ip, user, path, int(status), source)
+
+
+def _parse_syslog(lines: Iterable[str], source: str, counter: List[int], year: int) -> Iterator[LogEvent]:
+    match_line = SYSLOG_LINE.match
+    patterns = ((SSH_FAILED.match, 'auth_fail'), (SSH_INVALID.match, 'auth_fail'), (SSH_ACCEPTED.match, 'auth_ok'))
+    for line in lines:
+        counter[0] += 1
+        # Cheap substring test first: most syslog lines are not from sshd
+        if 'ssh' not in line:
+            continue
+        match = match_line(line)
+        if match is None:
+            continue
+        month, day, clock, message = match.group('month', 'day', 'time', 'message')
+        for matcher, kind in patterns:
+            found = matcher(message)
+            if found:
+                yield LogEvent(_syslog_time(year, month, day, clock), kind,
+                               found.group('ip'), found.group('user'), '', 0, source)
+                break
+
+
+def _parse_json(lines: Iterable[str], source: str, counter: List[int]) -> Iterator[LogEvent]:
+    for line in lines:
+        counter[0] += 1
+        try:
+            record = json.loads(line)
+            timestamp = _json_time(next(record[k] for k in _JSON_TIME if k in record))
+        except (ValueError, StopIteration, TypeError, AttributeError):
+            continue
+        ip = next((str(record[k]) for k in _JSON_IP if k in record), '')
+        path = next((str(record[k]) for k in _JSON_PATH if k in record), '')
+        event = str(record.get('event', record.get('message', ''))).lower()
+        if 'fail' in event and ('login' in event or 'auth' in event or 'password' in event):
+            kind = 'auth_fail'
+        elif ('login' in event or 'auth' in event) and ('success' in event or 'accepted' in event):
+            kind = 'auth_ok'
+        else:
+            kind = 'http'
+        try:
+            status = int(record.get('status', 0))
+        except (TypeError, ValueError):
+            status = 0
+        yield LogEvent(timestamp, kind, ip, str(record.get('user', '')), path, status, source)
+
+
+def parse_lines(lines: Iterable[str], source: str = '', year: Optional[int] = None,
+                counter: Optional[List[int]] = None) -> Iterator[LogEvent]:
+    """Detect the format from the first non-empty line, then hand the stream to one
+    specialised loop (no per-line dispatch). counter[0] accumulates lines read."""
+    counter = counter if counter is not None else [0]
+    lines = iter(lines)
+    first = ''
+    for first in lines:
+        if first.strip():
+            break
+        counter[0] += 1
+    if not first.strip():
+        return
+
+    stream = chain((first,), lines)
+    if first.lstrip().startswith('{'):
+        yield from _parse_json(stream, source, counter)
+    elif ACCESS_LINE.match(first):
+        yield from _parse_access(stream, source, counter)
+    else:
+        yield from _parse_syslog(stream, source, counter, year or datetime.now().year)
+
+
+class LogAnalyzer:
+    """Sliding-window detectors with state bounded by the window, not by the log size"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, brute_threshold: int = BRUTE_FORCE_THRESHOLD,
+                 scan_threshold: int = SCAN_THRESHOLD):
+        self.window = window
+        self.brute_threshold = brute_threshold
+        self.scan_threshold = scan_threshold
+        self.events = 0
+        self.now = 0.0
+        self._next_close = 0.0
+
+        self._failures: Dict[str, Deque[float]] = {}
+        self._misses: Dict[str, Deque[Tuple[float, str]]] = {}
+        self._miss_paths: Dict[str, Dict[str, int]] = {}
+        self._brute_sources: Dict[str, float] = {}
+        # (kind, ip) -> [start, end, severity, count, detail]
+        self._open: Dict[Tuple[str, str], list] = {}
+
+    def _hit(self, kind: str, ip: str, timestamp: float, severity: str, detail: str, count: int = 1):
+        record = self._open.get((kind, ip))
+        if record is None:
+            self._open[(kind, ip)] = [timestamp, timestamp, severity, count, detail]
+        else:
+            record[1] = max(record[1], timestamp)
+            record[3] += count
+
+    def feed(self, event: LogEvent) -> List[Incident]:
+        """Consume one event; returns incidents whose source has been quiet for a full window"""
+        self.events += 1
+        self.now = max(self.now, event.timestamp)
+        cutoff = event.timestamp - self.window
+        ip = event.ip
+
+        if event.kind == 'auth_fail':
+            failures = self._failures.setdefault(ip, deque())
+            failures.append(event.timestamp)
+            while failures and failures[0] < cutoff:
+                failures.popleft()
+            if len(failures) >= self.brute_threshold:
+                fresh = ('Força Bruta', ip) not in self._open
+                self._hit('Força Bruta', ip, event.timestamp, 'alta',
+                          f"≥{self.brute_threshold} falhas de login em {self.window}s (usuário: {event.user})",
+                          len(failures) if fresh else 1)
+                self._brute_sources[ip] = event.timestamp
+
+        elif event.kind == 'auth_ok':
+            last_attack = self._brute_sources.get(ip)
+            if last_attack is not None and event.timestamp - last_attack <= self.window * 10:
+                self._hit('Login Após Força Bruta', ip, event.timestamp, 'crítica',
+                          f"Login bem-sucedido como '{event.user}' após ataque de força bruta")
+
+        else:
+            path = unquote_plus(event.path) if '%' in event.path or '+' in event.path else event.path
+            compact = ''.join(path.lower().split())
+            attack = ATTACK_PATTERN.search(path) if any(hint in compact for hint in _ATTACK_HINTS) else None
+            if attack:
+                label = ATTACK_LABELS[attack.lastgroup]
+                self._hit(label, ip, event.timestamp, 'alta', f"Ex.: {path[:120]}")
+
+            if event.status in (401, 403, 404):
+                misses = self._misses.setdefault(ip, deque())
+                paths = self._miss_paths.setdefault(ip, {})
+                misses.append((event.timestamp, event.path))
+                paths[event.path] = paths.get(event.path, 0) + 1
+                while misses and misses[0][0] < cutoff:
+                    _, old = misses.popleft()
+                    paths[old] -= 1
+                    if not paths[old]:
+                        del paths[old]
+                if len(paths) >= self.scan_threshold:
+                    fresh = ('Varredura', ip) not in self._open
+                    self._hit('Varredura', ip, event.timestamp, 'média',
+                              f"≥{self.scan_threshold} caminhos distintos com erro em {self.window}s",
+                              len(misses) if fresh else 1)
+
+        if self.events % CLEANUP_EVERY == 0:
+            self._cleanup(cutoff)
+        # Incidents can only close when the clock moves; check at most once per log second
+        if event.timestamp < self._next_close:
+            return []
+        self._next_close = event.timestamp + 1
+        return self._close(cutoff)
+
+    def _close(self, cutoff: float) -> List[Incident]:
+        closed = []
+        for key in [k for k, record in self._open.items() if record[1] < cutoff]:
+            start, end, severity, count, detail = self._open.pop(key)
+            closed.append(Incident(start, end, severity, key[0], key[1], count, detail))
+        return closed
+
+    def _cleanup(self, cutoff: float):
+        """Drop per-source state that fell out of the window, keeping memory flat"""
+        for ip in [ip for ip, failures in self._failures.items() if not failures or failures[-1] < cutoff]:
+            del self._failures[ip]
+        for ip in [ip for ip, misses in self._misses.items() if not misses or misses[-1][0] < cutoff]:
+            del self._misses[ip]
+            del self._miss_paths[ip]
+        horizon = cutoff - self.window * 10
+        for ip in [ip for ip, seen in self._brute_sources.items() if seen < horizon]:
+            del self._brute_sources[ip]
+
+    def finish(self) -> List[Incident]:
+        return self._close(float('inf'))
+
+
+def analyze(sources: Iterable[Union[str, Tuple[str, IO[bytes]]]], window: int = DEFAULT_WINDOW,
+            year: Optional[int] = None, stats: Optional[dict] = None) -> Iterator[Incident]:
+    """Stream every source (paths, or (name, binary file) pairs) through one analyzer.
+
+    Each log is already in time order, so heapq.merge interleaves them by
+    timestamp lazily: correlations across files (SSH then web) see one clock."""
+    analyzer = LogAnalyzer(window)
+    started = time.perf_counter()
+    counter = [0]
+
+    streams = []
+    try:
+        for source in sources:
+            name, handle = (source, source) if isinstance(source, (str, os.PathLike)) else source
+            streams.append((os.path.basename(str(name)), open_log(handle)))
+
+        parsed = [parse_lines(stream, name, year, counter) for name, stream in streams]
+        merged = parsed[0] if len(parsed) == 1 else heapq.merge(*parsed, key=lambda event: event.timestamp)
+        feed = analyzer.feed
+        for event in merged:
+            closed = feed(event)
+            if closed:
+                yield from closed
+        yield from analyzer.finish()
+    finally:
+        for _, stream in streams:
+            stream.close()
+
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        stats.update(lines=counter[0], events=analyzer.events, elapsed=elapsed,
+                     lines_per_second=counter[0] / elapsed if elapsed else 0.0)
+
+
+def incident_timeline(incidents: Iterable[Incident]) -> List[Incident]:
+    """Chronological timeline; incidents are few, so sorting them is cheap"""
+    return sorted(incidents, key=lambda i: (i.start, SEVERITY_ORDER.get(i.severity, 9)))
+
+
+def write_sample_logs(directory: str, day: Optional[datetime] = None) -> List[str]:
+    """Synthetic auth.log (rotated + gzip) and access.log for the data-leak scenario"""
+    day = (day or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    base = day.timestamp()
+    os.makedirs(directory, exist_ok=True)
+
+    def syslog(offset, message):
+        moment = datetime.fromtimestamp(base + offset)
+        return f"{moment:%b} {moment.day:2d} {moment:%H:%M:%S} srv-arquivos sshd[{4000 + offset % 997}]: {message}\n"
+
+    def access(offset, ip, path, status):
+        moment = datetime.fromtimestamp(base + offset).astimezone()
+        return (f'{ip} - - [{moment:%d/%b/%Y:%H:%M:%S %z}] "GET {path} HTTP/1.1" {status} 512 '
+                f'"-" "Mozilla/5.0"\n')
+
+    old_auth = [syslog(3600 * 9 + i * 600, f"Accepted password for j.silva from 10.0.0.15 port 5{i:04d} ssh2")
+                for i in range(6)]
+    auth = [syslog(3600 * 2 + 600 + i * 4, f"Failed password for {'invalid user ' if i % 3 else ''}admin "
+                                           f"from 185.220.101.7 port 4{i:04d} ssh2") for i in range(40)]
+    auth.append(syslog(3600 * 2 + 840, "Accepted password for j.silva from 185.220.101.7 port 51515 ssh2"))
+
+    web = [access(3600 * 10 + i * 30, '10.0.0.15', '/relatorios/vendas', 200) for i in range(30)]
+    web += [access(3600 * 2 + 900 + i, '185.220.101.7', f'/{w}', 404) for i, w in enumerate(
+        ['admin', 'backup', '.git/config', '.env', 'phpmyadmin', 'wp-login.php', 'old', 'db.sql', 'config.php',
+         'test', 'dev', 'api/v1', 'server-status', 'uploads', 'private', 'export', 'dump.sql', 'logs', 'tmp',
+         'cgi-bin/', 'shell.php', 'console'])]
+    web += [access(3600 * 2 + 960, '185.220.101.7', "/busca?q=%27%20UNION%20SELECT%20email,senha%20FROM%20clientes--", 200),
+            access(3600 * 2 + 975, '185.220.101.7', "/comentarios?texto=%3Cscript%3Edocument.cookie%3C/script%3E", 200),
+            access(3600 * 2 + 990, '185.220.101.7', "/download?arquivo=../../../etc/passwd", 403)]
+    web.sort(key=lambda line: datetime.strptime(line.split('[')[1].split(']')[0], '%d/%b/%Y:%H:%M:%S %z'))
+
+    paths = [os.path.join(directory, 'auth.log.1.gz'), os.path.join(directory, 'auth.log'),
+             os.path.join(directory, 'access.log')]
+    with gzip.open(paths[0], 'wt', encoding='utf-8') as f:
+        f.writelines(old_auth)
+    with open(paths[1], 'w', encoding='utf-8') as f:
+        f.writelines(auth)
+    with open(paths[2], 'w', encoding='utf-8') as f:
+        f.writelines(web)
+    return paths
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.log_analyzer <log> [log ...]
+    summary = {}
+    found = incident_timeline(analyze(rotation_order(sys.argv[1:]), stats=summary))
+    for incident in found[:20]:
+        print(incident.as_row())
+    print(f"{summary['lines']:,} linhas em {summary['elapsed']:.2f}s "
+          f"({summary['lines_per_second']:,.0f} linhas/s), {len(found)} incidentes")
@@ -0,0 +1,387 @@
+"""
+Network Inventory
+Interfaces, routes, neighbours and sockets read straight from /proc, /sys and netlink
+"""
+
+import os
+import time
+import socket
+import struct
+import ipaddress
+from typing import Dict, List, NamedTuple, Optional
+
+PROC_NET = '/proc/net'
+SYS_NET = '/sys/class/net'
+MAX_CANDIDATES = 1024
+
+# include/net/tcp_states.h
+TCP_STATES = {
+    1: 'ESTABLISHED', 2: 'SYN_SENT', 3: 'SYN_RECV', 4: 'FIN_WAIT1', 5: 'FIN_WAIT2', 6: 'TIME_WAIT',
+    7: 'CLOSE', 8: 'CLOSE_WAIT', 9: 'LAST_ACK', 10: 'LISTEN', 11: 'CLOSING', 12: 'NEW_SYN_RECV',
+}
+RTF_UP, RTF_GATEWAY = 0x1, 0x2
+ATF_COM = 0x2  # ARP entry resolved
+
+# Netlink RTM_GETADDR dump (linux/rtnetlink.h, linux/if_addr.h)
+NLMSG_DONE, NLMSG_ERROR = 3, 2
+RTM_NEWADDR, RTM_GETADDR = 20, 22
+NLM_F_REQUEST, NLM_F_DUMP = 0x1, 0x300
+IFA_ADDRESS, IFA_LOCAL = 1, 2
+_NLMSG = struct.Struct('=IHHII')
+_IFADDRMSG = struct.Struct('=BBBBI')
+_RTATTR = struct.Struct('=HH')
+
+
+class Interface(NamedTuple):
+    name: str
+    index: int
+    mac: str
+    mtu: int
+    state: str
+    addresses: List[str]
+    rx_bytes: int
+    rx_packets: int
+    rx_errors: int
+    rx_dropped: int
+    tx_bytes: int
+    tx_packets: int
+    tx_errors: int
+    tx_dropped: int
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Interface': self.name,
+            'Estado': self.state,
+            'MAC': self.mac or '-',
+            'Endereços': ', '.join(self.addresses) or '-',
+            'MTU': str(self.mtu),
+            'RX': f"{self.rx_bytes / 1e6:.1f} MB ({self.rx_errors} erros, {self.rx_dropped} descartes)",
+            'TX': f"{self.tx_bytes / 1e6:.1f} MB ({self.tx_errors} erros, {self.tx_dropped} descartes)",
+        }
+
+
+class Route(NamedTuple):
+    interface: str
+    destination: str
+    gateway: str
+    metric: int
+
+    @property
+    def is_default(self) -> bool:
+        return self.destination in ('0.0.0.0/0', '::/0')
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Destino': 'padrão' if self.is_default else self.destination,
+            'Gateway': self.gateway or 'direto (link)',
+            'Interface': self.interface,
+            'Métrica': str(self.metric),
+        }
+
+
+class Neighbor(NamedTuple):
+    address: str
+    mac: str
+    interface: str
+    complete: bool
+
+
+class Socket(NamedTuple):
+    protocol: str
+    local_address: str
+    local_port: int
+    remote_address: str
+    remote_port: int
+    state: str
+    uid: int
+    inode: int
+
+    @property
+    def listening(self) -> bool:
+        # UDP has no LISTEN; an unconnected bound socket (state CLOSE) is the equivalent
+        return self.state == 'LISTEN' or (self.protocol.startswith('udp') and self.state == 'CLOSE')
+
+
+def _read(path: str) -> str:
+    with open(path, encoding='ascii', errors='replace') as f:
+        return f.read()
+
+
+def _table(path: str, header: bool = True) -> List[List[str]]:
+    """Whitespace-split rows of a /proc table, header removed; [] if missing"""
+    try:
+        return [line.split() for line in _read(path).splitlines()[1 if header else 0:] if line.strip()]
+    except OSError:
+        return []
+
+
+def _hex_ipv4(value: str) -> str:
+    # /proc prints the in-memory (network order) u32 with %08X, so it reads in host byte order
+    return socket.inet_ntop(socket.AF_INET, struct.pack('=I', int(value, 16)))
+
+
+def _hex_ipv6(value: str) -> str:
+    words = struct.pack('=IIII', *(int(value[i:i + 8], 16) for i in range(0, 32, 8)))
+    return socket.inet_ntop(socket.AF_INET6, words)
+
+
+def _sys(name: str, attribute: str, default: str = '') -> str:
+    try:
+        return _read(os.path.join(SYS_NET, name, attribute)).strip()
+    except OSError:
+        return default
+
+
+def read_routes(proc: str = PROC_NET) -> List[Route]:
+    routes = []
+    for row in _table(os.path.join(proc, 'route')):
+        interface, destination, gateway, flags, metric, mask = row[0], row[1], row[2], int(row[3], 16), row[6], row[7]
+        if not flags & RTF_UP:
+            continue
+        network = ipaddress.ip_network(f"{_hex_ipv4(destination)}/{_hex_ipv4(mask)}", strict=False)
+        routes.append(Route(interface, str(network), _hex_ipv4(gateway) if flags & RTF_GATEWAY else '', int(metric)))
+    try:
+        lines = _read(os.path.join(proc, 'ipv6_route')).splitlines()
+    except OSError:
+        lines = []
+    for line in lines:
+        # dest prefix src src_prefix next_hop metric refcnt use flags device; addresses in network order
+        row = line.split()
+        if len(row) < 10 or not int(row[8], 16) & RTF_UP:
+            continue
+        destination = ipaddress.IPv6Address(bytes.fromhex(row[0]))
+        gateway = ipaddress.IPv6Address(bytes.fromhex(row[4]))
+        if row[9] == 'lo':
+            continue
+        routes.append(Route(row[9], f"{destination}/{int(row[1], 16)}",
+                            '' if gateway.is_unspecified else str(gateway), int(row[5], 16)))
+    return routes
+
+
+def read_neighbors(proc: str = PROC_NET) -> List[Neighbor]:
+    return [Neighbor(row[0], row[3], row[5], bool(int(row[2], 16) & ATF_COM))
+            for row in _table(os.path.join(proc, 'arp')) if len(row) >= 6]
+
+
+def read_device_stats(proc: str = PROC_NET) -> Dict[str, List[int]]:
+    """interface -> the 16 counters of /proc/net/dev"""
+    stats = {}
+    try:
+        lines = _read(os.path.join(proc, 'dev')).splitlines()[2:]
+    except OSError:
+        return stats
+    for line in lines:
+        name, _, counters = line.partition(':')
+        stats[name.strip()] = [int(v) for v in counters.split()]
+    return stats
+
+
+def read_sockets(protocol: str = 'tcp', proc: str = PROC_NET) -> List[Socket]:
+    """Parse /proc/net/{tcp,tcp6,udp,udp6}"""
+    decode = _hex_ipv6 if protocol.endswith('6') else _hex_ipv4
+    sockets = []
+    for row in _table(os.path.join(proc, protocol)):
+        local, remote = row[1].split(':'), row[2].split(':')
+        sockets.append(Socket(protocol, decode(local[0]), int(local[1], 16), decode(remote[0]), int(remote[1], 16),
+                              TCP_STATES.get(int(row[3], 16), row[3]), int(row[7]), int(row[9])))
+    return sockets
+
+
+def _netlink_addresses() -> Dict[int, List[str]]:
+    """ifindex -> ['addr/prefix', ...] through one RTM_GETADDR dump"""
+    addresses: Dict[int, List[str]] = {}
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE) as sock:
+        sock.settimeout(1.0)
+        request = _IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+        sock.send(_NLMSG.pack(_NLMSG.size + len(request), RTM_GETADDR, NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + request)
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + _NLMSG.size <= len(data):
+                length, kind, _, _, _ = _NLMSG.unpack_from(data, offset)
+                if length < _NLMSG.size:
+                    break
+                if kind == NLMSG_DONE:
+                    return addresses
+                if kind == NLMSG_ERROR:
+                    raise OSError("netlink RTM_GETADDR falhou")
+                if kind == RTM_NEWADDR:
+                    family, prefix, _, _, index = _IFADDRMSG.unpack_from(data, offset + _NLMSG.size)
+                    attributes = {}
+                    cursor = offset + _NLMSG.size + _IFADDRMSG.size
+                    while cursor + _RTATTR.size <= offset + length:
+                        size, attribute = _RTATTR.unpack_from(data, cursor)
+                        if size < _RTATTR.size:
+                            break
+                        attributes[attribute] = data[cursor + _RTATTR.size:cursor + size]
+                        cursor += (size + 3) & ~3
+                    # IFA_LOCAL is our address on point-to-point links, where IFA_ADDRESS is the peer
+                    raw = attributes.get(IFA_LOCAL) or attributes.get(IFA_ADDRESS)
+                    if raw:
+                        address = socket.inet_ntop(family, raw)
+                        addresses.setdefault(index, []).append(f"{address}/{prefix}")
+                offset += (length + 3) & ~3
+
+
+def _proc_addresses(proc: str = PROC_NET) -> Dict[str, List[str]]:
+    """Fallback without netlink: IPv4 from fib_trie LOCAL entries, IPv6 from if_inet6"""
+    addresses: Dict[str, List[str]] = {}
+    routes = read_routes(proc)
+    try:
+        lines = _read(os.path.join(proc, 'fib_trie')).splitlines()
+    except OSError:
+        lines = []
+    seen = set()
+    for previous, line in zip(lines, lines[1:]):
+        if '/32 host LOCAL' in line and '|--' in previous:
+            address = ipaddress.IPv4Address(previous.split('|--')[1].strip())
+            if address in seen:
+                continue
+            seen.add(address)
+            matches = [r for r in routes if not r.gateway and not r.is_default and ':' not in r.destination
+                       and address in ipaddress.ip_network(r.destination)]
+            if address.is_loopback:
+                addresses.setdefault('lo', []).append(f"{address}/8")
+            elif matches:
+                best = max(matches, key=lambda r: ipaddress.ip_network(r.destination).prefixlen)
+                addresses.setdefault(best.interface, []).append(
+                    f"{address}/{ipaddress.ip_network(best.destination).prefixlen}")
+    for row in _table(os.path.join(proc, 'if_inet6'), header=False):
+        address = ipaddress.IPv6Address(bytes.fromhex(row[0]))
+        addresses.setdefault(row[5], []).append(f"{address}/{int(row[2], 16)}")
+    return addresses
+
+
+def read_interfaces(proc: str = PROC_NET) -> List[Interface]:
+    stats = read_device_stats(proc)
+    try:
+        by_index = _netlink_addresses()
+        by_name = {}
+    except (OSError, AttributeError):
+        # AttributeError: no AF_NETLINK (not Linux)
+        by_index, by_name = {}, _proc_addresses(proc)
+
+    interfaces = []
+    for name, counters in stats.items():
+        index = int(_sys(name, 'ifindex', '0') or 0)
+        counters = counters + [0] * (16 - len(counters))
+        interfaces.append(Interface(
+            name, index, _sys(name, 'address'), int(_sys(name, 'mtu', '0') or 0), _sys(name, 'operstate', 'unknown'),
+            by_index.get(index) or by_name.get(name, []),
+            counters[0], counters[1], counters[2], counters[3], counters[8], counters[9], counters[10], counters[11],
+        ))
+    return sorted(interfaces, key=lambda i: i.index)
+
+
+def primary_address() -> str:
+    """Source address the kernel picks for the internet; connect() on UDP sends nothing.
+
+    Works on any OS, unlike gethostbyname(gethostname()), which Debian/Ubuntu map to 127.0.1.1."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.connect(('192.0.2.1', 9))
+            return sock.getsockname()[0]
+        except OSError:
+            return '127.0.0.1'
+
+
+class Inventory(NamedTuple):
+    hostname: str
+    interfaces: List[Interface]
+    routes: List[Route]
+    neighbors: List[Neighbor]
+    sockets: List[Socket]
+    elapsed: float
+
+    @property
+    def default_route(self) -> Optional[Route]:
+        defaults = [r for r in self.routes if r.is_default and ':' not in r.destination]
+        return min(defaults, key=lambda r: r.metric) if defaults else None
+
+    @property
+    def default_gateway(self) -> str:
+        route = self.default_route
+        return route.gateway if route else ''
+
+    @property
+    def primary_address(self) -> str:
+        route = self.default_route
+        if route:
+            for interface in self.interfaces:
+                if interface.name == route.interface:
+                    for address in interface.addresses:
+                        if ':' not in address:
+                            return address.split('/')[0]
+        return primary_address()
+
+    @property
+    def listening(self) -> List[Socket]:
+        return [s for s in self.sockets if s.listening]
+
+    def neighbor(self, address: str) -> Optional[Neighbor]:
+        for entry in self.neighbors:
+            if entry.address == address:
+                return entry
+        return None
+
+    def local_networks(self) -> List[ipaddress.IPv4Network]:
+        """Directly attached IPv4 subnets, excluding loopback and link-local"""
+        networks = []
+        for interface in self.interfaces:
+            for address in interface.addresses:
+                network = ipaddress.ip_interface(address).network
+                if network.version == 4 and not network.is_loopback and not network.is_link_local \
+                        and network not in networks:
+                    networks.append(network)
+        return networks
+
+    def candidate_hosts(self, limit: int = MAX_CANDIDATES) -> List[str]:
+        """Seed for discovery: gateway and known neighbours first, then the local subnets.
+
+        Our own addresses are skipped; large subnets are truncated at `limit`."""
+        own = {a.split('/')[0] for i in self.interfaces for a in i.addresses}
+        seeds = [self.default_gateway] + [n.address for n in self.neighbors if n.complete]
+        candidates = list(dict.fromkeys(s for s in seeds if s and s not in own))
+        seen = set(candidates)
+        for network in self.local_networks():
+            for host in network.hosts() if network.num_addresses > 2 else network:
+                if len(candidates) >= limit:
+                    return candidates
+                address = str(host)
+                if address not in seen and address not in own:
+                    seen.add(address)
+                    candidates.append(address)
+        return candidates
+
+
+def collect(proc: str = PROC_NET) -> Inventory:
+    """Full snapshot; a few milliseconds on a typical host, no subprocesses"""
+    started = time.perf_counter()
+    sockets = []
+    for protocol in ('tcp', 'tcp6', 'udp', 'udp6'):
+        sockets.extend(read_sockets(protocol, proc))
+    return Inventory(socket.gethostname(), read_interfaces(proc), read_routes(proc), read_neighbors(proc), sockets,
+                     time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    # Benchmark: python -m core.net_inventory
+    inventory = collect()
+    runs = 200
+    started = time.perf_counter()
+    for _ in range(runs):
+        collect()
+    per_run = (time.perf_counter() - started) / runs
+
+    print(f"host {inventory.hostname}, IP principal {inventory.primary_address}, "
+          f"gateway {inventory.default_gateway or 'nenhum'}")
+    for interface in inventory.interfaces:
+        print(f"  {interface.name:<10} {interface.state:<8} {interface.mac:<18} {', '.join(interface.addresses)}")
+    for route in inventory.routes:
+        print(f"  rota {route.destination:<20} via {route.gateway or 'link':<16} {route.interface}")
+    for neighbor in inventory.neighbors:
+        print(f"  vizinho {neighbor.address:<16} {neighbor.mac} {neighbor.interface}")
+    print(f"  {len(inventory.listening)} sockets escutando, {len(inventory.sockets)} no total")
+    print(f"  candidatos para discovery: {len(inventory.candidate_hosts())} "
+          f"(primeiros: {', '.join(inventory.candidate_hosts()[:5])})")
+    print(f"coleta completa em {per_run * 1000:.2f} ms (média de {runs})")
@@ -0,0 +1,289 @@
+"""
+Perceptual Hashing
+aHash/dHash/pHash with NumPy, BK-tree and multi-index tables for near-duplicate search
+"""
+
+import os
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+HASH_SIZE = 8
+PHASH_FACTOR = 4
+DEFAULT_RADIUS = 10
+INDEX_CHUNKS = 4
+BATCH_CHUNKSIZE = 32
+
+
+class ImageHashes(NamedTuple):
+    """64-bit perceptual hashes of one image"""
+    path: str
+    ahash: int
+    dhash: int
+    phash: int
+
+    def hex(self) -> Dict[str, str]:
+        return {'aHash': f"{self.ahash:016x}", 'dHash': f"{self.dhash:016x}", 'pHash': f"{self.phash:016x}"}
+
+
+class ImageError(NamedTuple):
+    """A file the triage could not decode"""
+    path: str
+    error: str
+
+
+_WEIGHTS = 1 << np.arange(HASH_SIZE * HASH_SIZE - 1, -1, -1, dtype=np.uint64)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int(np.dot(bits.ravel().astype(np.uint64), _WEIGHTS))
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    n = np.arange(size)
+    matrix = np.sqrt(2.0 / size) * np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_PHASH_DCT = _dct_matrix(HASH_SIZE * PHASH_FACTOR)
+
+
+def _thumbnail(image: Image.Image, size: Tuple[int, int]) -> np.ndarray:
+    """Grayscale thumbnail; JPEG draft mode lets libjpeg decode at 1/2..1/8 scale"""
+    image.draft('L', (size[0] * 4, size[1] * 4))
+    return np.asarray(image.convert('L').resize(size, Image.LANCZOS), dtype=np.float64)
+
+
+def average_hash(image: Image.Image) -> int:
+    pixels = _thumbnail(image, (HASH_SIZE, HASH_SIZE))
+    return _bits_to_int(pixels > pixels.mean())
+
+
+def difference_hash(image: Image.Image) -> int:
+    pixels = _thumbnail(image, (HASH_SIZE + 1, HASH_SIZE))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(image: Image.Image) -> int:
+    pixels = _thumbnail(image, (HASH_SIZE * PHASH_FACTOR, HASH_SIZE * PHASH_FACTOR))
+    low = (_PHASH_DCT @ pixels @ _PHASH_DCT.T)[:HASH_SIZE, :HASH_SIZE]
+    # The DC term only carries overall brightness; leave it out of the median
+    return _bits_to_int(low > np.median(low.ravel()[1:]))
+
+
+def hash_image(image: Image.Image, path: str = '') -> ImageHashes:
+    """All three hashes from one decode; each hash then resizes that grayscale image to its own size"""
+    image.draft('L', (128, 128))
+    gray = image.convert('L')
+    gray.load()
+    return ImageHashes(path, average_hash(gray), difference_hash(gray), phash(gray))
+
+
+def hash_file(path: str) -> Union[ImageHashes, ImageError]:
+    try:
+        with Image.open(path) as image:
+            return hash_image(image, path)
+    except Exception as e:
+        # Pillow decoders raise more than OSError on damaged files (SyntaxError, struct.error,
+        # IndexError...); one bad file must not abort the pool.map of the whole triage
+        return ImageError(path, f"{type(e).__name__}: {e}")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over Hamming distance.
+
+    The triangle inequality lets a range query skip every child whose edge
+    distance lies outside [d - radius, d + radius]. Pruning works well when
+    hashes cluster (bursts from one camera, small radii); on large, uniformly
+    spread sets most edges fall inside the window and MultiIndexHash wins."""
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()):
+        # node = [hash, [paths], {distance: child}]
+        self.root: Optional[list] = None
+        self.size = 0
+        for value, key in items:
+            self.add(value, key)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, value: int, key: str):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [key], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, int, str]]:
+        """All (distance, hash, key) within `radius` of value, closest first"""
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((distance, node[0], key) for key in node[1])
+            low, high = distance - radius, distance + radius
+            stack.extend(child for edge, child in node[2].items() if low <= edge <= high)
+        found.sort()
+        return found
+
+
+class MultiIndexHash:
+    """Multi-index hashing (Norouzi et al.): the 64-bit hash is split into
+    INDEX_CHUNKS exact-match tables. By the pigeonhole principle, anything within
+    `radius` differs by at most radius // INDEX_CHUNKS bits in some chunk, so a
+    query probes a few hundred buckets and verifies only their members. Unlike a
+    BK-tree this stays sub-linear on uniformly spread 64-bit hashes."""
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()):
+        self.bits = HASH_SIZE * HASH_SIZE // INDEX_CHUNKS
+        self.chunk_mask = (1 << self.bits) - 1
+        self.values: List[int] = []
+        self.keys: List[str] = []
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in range(INDEX_CHUNKS)]
+        self._flips: Dict[int, List[int]] = {}
+        for value, key in items:
+            self.add(value, key)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: int, key: str):
+        slot = len(self.values)
+        self.values.append(value)
+        self.keys.append(key)
+        for i, table in enumerate(self.tables):
+            table.setdefault((value >> (i * self.bits)) & self.chunk_mask, []).append(slot)
+
+    def _masks(self, radius: int) -> List[int]:
+        """Every chunk-sized XOR mask with at most `radius` bits set"""
+        if radius not in self._flips:
+            masks = [0]
+            for flipped in range(1, radius + 1):
+                masks.extend(sum(1 << b for b in bits) for bits in combinations(range(self.bits), flipped))
+            self._flips[radius] = masks
+        return self._flips[radius]
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, int, str]]:
+        """All (distance, hash, key) within `radius` of value, closest first"""
+        masks = self._masks(radius // INDEX_CHUNKS)
+        seen = set()
+        found = []
+        for i, table in enumerate(self.tables):
+            chunk = (value >> (i * self.bits)) & self.chunk_mask
+            for mask in masks:
+                for slot in table.get(chunk ^ mask, ()):
+                    if slot in seen:
+                        continue
+                    seen.add(slot)
+                    distance = hamming(value, self.values[slot])
+                    if distance <= radius:
+                        found.append((distance, self.values[slot], self.keys[slot]))
+        found.sort()
+        return found
+
+
+def iter_images(root: str) -> Iterator[str]:
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def hash_files(paths: Iterable[str], workers: Optional[int] = None,
+               errors: Optional[List[ImageError]] = None) -> Iterator[ImageHashes]:
+    """Decode and hash on a process pool (image decoding is CPU bound); unreadable files are
+    skipped and, when given a list, appended to `errors`"""
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(hash_file, paths, chunksize=BATCH_CHUNKSIZE):
+            if isinstance(result, ImageError):
+                if errors is not None:
+                    errors.append(result)
+            else:
+                yield result
+
+
+def triage_directory(root: str, radius: int = DEFAULT_RADIUS, kind: str = 'phash', workers: Optional[int] = None,
+                     errors: Optional[List[ImageError]] = None) -> Tuple[List[ImageHashes], List[List[Tuple[int, str]]]]:
+    """Hash every image below root and group near-duplicates.
+
+    Returns (hashes, groups); each group lists (distance to the first member, path).
+    Files that fail to decode are appended to `errors` when a list is given."""
+    hashes = list(hash_files(iter_images(root), workers, errors))
+    index = MultiIndexHash((getattr(h, kind), h.path) for h in hashes)
+
+    grouped = set()
+    groups = []
+    for item in hashes:
+        if item.path in grouped:
+            continue
+        matches = [(d, path) for d, _, path in index.search(getattr(item, kind), radius) if path not in grouped]
+        if len(matches) > 1:
+            groups.append(matches)
+            grouped.update(path for _, path in matches)
+    groups.sort(key=len, reverse=True)
+    return hashes, groups
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import random
+
+    # Benchmark: python -m core.perceptual_hash [diretório]
+    random.seed(1)
+    values = [random.getrandbits(64) for _ in range(200_000)]
+    queries = [v ^ 0b1011 for v in values[:200]]
+
+    for name, structure in (('BK-tree', BKTree), ('Multi-index', MultiIndexHash)):
+        started = time.perf_counter()
+        index = structure((v, str(i)) for i, v in enumerate(values))
+        built = time.perf_counter() - started
+        started = time.perf_counter()
+        for q in queries:
+            index.search(q, DEFAULT_RADIUS)
+        queried = (time.perf_counter() - started) / len(queries)
+        print(f"{name}: {len(index):,} hashes em {built:.2f}s, consulta raio {DEFAULT_RADIUS}: {queried * 1000:.2f} ms")
+
+    started = time.perf_counter()
+    for q in queries[:20]:
+        [v for v in values if hamming(q, v) <= DEFAULT_RADIUS]
+    print(f"Varredura linear: {(time.perf_counter() - started) / 20 * 1000:.2f} ms")
+
+    if len(sys.argv) > 1:
+        started = time.perf_counter()
+        failed: List[ImageError] = []
+        hashes, groups = triage_directory(sys.argv[1], errors=failed)
+        elapsed = time.perf_counter() - started
+        print(f"{len(hashes):,} imagens em {elapsed:.2f}s ({len(hashes) / elapsed:.0f} img/s), {len(groups)} grupos, "
+              f"{len(failed)} ilegíveis")
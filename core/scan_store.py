@@ -0,0 +1,385 @@
+"""
+Scan Store
+Persistent scan results (SQLite WAL) with batched inserts and diffs between runs
+"""
+
+import os
+import csv
+import io
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+BATCH_SIZE = 10000
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "cybermentor_scans.sqlite3")
+# Host-level rows (discovery, manual scope) use port 0
+HOST_PORT = 0
+LIVE_STATES = ('open', 'up')
+
+# results is clustered by scan (WITHOUT ROWID primary key), so a whole scan is one
+# range read; the (host, port, scan_id) index serves history lookups and diff joins
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    started REAL NOT NULL,
+    finished REAL,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS scans_target ON scans (target, kind, id);
+CREATE TABLE IF NOT EXISTS results (
+    scan_id INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    protocol TEXT NOT NULL,
+    state TEXT NOT NULL,
+    service TEXT NOT NULL DEFAULT '',
+    info TEXT NOT NULL DEFAULT '',
+    rtt REAL,
+    PRIMARY KEY (scan_id, host, port, protocol)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_host_port_scan ON results (host, port, scan_id);
+"""
+
+RESULT_FIELDS = ['host', 'port', 'protocol', 'state', 'service', 'info', 'rtt']
+
+
+class ScanInfo(NamedTuple):
+    id: int
+    kind: str
+    target: str
+    label: str
+    started: float
+    finished: Optional[float]
+    total: int
+
+    def as_row(self) -> Dict[str, Any]:
+        return {
+            'Scan': self.id,
+            'Tipo': self.kind,
+            'Alvo': self.target,
+            'Início': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+            'Duração (s)': round(self.finished - self.started, 2) if self.finished else None,
+            'Resultados': self.total,
+            'Rótulo': self.label,
+        }
+
+
+class StoredResult(NamedTuple):
+    host: str
+    port: int
+    protocol: str
+    state: str
+    service: str
+    info: str
+    rtt: Optional[float]
+
+
+class Change(NamedTuple):
+    host: str
+    port: int
+    protocol: str
+    before: Optional[str]
+    after: Optional[str]
+
+    @property
+    def kind(self) -> str:
+        if self.before is None:
+            return 'novo'
+        if self.after is None:
+            return 'removido'
+        return 'alterado'
+
+    def as_row(self) -> Dict[str, Any]:
+        return {
+            'Host': self.host,
+            'Porta': f"{self.port}/{self.protocol}" if self.port else self.protocol,
+            'Mudança': self.kind,
+            'Antes': self.before or '-',
+            'Depois': self.after or '-',
+        }
+
+
+def tcp_rows(report) -> List[Tuple]:
+    """Rows from a scan_timing.ScanReport"""
+    return [(report.host, r.port, 'tcp', r.state, '', '', r.rtt) for r in report.results.values()]
+
+
+def udp_rows(report) -> List[Tuple]:
+    """Rows from a udp_scan.UdpReport"""
+    return [(r.host, r.port, 'udp', r.state, r.service, r.info, r.rtt) for r in report.results]
+
+
+def host_row(host: str, source: str = '', rtt: Optional[float] = None, info: str = '') -> Tuple:
+    """A host seen alive by discovery (no port involved)"""
+    return (host, HOST_PORT, 'host', 'up', source, info, rtt)
+
+
+class ScanStore:
+    """All scans ever recorded, one row per (scan, host, port, protocol).
+
+    Shared by every Streamlit session and by the terminal demos through the
+    same SQLite file; WAL lets readers work while a scan is being written."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def begin_scan(self, kind: str, target: str, label: str = '') -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO scans (kind, target, label, started) VALUES (?, ?, ?, ?)",
+                (kind, target, label, time.time())
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def add_results(self, scan_id: int, rows: Iterable[Tuple]) -> int:
+        """Bulk insert (host, port, protocol, state, service, info, rtt) rows.
+
+        One transaction per call, executemany in BATCH_SIZE chunks: SQLite's
+        per-statement overhead is the bottleneck, not the disk."""
+        count = 0
+        batch = []
+        sql = "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        with self._lock:
+            try:
+                for row in rows:
+                    batch.append((scan_id,) + tuple(row))
+                    if len(batch) >= BATCH_SIZE:
+                        self._db.executemany(sql, batch)
+                        count += len(batch)
+                        batch.clear()
+                if batch:
+                    self._db.executemany(sql, batch)
+                    count += len(batch)
+                self._db.execute("UPDATE scans SET total = total + ? WHERE id = ?", (count, scan_id))
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+        return count
+
+    def finish_scan(self, scan_id: int):
+        with self._lock:
+            self._db.execute("UPDATE scans SET finished = ? WHERE id = ?", (time.time(), scan_id))
+            self._db.commit()
+
+    def record(self, kind: str, target: str, rows: Iterable[Tuple], label: str = '') -> int:
+        """begin + add + finish for results that are already complete"""
+        scan_id = self.begin_scan(kind, target, label)
+        self.add_results(scan_id, rows)
+        self.finish_scan(scan_id)
+        return scan_id
+
+    def scan(self, scan_id: int) -> Optional[ScanInfo]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM scans WHERE id = ?", (scan_id,)).fetchone()
+        return ScanInfo(*row) if row else None
+
+    def scans(self, target: Optional[str] = None, kind: Optional[str] = None, limit: int = 20) -> List[ScanInfo]:
+        clauses, params = [], []
+        if target is not None:
+            clauses.append("target = ?")
+            params.append(target)
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._db.execute(f"SELECT * FROM scans {where} ORDER BY id DESC LIMIT ?",
+                                    params + [limit]).fetchall()
+        return [ScanInfo(*row) for row in rows]
+
+    def results(self, scan_id: int, state: Optional[str] = None) -> List[StoredResult]:
+        sql = "SELECT host, port, protocol, state, service, info, rtt FROM results WHERE scan_id = ?"
+        params: list = [scan_id]
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        with self._lock:
+            return [StoredResult(*row) for row in self._db.execute(sql, params)]
+
+    def previous_scan(self, scan_id: int) -> Optional[int]:
+        """Latest finished scan of the same target and kind before scan_id"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT p.id FROM scans s JOIN scans p ON p.target = s.target AND p.kind = s.kind "
+                "AND p.id < s.id AND p.finished IS NOT NULL WHERE s.id = ? ORDER BY p.id DESC LIMIT 1",
+                (scan_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def diff(self, old_id: int, new_id: int, states: Optional[Iterable[str]] = None) -> List[Change]:
+        """Ports that appeared, vanished or changed state between two scans.
+
+        `states` restricts the comparison to rows in those states on either
+        side (e.g. ('open',) to ignore closed/filtered churn)."""
+        states = tuple(states) if states else None
+        state_filter = f" AND {{alias}}.state IN ({','.join('?' * len(states))})" if states else ''
+        new_filter = state_filter.format(alias='n')
+        old_filter = state_filter.format(alias='o')
+        extra = list(states) if states else []
+        # Both sides walk one scan by primary key and probe the other through the (host, port, scan_id) index
+        sql = (
+            "SELECT n.host, n.port, n.protocol, o.state, n.state FROM results n "
+            "LEFT JOIN results o ON o.host = n.host AND o.port = n.port AND o.scan_id = ? "
+            f"AND o.protocol = n.protocol{old_filter} "
+            f"WHERE n.scan_id = ?{new_filter} AND (o.state IS NULL OR o.state != n.state) "
+            "UNION ALL "
+            "SELECT o.host, o.port, o.protocol, o.state, NULL FROM results o "
+            f"WHERE o.scan_id = ?{old_filter} AND NOT EXISTS (SELECT 1 FROM results n "
+            f"WHERE n.host = o.host AND n.port = o.port AND n.scan_id = ? AND n.protocol = o.protocol{new_filter}) "
+            "ORDER BY 1, 2"
+        )
+        params = [old_id] + extra + [new_id] + extra + [old_id] + extra + [new_id] + extra
+        with self._lock:
+            return [Change(*row) for row in self._db.execute(sql, params)]
+
+    def changes_since_last(self, scan_id: int, states: Optional[Iterable[str]] = None) -> Optional[List[Change]]:
+        """diff against previous_scan(); None when this is the first scan of the target"""
+        previous = self.previous_scan(scan_id)
+        return None if previous is None else self.diff(previous, scan_id, states)
+
+    def history(self, host: str, port: Optional[int] = None, limit: int = 50) -> List[Tuple[int, float, str, int, str]]:
+        """(scan_id, started, protocol, port, state), newest first"""
+        sql = ("SELECT r.scan_id, s.started, r.protocol, r.port, r.state FROM results r "
+               "JOIN scans s ON s.id = r.scan_id WHERE r.host = ?")
+        params: list = [host]
+        if port is not None:
+            sql += " AND r.port = ?"
+            params.append(port)
+        with self._lock:
+            return self._db.execute(sql + " ORDER BY r.scan_id DESC LIMIT ?", params + [limit]).fetchall()
+
+    def stable_hosts(self, target: str, kind: str, runs: int = 3) -> List[str]:
+        """Hosts present with identical results in each of the last `runs` scans of a target.
+
+        Their ports can be skipped on the next sweep and re-checked less often."""
+        recent = [s.id for s in self.scans(target, kind, runs) if s.finished]
+        if len(recent) < runs:
+            return []
+        marks = ','.join('?' * len(recent))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT host, scan_id, port, protocol, state FROM results WHERE scan_id IN ({marks}) "
+                "ORDER BY host, scan_id, port, protocol", recent
+            ).fetchall()
+        signatures: Dict[str, Dict[int, list]] = {}
+        for host, scan_id, port, protocol, state in rows:
+            signatures.setdefault(host, {}).setdefault(scan_id, []).append((port, protocol, state))
+        return sorted(host for host, per_scan in signatures.items()
+                      if len(per_scan) == len(recent) and len({tuple(v) for v in per_scan.values()}) == 1)
+
+    def known_hosts(self) -> List[str]:
+        """Every host ever seen alive (host row 'up' or any open port)"""
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT DISTINCT host FROM results WHERE state IN ({','.join('?' * len(LIVE_STATES))})",
+                LIVE_STATES
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def add_host(self, host: str, source: str = 'manual') -> int:
+        """Put a single host in scope, as a one-row discovery scan"""
+        return self.record('discovery', host, [host_row(host, source)], label=source)
+
+    def summary(self) -> Dict[str, int]:
+        """Dashboard numbers: latest scan per (target, kind) counts as the current state"""
+        with self._lock:
+            scans = self._db.execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+            open_ports = self._db.execute(
+                "SELECT COUNT(*) FROM results r JOIN (SELECT MAX(id) AS id FROM scans "
+                "WHERE finished IS NOT NULL GROUP BY target, kind) latest ON r.scan_id = latest.id "
+                "WHERE r.state = 'open' AND r.port != ?", (HOST_PORT,)
+            ).fetchone()[0]
+            results = self._db.execute("SELECT COALESCE(SUM(total), 0) FROM scans").fetchone()[0]
+        return {'scans': scans, 'hosts': len(self.known_hosts()), 'open_ports': open_ports, 'results': results}
+
+    def export_json(self, scan_id: int) -> str:
+        info = self.scan(scan_id)
+        return json.dumps({
+            'scan': info._asdict() if info else None,
+            'results': [r._asdict() for r in self.results(scan_id)],
+        }, indent=2, ensure_ascii=False)
+
+    def export_csv(self, scan_id: int) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(RESULT_FIELDS)
+        writer.writerows(self.results(scan_id))
+        return buffer.getvalue()
+
+    def delete_scan(self, scan_id: int):
+        with self._lock:
+            self._db.execute("DELETE FROM results WHERE scan_id = ?", (scan_id,))
+            self._db.execute("DELETE FROM scans WHERE id = ?", (scan_id,))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.execute("DELETE FROM scans")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_shared: Optional[ScanStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_store() -> ScanStore:
+    """Process-wide instance; Streamlit imports core modules once per server"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ScanStore()
+        return _shared
+
+
+if __name__ == "__main__":
+    import sys
+    import random
+
+    # Benchmark: python -m core.scan_store [hosts] [portas por host]
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    ports = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    store = ScanStore(path)
+    rng = random.Random(1)
+    states = {(h, p): ('open' if rng.random() < 0.02 else 'closed') for h in range(hosts) for p in range(1, ports + 1)}
+
+    def rows(flip: float):
+        for (h, p), state in states.items():
+            if flip and rng.random() < flip:
+                state = 'closed' if state == 'open' else 'open'
+            yield (f"10.0.{h // 256}.{h % 256}", p, 'tcp', state, '', '', 0.001)
+
+    for label, flip in (('inicial', 0.0), ('repetição', 0.001)):
+        started = time.perf_counter()
+        scan_id = store.record('tcp', '10.0.0.0/22', rows(flip), label)
+        elapsed = time.perf_counter() - started
+        print(f"{label}: {hosts * ports:,} resultados em {elapsed:.2f}s ({hosts * ports / elapsed:,.0f}/s)")
+
+    started = time.perf_counter()
+    changes = store.changes_since_last(scan_id)
+    print(f"diff completo: {len(changes)} mudanças em {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    changes = store.changes_since_last(scan_id, ('open',))
+    print(f"diff só de portas abertas: {len(changes)} mudanças em {time.perf_counter() - started:.2f}s")
+    started = time.perf_counter()
+    history = store.history('10.0.0.7')
+    print(f"histórico de um host: {len(history)} linhas em {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"arquivo: {os.path.getsize(path) / 1e6:.0f} MB")
@@ -0,0 +1,347 @@
+"""
+Scan Timing
+nmap-style T0-T5 templates, per-host RTT estimation and a TCP-like probe window
+"""
+
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+MIN_SAMPLES_FOR_TIMEOUT = 1
+DROP_BACKOFF = 0.5
+# The template's max_timeout is a ceiling for ordinary links; a host whose measured RTT gets
+# close to it may wait up to this many smoothed RTTs instead (satellite, congested WAN)
+RTT_CEILING_FACTOR = 2.0
+# Retries per silent port are sized so a responsive port is missed at most this often
+# given the measured loss rate: loss ** (retries + 1) <= MISS_TARGET
+MISS_TARGET = 0.01
+# RFC 6298 smoothing factors
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+
+
+class TimingTemplate(NamedTuple):
+    name: str
+    label: str
+    initial_timeout: float
+    min_timeout: float
+    max_timeout: float
+    max_retries: int
+    scan_delay: float
+    initial_window: int
+    max_window: int
+
+
+# nmap waits 5 min / 15 s between probes at T0/T1; scaled down here so demos finish
+TEMPLATES = {
+    0: TimingTemplate('T0', 'Paranoico', 5.0, 0.1, 10.0, 10, 5.0, 1, 1),
+    1: TimingTemplate('T1', 'Furtivo', 5.0, 0.1, 10.0, 10, 1.5, 1, 1),
+    2: TimingTemplate('T2', 'Educado', 1.0, 0.1, 10.0, 10, 0.4, 1, 1),
+    3: TimingTemplate('T3', 'Normal', 1.0, 0.1, 10.0, 10, 0.0, 10, 300),
+    4: TimingTemplate('T4', 'Agressivo', 0.5, 0.1, 1.25, 6, 0.0, 20, 500),
+    5: TimingTemplate('T5', 'Insano', 0.25, 0.05, 0.3, 2, 0.0, 50, 1000),
+}
+DEFAULT_TEMPLATE = 3
+
+# The old behaviour (fixed 1 s timeout, no retries), kept as a baseline for comparisons
+FIXED_TIMEOUT = TimingTemplate('fixo', 'Timeout fixo de 1 s', 1.0, 1.0, 1.0, 0, 0.0, 100, 100)
+
+
+class RttEstimator:
+    """Smoothed RTT and variance (RFC 6298) for one host"""
+    __slots__ = ('srtt', 'rttvar', 'timeout', 'samples', 'min_timeout', 'max_timeout')
+
+    def __init__(self, template: TimingTemplate):
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.samples = 0
+        self.min_timeout = template.min_timeout
+        self.max_timeout = template.max_timeout
+        self.timeout = template.initial_timeout
+
+    def update(self, rtt: float):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar += RTT_BETA * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += RTT_ALPHA * (rtt - self.srtt)
+        self.samples += 1
+        ceiling = self.max_timeout
+        if self.min_timeout < self.max_timeout:  # min == max pins the timeout (FIXED_TIMEOUT)
+            ceiling = max(ceiling, RTT_CEILING_FACTOR * self.srtt)
+        self.timeout = min(ceiling, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+
+    def backoff(self, expired: float):
+        # Only before the first sample: a silent filtered port must not inflate a known RTT.
+        # A burst of probes sent with the same timeout doubles it once, not once per probe
+        if self.samples < MIN_SAMPLES_FOR_TIMEOUT and expired >= self.timeout:
+            self.timeout = min(self.max_timeout, expired * 2)
+
+
+class TimingController:
+    """Decides how long to wait, how many probes may be in flight and how often to retry.
+
+    Every finished probe grows the window by one below ssthresh (slow start) and by
+    1/window above it; a silent port is not a congestion signal. A reply to a
+    retransmission faster than the earlier probe's timeout proves that probe was
+    lost (a slower one only shows it was given too little time): the window halves (at most
+    once per timeout period, since one burst of loss surfaces over that span).
+    The retry budget follows the loss rate measured over all replies, not the
+    highest attempt that ever got one: a single unlucky port must not make every
+    filtered port (silent by definition) use the template's whole max_retries."""
+
+    def __init__(self, template: TimingTemplate = TEMPLATES[DEFAULT_TEMPLATE]):
+        self.template = template
+        self.hosts: Dict[str, RttEstimator] = {}
+        self.window = float(template.initial_window)
+        self.ssthresh = float(template.max_window)
+        self.allowed_retries = min(1, template.max_retries)
+        self.drops = 0
+        self.responses = 0
+        self._last_drop = 0.0
+
+    def estimator(self, host: str) -> RttEstimator:
+        if host not in self.hosts:
+            self.hosts[host] = RttEstimator(self.template)
+        return self.hosts[host]
+
+    def timeout(self, host: str) -> float:
+        return self.estimator(host).timeout
+
+    @property
+    def max_in_flight(self) -> int:
+        return max(1, int(self.window))
+
+    def _grow(self):
+        if self.window < self.ssthresh:
+            self.window += 1
+        else:
+            self.window += 1 / self.window
+        self.window = min(self.window, float(self.template.max_window))
+
+    def on_response(self, host: str, rtt: float, attempt: int, waited: float = 0.0):
+        """`waited` is the timeout the previous attempt of this port expired after"""
+        estimator = self.estimator(host)
+        estimator.update(rtt)
+        self.responses += 1
+        lost = attempt and rtt < waited
+        if lost:
+            self.drops += 1
+        self.allowed_retries = self._retries_for(self.drops / self.responses)
+        if not lost:
+            self._grow()
+            return
+        now = time.monotonic()
+        if now - self._last_drop >= estimator.timeout:
+            self._last_drop = now
+            self.ssthresh = max(float(self.template.initial_window), self.window * DROP_BACKOFF)
+            self.window = self.ssthresh
+
+    def _retries_for(self, loss: float) -> int:
+        retries = min(1, self.template.max_retries)
+        while retries < self.template.max_retries and loss ** (retries + 1) > MISS_TARGET:
+            retries += 1
+        return retries
+
+    def on_timeout(self, host: str, expired: float):
+        self.estimator(host).backoff(expired)
+        self._grow()
+
+
+class PortResult(NamedTuple):
+    port: int
+    state: str
+    rtt: Optional[float]
+    attempts: int
+
+
+class ScanReport(NamedTuple):
+    host: str
+    template: str
+    results: Dict[int, PortResult]
+    elapsed: float
+    probes: int
+    retries: int
+    drops: int
+    srtt: Optional[float]
+    timeout: float
+    window: int
+
+    def ports(self, state: str):
+        return sorted(p for p, r in self.results.items() if r.state == state)
+
+    @property
+    def open_ports(self):
+        return self.ports('open')
+
+
+ProbeFunction = Callable[[str, int, float], Awaitable[Tuple[Optional[str], float]]]
+
+
+async def tcp_connect_probe(host: str, port: int, timeout: float) -> Tuple[Optional[str], float]:
+    """Full TCP handshake. Returns (state, rtt); state None means no answer in time.
+
+    A refused connection is an RST, which is as good an RTT sample as a SYN/ACK."""
+    started = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
+        return None, timeout
+    except ConnectionRefusedError:
+        return 'closed', time.perf_counter() - started
+    except OSError:
+        # Host/network unreachable: an ICMP error is a definitive "filtered"
+        return 'filtered', time.perf_counter() - started
+    rtt = time.perf_counter() - started
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return 'open', rtt
+
+
+async def tcp_scan(host: str, ports: Iterable[int], template: TimingTemplate = TEMPLATES[DEFAULT_TEMPLATE],
+                   probe: ProbeFunction = tcp_connect_probe,
+                   on_result: Optional[Callable[[PortResult], None]] = None) -> ScanReport:
+    """Scan ports with adaptive timing. Open/closed answers are final; only
+    timeouts are retried, and only as many times as observed loss justifies.
+
+    Retrying silent ports has a price the fixed 1 s timeout never pays: in the
+    400-port benchmark T3 takes about 5 s at 350 ms RTT and 12 s at 1.2 s RTT
+    against 4 s for FIXED_TIMEOUT, which in exchange misses 18 of 20 open
+    ports on the 1.2 s link. T4 is faster than FIXED_TIMEOUT on the 350 ms
+    link (about 3.6 s), but still takes 9-10 s on the 1.2 s link."""
+    controller = TimingController(template)
+    pending = deque((port, 0, 0.0) for port in dict.fromkeys(ports))
+    in_flight: Dict[asyncio.Task, Tuple[int, int, float, float]] = {}
+    results: Dict[int, PortResult] = {}
+    probes = retries = 0
+    last_sent = 0.0
+    started = time.perf_counter()
+
+    def finish(result: PortResult):
+        results[result.port] = result
+        if on_result:
+            on_result(result)
+
+    while pending or in_flight:
+        while pending and len(in_flight) < controller.max_in_flight:
+            if template.scan_delay:
+                wait = last_sent + template.scan_delay - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_sent = time.perf_counter()
+            port, attempt, waited = pending.popleft()
+            timeout = controller.timeout(host)
+            task = asyncio.ensure_future(probe(host, port, timeout))
+            in_flight[task] = (port, attempt, timeout, waited)
+            probes += 1
+
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            port, attempt, timeout, waited = in_flight.pop(task)
+            state, rtt = task.result()
+            if state is None:
+                controller.on_timeout(host, timeout)
+                if attempt < controller.allowed_retries:
+                    pending.append((port, attempt + 1, timeout))
+                    retries += 1
+                else:
+                    finish(PortResult(port, 'filtered', None, attempt + 1))
+            else:
+                controller.on_response(host, rtt, attempt, waited)
+                finish(PortResult(port, state, rtt, attempt + 1))
+
+    estimator = controller.estimator(host)
+    return ScanReport(host, template.name, results, time.perf_counter() - started, probes, retries,
+                      controller.drops, estimator.srtt, estimator.timeout, controller.max_in_flight)
+
+
+def scan(host: str, ports: Iterable[int], template: TimingTemplate = TEMPLATES[DEFAULT_TEMPLATE],
+         probe: ProbeFunction = tcp_connect_probe,
+         on_result: Optional[Callable[[PortResult], None]] = None) -> ScanReport:
+    """Synchronous entry point for scripts and Streamlit"""
+    return asyncio.run(tcp_scan(host, ports, template, probe, on_result))
+
+
+def parse_ports(text: str, limit: int = 65535) -> list:
+    """'22,80,8000-8100' -> sorted unique port list"""
+    ports = set()
+    for part in text.replace(' ', '').split(','):
+        if not part:
+            continue
+        low, _, high = part.partition('-')
+        first, last = int(low), int(high or low)
+        if not 1 <= first <= last <= limit:
+            raise ValueError(f"Faixa de portas inválida: {part}")
+        ports.update(range(first, last + 1))
+    return sorted(ports)
+
+
+class SimulatedTarget:
+    """Stand-in remote host with injected latency, jitter and packet loss.
+
+    Dropping SYNs for real needs firewall rules (root); simulating the wire at
+    the probe layer keeps the benchmark reproducible and unprivileged. Filtered
+    ports never answer; lost probes (either direction) never answer either."""
+
+    def __init__(self, open_ports: Iterable[int], closed_ports: Iterable[int], latency: float,
+                 jitter: float = 0.0, loss: float = 0.0, seed: Optional[int] = None):
+        self.open_ports = set(open_ports)
+        self.closed_ports = set(closed_ports)
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.random = random.Random(seed)
+
+    def truth(self, port: int) -> str:
+        if port in self.open_ports:
+            return 'open'
+        return 'closed' if port in self.closed_ports else 'filtered'
+
+    async def probe(self, host: str, port: int, timeout: float) -> Tuple[Optional[str], float]:
+        state = self.truth(port)
+        rtt = max(0.0, self.random.gauss(self.latency, self.jitter))
+        if state == 'filtered' or self.random.random() < self.loss or rtt > timeout:
+            await asyncio.sleep(timeout)
+            return None, timeout
+        await asyncio.sleep(rtt)
+        return state, rtt
+
+
+def accuracy(report: ScanReport, target: SimulatedTarget) -> Tuple[float, int]:
+    """(fraction of ports classified correctly, open ports found)"""
+    correct = sum(1 for port, result in report.results.items() if result.state == target.truth(port))
+    found = len(target.open_ports.intersection(report.open_ports))
+    return (correct / len(report.results) if report.results else 0.0), found
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.scan_timing [host portas]
+    if len(sys.argv) > 2:
+        report = scan(sys.argv[1], parse_ports(sys.argv[2]))
+        print(f"{report.template}: {len(report.open_ports)} abertas em {report.elapsed:.2f}s, "
+              f"{report.probes} sondas, srtt {report.srtt}")
+        sys.exit()
+
+    scenarios = [
+        ('LAN com perda (20 ms, 15% perda)', 0.020, 0.008, 0.15),
+        ('WAN lenta (350 ms, 5% perda)', 0.350, 0.080, 0.05),
+        ('Satélite (1,2 s, 3% perda)', 1.200, 0.100, 0.03),
+    ]
+    ports = list(range(1, 401))
+    for title, latency, jitter, loss in scenarios:
+        print(title)
+        for template in (FIXED_TIMEOUT, TEMPLATES[3], TEMPLATES[4]):
+            target = SimulatedTarget(range(1, 401, 20), range(2, 401, 10), latency, jitter, loss, seed=7)
+            report = asyncio.run(tcp_scan('simulado', ports, template, probe=target.probe))
+            correct, found = accuracy(report, target)
+            print(f"  {template.name:<5} {report.elapsed:6.2f}s  precisão {correct:6.1%}  "
+                  f"abertas {found}/{len(target.open_ports)}  "
+                  f"sondas {report.probes:4}  reenvios {report.retries:4}  perdas detectadas {report.drops:3}  "
+                  f"timeout final {report.timeout * 1000:6.0f} ms  janela {report.window}")
@@ -0,0 +1,118 @@
+"""
+Security Headers
+Scores the protective response headers of a site and flags technology disclosure
+"""
+
+from typing import Dict, List, NamedTuple
+
+
+class HeaderRule(NamedTuple):
+    header: str
+    protects: str
+    weight: int
+    advice: str
+
+
+# Weights add up to 100 together with DISCLOSURE_WEIGHT
+SECURITY_HEADERS = (
+    HeaderRule('Content-Security-Policy', 'Previne XSS e injeção de conteúdo', 30,
+               'Adicione uma Content Security Policy (CSP)'),
+    HeaderRule('Strict-Transport-Security', 'Força conexões HTTPS', 25,
+               'Ative o HTTP Strict Transport Security (HSTS) servindo o site por HTTPS'),
+    HeaderRule('X-Frame-Options', 'Protege contra clickjacking', 20,
+               'Defina X-Frame-Options ou frame-ancestors na CSP'),
+    HeaderRule('X-Content-Type-Options', 'Impede MIME sniffing', 15,
+               'Adicione X-Content-Type-Options: nosniff'),
+)
+# Reported but not scored: good practice, legacy or browser-specific
+INFORMATIONAL_HEADERS = (
+    HeaderRule('Referrer-Policy', 'Controla o vazamento de URLs no Referer', 0, ''),
+    HeaderRule('Permissions-Policy', 'Restringe câmera, microfone e outras APIs', 0, ''),
+    HeaderRule('X-XSS-Protection', 'Filtro XSS legado (ignorado por navegadores atuais)', 0, ''),
+)
+DISCLOSURE_HEADERS = ('Server', 'X-Powered-By', 'X-AspNet-Version', 'X-AspNetMvc-Version', 'X-Generator')
+DISCLOSURE_WEIGHT = 10
+DISCLOSURE_ADVICE = 'Esconda informações de servidor e tecnologia'
+
+
+class HeaderFinding(NamedTuple):
+    header: str
+    value: str
+    points: int
+    weight: int
+    protects: str
+    advice: str
+
+    @property
+    def present(self) -> bool:
+        return bool(self.value)
+
+    @property
+    def passed(self) -> bool:
+        return self.points == self.weight if self.weight else self.present
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Header': self.header,
+            'Valor': self.value or 'AUSENTE',
+            'Pontos': f"{self.points}/{self.weight}" if self.weight else 'informativo',
+            'Proteção': self.protects,
+        }
+
+
+class HeaderReport(NamedTuple):
+    url: str
+    status: int
+    score: int
+    findings: List[HeaderFinding]
+    disclosed: Dict[str, str]
+
+    @property
+    def grade(self) -> str:
+        if self.score >= 80:
+            return 'EXCELENTE'
+        if self.score >= 60:
+            return 'MODERADO'
+        return 'FRACO'
+
+    @property
+    def recommendations(self) -> List[str]:
+        advice = [f.advice for f in self.findings if f.weight and not f.passed]
+        if self.disclosed:
+            advice.append(DISCLOSURE_ADVICE)
+        return advice
+
+    def as_row(self) -> Dict[str, str]:
+        row = {'URL': self.url, 'Status': str(self.status) if self.status else 'erro',
+               'Score': str(self.score), 'Nota': self.grade}
+        row.update({f.header: '✅' if f.passed else '❌' for f in self.findings if f.weight})
+        row['Exposição'] = ', '.join(f"{k}: {v}" for k, v in self.disclosed.items()) or '-'
+        return row
+
+
+def _points(rule: HeaderRule, value: str, headers, https: bool) -> int:
+    if not value:
+        # frame-ancestors supersedes X-Frame-Options in every current browser
+        if rule.header == 'X-Frame-Options' and 'frame-ancestors' in headers.get('content-security-policy', ''):
+            return rule.weight
+        return 0
+    if rule.header == 'Strict-Transport-Security' and not https:
+        return 0  # browsers ignore HSTS received over plain HTTP
+    if rule.header == 'X-Content-Type-Options' and value.strip().lower() != 'nosniff':
+        return 0
+    return rule.weight
+
+
+def analyze(headers, url: str = '', status: int = 0) -> HeaderReport:
+    """Score a case-insensitive header mapping (requests, aiohttp and http.client all provide one)"""
+    https = url.lower().startswith('https://')
+    findings = []
+    for rule in SECURITY_HEADERS + INFORMATIONAL_HEADERS:
+        value = headers.get(rule.header, '')
+        findings.append(HeaderFinding(rule.header, value, _points(rule, value, headers, https), rule.weight,
+                                      rule.protects, rule.advice))
+
+    disclosed = {name: headers[name] for name in DISCLOSURE_HEADERS if headers.get(name)}
+    score = sum(f.points for f in findings) + (0 if disclosed else DISCLOSURE_WEIGHT)
+    return HeaderReport(url, status, score, findings, disclosed)
+
@@ -0,0 +1,401 @@
+"""
+Service Detection
+Async banner grabbing with protocol probes and a compiled version-signature database
+"""
+
+import os
+import re
+import ssl
+import time
+import struct
+import asyncio
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+MAX_BANNER = 4096
+CONNECT_TIMEOUT = 3.0
+GREETING_TIMEOUT = 1.5
+PROBE_TIMEOUT = 3.0
+# Once the first bytes arrive, keep reading until the peer is idle this long
+IDLE_TIMEOUT = 0.05
+DEFAULT_CONCURRENCY = 100
+
+SERVICES_FILES = ('/etc/services', os.path.join(os.environ.get('SystemRoot', r'C:\Windows'),
+                                                'System32', 'drivers', 'etc', 'services'))
+
+# Curated names and descriptions; they override the system services file
+COMMON_SERVICES = {
+    20: ('ftp-data', 'Canal de dados do FTP'),
+    21: ('ftp', 'Transferência de arquivos (sem criptografia)'),
+    22: ('ssh', 'Secure Shell - Acesso remoto'),
+    23: ('telnet', 'Acesso remoto não criptografado'),
+    25: ('smtp', 'Envio de email'),
+    53: ('domain', 'Resolução de nomes (DNS)'),
+    80: ('http', 'Web server não criptografado'),
+    110: ('pop3', 'Recebimento de email (POP3)'),
+    111: ('rpcbind', 'Mapeador de portas RPC (Unix)'),
+    135: ('msrpc', 'Remote Procedure Call'),
+    139: ('netbios-ssn', 'Compartilhamento Windows'),
+    143: ('imap', 'Caixa de email remota (IMAP)'),
+    389: ('ldap', 'Diretório LDAP / Active Directory'),
+    443: ('https', 'Web server criptografado'),
+    445: ('microsoft-ds', 'SMB - Compartilhamento de arquivos Windows'),
+    465: ('smtps', 'SMTP sobre TLS'),
+    587: ('submission', 'Envio autenticado de email'),
+    631: ('ipp', 'Impressão via rede (CUPS)'),
+    993: ('imaps', 'IMAP sobre TLS'),
+    995: ('pop3s', 'POP3 sobre TLS'),
+    1433: ('ms-sql-s', 'Microsoft SQL Server'),
+    1521: ('oracle', 'Banco de dados Oracle'),
+    2049: ('nfs', 'Sistema de arquivos de rede (NFS)'),
+    3306: ('mysql', 'MySQL Database Server'),
+    3389: ('ms-wbt-server', 'Remote Desktop Protocol'),
+    5432: ('postgresql', 'PostgreSQL Database'),
+    5900: ('vnc', 'Área de trabalho remota VNC'),
+    5985: ('wsman', 'Gerenciamento remoto do Windows (WinRM)'),
+    6379: ('redis', 'Banco em memória Redis'),
+    8000: ('http-alt', 'Web server de desenvolvimento'),
+    8080: ('http-proxy', 'Web server porta alternativa'),
+    8443: ('https-alt', 'Web server TLS porta alternativa'),
+    9100: ('jetdirect', 'Impressão direta (RAW)'),
+    9200: ('elasticsearch', 'API REST do Elasticsearch'),
+    11211: ('memcache', 'Cache em memória Memcached'),
+    27017: ('mongod', 'Banco de dados MongoDB'),
+}
+
+
+def _build_port_table() -> List[str]:
+    """Port number -> service name for all 65,536 TCP ports ('' when unassigned)"""
+    table = [''] * 65536
+    for path in SERVICES_FILES:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as handle:
+                for line in handle:
+                    fields = line.split('#', 1)[0].split()
+                    if len(fields) < 2 or not fields[1].endswith('/tcp'):
+                        continue
+                    port = fields[1][:-4]
+                    if port.isdigit() and int(port) < 65536 and not table[int(port)]:
+                        table[int(port)] = fields[0]
+            break
+        except OSError:
+            continue
+    for port, (name, _) in COMMON_SERVICES.items():
+        table[port] = name
+    return table
+
+
+PORT_SERVICES = _build_port_table()
+
+
+def service_name(port: int) -> str:
+    return PORT_SERVICES[port] or 'desconhecido'
+
+
+def service_description(port: int) -> str:
+    return COMMON_SERVICES.get(port, ('', 'Serviço não identificado'))[1]
+
+
+class Probe(NamedTuple):
+    name: str
+    payload: bytes
+    timeout: float
+
+
+NULL_PROBE = Probe('NULL', b'', GREETING_TIMEOUT)
+HTTP_PROBE = Probe('GetRequest', b'GET / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: CyberMentor\r\n\r\n', PROBE_TIMEOUT)
+REDIS_PROBE = Probe('RedisInfo', b'*2\r\n$4\r\nINFO\r\n$6\r\nserver\r\n', PROBE_TIMEOUT)
+
+# Services whose clients speak first: waiting for a greeting would only burn the NULL timeout
+CLIENT_FIRST = {
+    'http': HTTP_PROBE, 'http-alt': HTTP_PROBE, 'http-proxy': HTTP_PROBE, 'www': HTTP_PROBE,
+    'https': HTTP_PROBE, 'https-alt': HTTP_PROBE, 'elasticsearch': HTTP_PROBE, 'redis': REDIS_PROBE,
+}
+TLS_SERVICES = {'https', 'https-alt', 'smtps', 'imaps', 'pop3s'}
+
+# (service, product, pattern). Named groups: version, info, host. First match wins,
+# so specific products come before the generic fallback of each protocol.
+SIGNATURES = [
+    ('ssh', 'OpenSSH', rb'^SSH-[\d.]+-OpenSSH_(?P<version>[\w.]+)(?:[ -](?P<info>[^\r\n]+))?'),
+    ('ssh', 'Dropbear sshd', rb'^SSH-[\d.]+-dropbear_(?P<version>[\w.]+)'),
+    ('ssh', 'Cisco SSH', rb'^SSH-[\d.]+-Cisco-(?P<version>[\d.]+)'),
+    ('ssh', '', rb'^SSH-(?P<version>[\d.]+)-(?P<info>[^\r\n]+)'),
+    ('ftp', 'vsftpd', rb'^220 \(vsFTPd (?P<version>[\d.]+)\)'),
+    ('ftp', 'ProFTPD', rb'^220[ -]ProFTPD (?P<version>[\w.]+) Server(?: \((?P<info>[^)]+)\))?'),
+    ('ftp', 'Pure-FTPd', rb'^220-+ Welcome to Pure-FTPd'),
+    ('ftp', 'FileZilla Server', rb'^220[ -].*FileZilla Server(?: version)? (?P<version>[\d.]+\w*)'),
+    ('ftp', 'Microsoft ftpd', rb'^220[ -]Microsoft FTP Service'),
+    ('smtp', 'Postfix smtpd', rb'^220[ -](?P<host>[\w.-]+) ESMTP Postfix(?: \((?P<info>[^)]+)\))?'),
+    ('smtp', 'Exim smtpd', rb'^220[ -](?P<host>[\w.-]+) ESMTP Exim (?P<version>[\d.]+)'),
+    ('smtp', 'Sendmail', rb'^220[ -](?P<host>[\w.-]+) ESMTP Sendmail (?P<version>[\w.]+)'),
+    ('smtp', 'Microsoft ESMTP', rb'^220[ -](?P<host>[\w.-]+) Microsoft ESMTP MAIL Service'),
+    ('smtp', '', rb'^220[ -](?P<host>[\w.-]+) .*E?SMTP'),
+    ('ftp', '', rb'(?i)^220[ -].*ftp'),
+    ('pop3', 'Dovecot pop3d', rb'^\+OK Dovecot'),
+    ('pop3', '', rb'^\+OK .*POP3'),
+    ('imap', 'Dovecot imapd', rb'^\* OK .*Dovecot'),
+    ('imap', '', rb'^\* OK .*IMAP4'),
+    ('mysql', 'MariaDB', rb'^.{3}\x00\x0a(?:5\.5\.5-)?(?P<version>[\d.]+)-MariaDB'),
+    ('mysql', 'MySQL', rb'^.{3}\x00\x0a(?P<version>\d[\w.-]*)\x00'),
+    ('mysql', 'MySQL', rb"^.{3}\x00\xff.{2}Host '(?P<host>[^']+)' is not allowed to connect"),
+    ('redis', 'Redis key-value store', rb'^\$\d+\r\n# Server\r\n(?:[^\r\n]*\r\n)*?redis_version:(?P<version>[\d.]+)'),
+    ('redis', 'Redis key-value store', rb'^-NOAUTH (?P<info>[^\r\n]+)'),
+    ('redis', 'Redis key-value store', rb'^(?:\+PONG|-ERR (?:unknown command|wrong number of arguments))'),
+    ('http', 'Apache httpd', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: Apache(?:/(?P<version>[\d.]+))?(?: \((?P<info>[^)]+)\))?'),
+    ('http', 'nginx', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: nginx(?:/(?P<version>[\d.]+))?'),
+    ('http', 'Microsoft IIS httpd', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: Microsoft-IIS/(?P<version>[\d.]+)'),
+    ('http', 'lighttpd', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: lighttpd/(?P<version>[\d.]+)'),
+    ('http', 'Python http.server', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: SimpleHTTP/[\d.]+ Python/(?P<version>[\d.]+)'),
+    ('http', 'Werkzeug httpd', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: Werkzeug/(?P<version>[\d.]+)'),
+    ('http', 'gunicorn', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: gunicorn(?:/(?P<version>[\d.]+))?'),
+    ('http', '', rb'^HTTP/1\.[01] \d{3}(?:[^\r\n]*\r\n)*?Server: (?P<info>[^\r\n]+)'),
+    ('http', '', rb'^HTTP/1\.[01] \d{3}'),
+    ('vnc', 'VNC', rb'^RFB (?P<version>\d{3}\.\d{3})\n'),
+    ('telnet', '', rb'^\xff[\xfb-\xfe]'),
+]
+
+_SIGNATURES = [(service, product, re.compile(pattern, re.DOTALL)) for service, product, pattern in SIGNATURES]
+_PRINTABLE = bytes(b if 0x20 <= b < 0x7F else 0x2E for b in range(256))
+
+
+class ProbeTiming(NamedTuple):
+    """Time from sending a probe (or connecting, for NULL) to the first response byte"""
+    probe: str
+    latency: float
+    received: int
+
+
+class ServiceInfo(NamedTuple):
+    host: str
+    port: int
+    state: str
+    service: str
+    product: str
+    version: str
+    info: str
+    banner: bytes
+    connect_time: float
+    probes: List[ProbeTiming]
+
+    @property
+    def description(self) -> str:
+        return ' '.join(part for part in (self.product, self.version, f"({self.info})" if self.info else '') if part)
+
+    def banner_text(self, limit: int = 200) -> str:
+        """First line(s) of the banner with control bytes shown as '.'"""
+        return self.banner[:limit].replace(b'\r\n', b' | ').translate(_PRINTABLE).decode('ascii')
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Porta': f"{self.port}/tcp",
+            'Estado': self.state,
+            'Serviço': self.service,
+            'Versão': self.description or '-',
+            'Conexão (ms)': f"{self.connect_time * 1000:.1f}" if self.connect_time else '-',
+            'Sondas': ', '.join(f"{p.probe} {p.latency * 1000:.1f} ms" + ('' if p.received else ' (sem resposta)')
+                                for p in self.probes),
+            'Banner': self.banner_text(120),
+        }
+
+
+def match_banner(banner: bytes) -> Optional[Tuple[str, str, str, str]]:
+    """(service, product, version, info) of the first matching signature"""
+    for service, product, pattern in _SIGNATURES:
+        match = pattern.match(banner)
+        if match:
+            groups = match.groupdict()
+            version = groups.get('version') or b''
+            info = groups.get('info') or groups.get('host') or b''
+            return service, product, version.decode('latin-1').strip(), info.decode('latin-1').strip()
+    return None
+
+
+async def _read_response(reader: asyncio.StreamReader, timeout: float) -> Tuple[bytes, float]:
+    """(data, seconds to first byte); later segments are collected until the peer goes idle"""
+    started = time.perf_counter()
+    try:
+        data = await asyncio.wait_for(reader.read(MAX_BANNER), timeout)
+    except asyncio.TimeoutError:
+        return b'', time.perf_counter() - started
+    first_byte = time.perf_counter() - started
+    while data and len(data) < MAX_BANNER and not reader.at_eof():
+        try:
+            more = await asyncio.wait_for(reader.read(MAX_BANNER - len(data)), IDLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            break
+        if not more:
+            break
+        data += more
+    return data, first_byte
+
+
+def _probe_plan(name: str) -> List[Probe]:
+    if name in CLIENT_FIRST:
+        return [CLIENT_FIRST[name]]
+    # Wait for a greeting first, then try HTTP on the same connection
+    return [NULL_PROBE, HTTP_PROBE]
+
+
+async def grab_service(host: str, port: int, hint: Optional[str] = None,
+                       connect_timeout: float = CONNECT_TIMEOUT) -> ServiceInfo:
+    """Connect, run the probe plan for the port's expected service and fingerprint the reply"""
+    expected = hint or service_name(port)
+    tls = None
+    if expected in TLS_SERVICES:
+        tls = ssl.create_default_context()
+        tls.check_hostname = False
+        tls.verify_mode = ssl.CERT_NONE
+
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=tls), connect_timeout)
+    except asyncio.TimeoutError:
+        return ServiceInfo(host, port, 'filtered', expected, '', '', '', b'', 0.0, [])
+    except (ConnectionRefusedError, ConnectionResetError):
+        return ServiceInfo(host, port, 'closed', expected, '', '', '', b'', 0.0, [])
+    except (OSError, ssl.SSLError) as e:
+        return ServiceInfo(host, port, 'error', expected, '', '', str(e), b'', 0.0, [])
+    connect_time = time.perf_counter() - started
+
+    banner = b''
+    timings = []
+    try:
+        for probe in _probe_plan(expected):
+            if probe.payload:
+                writer.write(probe.payload.replace(b'{host}', host.encode('idna')))
+                await writer.drain()
+            banner, latency = await _read_response(reader, probe.timeout)
+            timings.append(ProbeTiming(probe.name, latency, len(banner)))
+            if banner or reader.at_eof():
+                break
+    except (OSError, ssl.SSLError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+    fingerprint = match_banner(banner) if banner else None
+    if fingerprint:
+        service, product, version, info = fingerprint
+    else:
+        service, product, version, info = (expected if not banner else 'desconhecido'), '', '', ''
+    if tls is not None and service == 'http':
+        service = 'https'
+    return ServiceInfo(host, port, 'open', service, product, version, info, banner, connect_time, timings)
+
+
+async def detect_services(host: str, ports: Iterable[int], hints: Optional[Dict[int, str]] = None,
+                          concurrency: int = DEFAULT_CONCURRENCY) -> List[ServiceInfo]:
+    """Fingerprint many ports concurrently; results come back in port order"""
+    limit = asyncio.Semaphore(concurrency)
+    hints = hints or {}
+
+    async def bounded(port):
+        async with limit:
+            return await grab_service(host, port, hints.get(port))
+
+    return sorted(await asyncio.gather(*(bounded(p) for p in set(ports))), key=lambda s: s.port)
+
+
+def detect(host: str, ports: Iterable[int], hints: Optional[Dict[int, str]] = None,
+           concurrency: int = DEFAULT_CONCURRENCY) -> List[ServiceInfo]:
+    """Synchronous entry point for scripts and Streamlit"""
+    return asyncio.run(detect_services(host, ports, hints, concurrency))
+
+
+def _mysql_greeting(version: str) -> bytes:
+    payload = (b'\x0a' + version.encode() + b'\x00' + struct.pack('<I', 42) + b'saltsalt\x00'
+               + struct.pack('<HBHH', 0xF7FF, 0x21, 0x0002, 0x81FF) + b'\x15' + bytes(10)
+               + b'saltsaltsalt\x00' + b'mysql_native_password\x00')
+    return struct.pack('<I', len(payload))[:3] + b'\x00' + payload
+
+
+# name -> (greeting sent on connect, reply to any request, delay in seconds)
+STAND_INS = {
+    'ssh': (b'SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.6\r\n', None, 0.004),
+    'ftp': (b'220 (vsFTPd 2.3.4)\r\n', None, 0.012),
+    'smtp': (b'220 mail.lab.local ESMTP Postfix (Ubuntu)\r\n', None, 0.020),
+    'http': (None, b'HTTP/1.1 200 OK\r\nServer: Apache/2.4.41 (Ubuntu)\r\nContent-Type: text/html\r\n'
+                   b'Content-Length: 13\r\n\r\n<h1>Lab</h1>\n', 0.008),
+    'redis': (None, b'$61\r\n# Server\r\nredis_version:6.0.16\r\nredis_mode:standalone\r\nos:Linux\r\n\r\n', 0.002),
+    'mysql': (_mysql_greeting('8.0.25'), None, 0.015),
+    'silencioso': (None, None, 0.0),
+}
+
+
+class StandInServers:
+    """Loopback servers imitating common daemons, for demos and benchmarks.
+
+    Each listens on an ephemeral port; `hints` maps those ports to the service
+    they imitate, standing in for the well-known port numbers."""
+
+    def __init__(self, host: str = '127.0.0.1', services: Optional[Iterable[str]] = None):
+        self.host = host
+        self.services = list(services or STAND_INS)
+        self.hints: Dict[int, str] = {}
+        self._servers = []
+
+    async def __aenter__(self) -> 'StandInServers':
+        for name in self.services:
+            greeting, reply, delay = STAND_INS[name]
+
+            async def handle(reader, writer, greeting=greeting, reply=reply, delay=delay):
+                try:
+                    if greeting:
+                        await asyncio.sleep(delay)
+                        writer.write(greeting)
+                        await writer.drain()
+                    request = await reader.read(1024)
+                    if request and reply:
+                        await asyncio.sleep(delay)
+                        writer.write(reply)
+                        await writer.drain()
+                    await reader.read(1024)
+                except (OSError, asyncio.CancelledError):
+                    pass
+                finally:
+                    writer.close()
+
+            server = await asyncio.start_server(handle, self.host, 0)
+            self._servers.append(server)
+            self.hints[server.sockets[0].getsockname()[1]] = name
+        return self
+
+    async def __aexit__(self, *exc):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+    @property
+    def ports(self) -> List[int]:
+        return list(self.hints)
+
+
+async def _detect_lab(services: Optional[Iterable[str]]) -> List[ServiceInfo]:
+    async with StandInServers(services=services) as lab:
+        return await detect_services(lab.host, lab.ports, lab.hints)
+
+
+def detect_lab(services: Optional[Iterable[str]] = None) -> List[ServiceInfo]:
+    """Start the stand-in servers, fingerprint them and shut them down"""
+    return asyncio.run(_detect_lab(services))
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.service_detection [host porta ...]
+    started = time.perf_counter()
+    if len(sys.argv) > 2:
+        results = detect(sys.argv[1], [int(p) for p in sys.argv[2:]])
+    else:
+        results = detect_lab()
+    elapsed = time.perf_counter() - started
+
+    for item in results:
+        print(f"{item.port:>5}/tcp {item.state:<9} {item.service:<12} {item.description:<45} "
+              + '  '.join(f"{p.probe}={p.latency * 1000:.1f}ms" for p in item.probes))
+    print(f"{len(results)} portas em {elapsed:.2f}s; tabela de portas: "
+          f"{sum(1 for name in PORT_SERVICES if name):,} de {len(PORT_SERVICES):,} com nome")
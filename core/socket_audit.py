@@ -0,0 +1,239 @@
+"""
+Socket Audit
+Inside-out view of listening sockets with owning processes and snapshot diffs
+"""
+
+import os
+import time
+import ipaddress
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from core.net_inventory import read_sockets
+from core.service_detection import service_name
+
+try:
+    import pwd
+except ImportError:  # Windows
+    pwd = None
+
+PROC = '/proc'
+PROTOCOLS = ('tcp', 'tcp6', 'udp', 'udp6')
+SUPPORTED = os.path.exists(os.path.join(PROC, 'net', 'tcp'))
+
+# Services that should rarely face the network; listening on every interface is worth a warning
+RISKY_PORTS = {
+    21: 'FTP envia senhas em texto puro',
+    23: 'Telnet envia tudo em texto puro',
+    111: 'rpcbind expõe serviços RPC',
+    135: 'RPC do Windows é alvo clássico de worms',
+    139: 'NetBIOS expõe compartilhamentos',
+    445: 'SMB foi o vetor do WannaCry',
+    1433: 'Banco de dados exposto',
+    2375: 'API do Docker sem TLS dá root no host',
+    3306: 'Banco de dados exposto',
+    3389: 'RDP é alvo de força bruta',
+    5432: 'Banco de dados exposto',
+    5900: 'VNC costuma ter senha fraca ou nenhuma',
+    6379: 'Redis sem senha permite execução remota',
+    9200: 'Elasticsearch sem autenticação vaza dados',
+    11211: 'Memcached é usado em ataques de amplificação',
+    27017: 'MongoDB sem autenticação vaza dados',
+}
+
+
+class ListeningSocket(NamedTuple):
+    protocol: str
+    address: str
+    port: int
+    pid: Optional[int]
+    process: str
+    user: str
+    inode: int
+
+    @property
+    def key(self) -> Tuple[str, str, int, Optional[int]]:
+        """Identity across snapshots (the inode changes if the service restarts)"""
+        return self.protocol, self.address, self.port, self.pid
+
+    @property
+    def exposure(self) -> str:
+        address = ipaddress.ip_address(self.address)
+        if address.is_unspecified:
+            return 'todas as interfaces'
+        if address.is_loopback:
+            return 'somente local'
+        return 'uma interface'
+
+    @property
+    def warning(self) -> str:
+        if self.exposure == 'somente local':
+            return ''
+        return RISKY_PORTS.get(self.port, '')
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Protocolo': self.protocol,
+            'Endereço': f"[{self.address}]:{self.port}" if ':' in self.address else f"{self.address}:{self.port}",
+            'Serviço': service_name(self.port),
+            'Processo': f"{self.process} ({self.pid})" if self.pid else self.process,
+            'Usuário': self.user,
+            'Exposição': self.exposure,
+            'Alerta': self.warning or '-',
+        }
+
+
+class Snapshot(NamedTuple):
+    taken: float
+    sockets: List[ListeningSocket]
+    elapsed: float
+    cpu: float
+    index_rebuilt: bool
+
+    @property
+    def exposed(self) -> List[ListeningSocket]:
+        return [s for s in self.sockets if s.exposure != 'somente local']
+
+
+class SocketDiff(NamedTuple):
+    appeared: List[ListeningSocket]
+    disappeared: List[ListeningSocket]
+
+    def __bool__(self):
+        return bool(self.appeared or self.disappeared)
+
+
+def diff(before: Snapshot, after: Snapshot) -> SocketDiff:
+    old = {s.key: s for s in before.sockets}
+    new = {s.key: s for s in after.sockets}
+    return SocketDiff([new[k] for k in new.keys() - old.keys()], [old[k] for k in old.keys() - new.keys()])
+
+
+def build_inode_index(proc: str = PROC) -> Dict[int, int]:
+    """socket inode -> pid from every readable /proc/<pid>/fd link.
+
+    Processes of other users are unreadable without root; their sockets keep pid None."""
+    index = {}
+    try:
+        pids = [entry for entry in os.listdir(proc) if entry.isdigit()]
+    except OSError:
+        return index
+    for pid in pids:
+        fd_dir = os.path.join(proc, pid, 'fd')
+        try:
+            fds = os.listdir(fd_dir)
+        except OSError:
+            continue
+        for fd in fds:
+            try:
+                target = os.readlink(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if target.startswith('socket:['):
+                index[int(target[8:-1])] = int(pid)
+    return index
+
+
+def _process_name(pid: int, proc: str = PROC) -> str:
+    try:
+        with open(os.path.join(proc, str(pid), 'comm')) as f:
+            return f.read().strip()
+    except OSError:
+        return '?'
+
+
+def _user(uid: int) -> str:
+    if pwd is None:
+        return str(uid)
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return str(uid)
+
+
+class SocketAuditor:
+    """Takes listening-socket snapshots cheap enough to refresh every second.
+
+    The /proc/net tables are tiny to parse; walking every /proc/<pid>/fd is what
+    costs. The inode -> pid index is therefore kept between snapshots and only
+    rebuilt when a listening inode is missing from it, i.e. when something new
+    started listening. Inodes still unresolved after a rebuild (other users'
+    processes, other namespaces) are remembered so they don't force one each time."""
+
+    def __init__(self, proc: str = PROC):
+        self.proc = proc
+        self._index: Dict[int, int] = {}
+        self._unresolved: Set[int] = set()
+        self._names: Dict[int, str] = {}
+        self._users: Dict[int, str] = {}
+        self.previous: Optional[Snapshot] = None
+        self.rebuilds = 0
+
+    def _lookup(self, inodes: Set[int]) -> bool:
+        """Make sure the index covers `inodes`; True if it had to be rebuilt"""
+        known = inodes & self._index.keys()
+        stale = any(not os.path.exists(os.path.join(self.proc, str(self._index[i]))) for i in known)
+        if inodes - known - self._unresolved or stale:
+            self._index = build_inode_index(self.proc)
+            self._unresolved = inodes - self._index.keys()
+            self._names.clear()
+            self.rebuilds += 1
+            return True
+        return False
+
+    def snapshot(self) -> Snapshot:
+        started, cpu_started = time.perf_counter(), time.process_time()
+        raw = [s for protocol in PROTOCOLS for s in read_sockets(protocol, os.path.join(self.proc, 'net'))
+               if s.listening]
+        rebuilt = self._lookup({s.inode for s in raw if s.inode})
+
+        sockets = []
+        for s in raw:
+            pid = self._index.get(s.inode)
+            if pid is not None and pid not in self._names:
+                self._names[pid] = _process_name(pid, self.proc)
+            if s.uid not in self._users:
+                self._users[s.uid] = _user(s.uid)
+            sockets.append(ListeningSocket(s.protocol, s.local_address, s.local_port, pid,
+                                           self._names[pid] if pid is not None else 'sem permissão',
+                                           self._users[s.uid], s.inode))
+        sockets.sort(key=lambda s: (s.port, s.protocol, s.address))
+        return Snapshot(time.time(), sockets, time.perf_counter() - started, time.process_time() - cpu_started,
+                        rebuilt)
+
+    def refresh(self) -> Tuple[Snapshot, SocketDiff]:
+        """New snapshot plus what changed since the last one"""
+        current = self.snapshot()
+        changes = diff(self.previous, current) if self.previous else SocketDiff([], [])
+        self.previous = current
+        return current, changes
+
+
+if __name__ == "__main__":
+    import socket
+
+    # Benchmark: python -m core.socket_audit
+    auditor = SocketAuditor()
+    first, _ = auditor.refresh()
+    for item in first.sockets:
+        row = item.as_row()
+        print(f"  {row['Protocolo']:<5} {row['Endereço']:<28} {row['Processo']:<28} {row['Exposição']:<20} "
+              f"{item.warning}")
+    print(f"snapshot inicial: {first.elapsed * 1000:.2f} ms ({first.cpu * 1000:.2f} ms de CPU, índice reconstruído)")
+
+    runs = 100
+    cpu = sum(auditor.refresh()[0].cpu for _ in range(runs)) / runs
+    print(f"atualização com índice em cache: {cpu * 1000:.3f} ms de CPU por snapshot "
+          f"({cpu * 100:.3f}% de um núcleo a 1 Hz)")
+    started = time.process_time()
+    for _ in range(20):
+        build_inode_index()
+    print(f"reconstruir o índice a cada snapshot custaria {(time.process_time() - started) / 20 * 1000:.2f} ms de CPU")
+
+    listener = socket.socket()
+    listener.bind(('0.0.0.0', 0))
+    listener.listen()
+    _, changes = auditor.refresh()
+    print(f"novo listener detectado: {[s.as_row()['Endereço'] for s in changes.appeared]}")
+    listener.close()
+    _, changes = auditor.refresh()
+    print(f"listener fechado: {[s.as_row()['Endereço'] for s in changes.disappeared]}")
@@ -0,0 +1,602 @@
+"""
+Tech Fingerprint
+Wappalyzer-style technology detection with every pattern of a channel behind one combined regex
+"""
+
+import re
+import json
+import threading
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+MIN_ATOM = 3
+# Literal runs present in nearly every page narrow nothing down; any other run is preferred
+COMMON_ATOMS = frozenset(('<link', '<script', '<meta', '<div', '<span', '<input', '<body', '<img', '<!--',
+                          'href="', 'src="', 'class="', 'id="', 'name="', '.js', '.css', 'http', 'https://'))
+MAX_SCAN_CHARS = 1024 * 1024
+CHANNELS = ('html', 'scriptSrc')
+
+# name -> signatures, in the technologies.json format used by Wappalyzer:
+# patterns are case-insensitive regexes, optionally followed by \;version:\1
+# and \;confidence:N; an empty pattern only requires the header/cookie/meta to exist
+TECHNOLOGIES: Dict[str, dict] = {
+    # Servidores web e proxies
+    'Nginx': {'cats': ['Servidor web', 'Proxy reverso'], 'headers': {'Server': r'nginx(?:/([\d.]+))?\;version:\1'}},
+    'Apache HTTP Server': {'cats': ['Servidor web'],
+                           'headers': {'Server': r'^Apache(?:/([\d.]+))?(?![\w-])\;version:\1'}},
+    'Microsoft IIS': {'cats': ['Servidor web'], 'headers': {'Server': r'^Microsoft-IIS(?:/([\d.]+))?\;version:\1'},
+                      'implies': ['Windows Server']},
+    'LiteSpeed': {'cats': ['Servidor web'], 'headers': {'Server': r'^LiteSpeed'}},
+    'Caddy': {'cats': ['Servidor web'], 'headers': {'Server': r'^Caddy'}},
+    'OpenResty': {'cats': ['Servidor web'], 'headers': {'Server': r'^openresty(?:/([\d.]+))?\;version:\1'},
+                  'implies': ['Nginx', 'Lua']},
+    'Apache Tomcat': {'cats': ['Servidor web'], 'headers': {'Server': r'^Apache-Coyote(?:/([\d.]+))?\;version:\1'},
+                      'implies': ['Java']},
+    'Gunicorn': {'cats': ['Servidor web'], 'headers': {'Server': r'gunicorn(?:/([\d.]+))?\;version:\1'},
+                 'implies': ['Python']},
+    'Werkzeug': {'cats': ['Servidor web'], 'headers': {'Server': r'Werkzeug(?:/([\d.]+))?\;version:\1'},
+                 'implies': ['Python']},
+    'Kestrel': {'cats': ['Servidor web'], 'headers': {'Server': r'^Kestrel'}, 'implies': ['Microsoft ASP.NET']},
+    'Phusion Passenger': {'cats': ['Servidor web'],
+                          'headers': {'Server': r'Phusion[ _]Passenger(?:[ /]([\d.]+))?\;version:\1'}},
+    'Envoy': {'cats': ['Proxy reverso'], 'headers': {'Server': r'^envoy', 'x-envoy-upstream-service-time': ''}},
+    'Varnish': {'cats': ['Cache'], 'headers': {'Via': r'varnish', 'X-Varnish': ''}},
+    'Windows Server': {'cats': ['Sistema operacional']},
+    # CDN, hospedagem e proteção
+    'Cloudflare': {'cats': ['CDN'], 'headers': {'Server': r'^cloudflare$', 'cf-ray': ''}, 'cookies': {'__cf_bm': ''}},
+    'Amazon CloudFront': {'cats': ['CDN'], 'headers': {'X-Amz-Cf-Id': '', 'Via': r'\(CloudFront\)'}},
+    'Amazon S3': {'cats': ['Hospedagem'], 'headers': {'Server': r'^AmazonS3'}},
+    'Fastly': {'cats': ['CDN'], 'headers': {'Fastly-Debug-Digest': '', 'X-Served-By': r'^cache-\;confidence:50'}},
+    'Akamai': {'cats': ['CDN'], 'headers': {'X-Akamai-Transformed': '', 'Server': r'^AkamaiGHost'}},
+    'Vercel': {'cats': ['Hospedagem'], 'headers': {'Server': r'^Vercel', 'X-Vercel-Id': ''}},
+    'Netlify': {'cats': ['Hospedagem'], 'headers': {'Server': r'^Netlify', 'X-Nf-Request-Id': ''}},
+    'GitHub Pages': {'cats': ['Hospedagem'], 'headers': {'Server': r'^GitHub\.com$'}},
+    'Heroku': {'cats': ['Hospedagem'], 'headers': {'Via': r'[\d.-]+ vegur$'}},
+    'Sucuri': {'cats': ['Segurança'], 'headers': {'X-Sucuri-ID': '', 'Server': r'^Sucuri'}},
+    'Imperva': {'cats': ['Segurança'], 'headers': {'X-Iinfo': '', 'X-CDN': r'^Incapsula'}},
+    'ModSecurity': {'cats': ['Segurança'], 'headers': {'Server': r'Mod_Security(?:/([\d.]+))?\;version:\1'}},
+    'reCAPTCHA': {'cats': ['Segurança'], 'scriptSrc': [r'google\.com/recaptcha/', r'recaptcha/api\.js']},
+    'hCaptcha': {'cats': ['Segurança'], 'scriptSrc': [r'hcaptcha\.com/1/api\.js']},
+    'Cloudflare Turnstile': {'cats': ['Segurança'], 'scriptSrc': [r'challenges\.cloudflare\.com/turnstile/']},
+    # Linguagens e frameworks de servidor
+    'PHP': {'cats': ['Linguagem'], 'headers': {'X-Powered-By': r'^php/?([\d.]+)?\;version:\1',
+                                                'Server': r'php/?([\d.]+)?\;version:\1'},
+            'cookies': {'PHPSESSID': ''}},
+    'Microsoft ASP.NET': {'cats': ['Framework web'],
+                          'headers': {'X-AspNet-Version': r'(.+)\;version:\1', 'X-Powered-By': r'^ASP\.NET',
+                                      'X-AspNetMvc-Version': ''},
+                          'cookies': {'ASP.NET_SessionId': '', 'ASPSESSION': ''},
+                          'html': [r'<input[^>]+name="__VIEWSTATE'], 'implies': ['Windows Server\\;confidence:50']},
+    'Java': {'cats': ['Linguagem'], 'cookies': {'JSESSIONID': ''}},
+    'Python': {'cats': ['Linguagem']},
+    'Ruby': {'cats': ['Linguagem']},
+    'Node.js': {'cats': ['Linguagem']},
+    'Lua': {'cats': ['Linguagem']},
+    'MySQL': {'cats': ['Banco de dados']},
+    'Express': {'cats': ['Framework web'], 'headers': {'X-Powered-By': r'^Express$'}, 'implies': ['Node.js']},
+    'Next.js': {'cats': ['Framework JavaScript'], 'headers': {'X-Powered-By': r'^Next\.js ?([\d.]+)?\;version:\1'},
+                'html': [r'<script[^>]+id="__NEXT_DATA__"'], 'scriptSrc': [r'/_next/static/'],
+                'implies': ['React', 'Node.js']},
+    'Nuxt.js': {'cats': ['Framework JavaScript'], 'html': [r'<div[^>]+id="__nuxt"'], 'scriptSrc': [r'/_nuxt/'],
+                'implies': ['Vue.js', 'Node.js']},
+    'Django': {'cats': ['Framework web'], 'cookies': {'django_language': ''},
+               'html': [r'<input[^>]+name="csrfmiddlewaretoken"'], 'implies': ['Python']},
+    'Laravel': {'cats': ['Framework web'], 'cookies': {'laravel_session': ''}, 'implies': ['PHP']},
+    'CodeIgniter': {'cats': ['Framework web'], 'cookies': {'ci_session': ''}, 'implies': ['PHP']},
+    'Ruby on Rails': {'cats': ['Framework web'], 'meta': {'csrf-param': r'^authenticity_token$'},
+                      'cookies': {'_rails_session': ''}, 'implies': ['Ruby']},
+    'Spring': {'cats': ['Framework web'], 'headers': {'X-Application-Context': ''}, 'implies': ['Java']},
+    # CMS e e-commerce
+    'WordPress': {'cats': ['CMS'], 'meta': {'generator': r'^WordPress ?([\d.]+)?\;version:\1'},
+                  'headers': {'Link': r'rel="https://api\.w\.org/"', 'X-Pingback': r'/xmlrpc\.php$'},
+                  'html': [r'<link[^>]+/wp-(?:content|includes)/'], 'scriptSrc': [r'/wp-(?:content|includes)/'],
+                  'implies': ['PHP', 'MySQL']},
+    'WooCommerce': {'cats': ['E-commerce'], 'meta': {'generator': r'^WooCommerce ([\d.]+)\;version:\1'},
+                    'scriptSrc': [r'/woocommerce(?:-[\w-]+)?/'], 'implies': ['WordPress']},
+    'Elementor': {'cats': ['Construtor de sites'], 'html': [r'<div[^>]+class="[^"]*elementor'],
+                  'scriptSrc': [r'/elementor/assets/'], 'implies': ['WordPress']},
+    'Yoast SEO': {'cats': ['SEO'], 'html': [r'<!-- This site is optimized with the Yoast (?:WordPress )?SEO'],
+                  'implies': ['WordPress']},
+    'Drupal': {'cats': ['CMS'], 'headers': {'X-Drupal-Cache': '', 'X-Generator': r'^Drupal(?:\s([\d.]+))?\;version:\1'},
+               'meta': {'generator': r'^Drupal(?:\s([\d.]+))?\;version:\1'}, 'html': [r'<[^>]+data-drupal-'],
+               'scriptSrc': [r'drupal(?:\.min)?\.js'], 'implies': ['PHP']},
+    'Joomla': {'cats': ['CMS'], 'meta': {'generator': r'Joomla!(?: ([\d.]+))?\;version:\1'},
+               'scriptSrc': [r'/media/jui/'], 'implies': ['PHP']},
+    'Magento': {'cats': ['E-commerce'], 'cookies': {'X-Magento-Vary': ''},
+                'html': [r'<script[^>]+data-requiremodule="(?:mage/|Magento_)'],
+                'scriptSrc': [r'/static/(?:version\d+/)?frontend/'], 'implies': ['PHP', 'MySQL']},
+    'Shopify': {'cats': ['E-commerce'], 'headers': {'X-ShopId': '', 'X-Shopify-Stage': ''},
+                'scriptSrc': [r'cdn\.shopify\.com']},
+    'PrestaShop': {'cats': ['E-commerce'], 'meta': {'generator': r'PrestaShop'},
+                   'headers': {'Powered-By': r'^Prestashop'}, 'implies': ['PHP']},
+    'Wix': {'cats': ['Construtor de sites'], 'headers': {'X-Wix-Request-Id': ''}, 'meta': {'generator': r'Wix\.com'}},
+    'Squarespace': {'cats': ['Construtor de sites'], 'html': [r'<!-- This is Squarespace\. -->'],
+                    'scriptSrc': [r'static1?\.squarespace\.com']},
+    'Ghost': {'cats': ['CMS'], 'meta': {'generator': r'^Ghost(?: ([\d.]+))?\;version:\1'},
+              'headers': {'X-Ghost-Cache-Status': ''}, 'implies': ['Node.js']},
+    'Hugo': {'cats': ['Gerador de site estático'], 'meta': {'generator': r'^Hugo ([\d.]+)?\;version:\1'}},
+    'Jekyll': {'cats': ['Gerador de site estático'], 'meta': {'generator': r'^Jekyll v([\d.]+)?\;version:\1'},
+               'html': [r'<!-- Begin Jekyll SEO tag v([\d.]+)\;version:\1'], 'implies': ['Ruby']},
+    'Gatsby': {'cats': ['Gerador de site estático'], 'meta': {'generator': r'^Gatsby(?: ([\d.]+))?\;version:\1'},
+               'html': [r'<div[^>]+id="___gatsby"'], 'implies': ['React']},
+    'MediaWiki': {'cats': ['Wiki'], 'meta': {'generator': r'^MediaWiki ?(.+)$\;version:\1'},
+                  'html': [r'<body[^>]+class="mediawiki'], 'implies': ['PHP']},
+    'Moodle': {'cats': ['LMS'], 'cookies': {'MoodleSession': ''}, 'meta': {'keywords': r'^moodle'},
+               'implies': ['PHP']},
+    # Bibliotecas e frameworks JavaScript
+    'jQuery': {'cats': ['Biblioteca JavaScript'],
+               'scriptSrc': [r'jquery[.-]([\d.]*\d)[^/]*\.js\;version:\1', r'/jquery(?:\.min)?\.js',
+                             r'/jquery(?:\.min)?\.js\?ver=([\d.]+)\;version:\1']},
+    'jQuery UI': {'cats': ['Biblioteca JavaScript'],
+                  'scriptSrc': [r'jquery-ui[.-]([\d.]*\d)[^/]*\.js\;version:\1', r'jquery-ui(?:\.min)?\.js'],
+                  'implies': ['jQuery']},
+    'React': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+data-react'],
+              'scriptSrc': [r'react(?:-dom)?(?:\.production)?(?:\.min)?\.js', r'/react@([\d.]+)/\;version:\1']},
+    'Vue.js': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+\sdata-v-[0-9a-f]{8}'],
+               'scriptSrc': [r'vue(?:\.global)?(?:\.min)?\.js', r'/vue@([\d.]+)\;version:\1']},
+    'Angular': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+ ng-version="([\d.]+)"\;version:\1']},
+    'AngularJS': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+ ng-app'],
+                  'scriptSrc': [r'angular[.-]([\d.]*\d)[^/]*\.js\;version:\1', r'/angular(?:\.min)?\.js']},
+    'Svelte': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+class="[^"]*svelte-[a-z0-9]+']},
+    'Ember.js': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+id="ember\d+"']},
+    'Alpine.js': {'cats': ['Framework JavaScript'], 'html': [r'<[^>]+[^\w-]x-data[^\w-]'],
+                  'scriptSrc': [r'alpine(?:js)?(?:\.min)?\.js']},
+    'htmx': {'cats': ['Biblioteca JavaScript'], 'html': [r'<[^>]+ hx-(?:get|post)='],
+             'scriptSrc': [r'htmx(?:\.org)?(?:\.min)?\.js']},
+    'Lodash': {'cats': ['Biblioteca JavaScript'], 'scriptSrc': [r'lodash(?:\.min)?\.js']},
+    'Moment.js': {'cats': ['Biblioteca JavaScript'], 'scriptSrc': [r'moment(?:-with-locales)?(?:\.min)?\.js']},
+    'Modernizr': {'cats': ['Biblioteca JavaScript'], 'scriptSrc': [r'modernizr[.-]([\d.]*\d)[^/]*\.js\;version:\1',
+                                                                    r'modernizr(?:\.min)?\.js']},
+    'Socket.io': {'cats': ['Biblioteca JavaScript'], 'scriptSrc': [r'socket\.io(?:\.min)?\.js'],
+                  'implies': ['Node.js']},
+    'core-js': {'cats': ['Biblioteca JavaScript'], 'scriptSrc': [r'core-js(?:-bundle)?@([\d.]+)\;version:\1']},
+    'Polyfill.io': {'cats': ['Biblioteca JavaScript'], 'scriptSrc': [r'polyfill\.io/v\d/polyfill']},
+    # CSS e fontes
+    'Bootstrap': {'cats': ['Framework CSS'],
+                  'html': [r'<link[^>]+?href="[^"]*bootstrap(?:\.min)?\.css',
+                           r'<link[^>]+?href="[^"]*/bootstrap@([\d.]+)/\;version:\1'],
+                  'scriptSrc': [r'bootstrap(?:\.bundle)?(?:\.min)?\.js', r'/bootstrap@([\d.]+)/\;version:\1']},
+    'Tailwind CSS': {'cats': ['Framework CSS'], 'html': [r'<link[^>]+?href="[^"]*tailwind(?:\.min)?\.css'],
+                     'scriptSrc': [r'cdn\.tailwindcss\.com']},
+    'Bulma': {'cats': ['Framework CSS'], 'html': [r'<link[^>]+?href="[^"]*bulma(?:\.min)?\.css']},
+    'Font Awesome': {'cats': ['Fontes'], 'html': [r'<link[^>]+?href="[^"]+?font-?awesome(?:\.min)?\.css'],
+                     'scriptSrc': [r'kit\.fontawesome\.com']},
+    'Google Font API': {'cats': ['Fontes'], 'html': [r'<link[^>]+fonts\.(?:googleapis|gstatic)\.com']},
+    # Analytics, marketing e pagamentos
+    'Google Analytics': {'cats': ['Analytics'], 'cookies': {'_ga': ''},
+                         'scriptSrc': [r'google-analytics\.com/(?:ga|urchin|analytics)\.js',
+                                       r'googletagmanager\.com/gtag/js']},
+    'Google Tag Manager': {'cats': ['Gerenciador de tags'], 'scriptSrc': [r'googletagmanager\.com/gtm\.js'],
+                           'html': [r'googletagmanager\.com/ns\.html']},
+    'Hotjar': {'cats': ['Analytics'], 'scriptSrc': [r'static\.hotjar\.com']},
+    'Matomo': {'cats': ['Analytics'], 'scriptSrc': [r'matomo\.js', r'piwik\.js']},
+    'Plausible': {'cats': ['Analytics'], 'scriptSrc': [r'plausible\.io/js/']},
+    'Facebook Pixel': {'cats': ['Analytics'], 'scriptSrc': [r'connect\.facebook\.net/[^/]+/fbevents\.js']},
+    'Sentry': {'cats': ['Monitoramento de erros'], 'scriptSrc': [r'browser\.sentry-cdn\.com/([\d.]+)/\;version:\1']},
+    'Stripe': {'cats': ['Pagamentos'], 'scriptSrc': [r'js\.stripe\.com']},
+    'PayPal': {'cats': ['Pagamentos'], 'scriptSrc': [r'paypal\.com/sdk/js', r'paypalobjects\.com']},
+}
+
+_META_TAG = re.compile(r'<meta\s[^>]*>', re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'''([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+_SCRIPT_SRC = re.compile(r'''<script\b[^>]*?\ssrc\s*=\s*["']?([^"'\s>]+)''', re.IGNORECASE)
+_COOKIE_NAME = re.compile(r'(?:^|,)\s*([^=;,\s]+)=')
+_TERNARY = re.compile(r'^\\(\d)\?([^:]*):(.*)$')
+_GROUP = re.compile(r'\\(\d)')
+
+
+class Technology(NamedTuple):
+    name: str
+    version: str
+    confidence: int
+    categories: Tuple[str, ...]
+    evidence: Tuple[str, ...]
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Tecnologia': self.name,
+            'Versão': self.version or '-',
+            'Categoria': ', '.join(self.categories) or '-',
+            'Confiança': f"{self.confidence}%",
+            'Evidência': '; '.join(self.evidence),
+        }
+
+
+class _Pattern(NamedTuple):
+    tech: str
+    source: str  # 'html', 'scriptSrc', 'headers:server', ...
+    regex: Optional['re.Pattern']  # None: presence is enough
+    version: str
+    confidence: int
+
+
+def parse_pattern(text: str) -> Tuple[str, str, int]:
+    """'regex\\;version:\\1\\;confidence:50' -> (regex, version template, confidence)"""
+    regex, *tags = text.split('\\;')
+    version, confidence = '', 100
+    for tag in tags:
+        key, _, value = tag.partition(':')
+        if key == 'version':
+            version = value
+        elif key == 'confidence' and value.isdigit():
+            confidence = int(value)
+    return regex, version, confidence
+
+
+def resolve_version(template: str, match: 're.Match') -> str:
+    if not template:
+        return ''
+    groups = [''] + [g or '' for g in match.groups()]
+
+    def group(number: str) -> str:
+        index = int(number)
+        return groups[index] if index < len(groups) else ''
+
+    ternary = _TERNARY.match(template)
+    if ternary:
+        number, present, absent = ternary.groups()
+        template = present if group(number) else absent
+    return _GROUP.sub(lambda m: group(m.group(1)), template).strip()
+
+
+def literal_atom(regex: str) -> Optional[str]:
+    """Longest uncommon literal run every match of `regex` must contain, lowercased; None if there is none.
+
+    Only the top-level sequence (and plain groups in it) is considered: text
+    inside alternations, optional parts or repeats is not guaranteed to occur."""
+    try:
+        parsed = sre_parse.parse(regex, re.IGNORECASE)
+    except re.error:
+        return None
+    runs: List[str] = []
+    run: List[str] = []
+
+    def walk(items):
+        nonlocal run
+        for op, argument in items:
+            if op is sre_parse.LITERAL and argument < 128:
+                run.append(chr(argument).lower())
+                continue
+            if op is sre_parse.SUBPATTERN and not any(o in (sre_parse.BRANCH, sre_parse.IN) for o, _ in argument[-1]):
+                walk(argument[-1])
+                continue
+            if op in (sre_parse.AT, sre_parse.ASSERT_NOT) or op is sre_parse.ASSERT and argument[0] < 0:
+                continue  # zero-width: the literal run on each side stays contiguous
+            runs.append(''.join(run))
+            run = []
+            if op is sre_parse.MAX_REPEAT or op is sre_parse.MIN_REPEAT:
+                low, _, body = argument
+                if low >= 1 and len(body) == 1 and body[0][0] is sre_parse.LITERAL and body[0][1] < 128:
+                    run = [chr(body[0][1]).lower()]  # x+ still contributes one x to the next run
+
+    walk(parsed)
+    runs.append(''.join(run))
+    runs = [r for r in runs if len(r) >= MIN_ATOM]
+    if not runs:
+        return None
+    atom = max(runs, key=lambda r: (r.strip() not in COMMON_ATOMS, len(r)))
+    # Letters and spaces start a trie walk at almost every byte of a page; punctuation rarely does
+    start = next((i for i, char in enumerate(atom) if not (char.isalnum() or char == ' ')), 0)
+    return atom[start:] if len(atom) - start >= MIN_ATOM else atom
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Alternation shaped as a prefix trie: the engine follows one branch per character"""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            return '(?:' + body + ')?' if len(branches) == 1 and len(body) > 1 else body + '?'
+        return body
+
+    return build(trie)
+
+
+class _Channel:
+    """Every pattern of one text channel (body, script URLs, one header...) behind one scan.
+
+    Each regex is reduced to a literal ASCII atom it cannot match without. All
+    atoms form a single trie-shaped regex run over the ASCII-lowercased bytes,
+    restarting one byte after each hit so overlapping atoms are all seen; only
+    patterns whose atom turned up are then searched. Patterns with no usable
+    atom are always searched."""
+
+    def __init__(self, patterns: List[_Pattern]):
+        self.patterns = patterns
+        self.by_atom: Dict[bytes, List[_Pattern]] = {}
+        self.unanchored: List[_Pattern] = []
+        for pattern in patterns:
+            atom = literal_atom(pattern.regex.pattern) if pattern.regex is not None else None
+            if atom:
+                self.by_atom.setdefault(atom.encode('ascii'), []).append(pattern)
+            else:
+                self.unanchored.append(pattern)
+        # The trie returns the longest atom starting at a position; the shorter ones there are its prefixes
+        self.prefixes = {atom: [atom[:end] for end in range(MIN_ATOM, len(atom) + 1) if atom[:end] in self.by_atom]
+                         for atom in self.by_atom}
+        words = [atom.decode('ascii') for atom in self.by_atom]
+        self.scanner = re.compile(_trie_regex(words).encode('ascii')) if words else None
+
+    def candidates(self, lowered: bytes) -> List[_Pattern]:
+        found: Set[bytes] = set()
+        if self.scanner is not None:
+            search, prefixes = self.scanner.search, self.prefixes
+            match = search(lowered)
+            while match is not None:
+                found.update(prefixes[match.group()])
+                match = search(lowered, match.start() + 1)
+        return [p for atom in found for p in self.by_atom[atom]] + self.unanchored
+
+    def match(self, text: str, lowered: Optional[bytes] = None,
+              prefilter: bool = True) -> Iterator[Tuple[_Pattern, 're.Match']]:
+        if prefilter:
+            patterns = self.candidates(_lowered(text) if lowered is None else lowered)
+        else:
+            patterns = self.patterns  # reference path: every regex over the whole text
+        for pattern in patterns:
+            found = pattern.regex.search(text)
+            if found:
+                yield pattern, found
+
+
+class TechDatabase:
+    """Compiled signatures; detect() scans each channel once whatever the number of technologies"""
+
+    def __init__(self, technologies: Dict[str, dict], categories: Optional[Dict[str, str]] = None):
+        self.technologies = technologies
+        self.categories = {name: tuple(categories.get(str(c), str(c)) if categories else str(c)
+                                       for c in spec.get('cats', ()))
+                           for name, spec in technologies.items()}
+        self.implies: Dict[str, List[Tuple[str, int]]] = {}
+        channels: Dict[str, List[_Pattern]] = {channel: [] for channel in CHANNELS}
+        keyed: Dict[str, Dict[str, List[_Pattern]]] = {'headers': {}, 'cookies': {}, 'meta': {}}
+        self.pattern_count = 0
+        self.invalid: List[Tuple[str, str, str]] = []  # (technology, source, error): JS-only syntax, mostly
+
+        for name, spec in technologies.items():
+            for channel in CHANNELS:
+                for text in _as_list(spec.get(channel)):
+                    self._compile(name, channel, text, channels[channel])
+            for kind, by_key in keyed.items():
+                for key, texts in (spec.get(kind) or {}).items():
+                    for text in _as_list(texts) or ['']:
+                        self._compile(name, f"{kind}:{key}", text, by_key.setdefault(key.lower(), []))
+            implied = []
+            for text in _as_list(spec.get('implies')):
+                target, _, confidence = parse_pattern(text)
+                implied.append((target, confidence))
+            self.implies[name] = implied
+
+        self.channels = {channel: _Channel(patterns) for channel, patterns in channels.items()}
+        # Header, cookie and meta values are tiny; presence-only patterns skip the regex entirely
+        self.keyed = {kind: {key: (_Channel([p for p in patterns if p.regex is not None]),
+                                   [p for p in patterns if p.regex is None])
+                             for key, patterns in by_key.items()}
+                      for kind, by_key in keyed.items()}
+
+    def _compile(self, name: str, source: str, text: str, into: List[_Pattern]):
+        regex, version, confidence = parse_pattern(text)
+        compiled = None
+        if regex:
+            try:
+                compiled = re.compile(regex, re.IGNORECASE)
+            except re.error as e:
+                self.invalid.append((name, source, str(e)))
+                return
+        self.pattern_count += 1
+        into.append(_Pattern(name, source, compiled, version, confidence))
+
+    def __len__(self) -> int:
+        return len(self.technologies)
+
+    def detect(self, headers=None, body: str = '', cookies: Optional[Iterable[str]] = None,
+               max_chars: int = MAX_SCAN_CHARS, prefilter: bool = True) -> List[Technology]:
+        """Technologies behind one response. `headers` is any case-insensitive or plain mapping;
+        cookie names default to those in its Set-Cookie header. `prefilter=False` runs every
+        regex on its own, as a reference for the combined scan."""
+        hits: Dict[str, Dict[str, object]] = {}
+
+        def record(pattern: _Pattern, match: Optional['re.Match']):
+            entry = hits.setdefault(pattern.tech, {'confidence': 0, 'version': '', 'evidence': []})
+            entry['confidence'] = min(100, entry['confidence'] + pattern.confidence)
+            version = resolve_version(pattern.version, match) if match is not None else ''
+            if len(version) > len(entry['version']):
+                entry['version'] = version
+            if pattern.source not in entry['evidence']:
+                entry['evidence'].append(pattern.source)
+
+        def keyed(kind: str, values: Dict[str, str]):
+            table = self.keyed[kind]
+            for key, value in values.items():
+                compiled = table.get(key.lower())
+                if compiled is None:
+                    continue
+                channel, present = compiled
+                for pattern in present:
+                    record(pattern, None)
+                for pattern, match in channel.match(value, prefilter=prefilter):
+                    record(pattern, match)
+
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        keyed('headers', headers)
+        if cookies is None:
+            cookies = _COOKIE_NAME.findall(headers.get('set-cookie', ''))
+        keyed('cookies', {name: '' for name in cookies})
+
+        if body:
+            body = body[:max_chars]
+            lowered = _lowered(body) if prefilter else None
+            for pattern, match in self.channels['html'].match(body, lowered, prefilter):
+                record(pattern, match)
+            meta = {}
+            for tag in _META_TAG.findall(body):
+                attributes = {m.group(1).lower(): m.group(2) or m.group(3) or m.group(4) or ''
+                              for m in _ATTRIBUTE.finditer(tag)}
+                key = attributes.get('name') or attributes.get('property') or attributes.get('http-equiv')
+                if key and 'content' in attributes:
+                    meta[key] = attributes['content']
+            keyed('meta', meta)
+            sources = '\n'.join(_SCRIPT_SRC.findall(body))
+            for pattern, match in self.channels['scriptSrc'].match(sources, prefilter=prefilter):
+                record(pattern, match)
+
+        self._resolve_implies(hits)
+        return sorted((Technology(name, entry['version'], entry['confidence'], self.categories.get(name, ()),
+                                  tuple(entry['evidence'])) for name, entry in hits.items()),
+                      key=lambda t: (t.categories[:1], t.name))
+
+    def _resolve_implies(self, hits: Dict[str, Dict[str, object]]):
+        pending = list(hits)
+        while pending:
+            name = pending.pop()
+            for target, confidence in self.implies.get(name, ()):
+                if target not in hits:
+                    hits[target] = {'confidence': 0, 'version': '', 'evidence': []}
+                    pending.append(target)
+                entry = hits[target]
+                entry['confidence'] = min(100, max(entry['confidence'],
+                                                   confidence * hits[name]['confidence'] // 100))
+                evidence = f"implicado por {name}"
+                if evidence not in entry['evidence']:
+                    entry['evidence'].append(evidence)
+
+
+def _lowered(text: str) -> bytes:
+    # bytes.lower() folds ASCII only, which is all the atoms contain, at a third of str.lower()'s cost
+    return text.encode('utf-8', 'replace').lower()
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def load_wappalyzer(paths: Iterable[str], categories_path: Optional[str] = None) -> TechDatabase:
+    """Build a database from Wappalyzer technologies/*.json files (same format as TECHNOLOGIES).
+
+    Browser-only signatures (dom, js) are ignored; regexes Python cannot compile end up in .invalid."""
+    technologies: Dict[str, dict] = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            technologies.update(json.load(f))
+    categories = None
+    if categories_path:
+        with open(categories_path, encoding='utf-8') as f:
+            categories = {key: value.get('name', key) for key, value in json.load(f).items()}
+    return TechDatabase(technologies, categories)
+
+
+_shared: Optional[TechDatabase] = None
+_shared_lock = threading.Lock()
+
+
+def get_database() -> TechDatabase:
+    """Process-wide compiled copy of the built-in signatures"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TechDatabase(TECHNOLOGIES)
+        return _shared
+
+
+def detect(headers=None, body: str = '', cookies: Optional[Iterable[str]] = None) -> List[Technology]:
+    return get_database().detect(headers, body, cookies)
+
+
+def synthetic_technologies(count: int, seed: int = 7) -> Dict[str, dict]:
+    """`count` made-up technologies shaped like real Wappalyzer entries (plugins, JS libraries, markers)"""
+    import random
+
+    rng = random.Random(seed)
+    syllables = ('ka', 'lo', 'mi', 'ra', 'ze', 'tu', 'vo', 'pi', 'ne', 'sa', 'do', 'gri', 'fla', 'bex', 'qua', 'ly')
+    technologies = {}
+    while len(technologies) < count:
+        slug = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        if slug in technologies:
+            continue
+        shape = len(technologies) % 5
+        if shape == 0:
+            spec = {'scriptSrc': [rf'/wp-content/plugins/{slug}/'], 'html': [rf'<link[^>]+/wp-content/plugins/{slug}/'],
+                    'implies': ['WordPress']}
+        elif shape == 1:
+            spec = {'scriptSrc': [rf'{slug}[.-]([\d.]*\d)[^/]*\.js\;version:\1', rf'/{slug}(?:\.min)?\.js']}
+        elif shape == 2:
+            spec = {'html': [rf'<[^>]+data-{slug}-(?:id|config)=']}
+        elif shape == 3:
+            spec = {'headers': {f'X-{slug.title()}-Version': r'(.+)\;version:\1'},
+                    'meta': {'generator': rf'^{slug} ([\d.]+)\;version:\1'}}
+        else:
+            spec = {'html': [rf'<!-- {slug} v([\d.]+) -->\;version:\1'], 'cookies': {f'{slug}_sess': ''}}
+        spec['cats'] = ['Sintética']
+        technologies[slug] = spec
+    return technologies
+
+
+def sample_page(technologies: Iterable[str], paragraphs: int = 120, seed: int = 0) -> str:
+    """Ordinary-looking HTML page (~50 KB) that references the given synthetic technologies"""
+    import random
+
+    rng = random.Random(seed)
+    words = ('segurança', 'rede', 'dados', 'senha', 'servidor', 'cliente', 'política', 'acesso', 'token', 'sessão',
+             'the', 'and', 'data', 'service', 'privacy', 'account', 'login', 'cookie', 'cache', 'content')
+    head = ['<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">',
+            '<meta name="viewport" content="width=device-width, initial-scale=1">',
+            '<link rel="stylesheet" href="/static/css/site.css?v=3">']
+    for slug in technologies:
+        head.append(f'<script src="https://cdn.example.com/libs/{slug}-2.4.1.min.js"></script>')
+        head.append(f'<div class="widget" data-{slug}-config="{{}}"></div>')
+    body = []
+    for i in range(paragraphs):
+        text = ' '.join(rng.choice(words) for _ in range(60))
+        body.append(f'<div class="card col-md-{i % 12}"><a href="/artigo/{i}">Artigo {i}</a><p>{text}</p></div>')
+    return ''.join(head) + '</head><body>' + '\n'.join(body) + '</body></html>'
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Benchmark: python -m core.tech_fingerprint [assinaturas] [respostas]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    responses = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    started = time.perf_counter()
+    synthetic = synthetic_technologies(count)
+    database = TechDatabase({**TECHNOLOGIES, **synthetic})
+    compiled = time.perf_counter() - started
+    unanchored = sum(len(c.unanchored) for c in database.channels.values())
+    print(f"{len(database)} tecnologias, {database.pattern_count} padrões compilados em {compiled * 1000:.0f} ms "
+          f"({unanchored} padrões de corpo sem literal)")
+
+    names = list(synthetic)
+    pages = []
+    for i in range(responses):
+        page = sample_page(names[i * 3:i * 3 + 3], seed=i)
+        page = page.replace('</head>', '<script src="/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script></head>')
+        pages.append(({'Server': 'nginx/1.24.0', 'X-Powered-By': 'PHP/8.2.1'}, page))
+    size = sum(len(page) for _, page in pages) / len(pages)
+    print(f"{responses} respostas de {size / 1024:.0f} KB em média")
+
+    results = {}
+    for label, prefilter in (('varredura combinada', True), ('regex a regex', False)):
+        started = time.perf_counter()
+        results[label] = [database.detect(headers, page, prefilter=prefilter) for headers, page in pages]
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<20} {elapsed / responses * 1e6:>10,.0f} µs por resposta")
+    same = results['varredura combinada'] == results['regex a regex']
+    found = sum(len(r) for r in results['varredura combinada']) / responses
+    print(f"  resultados idênticos: {'sim' if same else 'NÃO'}  ({found:.1f} tecnologias por resposta)")
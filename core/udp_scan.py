@@ -0,0 +1,429 @@
+"""
+UDP Scan
+Async UDP port scanner with protocol payloads, ICMP-based closed detection and rate limiting
+"""
+
+import re
+import time
+import struct
+import asyncio
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from core.scan_timing import DEFAULT_TEMPLATE, TEMPLATES, RttEstimator, TimingTemplate
+from core.service_detection import service_name
+
+DEFAULT_RATE = 1000           # datagrams per second
+DEFAULT_CONCURRENCY = 256     # sockets open at once (one connected socket per port)
+DEFAULT_RETRIES = 2
+MAX_RESPONSE = 2048
+# nmap's default UDP ping port: almost never open, so a live host answers with ICMP port unreachable
+UDP_PING_PORT = 40125
+
+# Every ICMP error on a connected UDP socket surfaces through error_received:
+# port unreachable is ECONNREFUSED (closed), the rest mean something filtered the datagram
+CLOSED_ERRORS = (ConnectionRefusedError,)
+
+
+def _tlv(tag: int, content: bytes) -> bytes:
+    """BER type-length-value"""
+    if len(content) < 0x80:
+        return bytes((tag, len(content))) + content
+    size = len(content).to_bytes((len(content).bit_length() + 7) // 8, 'big')
+    return bytes((tag, 0x80 | len(size))) + size + content
+
+
+def _ber(data: bytes, offset: int = 0) -> Tuple[int, bytes, int]:
+    """(tag, value, next offset) of the BER element at offset"""
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    if offset + length > len(data):
+        raise ValueError("Elemento BER truncado")
+    return tag, data[offset:offset + length], offset + length
+
+
+def _ber_children(value: bytes) -> List[Tuple[int, bytes]]:
+    children, offset = [], 0
+    while offset < len(value):
+        tag, child, offset = _ber(value, offset)
+        children.append((tag, child))
+    return children
+
+
+DNS_QUERY_ID = 0x1337
+SNMP_REQUEST_ID = 0x4E4D
+# 1.3.6.1.2.1.1.1.0 (sysDescr.0)
+SYSDESCR_OID = bytes((0x2B, 6, 1, 2, 1, 1, 1, 0))
+
+# version.bind CH TXT: any answer (even REFUSED) proves a DNS server is listening
+DNS_PAYLOAD = (struct.pack('!HHHHHH', DNS_QUERY_ID, 0x0100, 1, 0, 0, 0)
+               + b'\x07version\x04bind\x00' + struct.pack('!HH', 16, 3))
+# LI=3 (unsynchronised), version 4, mode 3 (client)
+NTP_PAYLOAD = b'\xe3' + bytes(47)
+SNMP_PAYLOAD = _tlv(0x30, _tlv(0x02, b'\x00') + _tlv(0x04, b'public') + _tlv(0xA0, (
+    _tlv(0x02, SNMP_REQUEST_ID.to_bytes(2, 'big')) + _tlv(0x02, b'\x00') + _tlv(0x02, b'\x00')
+    + _tlv(0x30, _tlv(0x30, _tlv(0x06, SYSDESCR_OID) + _tlv(0x05, b''))))))
+SSDP_PAYLOAD = (b'M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\nMAN: "ssdp:discover"\r\n'
+                b'MX: 1\r\nST: ssdp:all\r\n\r\n')
+
+DNS_RCODES = {0: 'NOERROR', 1: 'FORMERR', 2: 'SERVFAIL', 3: 'NXDOMAIN', 4: 'NOTIMP', 5: 'REFUSED'}
+_SSDP_SERVER = re.compile(rb'^server:[ \t]*([^\r\n]+)', re.IGNORECASE | re.MULTILINE)
+
+
+def _skip_name(data: bytes, offset: int) -> int:
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += 1 + length
+        if not length:
+            return offset
+
+
+def parse_dns(data: bytes) -> str:
+    txid, flags, questions, answers = struct.unpack_from('!HHHH', data)
+    if txid != DNS_QUERY_ID or not flags & 0x8000:
+        raise ValueError("Resposta DNS de outra consulta")
+    rcode = DNS_RCODES.get(flags & 0x0F, str(flags & 0x0F))
+    offset = 12
+    for _ in range(questions):
+        offset = _skip_name(data, offset) + 4
+    if answers:
+        offset = _skip_name(data, offset)
+        rtype, _, _, rdlength = struct.unpack_from('!HHIH', data, offset)
+        rdata = data[offset + 10:offset + 10 + rdlength]
+        if rtype == 16 and rdata:
+            return f"version.bind: {rdata[1:1 + rdata[0]].decode('latin-1')}"
+    return f"DNS {rcode}"
+
+
+def parse_ntp(data: bytes) -> str:
+    if len(data) < 48:
+        raise ValueError("Resposta NTP curta")
+    mode, version, stratum = data[0] & 7, (data[0] >> 3) & 7, data[1]
+    if mode not in (4, 5):
+        raise ValueError("Modo NTP inesperado")
+    if stratum == 1:
+        reference = data[12:16].rstrip(b'\x00').decode('latin-1')
+    else:
+        reference = '.'.join(str(b) for b in data[12:16])
+    return f"NTPv{version}, stratum {stratum}, referência {reference}"
+
+
+def parse_snmp(data: bytes) -> str:
+    tag, message, _ = _ber(data)
+    version, community, pdu = _ber_children(message)[:3]
+    if tag != 0x30 or pdu[0] != 0xA2:
+        raise ValueError("Não é uma resposta SNMP")
+    varbinds = _ber_children(pdu[1])[3][1]
+    _, value = _ber_children(_ber_children(varbinds)[0][1])[1]
+    versions = {0: 'v1', 1: 'v2c', 3: 'v3'}
+    label = f"SNMP{versions.get(int.from_bytes(version[1], 'big'), '?')} community '{community[1].decode('latin-1')}'"
+    return f"{label}: {value.decode('latin-1')}" if value else label
+
+
+def parse_ssdp(data: bytes) -> str:
+    match = _SSDP_SERVER.search(data)
+    return f"UPnP: {match.group(1).decode('latin-1')}" if match else data.split(b'\r\n', 1)[0].decode('latin-1')
+
+
+class UdpPayload(NamedTuple):
+    service: str
+    payload: bytes
+    parse: object
+
+
+PAYLOADS = {
+    'domain': UdpPayload('domain', DNS_PAYLOAD, parse_dns),
+    'ntp': UdpPayload('ntp', NTP_PAYLOAD, parse_ntp),
+    'snmp': UdpPayload('snmp', SNMP_PAYLOAD, parse_snmp),
+    'ssdp': UdpPayload('ssdp', SSDP_PAYLOAD, parse_ssdp),
+}
+# Ports whose service gets a real payload; anything else receives a single NUL byte
+# (asyncio's datagram transport silently skips empty sends)
+PORT_PAYLOADS = {53: 'domain', 123: 'ntp', 161: 'snmp', 1900: 'ssdp', 5353: 'domain'}
+GENERIC_PAYLOAD = UdpPayload('', b'\x00', None)
+
+
+def payload_for(port: int, hint: Optional[str] = None) -> UdpPayload:
+    name = hint or PORT_PAYLOADS.get(port)
+    return PAYLOADS.get(name, GENERIC_PAYLOAD)
+
+
+class UdpResult(NamedTuple):
+    host: str
+    port: int
+    state: str
+    service: str
+    info: str
+    response: bytes
+    rtt: Optional[float]
+    attempts: int
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Porta': f"{self.port}/udp",
+            'Estado': self.state,
+            'Serviço': self.service,
+            'Resposta': self.info or (f"{len(self.response)} bytes" if self.response else '-'),
+            'RTT (ms)': f"{self.rtt * 1000:.1f}" if self.rtt is not None else '-',
+            'Tentativas': str(self.attempts),
+        }
+
+
+class UdpReport(NamedTuple):
+    host: str
+    results: List[UdpResult]
+    elapsed: float
+    probes: int
+    retries: int
+    srtt: Optional[float]
+    timeout: float
+
+    def ports(self, state: str) -> List[int]:
+        return [r.port for r in self.results if r.state == state]
+
+
+class RateLimiter:
+    """Spaces sends evenly; each caller reserves its slot before sleeping"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _ProbeProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.answer = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        if not self.answer.done():
+            self.answer.set_result(('open', data[:MAX_RESPONSE]))
+
+    def error_received(self, exc):
+        if not self.answer.done():
+            self.answer.set_result(('closed' if isinstance(exc, CLOSED_ERRORS) else 'filtered', b''))
+
+
+async def probe_port(host: str, port: int, estimator: RttEstimator, limiter: RateLimiter,
+                     retries: int = DEFAULT_RETRIES, hint: Optional[str] = None) -> UdpResult:
+    """Send the port's payload up to retries+1 times on one connected socket.
+
+    Silence after the last try is open|filtered: the datagram may have been
+    dropped by a firewall, or the service simply ignored it."""
+    payload = payload_for(port, hint)
+    service = payload.service or service_name(port)
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(_ProbeProtocol, remote_addr=(host, port))
+    except OSError as e:
+        return UdpResult(host, port, 'error', service, str(e), b'', None, 0)
+
+    try:
+        for attempt in range(retries + 1):
+            await limiter.wait()
+            # The timeout this probe was sent with: backing off from the current value would
+            # double it once per probe in flight instead of once per burst
+            timeout = estimator.timeout
+            sent = time.perf_counter()
+            try:
+                transport.sendto(payload.payload)
+                state, data = await asyncio.wait_for(asyncio.shield(protocol.answer), timeout)
+            except asyncio.TimeoutError:
+                estimator.backoff(timeout)
+                continue
+            rtt = time.perf_counter() - sent
+            # Karn: a reply after a retransmission can't be matched to one send
+            if not attempt:
+                estimator.update(rtt)
+            info = ''
+            if data and payload.parse:
+                try:
+                    info = payload.parse(data)
+                except (ValueError, IndexError, struct.error):
+                    info = 'resposta não reconhecida'
+            return UdpResult(host, port, state, service, info, data, rtt, attempt + 1)
+        return UdpResult(host, port, 'open|filtered', service, '', b'', None, retries + 1)
+    finally:
+        transport.close()
+
+
+async def udp_scan(host: str, ports: Iterable[int], hints: Optional[Dict[int, str]] = None,
+                   template: TimingTemplate = TEMPLATES[DEFAULT_TEMPLATE], rate: float = DEFAULT_RATE,
+                   retries: int = DEFAULT_RETRIES, concurrency: int = DEFAULT_CONCURRENCY,
+                   on_result=None) -> UdpReport:
+    """Sweep UDP ports; results come back in port order.
+
+    The rate limit protects both our socket buffers and the target's ICMP
+    budget: Linux answers only about 1 port-unreachable per second per peer
+    by default, so remote closed ports beyond that look open|filtered."""
+    if template.scan_delay:
+        rate = min(rate, 1.0 / template.scan_delay)
+    estimator = RttEstimator(template)
+    limiter = RateLimiter(rate)
+    limit = asyncio.Semaphore(concurrency)
+    hints = hints or {}
+    started = time.perf_counter()
+
+    async def bounded(port):
+        async with limit:
+            result = await probe_port(host, port, estimator, limiter, retries, hints.get(port))
+        if on_result:
+            on_result(result)
+        return result
+
+    results = sorted(await asyncio.gather(*(bounded(p) for p in dict.fromkeys(ports))), key=lambda r: r.port)
+    probes = sum(r.attempts for r in results)
+    return UdpReport(host, results, time.perf_counter() - started, probes, probes - len(results),
+                     estimator.srtt, estimator.timeout)
+
+
+def scan(host: str, ports: Iterable[int], hints: Optional[Dict[int, str]] = None,
+         template: TimingTemplate = TEMPLATES[DEFAULT_TEMPLATE], rate: float = DEFAULT_RATE,
+         retries: int = DEFAULT_RETRIES, on_result=None) -> UdpReport:
+    """Synchronous entry point for scripts and Streamlit"""
+    return asyncio.run(udp_scan(host, ports, hints, template, rate, retries, on_result=on_result))
+
+
+async def udp_ping(hosts: Iterable[str], port: int = UDP_PING_PORT, rate: float = DEFAULT_RATE,
+                   retries: int = 1) -> Dict[str, UdpResult]:
+    """Host discovery: an ICMP port unreachable (or any reply) proves the host is up"""
+    template = TEMPLATES[DEFAULT_TEMPLATE]
+    limiter = RateLimiter(rate)
+    limit = asyncio.Semaphore(DEFAULT_CONCURRENCY)
+
+    async def bounded(host):
+        async with limit:
+            return await probe_port(host, port, RttEstimator(template), limiter, retries)
+
+    results = await asyncio.gather(*(bounded(h) for h in hosts))
+    return {r.host: r for r in results if r.state in ('open', 'closed')}
+
+
+def discover(hosts: Iterable[str], port: int = UDP_PING_PORT) -> Dict[str, UdpResult]:
+    """Synchronous entry point for udp_ping"""
+    return asyncio.run(udp_ping(hosts, port))
+
+
+def _dns_reply(query: bytes) -> bytes:
+    version = b'9.18.18-0ubuntu0.22.04.2-Ubuntu'
+    question_end = _skip_name(query, 12) + 4
+    answer = b'\xc0\x0c' + struct.pack('!HHIH', 16, 3, 0, len(version) + 1) + bytes((len(version),)) + version
+    return query[:2] + struct.pack('!HHHHH', 0x8580, 1, 1, 0, 0) + query[12:question_end] + answer
+
+
+def _ntp_reply(query: bytes) -> bytes:
+    now = int(time.time()) + 2208988800
+    return (bytes((0x24, 2, 6, 0xE9)) + bytes(8) + bytes((192, 168, 1, 1)) + struct.pack('!II', now, 0)
+            + query[40:48] + struct.pack('!IIII', now, 0, now, 0))
+
+
+def _snmp_reply(query: bytes) -> bytes:
+    descr = b'Linux lab-router 5.15.0-91-generic #101-Ubuntu SMP x86_64'
+    _, message, _ = _ber(query)
+    version, community, pdu = _ber_children(message)[:3]
+    request_id = _ber_children(pdu[1])[0][1]
+    return _tlv(0x30, _tlv(0x02, version[1]) + _tlv(0x04, community[1]) + _tlv(0xA2, (
+        _tlv(0x02, request_id) + _tlv(0x02, b'\x00') + _tlv(0x02, b'\x00')
+        + _tlv(0x30, _tlv(0x30, _tlv(0x06, SYSDESCR_OID) + _tlv(0x04, descr))))))
+
+
+def _ssdp_reply(query: bytes) -> bytes:
+    return (b'HTTP/1.1 200 OK\r\nCACHE-CONTROL: max-age=120\r\nST: upnp:rootdevice\r\n'
+            b'SERVER: Linux/5.15 UPnP/1.1 MiniUPnPd/2.2.1\r\nLOCATION: http://192.168.1.1:5000/rootDesc.xml\r\n\r\n')
+
+
+# name -> (payload hint, reply builder or None for a listener that never answers)
+UDP_STAND_INS = {
+    'dns': ('domain', _dns_reply),
+    'ntp': ('ntp', _ntp_reply),
+    'snmp': ('snmp', _snmp_reply),
+    'ssdp': ('ssdp', _ssdp_reply),
+    'silencioso': (None, None),
+}
+
+
+class _StandInProtocol(asyncio.DatagramProtocol):
+    def __init__(self, reply):
+        self.reply = reply
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.reply:
+            try:
+                self.transport.sendto(self.reply(data), addr)
+            except (ValueError, IndexError, struct.error):
+                pass
+
+
+class UdpStandIns:
+    """Loopback UDP responders on ephemeral ports; `hints` maps them to payload names"""
+
+    def __init__(self, host: str = '127.0.0.1', services: Optional[Iterable[str]] = None):
+        self.host = host
+        self.services = list(services or UDP_STAND_INS)
+        self.hints: Dict[int, Optional[str]] = {}
+        self.names: Dict[int, str] = {}
+        self._transports = []
+
+    async def __aenter__(self) -> 'UdpStandIns':
+        loop = asyncio.get_running_loop()
+        for name in self.services:
+            hint, reply = UDP_STAND_INS[name]
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda reply=reply: _StandInProtocol(reply), local_addr=(self.host, 0))
+            self._transports.append(transport)
+            port = transport.get_extra_info('sockname')[1]
+            self.hints[port] = hint
+            self.names[port] = name
+        return self
+
+    async def __aexit__(self, *exc):
+        for transport in self._transports:
+            transport.close()
+
+    @property
+    def ports(self) -> List[int]:
+        return list(self.hints)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.udp_scan [host portas]
+    if len(sys.argv) > 2:
+        from core.scan_timing import parse_ports
+        report = scan(sys.argv[1], parse_ports(sys.argv[2]))
+        for item in report.results:
+            if item.state != 'closed':
+                print(f"{item.port:>5}/udp {item.state:<14} {item.service:<12} {item.info}")
+        print(f"{len(report.results)} portas em {report.elapsed:.2f}s")
+        sys.exit()
+
+    async def benchmark(count: int):
+        async with UdpStandIns() as lab:
+            ports = [p for p in range(20000, 20000 + count) if p not in lab.hints] + lab.ports
+            report = await udp_scan(lab.host, ports, lab.hints, rate=5000, retries=1)
+            for item in report.results:
+                if item.port in lab.hints:
+                    print(f"  {item.port:>5}/udp {lab.names[item.port]:<10} {item.state:<14} {item.info}")
+            states = {}
+            for item in report.results:
+                states[item.state] = states.get(item.state, 0) + 1
+            print(f"{len(report.results)} portas em {report.elapsed:.2f}s "
+                  f"({report.probes / report.elapsed:,.0f} datagramas/s, {report.retries} reenvios): {states}")
+
+    asyncio.run(benchmark(5000))
@@ -0,0 +1,540 @@
+"""
+Vuln Lab
+Local web application (SQLite login, search, comments, bank) in a vulnerable and a fixed variant
+"""
+
+import json
+import html
+import time
+import base64
+import hashlib
+import hmac
+import math
+import secrets
+import sqlite3
+import asyncio
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+VARIANTS = ('vuln', 'safe')
+PBKDF2_ITERATIONS = 100_000
+SESSION_COOKIE = 'session'
+MAX_COMMENT = 2000
+DEFAULT_LOAD_REQUESTS = 2000
+DEFAULT_LOAD_CONCURRENCY = 50
+
+# Seed data: (username, password, role); admin is id 1, so "' OR '1'='1" logs in as admin
+USERS = (
+    ('admin', 'S3nh@Forte!2024', 'admin'),
+    ('joao', 'password123', 'user'),
+    ('maria', 'qwerty456', 'user'),
+    ('pedro', 'letmein789', 'user'),
+    ('milionario', 'Milh0es$eguros', 'user'),
+    ('aluno', 'aluno123', 'user'),
+)
+PRODUCTS = (
+    ('Notebook Gamer', 7499.90), ('Mouse sem fio', 129.90), ('Teclado mecânico', 459.00),
+    ('Monitor 27 polegadas', 1899.00), ('Headset', 349.90), ('Webcam HD', 279.00),
+    ('Cadeira ergonômica', 1299.00), ('Pendrive 64GB', 59.90),
+)
+# (number, owner username, holder, balance)
+ACCOUNTS = (
+    ('123456789', 'milionario', 'John Millionaire', 5247389.12),
+    ('555444333', 'joao', 'João Silva', 3200.50),
+    ('777666555', 'maria', 'Maria Souza', 15890.00),
+    ('999888777', 'aluno', 'Conta do aluno', 50.00),
+)
+COMMENTS = (
+    ('maria', 'Ótima loja, entrega rápida!'),
+    ('joao', 'Alguém sabe se o teclado é ABNT2?'),
+)
+
+SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, password TEXT NOT NULL,
+                    password_hash TEXT NOT NULL, role TEXT NOT NULL);
+CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT NOT NULL, price REAL NOT NULL);
+CREATE TABLE comments (id INTEGER PRIMARY KEY, author TEXT NOT NULL, body TEXT NOT NULL, created REAL NOT NULL);
+CREATE TABLE accounts (number TEXT PRIMARY KEY, owner_id INTEGER NOT NULL REFERENCES users(id),
+                       holder TEXT NOT NULL, balance REAL NOT NULL);
+CREATE TABLE sessions (token TEXT PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users(id),
+                       csrf TEXT NOT NULL, created REAL NOT NULL);
+CREATE TABLE transfers (id INTEGER PRIMARY KEY, variant TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL,
+                        amount REAL NOT NULL, created REAL NOT NULL);
+"""
+
+VULN_HEADERS = {'Server': 'Apache/2.2.22 (Ubuntu)', 'X-Powered-By': 'PHP/5.3.10'}
+SAFE_HEADERS = {
+    'Server': 'VulnLab',
+    'Content-Security-Policy': "default-src 'self'; frame-ancestors 'none'",
+    'X-Frame-Options': 'DENY',
+    'X-Content-Type-Options': 'nosniff',
+    'Referrer-Policy': 'no-referrer',
+}
+
+
+def hash_password(password: str, salt: Optional[bytes] = None) -> str:
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password: str, stored: str) -> bool:
+    _, iterations, salt, digest = stored.split('$')
+    candidate = hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(salt), int(iterations))
+    return hmac.compare_digest(candidate.hex(), digest)
+
+
+def encode_session(data: Dict[str, str]) -> str:
+    """The vulnerable variant's session: unsigned base64 JSON the server believes blindly"""
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_session(value: str) -> Optional[Dict[str, str]]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(value.encode()))
+    except (ValueError, TypeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+# Hashing is deliberately slow, so reset() reuses the seed hashes of the first build
+_seed_hashes: Dict[str, str] = {}
+
+
+class LabDatabase:
+    """SQLite in memory. The vulnerable handlers build SQL with f-strings; the fixed ones bind parameters."""
+
+    def __init__(self):
+        self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self.reset()
+
+    def reset(self):
+        with self.conn:
+            for table in ('transfers', 'sessions', 'accounts', 'comments', 'products', 'users'):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.executescript(SCHEMA)
+            for username, password, role in USERS:
+                if username not in _seed_hashes:
+                    _seed_hashes[username] = hash_password(password)
+                self.conn.execute("INSERT INTO users (username, password, password_hash, role) VALUES (?, ?, ?, ?)",
+                                  (username, password, _seed_hashes[username], role))
+            self.conn.executemany("INSERT INTO products (name, price) VALUES (?, ?)", PRODUCTS)
+            self.conn.executemany("INSERT INTO comments (author, body, created) VALUES (?, ?, ?)",
+                                  [(author, body, time.time()) for author, body in COMMENTS])
+            for number, owner, holder, balance in ACCOUNTS:
+                self.conn.execute("INSERT INTO accounts SELECT ?, id, ?, ? FROM users WHERE username = ?",
+                                  (number, holder, balance, owner))
+
+    def execute(self, query: str, parameters: Tuple = ()) -> List[tuple]:
+        return self.conn.execute(query, parameters).fetchall()
+
+    def session(self, token: str) -> Optional[Tuple[int, str, str, str]]:
+        """(user id, username, role, csrf token) of a fixed-variant session"""
+        rows = self.execute("SELECT users.id, username, role, csrf FROM sessions JOIN users ON users.id = user_id "
+                            "WHERE token = ?", (token,))
+        return rows[0] if rows else None
+
+
+def _page(title: str, body: str) -> str:
+    return (f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>{title} - VulnLab</title>'
+            f'</head><body><h1>{title}</h1>{body}<p><a href="/">Início</a></p></body></html>')
+
+
+def _index() -> str:
+    sections = []
+    for variant, label in (('vuln', 'Vulnerável'), ('safe', 'Corrigida')):
+        sections.append(
+            f'<h2>Versão {label} (/{variant})</h2>'
+            f'<form method="post" action="/{variant}/login"><input name="username" placeholder="usuário">'
+            f'<input name="password" type="password" placeholder="senha"><button>Entrar</button></form>'
+            f'<form action="/{variant}/search"><input name="q" placeholder="buscar produto"><button>Buscar</button></form>'
+            f'<p><a href="/{variant}/comments">Comentários</a> · <a href="/{variant}/bank/accounts">Minhas contas</a>'
+            f' · <a href="/{variant}/me">Sessão</a></p>')
+    return _page('VulnLab', '<p>Aplicação de treino: só existe neste computador.</p>' + ''.join(sections))
+
+
+class VulnLab:
+    """The lab on a loopback port: `async with VulnLab() as lab:` then use lab.url.
+
+    Every route exists as /vuln/... and /safe/...; both share one database, so a
+    comment stored through either is rendered raw by one and escaped by the other."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.hits = 0
+        self.db: Optional[LabDatabase] = None
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def endpoint(self, variant: str, path: str) -> str:
+        if variant not in VARIANTS:
+            raise ValueError(f"Variante desconhecida: {variant} (use {' ou '.join(VARIANTS)})")
+        return f"{self.url}/{variant}/{path.lstrip('/')}"
+
+    def _app(self) -> web.Application:
+        db = self.db
+
+        @web.middleware
+        async def headers(request, handler):
+            self.hits += 1
+            extra = dict(SAFE_HEADERS if request.path.startswith('/safe/') else VULN_HEADERS)
+            extra['Cache-Control'] = 'no-store'  # keeps the shared HTTP client from caching lab state
+            try:
+                response = await handler(request)
+            except web.HTTPException as e:
+                e.headers.update(extra)
+                raise
+            response.headers.update(extra)
+            return response
+
+        def reply(data: dict, status: int = 200) -> web.Response:
+            return web.json_response(data, status=status)
+
+        def vuln_user(request) -> Optional[Dict[str, str]]:
+            return decode_session(request.cookies.get(SESSION_COOKIE, ''))
+
+        def safe_user(request) -> Optional[Tuple[int, str, str, str]]:
+            token = request.cookies.get(SESSION_COOKIE, '')
+            return db.session(token) if token else None
+
+        async def index(request):
+            return web.Response(text=_index(), content_type='text/html')
+
+        async def reset(request):
+            db.reset()
+            return reply({'ok': True})
+
+        async def login(request):
+            variant = request.match_info['variant']
+            form = await request.post()
+            username, password = form.get('username', ''), form.get('password', '')
+            if variant == 'vuln':
+                query = f"SELECT id, username, role FROM users WHERE username='{username}' AND password='{password}'"
+                try:
+                    rows = db.execute(query)
+                except sqlite3.Error as e:
+                    return reply({'ok': False, 'query': query, 'error': str(e)}, 500)
+                if not rows:
+                    return reply({'ok': False, 'query': query, 'error': 'Usuário ou senha inválidos'}, 401)
+                _, name, role = rows[0]
+                response = reply({'ok': True, 'user': name, 'role': role, 'query': query, 'rows': len(rows)})
+                response.set_cookie(SESSION_COOKIE, encode_session({'user': name, 'role': role}), path='/vuln')
+                return response
+
+            rows = db.execute("SELECT id, username, role, password_hash FROM users WHERE username = ?", (username,))
+            # Unknown users still pay for one hash, so response time doesn't reveal which usernames exist
+            stored = rows[0][3] if rows else _seed_hashes['admin']
+            valid = await asyncio.get_running_loop().run_in_executor(None, verify_password, password, stored)
+            if not rows or not valid:
+                return reply({'ok': False, 'error': 'Usuário ou senha inválidos'}, 401)
+            user_id, name, role, _ = rows[0]
+            token, csrf = secrets.token_urlsafe(32), secrets.token_urlsafe(16)
+            with db.conn:
+                db.conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?)", (token, user_id, csrf, time.time()))
+            response = reply({'ok': True, 'user': name, 'role': role, 'csrf': csrf})
+            response.set_cookie(SESSION_COOKIE, token, path='/safe', httponly=True, samesite='Strict')
+            return response
+
+        async def me(request):
+            if request.match_info['variant'] == 'vuln':
+                session = vuln_user(request)
+                if not session:
+                    return reply({'ok': False, 'error': 'Sem sessão'}, 401)
+                return reply({'ok': True, 'user': session.get('user'), 'role': session.get('role')})
+            session = safe_user(request)
+            if not session:
+                return reply({'ok': False, 'error': 'Sem sessão'}, 401)
+            return reply({'ok': True, 'user': session[1], 'role': session[2]})
+
+        async def search(request):
+            variant = request.match_info['variant']
+            q = request.query.get('q', '')
+            if variant == 'vuln':
+                query = f"SELECT name, price FROM products WHERE name LIKE '%{q}%'"
+                try:
+                    rows, error = db.execute(query), ''
+                except sqlite3.Error as e:
+                    rows, error = [], str(e)
+                shown = q
+            else:
+                query = "SELECT name, price FROM products WHERE name LIKE ?"
+                rows, error = db.execute(query, (f"%{q}%",)), ''
+                shown = html.escape(q)
+            if request.query.get('format') == 'json':
+                return reply({'query': query, 'rows': rows, 'error': error}, 500 if error else 200)
+            cell = (lambda value: str(value)) if variant == 'vuln' else (lambda value: html.escape(str(value)))
+            table = ''.join(f'<tr><td>{cell(name)}</td><td>{cell(price)}</td></tr>' for name, price in rows)
+            body = (f'<p>Resultados para: {shown}</p><table>{table}</table>'
+                    + (f'<pre>{error}</pre>' if error else ''))
+            return web.Response(text=_page('Busca', body), content_type='text/html', status=500 if error else 200)
+
+        async def comments(request):
+            variant = request.match_info['variant']
+            if request.method == 'POST':
+                form = await request.post()
+                author, body = form.get('author', '') or 'Anônimo', form.get('body', '')
+                if variant == 'safe' and (len(body) > MAX_COMMENT or len(author) > 100):
+                    return reply({'ok': False, 'error': 'Comentário longo demais'}, 400)
+                # Stored as typed in both variants: the flaw is in how it's rendered
+                with db.conn:
+                    db.conn.execute("INSERT INTO comments (author, body, created) VALUES (?, ?, ?)",
+                                    (author, body, time.time()))
+                raise web.HTTPSeeOther(f"/{variant}/comments")
+            rows = db.execute("SELECT author, body FROM comments ORDER BY id")
+            if request.query.get('format') == 'json':
+                return reply({'comments': rows})
+            render = (lambda text: text) if variant == 'vuln' else html.escape
+            items = ''.join(f'<li><b>{render(author)}</b>: {render(body)}</li>' for author, body in rows)
+            form = (f'<form method="post" action="/{variant}/comments"><input name="author" placeholder="nome">'
+                    f'<textarea name="body"></textarea><button>Comentar</button></form>')
+            return web.Response(text=_page('Comentários', f'<ul>{items}</ul>{form}'), content_type='text/html')
+
+        async def accounts(request):
+            variant = request.match_info['variant']
+            if variant == 'vuln':
+                session = vuln_user(request)
+                if not session:
+                    return reply({'ok': False, 'error': 'Faça login'}, 401)
+                # Trusts the role in the cookie and an owner chosen by the client
+                if session.get('role') == 'admin':
+                    query = "SELECT number, holder, balance FROM accounts"
+                else:
+                    owner = request.query.get('owner', session.get('user', ''))
+                    query = ("SELECT number, holder, balance FROM accounts WHERE owner_id = "
+                             f"(SELECT id FROM users WHERE username = '{owner}')")
+                try:
+                    return reply({'ok': True, 'query': query, 'accounts': db.execute(query)})
+                except sqlite3.Error as e:
+                    return reply({'ok': False, 'query': query, 'error': str(e)}, 500)
+            session = safe_user(request)
+            if not session:
+                return reply({'ok': False, 'error': 'Faça login'}, 401)
+            rows = db.execute("SELECT number, holder, balance FROM accounts WHERE owner_id = ?", (session[0],))
+            return reply({'ok': True, 'accounts': rows})
+
+        async def transfer(request):
+            variant = request.match_info['variant']
+            form = await request.post()
+            source, target, amount = form.get('source', ''), form.get('target', ''), form.get('amount', '')
+            if variant == 'vuln':
+                if not vuln_user(request):
+                    return reply({'ok': False, 'error': 'Faça login'}, 401)
+                # No ownership check, no CSRF token, no amount validation, SQL by concatenation
+                queries = [f"UPDATE accounts SET balance = balance - {amount} WHERE number = '{source}'",
+                           f"UPDATE accounts SET balance = balance + {amount} WHERE number = '{target}'"]
+                try:
+                    with db.conn:
+                        for query in queries:
+                            db.conn.execute(query)
+                        db.conn.execute(f"INSERT INTO transfers (variant, source, target, amount, created) "
+                                        f"VALUES ('vuln', '{source}', '{target}', {amount}, {time.time()})")
+                except sqlite3.Error as e:
+                    return reply({'ok': False, 'queries': queries, 'error': str(e)}, 500)
+                balances = db.execute("SELECT number, balance FROM accounts WHERE number IN (?, ?)", (source, target))
+                return reply({'ok': True, 'queries': queries, 'balances': balances})
+
+            session = safe_user(request)
+            if not session:
+                return reply({'ok': False, 'error': 'Faça login'}, 401)
+            user_id, _, _, csrf = session
+            sent = form.get('csrf', '') or request.headers.get('X-CSRF-Token', '')
+            if not hmac.compare_digest(sent, csrf):
+                return reply({'ok': False, 'error': 'Token CSRF inválido'}, 403)
+            try:
+                value = float(amount)
+            except ValueError:
+                return reply({'ok': False, 'error': 'Valor inválido'}, 400)
+            if not math.isfinite(value) or value <= 0:
+                return reply({'ok': False, 'error': 'O valor deve ser positivo'}, 400)
+            with db.conn:
+                owned = db.execute("SELECT balance FROM accounts WHERE number = ? AND owner_id = ?", (source, user_id))
+                if not owned:
+                    return reply({'ok': False, 'error': 'A conta de origem não é sua'}, 403)
+                if owned[0][0] < value:
+                    return reply({'ok': False, 'error': 'Saldo insuficiente'}, 400)
+                if not db.execute("SELECT 1 FROM accounts WHERE number = ?", (target,)):
+                    return reply({'ok': False, 'error': 'Conta de destino inexistente'}, 400)
+                db.conn.execute("UPDATE accounts SET balance = balance - ? WHERE number = ?", (value, source))
+                db.conn.execute("UPDATE accounts SET balance = balance + ? WHERE number = ?", (value, target))
+                db.conn.execute("INSERT INTO transfers (variant, source, target, amount, created) "
+                                "VALUES ('safe', ?, ?, ?, ?)", (source, target, value, time.time()))
+            balances = db.execute("SELECT number, balance FROM accounts WHERE number IN (?, ?)", (source, target))
+            return reply({'ok': True, 'balances': balances})
+
+        app = web.Application(middlewares=[headers])
+        variant = '{variant:vuln|safe}'
+        app.router.add_get('/', index)
+        app.router.add_post('/reset', reset)
+        app.router.add_post(f'/{variant}/login', login)
+        app.router.add_get(f'/{variant}/me', me)
+        app.router.add_get(f'/{variant}/search', search)
+        app.router.add_route('*', f'/{variant}/comments', comments)
+        app.router.add_get(f'/{variant}/bank/accounts', accounts)
+        app.router.add_post(f'/{variant}/bank/transfer', transfer)
+        return app
+
+    async def __aenter__(self) -> 'VulnLab':
+        self.db = LabDatabase()
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+_shared: Optional[VulnLab] = None
+_shared_lock = threading.Lock()
+
+
+def get_lab() -> VulnLab:
+    """Process-wide lab serving from a daemon thread, for synchronous callers (Streamlit, the CLI demos)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            lab = VulnLab()
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='vuln-lab', daemon=True).start()
+            asyncio.run_coroutine_threadsafe(lab.__aenter__(), loop).result(timeout=30)
+            _shared = lab
+        return _shared
+
+
+class LoadResult(NamedTuple):
+    name: str
+    requests: int
+    errors: int
+    elapsed: float
+    latencies: List[float]  # seconds, sorted
+
+    @property
+    def per_second(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of the latencies, in seconds"""
+        if not self.latencies:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * len(self.latencies)))
+        return self.latencies[rank - 1]
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Endpoint': self.name,
+            'Requisições': str(self.requests),
+            'Erros': str(self.errors),
+            'Req/s': f"{self.per_second:,.0f}",
+            'p50 (ms)': f"{self.percentile(50) * 1000:.1f}",
+            'p95 (ms)': f"{self.percentile(95) * 1000:.1f}",
+            'p99 (ms)': f"{self.percentile(99) * 1000:.1f}",
+        }
+
+
+async def load_test(name: str, url: str, method: str = 'GET', data: Optional[dict] = None,
+                    requests: int = DEFAULT_LOAD_REQUESTS, concurrency: int = DEFAULT_LOAD_CONCURRENCY,
+                    cookies: Optional[dict] = None, expect: int = 200) -> LoadResult:
+    """Closed-loop load: `concurrency` workers send `requests` requests back to back over kept-alive connections.
+
+    A request counts as an error when it fails or its status isn't `expect`."""
+    if requests < 1 or concurrency < 1:
+        raise ValueError("Requisições e concorrência devem ser pelo menos 1")
+    remaining = requests
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker(session: aiohttp.ClientSession):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                async with session.request(method, url, data=data, allow_redirects=False) as response:
+                    await response.read()
+                    if response.status != expect:
+                        errors += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, cookies=cookies,
+                                     timeout=aiohttp.ClientTimeout(total=30)) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(min(concurrency, requests))))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return LoadResult(name, len(latencies), errors, elapsed, latencies)
+
+
+async def login_cookies(base: str, variant: str, username: str, password: str) -> Dict[str, str]:
+    """Session cookie of a lab user, for load tests of authenticated endpoints"""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base}/{variant}/login", data={'username': username, 'password': password}) as r:
+            if r.status != 200:
+                raise ValueError(f"Login de {username} falhou na variante {variant} (HTTP {r.status})")
+            return {SESSION_COOKIE: r.cookies[SESSION_COOKIE].value}
+
+
+async def compare_variants(base: str, requests: int = DEFAULT_LOAD_REQUESTS,
+                           concurrency: int = DEFAULT_LOAD_CONCURRENCY, on_result=None) -> List[LoadResult]:
+    """Same workload against each endpoint's vulnerable and parameterised versions"""
+    credentials = {'username': 'aluno', 'password': 'aluno123'}
+    results = []
+    for variant in VARIANTS:
+        cookies = await login_cookies(base, variant, **credentials)
+        # Hashing makes fixed logins ~100x costlier; a smaller batch keeps the run short
+        logins = requests if variant == 'vuln' else max(1, requests // 20)
+        workload = (
+            (f"{variant} busca", f"{base}/{variant}/search?q=mouse", 'GET', None, requests, None, 200),
+            (f"{variant} comentários", f"{base}/{variant}/comments", 'GET', None, requests, None, 200),
+            (f"{variant} contas", f"{base}/{variant}/bank/accounts", 'GET', None, requests, cookies, 200),
+            (f"{variant} login", f"{base}/{variant}/login", 'POST', credentials, logins, None, 200),
+        )
+        for name, url, method, data, count, jar, expect in workload:
+            result = await load_test(name, url, method, data, count, concurrency, jar, expect)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.vuln_lab [url] [requisições] [concorrência]
+    #            python -m core.vuln_lab serve [porta]   (só o servidor, para usar no navegador)
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        async def serve(port: int):
+            async with VulnLab(port=port) as lab:
+                print(f"VulnLab em {lab.url}  (Ctrl+C para sair)")
+                await asyncio.Event().wait()
+
+        try:
+            asyncio.run(serve(int(sys.argv[2]) if len(sys.argv) > 2 else 8080))
+        except KeyboardInterrupt:
+            pass
+        sys.exit()
+
+    args = sys.argv[1:]
+    base = args.pop(0).rstrip('/') if args and not args[0].isdigit() else get_lab().url
+    total = int(args[0]) if args else DEFAULT_LOAD_REQUESTS
+    workers = int(args[1]) if len(args) > 1 else DEFAULT_LOAD_CONCURRENCY
+    print(f"Carga em {base}: {total} requisições por endpoint, {workers} conexões simultâneas")
+
+    def show(result: LoadResult):
+        row = result.as_row()
+        print(f"  {row['Endpoint']:<18} {row['Req/s']:>7} req/s  p50 {row['p50 (ms)']:>6} ms  "
+              f"p95 {row['p95 (ms)']:>6} ms  p99 {row['p99 (ms)']:>6} ms  "
+              f"erros {row['Erros']} de {row['Requisições']}")
+
+    asyncio.run(compare_variants(base, total, workers, show))
@@ -0,0 +1,513 @@
+"""
+Web Crawler
+Bounded async site mapper: robots.txt, per-host politeness, HTML parsing in a process pool
+"""
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from bs4 import BeautifulSoup, Comment as HtmlComment
+
+from core.http_client import USER_AGENT
+
+DEFAULT_MAX_PAGES = 500
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DELAY = 0.0
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+TIMEOUT = 15.0
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Query parameters that only track campaigns; dropping them collapses duplicate URLs
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_eid')
+LINK_ATTRIBUTES = (('a', 'href'), ('area', 'href'), ('link', 'href'), ('iframe', 'src'), ('frame', 'src'))
+
+
+def normalize(url: str, base: Optional[str] = None) -> Optional[str]:
+    """Canonical absolute form used for the seen-set; None for anything that isn't http(s).
+
+    Resolves against `base`, lowercases scheme and host, drops default ports,
+    fragments and tracking parameters, and sorts the query string."""
+    url = url.strip()
+    if base is not None:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if ':' in host:
+        host = f"[{host}]"
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith(TRACKING_PARAMS))
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class Form(NamedTuple):
+    page: str
+    action: str
+    method: str
+    fields: Tuple[Tuple[str, str], ...]  # (name, type)
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'Página': self.page,
+            'Ação': self.action,
+            'Método': self.method,
+            'Campos': ', '.join(f"{name} ({kind})" for name, kind in self.fields) or '-',
+        }
+
+
+class Script(NamedTuple):
+    page: str
+    src: str  # empty for inline scripts
+    inline_bytes: int
+
+    def as_row(self) -> Dict[str, str]:
+        return {'Página': self.page, 'Script': self.src or f"inline ({self.inline_bytes} bytes)"}
+
+
+class Comment(NamedTuple):
+    page: str
+    text: str
+
+    def as_row(self) -> Dict[str, str]:
+        return {'Página': self.page, 'Comentário': self.text}
+
+
+class ParsedPage(NamedTuple):
+    url: str
+    title: str
+    links: List[str]
+    forms: List[Form]
+    scripts: List[Script]
+    comments: List[Comment]
+
+
+class Page(NamedTuple):
+    url: str
+    status: int
+    depth: int
+    content_type: str
+    size: int
+    title: str
+    links: int
+    elapsed: float
+
+    def as_row(self) -> Dict[str, str]:
+        return {
+            'URL': self.url,
+            'Status': str(self.status),
+            'Profundidade': str(self.depth),
+            'Título': self.title or '-',
+            'Links': str(self.links),
+            'Tamanho': f"{self.size / 1024:.1f} KB",
+            'Tempo (ms)': f"{self.elapsed * 1000:.0f}",
+        }
+
+
+def parse_page(url: str, html: bytes, max_comment: int = 200) -> ParsedPage:
+    """Extract links, forms, scripts and comments; top-level so a process pool can run it"""
+    soup = BeautifulSoup(html, 'html.parser')
+    base_tag = soup.find('base', href=True)
+    base = urljoin(url, base_tag['href']) if base_tag else url
+
+    links, seen = [], set()
+    for tag, attribute in LINK_ATTRIBUTES:
+        for element in soup.find_all(tag, **{attribute: True}):
+            if tag == 'link' and 'stylesheet' not in element.get('rel', []) and 'alternate' not in element.get('rel', []):
+                continue
+            link = normalize(element[attribute], base)
+            if link and link not in seen:
+                seen.add(link)
+                links.append(link)
+
+    forms = []
+    for form in soup.find_all('form'):
+        action = normalize(form.get('action') or url, base) or form.get('action', '')
+        fields = tuple((field.get('name', ''), field.get('type', field.name).lower())
+                       for field in form.find_all(('input', 'select', 'textarea')) if field.get('name'))
+        forms.append(Form(url, action, (form.get('method') or 'GET').upper(), fields))
+
+    scripts = []
+    for script in soup.find_all('script'):
+        if script.get('src'):
+            scripts.append(Script(url, normalize(script['src'], base) or script['src'], 0))
+        elif script.string and script.string.strip():
+            scripts.append(Script(url, '', len(script.string.encode('utf-8'))))
+
+    comments = [Comment(url, ' '.join(text.split())[:max_comment])
+                for text in soup.find_all(string=lambda s: isinstance(s, HtmlComment)) if text.strip()]
+
+    title = ' '.join(soup.title.get_text().split())[:120] if soup.title else ''
+    return ParsedPage(url, title, links, forms, scripts, comments)
+
+
+class CrawlStats(NamedTuple):
+    pages: int
+    discovered: int
+    blocked: int
+    errors: int
+    bytes: int
+    elapsed: float
+    max_stall: float  # longest the event loop went without running, i.e. how much parsing blocked it
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+
+class SiteMap(NamedTuple):
+    start: str
+    pages: List[Page]
+    urls: List[str]
+    forms: List[Form]
+    scripts: List[Script]
+    comments: List[Comment]
+    errors: List[Tuple[str, str]]
+    stats: CrawlStats
+
+    def unique_comments(self) -> List[Dict[str, str]]:
+        """One row per distinct comment; site templates repeat the same ones on every page"""
+        rows: Dict[str, Dict[str, str]] = {}
+        for comment in self.comments:
+            row = rows.setdefault(comment.text, {'Comentário': comment.text, 'Primeira página': comment.page,
+                                                 'Ocorrências': 0})
+            row['Ocorrências'] += 1
+        return list(rows.values())
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process-wide parser pool; workers start once and are reused by every crawl"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pool
+
+
+class _HostPolicy:
+    __slots__ = ('robots', 'delay', 'next_slot', 'lock')
+
+    def __init__(self, robots: Optional[RobotFileParser], delay: float):
+        self.robots = robots
+        self.delay = delay
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    def allowed(self, url: str) -> bool:
+        return self.robots is None or self.robots.can_fetch(USER_AGENT, url)
+
+    async def wait_turn(self):
+        """Space requests to this host at least `delay` seconds apart"""
+        if not self.delay:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            if now < self.next_slot:
+                await asyncio.sleep(self.next_slot - now)
+            self.next_slot = max(now, self.next_slot) + self.delay
+
+
+class Crawler:
+    """Breadth-first crawl bounded by `max_pages` fetched and `max_depth` links from the start.
+
+    `stream()` yields ('url' | 'page' | 'form' | 'script' | 'comment' | 'error', item)
+    as they are found. Only the start URL's host, or the host it redirects to, is followed
+    unless `same_host` is off; every other link is still reported as a discovered URL."""
+
+    def __init__(self, start: str, max_pages: int = DEFAULT_MAX_PAGES, max_depth: int = DEFAULT_MAX_DEPTH,
+                 concurrency: int = DEFAULT_CONCURRENCY, delay: float = DEFAULT_DELAY,
+                 respect_robots: bool = True, same_host: bool = True, pool: Optional[ProcessPoolExecutor] = None,
+                 use_pool: bool = True):
+        start_url = normalize(start if '://' in start else 'https://' + start)
+        if start_url is None:
+            raise ValueError(f"URL inicial inválida: {start}")
+        if max_pages < 1 or max_depth < 0 or concurrency < 1:
+            raise ValueError("Orçamentos de páginas, profundidade e concorrência devem ser positivos")
+        self.start = start_url
+        self.host = self.start_host = urlsplit(start_url).netloc
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.delay = delay
+        self.respect_robots = respect_robots
+        self.same_host = same_host
+        self.pool = pool if pool is not None or not use_pool else get_pool()
+
+        self.seen: Set[str] = set()
+        self._policies: Dict[str, _HostPolicy] = {}
+        self._scheduled = 0
+        self._counts = {'pages': 0, 'blocked': 0, 'errors': 0, 'bytes': 0}
+        self.stats: Optional[CrawlStats] = None
+
+    async def _policy(self, session: aiohttp.ClientSession, url: str) -> _HostPolicy:
+        parts = urlsplit(url)
+        policy = self._policies.get(parts.netloc)
+        if policy is None:
+            robots, delay = None, self.delay
+            if self.respect_robots:
+                robots = RobotFileParser()
+                try:
+                    async with session.get(f"{parts.scheme}://{parts.netloc}/robots.txt") as response:
+                        if response.status >= 500:
+                            robots.disallow_all = True  # RFC 9309: server error means assume everything is off limits
+                        elif response.status < 400:
+                            robots.parse((await response.text(errors='replace')).splitlines())
+                        else:
+                            robots.allow_all = True
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    robots.allow_all = True
+                delay = max(delay, float(robots.crawl_delay(USER_AGENT) or 0))
+            # Two workers may race here; keep whichever policy landed first
+            policy = self._policies.setdefault(parts.netloc, _HostPolicy(robots, delay))
+        return policy
+
+    async def _parse(self, url: str, body: bytes) -> ParsedPage:
+        if self.pool is None:
+            return parse_page(url, body)
+        return await asyncio.get_running_loop().run_in_executor(self.pool, parse_page, url, body)
+
+    def _follow(self, url: str) -> bool:
+        return not self.same_host or urlsplit(url).netloc in (self.host, self.start_host)
+
+    async def stream(self):
+        queue: asyncio.Queue = asyncio.Queue()
+        events: asyncio.Queue = asyncio.Queue()
+        self.seen = {self.start}
+        self._scheduled = 1
+        queue.put_nowait((self.start, 0))
+        started = time.perf_counter()
+        stall = {'max': 0.0, 'running': True}
+
+        async def watchdog():
+            # Sleeps 10 ms at a time; any extra delay is time the loop spent blocked
+            while stall['running']:
+                before = time.perf_counter()
+                await asyncio.sleep(0.01)
+                stall['max'] = max(stall['max'], time.perf_counter() - before - 0.01)
+
+        async def visit(session: aiohttp.ClientSession, url: str, depth: int):
+            policy = await self._policy(session, url)
+            if not policy.allowed(url):
+                self._counts['blocked'] += 1
+                await events.put(('error', (url, 'bloqueado pelo robots.txt')))
+                return
+            await policy.wait_turn()
+            fetched = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                    chunks, size = [], 0
+                    if content_type in ('text/html', 'application/xhtml+xml'):
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            chunks.append(chunk)
+                            size += len(chunk)
+                            if size >= MAX_PAGE_BYTES:
+                                break
+                    body = b''.join(chunks)[:MAX_PAGE_BYTES]
+                    status, final = response.status, normalize(str(response.url)) or url
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._counts['errors'] += 1
+                await events.put(('error', (url, str(e) or type(e).__name__)))
+                return
+            elapsed = time.perf_counter() - fetched
+            if urlsplit(final).netloc != urlsplit(url).netloc:
+                # Redirected to another host: its robots.txt decides, and an apex -> www start moves the crawl there
+                if url == self.start:
+                    self.host = urlsplit(final).netloc
+                self.seen.add(final)
+                if not (await self._policy(session, final)).allowed(final):
+                    self._counts['blocked'] += 1
+                    await events.put(('error', (final, 'bloqueado pelo robots.txt')))
+                    return
+            self._counts['pages'] += 1
+            self._counts['bytes'] += len(body)
+
+            parsed = await self._parse(final, body) if body else ParsedPage(final, '', [], [], [], [])
+            await events.put(('page', Page(final, status, depth, content_type, len(body), parsed.title,
+                                           len(parsed.links), elapsed)))
+            for kind, items in (('form', parsed.forms), ('script', parsed.scripts), ('comment', parsed.comments)):
+                for item in items:
+                    await events.put((kind, item))
+
+            for link in parsed.links:
+                if link in self.seen:
+                    continue
+                self.seen.add(link)
+                await events.put(('url', link))
+                if depth < self.max_depth and self._scheduled < self.max_pages and self._follow(link):
+                    self._scheduled += 1
+                    queue.put_nowait((link, depth + 1))
+
+        async def worker(session: aiohttp.ClientSession):
+            while True:
+                url, depth = await queue.get()
+                try:
+                    await visit(session, url, depth)
+                except Exception as e:  # one broken page must not stop the crawl
+                    self._counts['errors'] += 1
+                    await events.put(('error', (url, f"{type(e).__name__}: {e}")))
+                finally:
+                    queue.task_done()
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT),
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            tasks = [asyncio.create_task(worker(session)) for _ in range(self.concurrency)]
+            monitor = asyncio.create_task(watchdog())
+            done = asyncio.create_task(queue.join())
+            await events.put(('url', self.start))
+            try:
+                while True:
+                    if done.done():
+                        # Every event is queued before its page is marked done
+                        while not events.empty():
+                            yield events.get_nowait()
+                        break
+                    getter = asyncio.create_task(events.get())
+                    finished, _ = await asyncio.wait({getter, done}, return_when=asyncio.FIRST_COMPLETED)
+                    if getter in finished:
+                        yield getter.result()
+                    else:
+                        getter.cancel()
+            finally:
+                stall['running'] = False
+                for task in tasks + [monitor, done]:
+                    task.cancel()
+                await asyncio.gather(*tasks, monitor, done, return_exceptions=True)
+                self.stats = CrawlStats(self._counts['pages'], len(self.seen), self._counts['blocked'],
+                                        self._counts['errors'], self._counts['bytes'],
+                                        time.perf_counter() - started, stall['max'])
+
+
+async def crawl(start: str, on_event=None, **options) -> SiteMap:
+    """Run a crawl to completion, collecting everything into a SiteMap"""
+    crawler = Crawler(start, **options)
+    collected = {'page': [], 'url': [], 'form': [], 'script': [], 'comment': [], 'error': []}
+    async for kind, item in crawler.stream():
+        collected[kind].append(item)
+        if on_event is not None:
+            on_event(kind, item)
+    return SiteMap(crawler.start, collected['page'], collected['url'], collected['form'], collected['script'],
+                   collected['comment'], collected['error'], crawler.stats)
+
+
+def crawl_site(start: str, on_event=None, **options) -> SiteMap:
+    """Synchronous entry point for scripts and Streamlit"""
+    return asyncio.run(crawl(start, on_event, **options))
+
+
+class GeneratedSite:
+    """Loopback site of `pages` linked pages for crawler benchmarks.
+
+    Page i links to its ten children (10i+1 ... 10i+10), back home, and to a
+    couple of pseudo-random pages; some carry forms, scripts and HTML comments.
+    robots.txt disallows /admin/, which every hundredth page links to."""
+
+    def __init__(self, pages: int = 10000, latency: float = 0.0, host: str = '127.0.0.1'):
+        self.pages = pages
+        self.latency = latency
+        self.host = host
+        self.port = 0
+        self.hits = 0
+        self._runner = None
+
+    def render(self, index: int) -> str:
+        children = ''.join(f'<li><a href="/pagina/{c}?utm_source=menu#topo">Página {c}</a></li>'
+                           for c in range(10 * index + 1, min(10 * index + 11, self.pages)))
+        extra = ''.join(f'<a href="../pagina/{(index * k * 7919) % self.pages}">relacionada</a>' for k in (1, 2))
+        form = ('<form action="/buscar" method="post"><input name="q" type="text">'
+                '<input name="csrf" type="hidden"><textarea name="msg"></textarea></form>') if index % 50 == 0 else ''
+        admin = '<a href="/admin/painel">admin</a><!-- TODO: remover senha padrão admin:admin -->' if index % 100 == 0 else ''
+        filler = '<p>' + 'Conteúdo de exemplo para o crawler. ' * 40 + '</p>'
+        return (f'<!DOCTYPE html><html><head><title>Página {index}</title>'
+                f'<script src="/static/app.js?v={index % 3}"></script>'
+                f'<script>var pagina = {index};</script></head><body>'
+                f'<!-- gerado para o benchmark --><a href="/">Início</a><ul>{children}</ul>'
+                f'{extra}{form}{admin}{filler}</body></html>')
+
+    async def __aenter__(self) -> 'GeneratedSite':
+        from aiohttp import web
+
+        async def page(request):
+            self.hits += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            index = int(request.match_info['index'])
+            if index >= self.pages:
+                raise web.HTTPNotFound()
+            return web.Response(text=self.render(index), content_type='text/html')
+
+        async def home(request):
+            self.hits += 1
+            return web.Response(text=self.render(0), content_type='text/html')
+
+        async def robots(request):
+            return web.Response(text="User-agent: *\nDisallow: /admin/\n")
+
+        async def static(request):
+            self.hits += 1
+            return web.Response(text="console.log('ok');", content_type='application/javascript')
+
+        app = web.Application()
+        app.router.add_get('/', home)
+        app.router.add_get('/robots.txt', robots)
+        app.router.add_get('/pagina/{index:\\d+}', page)
+        app.router.add_get('/static/{name}', static)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Benchmark: python -m core.web_crawler [páginas | url [orçamento]]
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        budget = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_MAX_PAGES
+        result = crawl_site(sys.argv[1], max_pages=budget, max_depth=5,
+                            on_event=lambda kind, item: kind == 'page' and print(f"  {item.status} {item.url}"))
+        print(f"{result.stats.pages} páginas, {len(result.urls)} URLs, {len(result.forms)} formulários, "
+              f"{len(result.comments)} comentários em {result.stats.elapsed:.1f}s")
+        sys.exit()
+
+    async def benchmark(pages: int):
+        async with GeneratedSite(pages) as site:
+            print(f"site gerado com {pages} páginas em {site.url} ({os.cpu_count()} CPU)")
+            for label, options in (("parsing no event loop", {'use_pool': False}),
+                                   ("parsing no pool de processos", {})):
+                result = await crawl(site.url, max_pages=pages, max_depth=10, concurrency=16, **options)
+                stats = result.stats
+                print(f"  {label:<30} {stats.pages:>6} páginas em {stats.elapsed:6.1f}s  "
+                      f"{stats.pages_per_second:6.0f} páginas/s  travamento máx. do loop {stats.max_stall * 1000:6.1f} ms  "
+                      f"URLs {stats.discovered}  formulários {len(result.forms)}  comentários {len(result.comments)}  "
+                      f"bloqueadas {stats.blocked}")
+
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
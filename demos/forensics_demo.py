@@ -14,6 +14,11 @@ from rich.table import Table
 from rich.prompt import Prompt
 from rich import box
 import base64
+import tempfile
+import shutil
+
+from core.integrity_baseline import Baseline, IntegrityMonitor
+from core.doc_metadata import FIELD_LABELS, extract_metadata
 
 class ForensicsDemo:
     """Demonstrações interativas de forense digital"""
@@ -29,7 +34,7 @@ class ForensicsDemo:
             
             choice = Prompt.ask(
                 "\n🕵️ Escolha o demo forense",
-                choices=['1', '2', '3', '4', 'b'],
+                choices=['1', '2', '3', '4', '5', 'b'],
                 default='b'
             )
             
@@ -41,6 +46,8 @@ class ForensicsDemo:
                 await self.hash_verification_demo()
             elif choice == '4':
                 await self.hidden_data_demo()
+            elif choice == '5':
+                await self.baseline_monitor_demo()
             elif choice == 'b':
                 break
                 
@@ -62,6 +69,7 @@ class ForensicsDemo:
             ("2", "Extração de Metadados", "Informações ocultas em arquivos"),
             ("3", "Verificação de Integridade", "Hashes e detecção de alterações"),
             ("4", "Dados Ocultos", "Esteganografia e dados escondidos"),
+            ("5", "Baseline de Diretório", "Monitoramento incremental de integridade"),
             ("B", "Voltar ao Menu Principal", "Retornar à aplicação principal")
         ]
         
@@ -303,7 +311,7 @@ Dados importantes:
         # Escolha do tipo de arquivo
         file_type = Prompt.ask(
             "📁 Escolha o tipo de arquivo para análise",
-            choices=['word', 'foto', 'pdf'],
+            choices=['word', 'foto', 'pdf', 'arquivo'],
             default='foto'
         )
         
@@ -313,8 +321,26 @@ Dados importantes:
             'pdf': 'PDF'
         }
         
-        selected_type = type_map[file_type]
-        metadata = metadata_examples[selected_type]
+        if file_type == 'arquivo':
+            # Documento real: PDF, DOCX/XLSX/PPTX ou ODF
+            file_path = Prompt.ask("Digite o caminho do documento")
+            if not os.path.exists(file_path):
+                self.console.print("❌ Arquivo não encontrado!")
+                return
+            
+            extracted = extract_metadata(file_path)
+            if extracted.get('erro'):
+                self.console.print(f"❌ Erro ao ler metadados: {extracted['erro']}")
+                return
+            
+            selected_type = f"{Path(file_path).name} ({extracted.pop('format', 'Documento')})"
+            metadata = {FIELD_LABELS.get(campo, campo): valor for campo, valor in extracted.items()}
+            if not metadata:
+                self.console.print("📝 Nenhum metadado encontrado no documento.")
+                return
+        else:
+            selected_type = type_map[file_type]
+            metadata = metadata_examples[selected_type]
         
         # Tabela de metadados
         metadata_table = Table(
@@ -339,6 +365,9 @@ Dados importantes:
             "GPS Latitude": "🌍 Localização exata",
             "GPS Longitude": "🌍 Localização exata",
             "Criador": "👨‍💻 Software criador",
+            "Último Autor": "👤 Última edição",
+            "Ferramenta de Criação": "👨‍💻 Software criador",
+            "Produtor PDF": "💻 Ambiente usado",
             "Título": "📄 Identificação",
             "Assunto": "📝 Contexto",
             "Palavras-chave": "🔍 Classificação"
@@ -748,4 +777,114 @@ Possível Mensagem: [dados binários ocultos]
         
         self.console.print(Panel(detection_tools.strip(), title="🛠️ Ferramentas de Detecção", border_style="green"))
         
-        Prompt.ask("\nPressione Enter para continuar")
\ No newline at end of file
+        Prompt.ask("\nPressione Enter para continuar")
+        
+    async def baseline_monitor_demo(self):
+        """Demo de baseline de integridade para uma árvore de diretórios"""
+        
+        self.console.print(Panel(
+            "🗂️ Baseline de Integridade de Diretório\n\n"
+            "Um manifesto registra tamanho, mtime, inode e hashes de cada arquivo.\n"
+            "A verificação só recalcula hashes de arquivos cujo stat mudou.",
+            title="Baseline de Diretório",
+            border_style="green"
+        ))
+        
+        choice = Prompt.ask(
+            "\n📁 Escolha uma opção (1 = diretório próprio, 2 = exemplo)",
+            choices=['1', '2'],
+            default='2'
+        )
+        
+        demo_dir = None
+        if choice == '1':
+            root = Prompt.ask("Digite o caminho do diretório")
+            if not os.path.isdir(root):
+                self.console.print("❌ Diretório não encontrado!")
+                return
+        else:
+            # Criar árvore de exemplo
+            demo_dir = tempfile.mkdtemp(prefix="evidencias_")
+            root = demo_dir
+            os.makedirs(os.path.join(root, "logs"))
+            for i in range(20):
+                with open(os.path.join(root, f"documento_{i:02d}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(f"Evidência {i} - conteúdo original\n")
+            with open(os.path.join(root, "logs", "acesso.log"), 'w', encoding='utf-8') as f:
+                f.write("2024-01-16 02:15:44 login j.silva\n")
+            self.console.print(f"✅ Árvore de exemplo criada: {root}")
+            
+        manifest_path = os.path.join(tempfile.gettempdir(), "cybermentor_baseline.cmib")
+        
+        try:
+            # Linha de base
+            baseline = Baseline.build(root)
+            baseline.save(manifest_path)
+            
+            self.console.print(f"\n✅ Baseline criada: {len(baseline)} arquivos")
+            self.console.print(f"💾 Manifesto salvo em: {manifest_path} ({os.path.getsize(manifest_path):,} bytes)")
+            
+            if demo_dir:
+                # Simular alterações na evidência
+                with open(os.path.join(root, "documento_03.txt"), 'a', encoding='utf-8') as f:
+                    f.write("linha adicionada\n")
+                os.remove(os.path.join(root, "documento_07.txt"))
+                with open(os.path.join(root, "logs", "apagar_rastros.sh"), 'w', encoding='utf-8') as f:
+                    f.write("rm -rf /var/log/*\n")
+                os.utime(os.path.join(root, "documento_10.txt"))
+                self.console.print("\n🔄 Alterações simuladas: edição, remoção, criação e touch")
+            else:
+                Prompt.ask("\n🔄 Altere arquivos no diretório e pressione Enter para verificar")
+                
+            # Verificação incremental a partir do manifesto salvo; as alterações entram na baseline
+            # para o monitoramento não reportá-las de novo
+            verificada = Baseline.load(manifest_path)
+            report = verificada.verify(update=True)
+            
+            report_table = Table(
+                title="🔍 Verificação Incremental",
+                box=box.ROUNDED,
+                border_style="red" if not report.is_clean else "green"
+            )
+            
+            report_table.add_column("Categoria", style="bold cyan", width=22)
+            report_table.add_column("Qtd", style="white", width=6)
+            report_table.add_column("Arquivos", style="dim white", width=40)
+            
+            def amostra(paths):
+                return ", ".join(paths[:5]) + (" ..." if len(paths) > 5 else "")
+            
+            report_table.add_row("✅ Inalterados (só stat)", str(report.unchanged), "-")
+            report_table.add_row("🚨 Modificados", str(len(report.modified)), amostra(report.modified))
+            report_table.add_row("➕ Novos", str(len(report.added)), amostra(report.added))
+            report_table.add_row("➖ Removidos", str(len(report.removed)), amostra(report.removed))
+            report_table.add_row("🕒 Só metadados (touch)", str(len(report.touched)), amostra(report.touched))
+            report_table.add_row("🔐 Hashes recalculados", str(report.rehashed), f"em {report.elapsed * 1000:.1f} ms")
+            
+            self.console.print("\n")
+            self.console.print(report_table)
+            
+            # Monitoramento contínuo opcional
+            if Prompt.ask("\n👁️ Monitorar por 10 segundos?", choices=['s', 'n'], default='n') == 's':
+                monitor = IntegrityMonitor(verificada, interval=1.0)
+                self.console.print(f"👁️ Monitorando {root} (modo: {monitor.mode})...")
+                
+                deadline = datetime.now().timestamp() + 10
+                while datetime.now().timestamp() < deadline:
+                    event = monitor.poll_once()
+                    for rel in event.modified + event.added + event.removed:
+                        self.console.print(f"🚨 Alteração detectada: {rel}")
+                if monitor.backend is not None:
+                    monitor.backend.close()
+                    
+        except Exception as e:
+            self.console.print(Panel(
+                f"❌ Erro na baseline: {str(e)}",
+                title="Erro",
+                border_style="red"
+            ))
+        finally:
+            if demo_dir:
+                shutil.rmtree(demo_dir, ignore_errors=True)
+                
+        Prompt.ask("\nPressione Enter para continuar")
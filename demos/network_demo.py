@@ -13,6 +13,12 @@ from rich.table import Table
 from rich.prompt import Prompt
 from rich import box
 
+from core.net_inventory import collect
+from core.scan_store import get_store, tcp_rows
+from core.scan_timing import DEFAULT_TEMPLATE, TEMPLATES, tcp_scan
+from core.socket_audit import SUPPORTED as SOCKET_AUDIT_SUPPORTED, SocketAuditor
+from core.service_detection import detect_services, service_description, service_name
+
 class NetworkDemo:
     """Demonstrações interativas de segurança de rede"""
     
@@ -81,11 +87,14 @@ class NetworkDemo:
         ))
         
         target = Prompt.ask("\n🎯 Digite o alvo para scan", default="127.0.0.1")
+        template_id = int(Prompt.ask("⏱️ Template de tempo (0=paranoico ... 5=insano)",
+                                     choices=[str(t) for t in TEMPLATES], default=str(DEFAULT_TEMPLATE)))
+        template = TEMPLATES[template_id]
         
         # Portas comuns para testar
         common_ports = [22, 23, 25, 53, 80, 110, 135, 139, 143, 443, 993, 995, 1433, 3306, 3389, 5432, 5900, 8080]
         
-        self.console.print(f"\n🔍 Verificando portas em {target}...")
+        self.console.print(f"\n🔍 Verificando portas em {target} ({template.name} - {template.label})...")
         
         # Tabela de resultados
         results_table = Table(
@@ -99,47 +108,71 @@ class NetworkDemo:
         results_table.add_column("Serviço", style="white", width=20)
         results_table.add_column("Descrição", style="dim white", width=30)
         
-        # Mapeamento de serviços
-        service_map = {
-            22: ("SSH", "Secure Shell - Acesso remoto"),
-            23: ("Telnet", "Acesso remoto não criptografado"),
-            25: ("SMTP", "Envio de email"),
-            53: ("DNS", "Resolução de nomes"),
-            80: ("HTTP", "Web server não criptografado"),
-            135: ("RPC", "Remote Procedure Call"),
-            139: ("NetBios", "Compartilhamento Windows"),
-            443: ("HTTPS", "Web server criptografado"),
-            1433: ("MSSQL", "Microsoft SQL Server"),
-            3306: ("MySQL", "MySQL Database Server"),
-            3389: ("RDP", "Remote Desktop Protocol"),
-            5432: ("PostgreSQL", "PostgreSQL Database"),
-            8080: ("HTTP-Alt", "Web server porta alternativa")
-        }
-        
-        open_ports = []
+        # Timeout derivado do RTT medido (SRTT + 4·RTTVAR) em vez de 1s fixo;
+        # só portas sem resposta são reenviadas
+        report = await tcp_scan(target, common_ports, template)
+        status_labels = {'open': "✅ ABERTA", 'closed': "❌ FECHADA", 'filtered': "🛡️ FILTRADA"}
+        
+        # Nomes e descrições vêm da tabela completa de 65.536 portas do core
+        open_ports = [(port, service_name(port)) for port in report.open_ports]
         
         for port in common_ports:
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(1)
-                result = sock.connect_ex((target, port))
-                
-                if result == 0:
-                    status = "✅ ABERTA"
-                    service_name, description = service_map.get(port, ("Desconhecido", "Serviço não identificado"))
-                    open_ports.append((port, service_name))
-                else:
-                    status = "❌ FECHADA"
-                    service_name, description = service_map.get(port, ("N/A", "N/A"))
-                    
-                results_table.add_row(str(port), status, service_name, description)
-                sock.close()
-                
-            except Exception:
-                results_table.add_row(str(port), "🚫 ERRO", "N/A", "Erro na conexão")
+            result = report.results[port]
+            results_table.add_row(str(port), status_labels[result.state], service_name(port), service_description(port))
                 
         self.console.print("\n")
         self.console.print(results_table)
+
+        # Histórico persistente: compara com o scan anterior do mesmo alvo
+        store = get_store()
+        scan_id = store.record('tcp', target, tcp_rows(report), f"{template.name} portas comuns")
+        changes = store.changes_since_last(scan_id, ('open',))
+        if changes is None:
+            self.console.print(f"\n🗄️ Scan #{scan_id} gravado em {store.db_path} (primeiro scan deste alvo)")
+        elif changes:
+            changes_table = Table(title=f"🔄 Mudanças desde o scan anterior (#{scan_id})", box=box.SIMPLE,
+                                  border_style="yellow")
+            for column in ("Porta", "Mudança", "Antes", "Depois"):
+                changes_table.add_column(column)
+            for change in changes:
+                row = change.as_row()
+                changes_table.add_row(row['Porta'], row['Mudança'], row['Antes'], row['Depois'])
+            self.console.print(changes_table)
+        else:
+            self.console.print(f"\n🗄️ Scan #{scan_id}: nenhuma porta abriu ou fechou desde o scan anterior")
+
+        # Alvo local: o /proc mostra de dentro qual processo é dono de cada porta aberta
+        try:
+            local_target = ipaddress.ip_address(socket.gethostbyname(target)).is_loopback
+        except (OSError, ValueError):
+            local_target = False
+        if local_target and open_ports and SOCKET_AUDIT_SUPPORTED:
+            owners = {s.port: s for s in SocketAuditor().snapshot().sockets if s.protocol.startswith('tcp')}
+            owners_table = Table(title="🔎 Quem está escutando (visto de dentro, via /proc)", box=box.SIMPLE,
+                                 border_style="magenta")
+            for column in ("Porta", "Processo", "Usuário", "Exposição"):
+                owners_table.add_column(column)
+            for port, _ in open_ports:
+                owner = owners.get(port)
+                if owner:
+                    owners_table.add_row(str(port), f"{owner.process} ({owner.pid or '?'})", owner.user, owner.exposure)
+            self.console.print(owners_table)
+
+        if open_ports:
+            # Banner grabbing nas portas abertas: identifica produto e versão de verdade
+            self.console.print("\n🔎 Identificando versões dos serviços abertos...")
+            detected = await detect_services(target, [port for port, _ in open_ports])
+            open_ports = [(item.port, f"{item.service} {item.description}".strip()) for item in detected]
+
+            versions_table = Table(title="🔎 Serviços Identificados", box=box.SIMPLE, border_style="cyan")
+            versions_table.add_column("Porta", style="bold cyan", width=8)
+            versions_table.add_column("Serviço", style="white", width=12)
+            versions_table.add_column("Versão", style="bold yellow", width=30)
+            versions_table.add_column("Latência", style="dim white", width=18)
+            for item in detected:
+                latency = ', '.join(f"{p.probe} {p.latency * 1000:.0f}ms" for p in item.probes)
+                versions_table.add_row(str(item.port), item.service, item.description or "-", latency)
+            self.console.print(versions_table)
         
         # Resumo da análise
         analysis = f"""
@@ -148,7 +181,11 @@ class NetworkDemo:
 🎯 Alvo: {target}
 🔍 Portas verificadas: {len(common_ports)}
 ✅ Portas abertas: {len(open_ports)}
-❌ Portas fechadas: {len(common_ports) - len(open_ports)}
+❌ Portas fechadas: {len(report.ports('closed'))}
+🛡️ Portas filtradas: {len(report.ports('filtered'))}
+
+⏱️ Tempo: {report.elapsed:.2f}s em {report.probes} sondas ({report.retries} reenvios)
+📶 RTT suavizado: {f"{report.srtt * 1000:.1f} ms" if report.srtt is not None else "sem resposta"} · timeout final {report.timeout * 1000:.0f} ms
 
 🔓 Serviços identificados:
 {chr(10).join([f'• Porta {port}: {service}' for port, service in open_ports]) if open_ports else '• Nenhum serviço comum detectado'}
@@ -185,58 +222,69 @@ class NetworkDemo:
         network_table.add_column("Informação", style="white", width=40)
         network_table.add_column("Detalhes", style="dim white", width=25)
         
-        try:
-            # Hostname
-            hostname = socket.gethostname()
-            network_table.add_row("Hostname", hostname, "Nome da máquina")
-            
-            # IP local
-            local_ip = socket.gethostbyname(hostname)
-            network_table.add_row("IP Local", local_ip, "Endereço IP principal")
+        # Tudo vem de /proc, /sys e netlink: nada de subprocessos nem de gethostbyname(hostname),
+        # que no Debian/Ubuntu devolve 127.0.1.1
+        inventory = collect()
+        local_ip = inventory.primary_address
+        gateway = inventory.default_gateway
+        
+        network_table.add_row("Hostname", inventory.hostname, "Nome da máquina")
+        network_table.add_row("IP Local", local_ip, "Endereço da rota padrão")
+        if gateway:
+            neighbor = inventory.neighbor(gateway)
+            network_table.add_row("Gateway Padrão", gateway,
+                                  f"MAC {neighbor.mac}" if neighbor and neighbor.complete else "Roteador de saída")
+        else:
+            network_table.add_row("Gateway Padrão", "Nenhuma rota padrão", "Sem saída para a internet")
             
-            # Informações adicionais sobre a rede
-            try:
-                # Gateway padrão (tentativa)
-                if platform.system() == "Windows":
-                    import subprocess
-                    result = subprocess.run(['ipconfig'], capture_output=True, text=True)
-                    # Parsing básico para gateway (simplificado)
-                    gateway = "Detectar manualmente"
-                else:
-                    # Linux/Mac
-                    gateway = "Detectar manualmente"
-                    
-                network_table.add_row("Gateway Padrão", gateway, "Roteador de saída")
-            except:
-                network_table.add_row("Gateway Padrão", "Não detectado", "Erro na detecção")
-                
-            # DNS
-            try:
-                dns_resolver = socket.getfqdn()
-                network_table.add_row("FQDN", dns_resolver, "Nome totalmente qualificado")
-            except:
-                network_table.add_row("FQDN", "Não disponível", "Erro na resolução")
-                
-            # Análise de rede privada
-            try:
-                ip_obj = ipaddress.ip_address(local_ip)
-                if ip_obj.is_private:
-                    network_type = "🏠 Rede Privada"
-                    security_note = "Protegida por NAT"
-                else:
-                    network_type = "🌐 IP Público"
-                    security_note = "Diretamente acessível"
-                    
-                network_table.add_row("Tipo de Rede", network_type, security_note)
-            except:
-                network_table.add_row("Tipo de Rede", "Não analisado", "Erro na análise")
-                
-        except Exception as e:
-            network_table.add_row("Erro", str(e), "Falha na coleta")
+        # DNS
+        try:
+            dns_resolver = socket.getfqdn()
+            network_table.add_row("FQDN", dns_resolver, "Nome totalmente qualificado")
+        except OSError:
+            network_table.add_row("FQDN", "Não disponível", "Erro na resolução")
             
+        # Análise de rede privada
+        ip_obj = ipaddress.ip_address(local_ip)
+        if ip_obj.is_private:
+            network_type = "🏠 Rede Privada"
+            security_note = "Protegida por NAT"
+        else:
+            network_type = "🌐 IP Público"
+            security_note = "Diretamente acessível"
+        network_table.add_row("Tipo de Rede", network_type, security_note)
+        network_table.add_row("Sockets Escutando", str(len(inventory.listening)),
+                              f"Coletado em {inventory.elapsed * 1000:.1f} ms")
+        
         self.console.print("\n")
         self.console.print(network_table)
         
+        # Interfaces, rotas e vizinhos (tabela ARP)
+        interfaces_table = Table(title="🔌 Interfaces", box=box.SIMPLE, border_style="cyan")
+        for column in ("Interface", "Estado", "MAC", "Endereços", "RX", "TX"):
+            interfaces_table.add_column(column)
+        for interface in inventory.interfaces:
+            row = interface.as_row()
+            interfaces_table.add_row(*(row[column] for column in ("Interface", "Estado", "MAC", "Endereços", "RX", "TX")))
+        self.console.print(interfaces_table)
+        
+        routes_table = Table(title="🧭 Rotas", box=box.SIMPLE, border_style="cyan")
+        for column in ("Destino", "Gateway", "Interface", "Métrica"):
+            routes_table.add_column(column)
+        for route in inventory.routes:
+            routes_table.add_row(*route.as_row().values())
+        self.console.print(routes_table)
+        
+        if inventory.neighbors:
+            neighbors_table = Table(title="👥 Vizinhos (cache ARP)", box=box.SIMPLE, border_style="cyan")
+            for column in ("IP", "MAC", "Interface"):
+                neighbors_table.add_column(column)
+            for neighbor in inventory.neighbors:
+                neighbors_table.add_row(neighbor.address, neighbor.mac if neighbor.complete else "(incompleto)",
+                                        neighbor.interface)
+            self.console.print(neighbors_table)
+
+        
         # Análise de segurança da rede
         security_analysis = """
 🔒 Análise de Segurança de Rede:
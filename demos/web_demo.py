@@ -3,6 +3,8 @@ Web Security Demo Module
 Interactive demonstrations of web security concepts and vulnerabilities
 """
 
+import os
+import html
 import requests
 import base64
 import urllib.parse
@@ -10,15 +12,26 @@ from bs4 import BeautifulSoup
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
-from rich.prompt import Prompt
+from rich.prompt import Confirm, Prompt
+from rich.progress import Progress
 from rich import box
 import json
 
+from core.http_client import get_client, normalize_url
+from core.security_headers import analyze
+from core.header_audit import DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, audit, parse_urls, to_csv
+from core.web_crawler import DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES, crawl
+from core.tech_fingerprint import detect as detect_technologies
+from core.vuln_lab import USERS as LAB_USERS, VARIANTS as LAB_VARIANTS, get_lab
+from core.injection_detect import detect_sqli, detect_xss
+from core.http_timing import PHASES, compare as compare_timings
+
 class WebDemo:
     """Interactive web security demonstrations"""
     
     def __init__(self, console: Console):
         self.console = console
+        self.http = get_client()
         
     async def run(self):
         """Main web security demo loop"""
@@ -28,7 +41,7 @@ class WebDemo:
             
             choice = Prompt.ask(
                 "\n🌐 Choose web security demo",
-                choices=['1', '2', '3', '4', '5', 'b'],
+                choices=['1', '2', '3', '4', '5', '6', 'b'],
                 default='b'
             )
             
@@ -42,6 +55,8 @@ class WebDemo:
                 await self.cookie_security_demo()
             elif choice == '5':
                 await self.web_recon_demo()
+            elif choice == '6':
+                await self.bulk_header_audit_demo()
             elif choice == 'b':
                 break
                 
@@ -64,6 +79,7 @@ class WebDemo:
             ("3", "XSS Demonstration", "Cross-site scripting examples"),
             ("4", "Cookie Security", "Secure vs insecure cookie analysis"),
             ("5", "Web Reconnaissance", "Information gathering techniques"),
+            ("6", "Bulk Header Audit", "Security headers of many sites at once"),
             ("B", "Back to Main Menu", "Return to main application")
         ]
         
@@ -86,14 +102,15 @@ class WebDemo:
         
         # Get target URL
         target_url = Prompt.ask(
-            "\n🌐 Enter URL to analyze", 
-            default="https://httpbin.org/get"
+            "\n🌐 Enter URL to analyze (default: the local lab's fixed variant)", 
+            default=get_lab().endpoint('safe', 'search')
         )
         
         try:
-            # Make HTTP request
+            # Headers only: HEAD through the shared pooled session, repeated URLs come from its cache
             self.console.print(f"\n🔍 Analyzing headers for: {target_url}")
-            response = requests.get(target_url, timeout=10)
+            response = self.http.head(normalize_url(target_url))
+            report = analyze(response.headers, response.url, response.status)
             
             # Create headers analysis table
             headers_table = Table(
@@ -106,74 +123,42 @@ class WebDemo:
             headers_table.add_column("Value", style="white", width=40)
             headers_table.add_column("Security Impact", style="bold", width=15)
             
-            # Analyze key security headers
-            security_headers = {
-                'content-security-policy': ('CSP', '🛡️ EXCELLENT'),
-                'strict-transport-security': ('HSTS', '🔒 GOOD'), 
-                'x-frame-options': ('Clickjacking Protection', '✅ GOOD'),
-                'x-content-type-options': ('MIME Sniffing Protection', '✅ GOOD'),
-                'x-xss-protection': ('XSS Protection', '⚠️ LEGACY'),
-                'server': ('Server Info', '⚠️ INFO LEAK'),
-                'x-powered-by': ('Tech Stack Info', '🚨 INFO LEAK')
-            }
-            
             # Check each header
-            for header, (description, security_level) in security_headers.items():
-                value = response.headers.get(header, '❌ MISSING')
-                if value != '❌ MISSING':
-                    value = value[:35] + "..." if len(value) > 35 else value
-                headers_table.add_row(header.title(), value, security_level)
+            for finding in report.findings:
+                value = finding.value or ('✅ via CSP frame-ancestors' if finding.passed else '❌ MISSING')
+                value = value[:35] + "..." if len(value) > 35 else value
+                if not finding.weight:
+                    impact = 'ℹ️ INFO'
+                else:
+                    impact = f"{'✅' if finding.passed else '❌'} {finding.points}/{finding.weight}"
+                headers_table.add_row(finding.header, value, impact)
+            for header, value in report.disclosed.items():
+                headers_table.add_row(header, value[:35] + "..." if len(value) > 35 else value, '🚨 INFO LEAK')
             
             self.console.print("\n")
             self.console.print(headers_table)
             
-            # Security assessment
-            security_score = 0
-            recommendations = []
-            
-            if 'content-security-policy' in response.headers:
-                security_score += 30
-            else:
-                recommendations.append("• Add Content Security Policy (CSP)")
-                
-            if 'strict-transport-security' in response.headers:
-                security_score += 25
-            else:
-                recommendations.append("• Enable HTTP Strict Transport Security (HSTS)")
-                
-            if 'x-frame-options' in response.headers:
-                security_score += 20
-            else:
-                recommendations.append("• Set X-Frame-Options to prevent clickjacking")
-                
-            if 'x-content-type-options' in response.headers:
-                security_score += 15
-            else:
-                recommendations.append("• Add X-Content-Type-Options: nosniff")
-                
-            if 'server' not in response.headers and 'x-powered-by' not in response.headers:
-                security_score += 10
-            else:
-                recommendations.append("• Hide server/technology information")
-                
             # Display security assessment
-            if security_score >= 80:
+            if report.score >= 80:
                 score_color = "green"
                 score_text = "🛡️ EXCELLENT"
-            elif security_score >= 60:
+            elif report.score >= 60:
                 score_color = "yellow"
                 score_text = "⚠️ MODERATE"
             else:
                 score_color = "red"
                 score_text = "🚨 POOR"
+            
+            recommendations = [f"• {advice}" for advice in report.recommendations]
+            content_length = f"{response.size} bytes" if response.size is not None else "not announced"
                 
             assessment = f"""
-🎯 Security Score: {security_score}/100 - {score_text}
+🎯 Security Score: {report.score}/100 - {score_text}
 
 📊 Analysis:
-• Status Code: {response.status_code}
-• Response Time: {response.elapsed.total_seconds():.2f}s
-• Content Length: {len(response.content)} bytes
+• Status Code: {response.status}
+• Response Time: {response.elapsed:.2f}s ({response.method}, {response.source})
+• Content Length: {content_length}
 
 💡 Recommendations:
 {chr(10).join(recommendations) if recommendations else "• Security headers look good!"}
@@ -185,7 +170,7 @@ class WebDemo:
                 border_style=score_color
             ))
             
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError) as e:
             self.console.print(Panel(
                 f"❌ Error analyzing URL: {str(e)}\n\n"
                 "This might be due to:\n"
@@ -221,6 +206,94 @@ class WebDemo:
         
         Prompt.ask("\nPress Enter to continue")
         
+    async def site_map(self, start_url: str):
+        """Crawl the target and show what a site map reveals"""
+        
+        budget = int(Prompt.ask("📄 Page budget", default=str(DEFAULT_MAX_PAGES)))
+        depth = int(Prompt.ask("🔽 Max depth", default=str(DEFAULT_MAX_DEPTH)))
+        
+        with Progress(console=self.console) as progress:
+            task = progress.add_task("Crawling...", total=budget)
+            site = await crawl(start_url, max_pages=budget, max_depth=depth, delay=0.2,
+                               on_event=lambda kind, item: kind == 'page' and progress.advance(task))
+        
+        for title, rows in (("📝 Forms (entry points)", [f.as_row() for f in site.forms[:20]]),
+                            ("💬 HTML Comments", [{k: str(v) for k, v in row.items()}
+                                                 for row in site.unique_comments()[:20]])):
+            if not rows:
+                continue
+            table = Table(title=title, box=box.SIMPLE, border_style="purple")
+            for column in rows[0]:
+                table.add_column(column, overflow="fold")
+            for row in rows:
+                table.add_row(*row.values())
+            self.console.print(table)
+        
+        external = sorted({s.src for s in site.scripts if s.src})
+        self.console.print(Panel(
+            f"📄 Pages crawled: {site.stats.pages} ({site.stats.pages_per_second:.1f} pages/s)\n"
+            f"🔗 URLs discovered: {len(site.urls)}\n"
+            f"📝 Forms: {len(site.forms)}\n"
+            f"📜 External scripts: {len(external)}\n"
+            f"💬 Comments: {len(site.comments)}\n"
+            f"🤖 Blocked by robots.txt: {site.stats.blocked}  ❌ Errors: {site.stats.errors}",
+            title="🕸️ Site Map",
+            border_style="purple"
+        ))
+        
+    async def bulk_header_audit_demo(self):
+        """Security headers of a whole list of URLs, fetched concurrently"""
+        
+        self.console.print(Panel(
+            "📋 Bulk Security Header Audit\n\n"
+            "Audit hundreds or thousands of sites in one go: requests run concurrently,\n"
+            "capped in total and per host so no single server gets hammered.",
+            title="Bulk Header Audit",
+            border_style="green"
+        ))
+        
+        path = Prompt.ask("\n📁 File with one URL per line")
+        try:
+            with open(path, encoding='utf-8') as f:
+                urls, invalid = parse_urls(f.read())
+        except OSError as e:
+            self.console.print(f"[red]❌ Could not read {path}: {e}[/red]")
+            return
+        if not urls:
+            self.console.print("[red]❌ No valid URLs found[/red]")
+            return
+        
+        concurrency = int(Prompt.ask("⚡ Concurrent requests (total)", default=str(DEFAULT_CONCURRENCY)))
+        per_host = int(Prompt.ask("🌐 Concurrent requests per host", default=str(DEFAULT_PER_HOST)))
+        
+        with Progress(console=self.console) as progress:
+            task = progress.add_task(f"Auditing {len(urls)} URLs...", total=len(urls))
+            report = await audit(urls, concurrency, per_host,
+                                 on_result=lambda result, done, total: progress.update(task, completed=done))
+        
+        results_table = Table(title="📋 Security Header Audit (worst first)", box=box.SIMPLE, border_style="blue")
+        for column in ("Score", "Grade", "Status", "URL", "Disclosure / Error"):
+            results_table.add_column(column)
+        for result in report.sorted()[:50]:
+            row = result.as_row()
+            detail = result.error or row['Exposição']
+            results_table.add_row(row['Score'], row['Nota'], row['Status'], result.url, detail[:40])
+        self.console.print(results_table)
+        
+        csv_path = os.path.splitext(path)[0] + '_audit.csv'
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(to_csv(report.sorted()))
+        
+        self.console.print(Panel(
+            f"🌐 URLs audited: {len(report.results)} ({len(report.failed)} errors, {len(invalid)} invalid lines)\n"
+            f"⚡ Throughput: {report.per_minute:,.0f} URLs/min in {report.elapsed:.1f}s\n"
+            f"📥 Full results: {csv_path}",
+            title="📊 Audit Summary",
+            border_style="green"
+        ))
+        
+        Prompt.ask("\nPress Enter to continue")
+        
     async def sql_injection_demo(self):
         """SQL injection educational demonstration"""
         
@@ -258,20 +331,21 @@ SELECT * FROM users WHERE username='admin' AND password='' OR '1'='1' --'
         test_username = Prompt.ask("Enter username", default="admin")
         test_password = Prompt.ask("Enter password", default="' OR '1'='1' --")
         
-        # Simulate vulnerable query construction
-        vulnerable_query = f"SELECT * FROM users WHERE username='{test_username}' AND password='{test_password}'"
-        
-        # Analyze the payload
-        injection_indicators = [
-            "' OR '",
-            "' OR 1=1",
-            "' UNION SELECT",
-            "'; DROP TABLE",
-            "' --",
-            "' /*"
-        ]
-        
-        is_injection = any(indicator in test_password.upper() for indicator in [i.upper() for i in injection_indicators])
+        # Send the same credentials to both variants of the local lab
+        lab = get_lab()
+        outcomes = {}
+        for variant in LAB_VARIANTS:
+            response = requests.post(lab.endpoint(variant, 'login'),
+                                     data={'username': test_username, 'password': test_password}, timeout=10)
+            outcomes[variant] = response.json()
+        vulnerable_query = outcomes['vuln'].get('query', '')
+        legitimate = (test_username, test_password) in {(user, password) for user, password, _ in LAB_USERS}
+        is_injection = outcomes['vuln'].get('ok', False) and not legitimate
+        
+        def outcome(result):
+            if result.get('ok'):
+                return f"logged in as {result['user']} ({result['role']})"
+            return result.get('error', 'rejected')
         
         # Show results
         analysis_table = Table(
@@ -284,20 +358,38 @@ SELECT * FROM users WHERE username='admin' AND password='' OR '1'='1' --'
         analysis_table.add_column("Value", style="white", width=40)
         analysis_table.add_column("Risk", style="bold", width=12)
         
-        analysis_table.add_row("Username Input", test_username, "✅ SAFE" if "'" not in test_username else "⚠️ SUSPICIOUS")
-        analysis_table.add_row("Password Input", test_password[:30] + "..." if len(test_password) > 30 else test_password, "🚨 INJECTION" if is_injection else "✅ SAFE")
-        analysis_table.add_row("Resulting Query", vulnerable_query[:40] + "...", "💀 EXPLOITABLE" if is_injection else "✅ NORMAL")
+        detections = {'Username': detect_sqli(test_username), 'Password': detect_sqli(test_password)}
+        for field, value in (('Username', test_username), ('Password', test_password)):
+            analysis_table.add_row(f"{field} Input", value[:30] + "..." if len(value) > 30 else value,
+                                   "🚨 INJECTION" if detections[field].detected else "✅ SAFE")
+        analysis_table.add_row("Executed Query", vulnerable_query, "💀 EXPLOITABLE" if is_injection else "✅ NORMAL")
+        analysis_table.add_row("Lab /vuln login", outcome(outcomes['vuln']), "💀 BYPASSED" if is_injection else "✅ OK")
+        analysis_table.add_row("Lab /safe login", outcome(outcomes['safe']),
+                               "💀 BYPASSED" if outcomes['safe'].get('ok') and not legitimate else "🛡️ HELD")
         
         self.console.print("\n")
         self.console.print(analysis_table)
         
+        # Why the detector flagged the input: token classes folded into a fingerprint
+        for field, detection in detections.items():
+            if not detection.detected:
+                continue
+            tokens = '  '.join(f"{token.value}→{token.type}" for token in detection.tokens)
+            self.console.print(Panel(
+                f"Technique: {detection.name} ({detection.context})\n"
+                f"Tokens: {tokens}\n"
+                f"Fingerprint: {detection.fingerprint}\n\n"
+                f"{detection.explanation}",
+                title=f"🔬 {field} Detector", border_style="yellow"
+            ))
+        
         if is_injection:
             result = """
-🚨 SQL INJECTION DETECTED!
+🚨 SQL INJECTION SUCCEEDED!
 
-This payload would bypass authentication by making the WHERE clause always true.
-The query becomes: username='admin' AND password='' OR '1'='1'
-Since '1'='1' is always true, the entire condition passes!
+The lab's vulnerable login accepted these credentials without the real password.
+The payload rewrote the WHERE clause so it no longer checks the password;
+the fixed variant bound the same text as a plain value and rejected it.
 
 💀 Potential Impact:
 • Unauthorized login
@@ -308,9 +400,9 @@ Since '1'='1' is always true, the entire condition passes!
             border_color = "red"
         else:
             result = """
-✅ INPUT APPEARS SAFE
+✅ NO BYPASS
 
-No common SQL injection patterns detected in this input.
+The vulnerable login did not let these credentials through.
 However, always use proper defenses in real applications!
             """
             border_color = "green"
@@ -386,31 +478,21 @@ However, always use proper defenses in real applications!
         self.console.print("\n🧪 Test XSS payload detection:")
         test_input = Prompt.ask("Enter potential XSS payload", default="<script>alert('test')</script>")
         
-        # XSS detection patterns
-        xss_patterns = [
-            '<script',
-            'javascript:',
-            'onload=',
-            'onerror=',
-            'onclick=',
-            'onmouseover=',
-            'eval(',
-            'alert(',
-            'document.cookie'
-        ]
-        
-        detected_patterns = [pattern for pattern in xss_patterns if pattern.lower() in test_input.lower()]
-        is_xss = len(detected_patterns) > 0
+        # Tokenize the input as HTML in text and attribute contexts, and as a JavaScript string
+        detection = detect_xss(test_input)
+        is_xss = detection.detected
         
         # Analysis results
         analysis = f"""
 🔍 XSS Analysis Results:
 
 Input: {test_input}
-Detected Patterns: {', '.join(detected_patterns) if detected_patterns else 'None'}
+Technique: {detection.name}
+Context: {detection.context or '-'}
+Construct: {detection.fingerprint or 'None'}
 Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
 
-{'⚠️ This input contains suspicious JavaScript patterns!' if is_xss else '✅ No obvious XSS patterns detected.'}
+{detection.explanation if is_xss else '✅ No executable HTML or JavaScript construct found.'}
         """
         
         self.console.print(Panel(
@@ -419,6 +501,20 @@ Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
             border_style="red" if is_xss else "green"
         ))
         
+        # What the local lab actually sends back for this input
+        lab = get_lab()
+        reflection_table = Table(title="🔬 Lab Search Page Response", box=box.ROUNDED, border_style="orange3")
+        reflection_table.add_column("Variant", style="bold cyan", width=10)
+        reflection_table.add_column("Rendered HTML", style="white", width=50)
+        reflection_table.add_column("Result", style="bold", width=18)
+        for variant in LAB_VARIANTS:
+            page = requests.get(lab.endpoint(variant, 'search'), params={'q': test_input}, timeout=10).text
+            start = page.find('Resultados para: ')
+            snippet = page[start:page.find('</p>', start)] if start >= 0 else page[:80]
+            raw = test_input != html.escape(test_input) and test_input in page
+            reflection_table.add_row(f"/{variant}", snippet, "💀 EXECUTES" if raw else "🛡️ ESCAPED")
+        self.console.print(reflection_table)
+        
         # XSS prevention techniques
         prevention_guide = """
 🛡️ XSS PREVENTION TECHNIQUES:
@@ -490,6 +586,19 @@ Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
         self.console.print("\n")
         self.console.print(cookie_table)
         
+        # Real Set-Cookie headers from the local lab's login, both variants
+        lab = get_lab()
+        lab_table = Table(title="🔬 Lab Session Cookies", box=box.ROUNDED, border_style="blue")
+        lab_table.add_column("Variant", style="bold cyan", width=10)
+        lab_table.add_column("Set-Cookie", style="white", width=60)
+        for variant in LAB_VARIANTS:
+            response = requests.post(lab.endpoint(variant, 'login'), data={'username': 'aluno', 'password': 'aluno123'},
+                                     timeout=10)
+            lab_table.add_row(f"/{variant}", response.headers.get('Set-Cookie', '-'))
+        self.console.print(lab_table)
+        self.console.print("[dim]The /vuln cookie is unsigned base64 JSON readable by scripts; "
+                           "the /safe one is a random server-side token with HttpOnly and SameSite.[/dim]")
+        
         # Interactive cookie builder
         self.console.print("\n🔨 Cookie Security Builder:")
         
@@ -583,13 +692,14 @@ Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
             border_style="purple"
         ))
         
-        target_url = Prompt.ask("🌐 Enter target URL", default="https://httpbin.org")
+        target_url = Prompt.ask("🌐 Enter target URL (default: the local lab)", default=get_lab().endpoint('vuln', 'comments'))
         
         try:
             # Gather information
             self.console.print(f"\n🔍 Gathering information from: {target_url}")
             
-            response = requests.get(target_url, timeout=10)
+            # Body capped by the shared client; a second look at the same site is served from its cache
+            response = self.http.get(normalize_url(target_url))
             
             # Create reconnaissance report
             recon_table = Table(
@@ -603,9 +713,10 @@ Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
             recon_table.add_column("Intelligence", style="dim white", width=20)
             
             # Basic information
-            recon_table.add_row("HTTP Status", str(response.status_code), "Service status")
-            recon_table.add_row("Response Time", f"{response.elapsed.total_seconds():.2f}s", "Server performance")
-            recon_table.add_row("Content Length", f"{len(response.content)} bytes", "Response size")
+            recon_table.add_row("HTTP Status", str(response.status), "Service status")
+            recon_table.add_row("Response Time", f"{response.elapsed:.2f}s ({response.source})", "Server performance")
+            recon_table.add_row("Content Length", f"{response.size or len(response.body)} bytes"
+                                + (" (truncated)" if response.truncated else ""), "Response size")
             
             # Server information
             server_info = response.headers.get('server', 'Not disclosed')
@@ -624,39 +735,50 @@ Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
             self.console.print("\n")
             self.console.print(recon_table)
             
-            # Technology fingerprinting
-            tech_indicators = {
-                'PHP': ['x-powered-by', 'set-cookie'],
-                'ASP.NET': ['x-aspnet-version', 'x-aspnetmvc-version'],
-                'Apache': ['server'],
-                'Nginx': ['server'],
-                'IIS': ['server'],
-                'Cloudflare': ['cf-ray', 'cf-cache-status'],
-                'WordPress': ['x-pingback']
-            }
-            
-            detected_tech = []
-            for tech, indicators in tech_indicators.items():
-                for indicator in indicators:
-                    if indicator in response.headers:
-                        header_value = response.headers[indicator].lower()
-                        if tech.lower() in header_value:
-                            detected_tech.append(f"{tech} ({header_value})")
-                            break
-                        elif tech == 'PHP' and 'php' in header_value:
-                            detected_tech.append(f"PHP ({header_value})")
-                        elif tech == 'Apache' and 'apache' in header_value:
-                            detected_tech.append(f"Apache ({header_value})")
-                        elif tech == 'Nginx' and 'nginx' in header_value:
-                            detected_tech.append(f"Nginx ({header_value})")
+            # The response time above mixes every phase; measure them separately, cold and over keep-alive
+            try:
+                timings = compare_timings(normalize_url(target_url), samples=5)
+            except (OSError, ValueError) as e:
+                timings = None
+                self.console.print(f"[yellow]⚠️ Timing breakdown unavailable: {e}[/yellow]")
+            if timings:
+                timing_table = Table(title="⏱️ Timing Breakdown (5 samples, ms)", box=box.ROUNDED,
+                                     border_style="purple")
+                timing_table.add_column("Phase", style="bold cyan", width=16)
+                for mode in ('Cold', 'Keep-alive'):
+                    timing_table.add_column(f"{mode} p50", justify="right")
+                    timing_table.add_column(f"{mode} p95", justify="right")
+                labels = {'dns': 'DNS', 'connect': 'TCP connect', 'tls': 'TLS handshake', 'ttfb': 'First byte',
+                          'transfer': 'Transfer', 'total': 'Total'}
+                for phase in PHASES + ('total',):
+                    timing_table.add_row(labels[phase], *(f"{report.percentile(phase, p) * 1000:.1f}"
+                                                          for report in timings.values() for p in (50, 95)))
+                self.console.print(timing_table)
+                cold, warm = timings['frio'], timings['quente']
+                timing_note = (f" (first byte p50 {cold.percentile('ttfb', 50) * 1000:.1f} ms, keep-alive saves "
+                               f"{(cold.percentile('total', 50) - warm.percentile('total', 50)) * 1000:.1f} ms)")
+            else:
+                timing_note = ""
+            
+            # Technology fingerprinting: headers, cookies, meta tags, script URLs and markup
+            technologies = detect_technologies(response.headers, response.text)
+            detected_tech = [f"{t.name} {t.version}".strip() + f" ({', '.join(t.categories)})" for t in technologies]
+            
+            if technologies:
+                tech_table = Table(title="🧬 Technology Fingerprint", box=box.ROUNDED, border_style="cyan")
+                for column in technologies[0].as_row():
+                    tech_table.add_column(column, style="bold cyan" if column == 'Tecnologia' else "white")
+                for tech in technologies:
+                    tech_table.add_row(*tech.as_row().values())
+                self.console.print(tech_table)
             
             # Information summary
             summary = f"""
 🎯 Reconnaissance Summary:
 
 🔍 Target: {target_url}
-📊 Response: {response.status_code} ({response.reason})
-⏱️ Response Time: {response.elapsed.total_seconds():.2f} seconds
+📊 Response: {response.status} ({response.reason})
+⏱️ Response Time: {response.elapsed:.2f} seconds{timing_note}
 
 💻 Technology Stack:
 {chr(10).join([f'• {tech}' for tech in detected_tech]) if detected_tech else '• Technology fingerprinting inconclusive'}
@@ -674,7 +796,10 @@ Risk Level: {'🚨 HIGH - Potential XSS' if is_xss else '✅ Safe'}
             
             self.console.print(Panel(summary.strip(), title="📊 Intelligence Report", border_style="blue"))
             
-        except requests.RequestException as e:
+            if Confirm.ask("\n🕸️ Map the site with the crawler?", default=False):
+                await self.site_map(response.url)
+            
+        except (requests.RequestException, ValueError) as e:
             self.console.print(Panel(
                 f"❌ Reconnaissance failed: {str(e)}\n\n"
                 "Possible reasons:\n"
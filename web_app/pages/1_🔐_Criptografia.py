@@ -21,6 +21,7 @@ root_dir = Path(__file__).parent.parent.parent
 sys.path.append(str(root_dir))
 
 from web_app.utils.helpers import setup_page_config, load_custom_css, display_status_alert
+from core.socket_audit import SUPPORTED as SOCKET_AUDIT_SUPPORTED, SocketAuditor
 
 # Configuração da página
 setup_page_config()
@@ -2199,6 +2200,60 @@ elif atividade == "🛡️ Protegendo Seu Computador":
         </div>
     </div>
     """, unsafe_allow_html=True)
+    
+    # Auditor de portas de dentro para fora: o kernel diz o que escuta e qual processo é o dono
+    st.subheader("🔎 Auditor de Portas: o que está escutando no SEU computador")
+    st.markdown("""
+    Um port scan enxerga a máquina **de fora** e só descobre que a porta está aberta.
+    Aqui a leitura é **de dentro**: `/proc/net/tcp`, `tcp6` e `udp` listam cada socket escutando,
+    e os links em `/proc/<pid>/fd` revelam o processo dono. Feche o que você não reconhece!
+    """)
+    
+    if not SOCKET_AUDIT_SUPPORTED:
+        st.info("ℹ️ O auditor lê o /proc do Linux. No Windows, `netstat -ano` mostra a mesma coisa "
+                "(PID na última coluna); no macOS, `lsof -nP -iTCP -sTCP:LISTEN`.")
+    else:
+        auto_atualizar = st.checkbox("🔄 Atualizar a cada segundo", key="auditor_auto")
+        
+        # Só o painel do auditor roda de novo a cada segundo; o resto da página fica parado
+        @st.fragment(run_every="1s" if auto_atualizar else None)
+        def painel_auditor():
+            if 'socket_auditor' not in st.session_state:
+                st.session_state.socket_auditor = SocketAuditor()
+                st.session_state.socket_eventos = []
+        
+            snapshot, mudancas = st.session_state.socket_auditor.refresh()
+            hora = time.strftime('%H:%M:%S', time.localtime(snapshot.taken))
+            for evento, sockets in (("🟢 começou a escutar", mudancas.appeared), ("🔴 parou de escutar", mudancas.disappeared)):
+                for sock in sockets:
+                    st.session_state.socket_eventos.insert(0, dict({'Hora': hora, 'Evento': evento}, **sock.as_row()))
+            del st.session_state.socket_eventos[100:]
+        
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("👂 Sockets Escutando", len(snapshot.sockets))
+            with col2:
+                st.metric("🌐 Expostos à Rede", len(snapshot.exposed))
+            with col3:
+                st.metric("🚨 Alertas", len([s for s in snapshot.sockets if s.warning]))
+            with col4:
+                st.metric("⚡ Custo do Snapshot", f"{snapshot.cpu * 1000:.1f} ms",
+                          "índice reconstruído" if snapshot.index_rebuilt else "índice em cache", delta_color="off")
+        
+            st.dataframe([sock.as_row() for sock in snapshot.sockets], use_container_width=True)
+        
+            for sock in snapshot.sockets:
+                if sock.warning:
+                    st.warning(f"⚠️ {sock.as_row()['Endereço']} ({sock.process}): {sock.warning}. "
+                               "Se não precisa dele na rede, faça-o escutar só em 127.0.0.1 ou bloqueie no firewall.")
+            if any(s.process == 'sem permissão' for s in snapshot.sockets):
+                st.caption("🔒 'sem permissão': o processo pertence a outro usuário; rode como root para ver o dono.")
+        
+            if st.session_state.socket_eventos:
+                st.markdown("**📜 Mudanças desde que você abriu esta página**")
+                st.dataframe(st.session_state.socket_eventos, use_container_width=True)
+        
+        painel_auditor()
 
 # ==============================================================================
 # GUERRA CIBERNÉTICA CORPORATIVA
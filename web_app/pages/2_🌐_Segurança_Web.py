@@ -4,9 +4,12 @@ Laboratório interativo e gamificado para aprendizado de segurança web
 """
 
 import streamlit as st
+import altair as alt
+import asyncio
 import requests
 import base64
 import urllib.parse
+import html
 import re
 import time
 import random
@@ -19,6 +22,17 @@ root_dir = Path(__file__).parent.parent.parent
 sys.path.append(str(root_dir))
 
 from web_app.utils.helpers import setup_page_config, load_custom_css, display_status_alert
+from core.http_client import get_client as get_http_client, normalize_url
+from core.security_headers import analyze as analisar_headers
+from core.header_audit import (DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_TIMEOUT, audit as auditar_headers,
+                               parse_urls, to_csv as exportar_auditoria_csv)
+from core.web_crawler import (DEFAULT_CONCURRENCY as CRAWL_CONCURRENCY, DEFAULT_MAX_DEPTH as CRAWL_MAX_DEPTH,
+                              crawl_site)
+from core.tech_fingerprint import detect as detectar_tecnologias
+from core.vuln_lab import USERS as USUARIOS_LAB, SESSION_COOKIE, decode_session, encode_session, get_lab
+from core.injection_detect import detect as detectar_injecao
+from core.http_timing import (DEFAULT_SAMPLES as AMOSTRAS_TEMPO, PERCENTILES, PHASE_NAMES,
+                              compare as comparar_tempos)
 
 # Configuração da página
 setup_page_config()
@@ -279,6 +293,38 @@ def adicionar_pontos(pontos, descricao):
     elif st.session_state.pontos_web >= 50:
         st.session_state.nivel_hacker = "Script Kiddie"
 
+# Laboratório local: os simuladores atacam um servidor HTTP de verdade em 127.0.0.1
+CREDENCIAIS_LAB = {(usuario, senha) for usuario, senha, _ in USUARIOS_LAB}
+
+def sessao_lab():
+    """Sessão HTTP do aluno contra o laboratório; guarda os cookies entre as interações"""
+    if 'sessao_lab' not in st.session_state:
+        st.session_state.sessao_lab = requests.Session()
+    return st.session_state.sessao_lab
+
+def variante_lab(chave):
+    """Seletor comum aos simuladores: versão vulnerável ou corrigida do laboratório"""
+    corrigida = st.checkbox("🛡️ Atacar a versão corrigida do laboratório", key=chave,
+                            help="Mesma aplicação com consultas parametrizadas, saída escapada e sessões no servidor")
+    return 'safe' if corrigida else 'vuln'
+
+def painel_detector(texto):
+    """Explica o payload como um WAF o enxerga: tokens, fingerprint e a técnica reconhecida"""
+    deteccao = detectar_injecao(texto)
+    titulo = f"🔬 Detector: {deteccao.name}" if deteccao.detected else "🔬 Detector: nenhum ataque reconhecido"
+    with st.expander(titulo, expanded=deteccao.detected):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Ataque", deteccao.as_row()['Ataque'])
+        col2.metric("Contexto", deteccao.context or '-')
+        col3.metric("Fingerprint", deteccao.fingerprint or '-')
+        st.markdown(deteccao.explanation)
+        if deteccao.tokens:
+            st.caption("Como o banco lê o input: cada token vira uma classe, e a sequência das 5 primeiras é o "
+                       "fingerprint comparado com formatos de ataque conhecidos. Maiúsculas, comentários e espaços "
+                       "não mudam o fingerprint.")
+            st.dataframe([token.as_row() for token in deteccao.tokens], use_container_width=True)
+    return deteccao
+
 # Status do usuário
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 🏆 Seu Status")
@@ -452,16 +498,18 @@ elif atividade_web == "💉 SQL Injection Playground":
     </div>
     """, unsafe_allow_html=True)
     
-    # Simulador de login vulnerável
+    # Login de verdade contra o laboratório local
     st.subheader("🎮 Simulador: Hackeie Este Login!")
     
     st.markdown("""
     <div class="attack-simulator">
-        <h3>🚨 SITE VULNERÁVEL SIMULADO</h3>
+        <h3>🚨 SITE VULNERÁVEL DE VERDADE (127.0.0.1)</h3>
         <p>Tente fazer login sem conhecer a senha usando SQL Injection!</p>
     </div>
     """, unsafe_allow_html=True)
     
+    variante_sql = variante_lab("sql_variante")
+    
     col1, col2 = st.columns(2)
     
     with col1:
@@ -470,36 +518,31 @@ elif atividade_web == "💉 SQL Injection Playground":
         password = st.text_input("🔐 Senha:", type="password", placeholder="Tente: ' OR '1'='1")
         
         if st.button("🚀 Tentar Login"):
-            # Simular SQL injection
-            sql_query = f"SELECT * FROM users WHERE username='{username}' AND password='{password}'"
-            
-            st.code(f"Query SQL gerada:\n{sql_query}")
+            lab = get_lab()
+            resposta = sessao_lab().post(lab.endpoint(variante_sql, 'login'),
+                                         data={'username': username, 'password': password}, timeout=10)
+            resultado = resposta.json()
             
-            # Verificar payloads comuns
-            payloads_sucesso = [
-                "' OR '1'='1",
-                "' OR 1=1--",
-                "admin'--",
-                "' UNION SELECT * FROM users--"
-            ]
+            painel_detector(password if detectar_injecao(password).detected or not username else username)
+            if resultado.get('query'):
+                st.code(f"Query SQL executada:\n{resultado['query']}", language='sql')
+            else:
+                st.code("Query SQL executada:\nSELECT id, username, role, password_hash FROM users WHERE username = ?\n"
+                        "-- a senha é conferida com PBKDF2, fora do SQL", language='sql')
             
-            if any(payload in password for payload in payloads_sucesso) or any(payload in username for payload in payloads_sucesso):
-                st.success("🚨 **HACK SUCESSFUL!** Login bypassed!")
+            if resultado.get('ok') and (username, password) not in CREDENCIAIS_LAB:
+                st.success(f"🚨 **HACK SUCESSFUL!** Login bypassed! Logado como **{resultado['user']}** "
+                           f"({resultado['role']}), a consulta devolveu {resultado.get('rows', 1)} linhas")
                 st.balloons()
                 adicionar_pontos(50, "SQL Injection executada com sucesso!")
-                
-                # Mostrar dados "vazados"
-                st.markdown("""
-                <div class="hacker-terminal">
-                    <h3>💀 DADOS VAZADOS:</h3>
-                    <p>admin:$2y$10$92IXUNpkjO0rOQ5byMi.Ye4oKoEa3Ro9llC/.og/at2.uheWG/igi</p>
-                    <p>john:password123</p>
-                    <p>sarah:qwerty456</p>
-                    <p>mike:letmein789</p>
-                </div>
-                """, unsafe_allow_html=True)
+            elif resultado.get('ok'):
+                st.info(f"✅ Login legítimo como {resultado['user']}. Agora tente sem a senha!")
+            elif resposta.status_code == 500:
+                st.error(f"💥 Erro do banco exposto ao atacante: {resultado['error']}")
+                st.caption("Mensagens de erro do SQL ajudam o atacante a ajustar o payload (error-based SQLi).")
             else:
-                st.error("❌ Login falhou. Tente usar SQL injection!")
+                st.error("❌ Login falhou. " + ("Tente usar SQL injection!" if variante_sql == 'vuln'
+                                                else "Consultas parametrizadas tratam o payload como texto."))
     
     with col2:
         st.markdown("### 🎓 Dicas de SQL Injection")
@@ -548,6 +591,32 @@ AND password='...'
 # Muito poderoso para exfiltração
             """)
     
+    # UNION de verdade: a busca de produtos devolve duas colunas
+    st.markdown("---")
+    st.subheader("💀 UNION Attack: Extraia a Tabela de Usuários")
+    st.markdown("A busca de produtos do laboratório monta o SQL por concatenação. Duas colunas: nome e preço.")
+    
+    busca_union = st.text_input("🔎 Buscar produto:", value="' UNION SELECT username, password FROM users--")
+    if st.button("🔎 Executar Busca"):
+        lab = get_lab()
+        resposta = requests.get(lab.endpoint(variante_sql, 'search'), params={'q': busca_union, 'format': 'json'},
+                                timeout=10)
+        resultado = resposta.json()
+        st.code(resultado['query'], language='sql')
+        painel_detector(busca_union)
+        if resultado['error']:
+            st.error(f"💥 Erro do banco: {resultado['error']}")
+        st.dataframe([{'Coluna 1': str(a), 'Coluna 2': str(b)} for a, b in resultado['rows']], use_container_width=True)
+        vazados = [a for a, b in resultado['rows'] if (a, b) in CREDENCIAIS_LAB]
+        if vazados:
+            st.markdown(f"""
+            <div class="hacker-terminal">
+                <h3>💀 DADOS VAZADOS:</h3>
+                <p>{len(vazados)} usuários com senha em texto puro: {html.escape(', '.join(vazados))}</p>
+            </div>
+            """, unsafe_allow_html=True)
+            adicionar_pontos(50, "Tabela de usuários extraída com UNION!")
+    
     # Quiz sobre SQL Injection
     st.markdown("---")
     st.subheader("🧠 Quiz: Você é um SQL Injection Master?")
@@ -598,6 +667,7 @@ elif atividade_web == "🎭 XSS Attack Simulator":
             "🕷️ DOM-based XSS (Mais técnico)"
         ]
     )
+    variante_xss = variante_lab("xss_variante")
     
     if "Reflected" in xss_type:
         st.subheader("🔴 Reflected XSS Simulator")
@@ -615,21 +685,28 @@ elif atividade_web == "🎭 XSS Attack Simulator":
         )
         
         if st.button("🚀 Buscar"):
-            # Simular XSS refletido
-            if "<script>" in search_query.lower() or "javascript:" in search_query.lower():
-                st.error("🚨 **XSS DETECTADO!** Payload executado com sucesso!")
+            # A busca do laboratório devolve o HTML que o navegador da vítima renderizaria
+            resposta = requests.get(get_lab().endpoint(variante_xss, 'search'), params={'q': search_query}, timeout=10)
+            trecho = re.search(r'<p>Resultados para: .*?</p>', resposta.text, re.S)
+            st.code(f"HTML gerado pelo servidor:\n{trecho.group() if trecho else resposta.text[:500]}", language='html')
+            painel_detector(search_query)
+            
+            if search_query != html.escape(search_query) and search_query in resposta.text:
+                st.error("🚨 **XSS DETECTADO!** O payload voltou sem escape e seria executado!")
                 st.markdown(f"""
                 <div class="hacker-terminal">
-                    <h3>💀 PAYLOAD EXECUTADO:</h3>
-                    <p>Input do usuário: {search_query}</p>
-                    <p>HTML gerado: &lt;div&gt;Resultados para: {search_query}&lt;/div&gt;</p>
-                    <p>🚨 JavaScript malicioso foi executado no navegador da vítima!</p>
+                    <h3>💀 PAYLOAD REFLETIDO:</h3>
+                    <p>Input do usuário: {html.escape(search_query)}</p>
+                    <p>🚨 JavaScript malicioso seria executado no navegador da vítima!</p>
                 </div>
                 """, unsafe_allow_html=True)
                 adicionar_pontos(40, "XSS attack executado!")
                 st.balloons()
+            elif search_query != html.escape(search_query):
+                st.success("🛡️ O servidor escapou o payload: o navegador mostra o texto, não executa.")
+                st.caption(f"CSP da resposta: {resposta.headers.get('Content-Security-Policy', 'ausente')}")
             else:
-                st.info(f"Resultados da busca para: '{search_query}' (nenhum resultado encontrado)")
+                st.info(f"Resultados da busca para: '{search_query}' (sem HTML no input, nada a explorar)")
         
         # Payloads comuns
         st.subheader("🕷️ Payloads XSS Populares")
@@ -664,21 +741,32 @@ elif atividade_web == "🎭 XSS Attack Simulator":
         )
         
         if st.button("📝 Postar Comentário"):
-            if "<script>" in comentario.lower():
-                st.error("🚨 **STORED XSS!** Comentário malicioso salvo!")
+            lab = get_lab()
+            resposta = requests.post(lab.endpoint(variante_xss, 'comments'), data={'author': nome, 'body': comentario},
+                                     timeout=10)
+            pagina = resposta.text
+            painel_detector(comentario)
+            if comentario and comentario != html.escape(comentario) and comentario in pagina:
+                st.error("🚨 **STORED XSS!** Comentário malicioso salvo e servido sem escape!")
                 st.markdown(f"""
                 <div class="hacker-terminal">
                     <h3>💀 ATAQUE PERSISTENTE CRIADO!</h3>
-                    <p>Autor: {nome}</p>
-                    <p>Payload: {comentario}</p>
-                    <p>🚨 Este código será executado para TODOS os visitantes!</p>
-                    <p>💀 Potencial para roubar cookies de milhares de usuários!</p>
+                    <p>Autor: {html.escape(nome)}</p>
+                    <p>Payload: {html.escape(comentario)}</p>
+                    <p>🚨 Este código será executado para TODOS os visitantes de {lab.endpoint(variante_xss, 'comments')}!</p>
                 </div>
                 """, unsafe_allow_html=True)
                 adicionar_pontos(60, "Stored XSS - o mais perigoso!")
-            else:
+            elif resposta.ok:
                 st.success(f"✅ Comentário de {nome} postado com sucesso!")
-                st.info(f"💬 {comentario}")
+                if comentario != html.escape(comentario):
+                    st.info("🛡️ Ficou salvo como digitado, mas a página escapa o HTML na saída.")
+            else:
+                st.error(f"❌ Comentário recusado: {resposta.json().get('error', resposta.status_code)}")
+            comentarios = requests.get(lab.endpoint(variante_xss, 'comments'), params={'format': 'json'},
+                                       timeout=10).json()['comments']
+            with st.expander(f"💬 {len(comentarios)} comentários no banco do laboratório"):
+                st.dataframe([{'Autor': a, 'Comentário': c} for a, c in comentarios], use_container_width=True)
     
     # Jogo: XSS Defense
     st.markdown("---")
@@ -723,50 +811,66 @@ elif atividade_web == "🍪 Cookie Monster Lab":
     </div>
     """, unsafe_allow_html=True)
     
-    # Simulador de cookie hijacking
+    # Cookies de verdade: login como 'aluno' nas duas versões do laboratório
     st.subheader("🎮 Simulador: Session Hijacking")
+    lab = get_lab()
+    sessao = sessao_lab()
     
-    # Mostrar cookies "capturados"
-    cookies_simulados = {
-        "sessionid": "abc123def456ghi789",
-        "user": "admin",
-        "role": "user",
-        "cart": "item1,item2,item3",
-        "preferences": "dark_mode=true"
-    }
+    if st.button("🔑 Entrar no laboratório como 'aluno' (senha aluno123)"):
+        for variante in ('vuln', 'safe'):
+            sessao.post(lab.endpoint(variante, 'login'), data={'username': 'aluno', 'password': 'aluno123'}, timeout=10)
     
-    st.markdown("### 🍪 Cookies Capturados da Vítima:")
+    cookies_lab = [c for c in sessao.cookies if c.name == SESSION_COOKIE]
+    if not cookies_lab:
+        st.info("Faça login para receber os cookies de sessão das duas versões.")
     
-    for nome, valor in cookies_simulados.items():
+    st.markdown("### 🍪 Cookies Capturados da Vítima:")
+    for cookie in cookies_lab:
         col1, col2, col3 = st.columns([1, 2, 1])
-        
         with col1:
-            st.code(nome)
+            st.code(f"{cookie.name} ({cookie.path})")
         with col2:
-            st.code(valor)
+            st.code(cookie.value)
         with col3:
-            if st.button(f"📝 Editar", key=f"edit_{nome}"):
-                novo_valor = st.text_input(f"Novo valor para {nome}:", value=valor, key=f"new_{nome}")
-                if nome == "role" and novo_valor == "admin":
-                    st.success("🚨 **PRIVILEGE ESCALATION!** Você agora é admin!")
-                    adicionar_pontos(50, "Cookie modificado para admin!")
+            flags = [flag for flag in ('HttpOnly', 'SameSite') if cookie.has_nonstandard_attr(flag)
+                     or cookie.has_nonstandard_attr(flag.lower())]
+            st.code(', '.join(flags) or 'sem flags')
     
     # Jogo de cookie hijacking
     st.markdown("---")
     st.subheader("🎯 Desafio: Transforme-se em Admin")
     
-    if st.button("🍪 Modificar Cookie 'role' para 'admin'"):
-        st.success("🏆 **HACK SUCESSFUL!** Você escalou privilégios!")
-        st.balloons()
-        st.markdown("""
-        <div class="hacker-terminal">
-            <h3>💀 SESSÃO SEQUESTRADA!</h3>
-            <p>Cookie original: role=user</p>
-            <p>Cookie modificado: role=admin</p>
-            <p>🚨 Agora você tem acesso administrativo total!</p>
-        </div>
-        """, unsafe_allow_html=True)
-        adicionar_pontos(75, "Session hijacking bem-sucedido!")
+    cookie_vuln = next((c.value for c in cookies_lab if c.path == '/vuln'), '')
+    conteudo = decode_session(cookie_vuln) if cookie_vuln else None
+    if conteudo:
+        st.markdown("O cookie da versão vulnerável é só JSON em base64, sem assinatura:")
+        st.code(str(conteudo))
+        novo_papel = st.text_input("Novo valor para 'role':", value=conteudo.get('role', 'user'))
+        
+        if st.button("🍪 Modificar Cookie 'role' e Enviar"):
+            forjado = encode_session({**conteudo, 'role': novo_papel})
+            col1, col2 = st.columns(2)
+            vistos = {}
+            for coluna, variante in ((col1, 'vuln'), (col2, 'safe')):
+                resposta = requests.get(lab.endpoint(variante, 'me'), cookies={SESSION_COOKIE: forjado}, timeout=10)
+                vistos[variante] = resposta.json()
+                with coluna:
+                    st.markdown(f"**/{variante}/me** → HTTP {resposta.status_code}")
+                    st.json(vistos[variante])
+            if vistos['vuln'].get('role') == 'admin':
+                st.success("🏆 **HACK SUCESSFUL!** Você escalou privilégios!")
+                st.balloons()
+                st.markdown(f"""
+                <div class="hacker-terminal">
+                    <h3>💀 SESSÃO SEQUESTRADA!</h3>
+                    <p>Cookie original: role={html.escape(conteudo.get('role', ''))}</p>
+                    <p>Cookie modificado: role=admin</p>
+                    <p>🚨 A versão vulnerável acreditou; a corrigida só conhece tokens guardados no servidor.</p>
+                </div>
+                """, unsafe_allow_html=True)
+                adicionar_pontos(75, "Session hijacking bem-sucedido!")
+    elif cookies_lab:
+        st.info("O cookie da versão vulnerável não está na sessão: faça login de novo.")
 
 # ==============================================================================
 # SECURITY HEADERS INSPECTOR
@@ -779,62 +883,292 @@ elif atividade_web == "🚫 Security Headers Inspector":
     </div>
     """, unsafe_allow_html=True)
     
-    # Inspector de headers
-    url_inspecionar = st.text_input(
-        "🔍 URL para analisar headers:",
-        placeholder="https://example.com"
-    )
+    modo_headers = st.radio("Modo de análise:", ["🔍 Uma URL", "📋 Auditoria em massa", "⏱️ Tempo de resposta"],
+                            horizontal=True)
     
-    if st.button("🚀 Analisar Headers") and url_inspecionar:
-        try:
-            # Simular análise de headers (em produção, usaria requests real)
-            headers_simulados = {
-                "X-Content-Type-Options": "nosniff",
-                "X-Frame-Options": "MISSING ⚠️",
-                "X-XSS-Protection": "1; mode=block", 
-                "Strict-Transport-Security": "MISSING ⚠️",
-                "Content-Security-Policy": "MISSING ⚠️",
-                "Referrer-Policy": "strict-origin-when-cross-origin"
-            }
-            
+    if modo_headers == "🔍 Uma URL":
+        # Inspector de headers
+        url_inspecionar = st.text_input(
+            "🔍 URL para analisar headers:",
+            placeholder="https://example.com"
+        )
+        
+        if st.button("🚀 Analisar Headers") and url_inspecionar:
+            try:
+                # Só os headers (HEAD) pela sessão compartilhada: conexões reaproveitadas e respostas em cache
+                with st.spinner("Buscando headers..."):
+                    resposta = get_http_client().head(normalize_url(url_inspecionar))
+                st.session_state.headers_inspecao = (analisar_headers(resposta.headers, resposta.url, resposta.status),
+                                                     resposta)
+            except (requests.RequestException, ValueError) as e:
+                st.session_state.headers_inspecao = None
+                st.error(f"Erro na análise: {e}")
+        
+        if st.session_state.get('headers_inspecao'):
+            relatorio, resposta = st.session_state.headers_inspecao
+        
             st.subheader("📊 Análise de Security Headers")
-            
-            score = 0
-            max_score = len(headers_simulados)
-            
-            for header, value in headers_simulados.items():
+            origem = {'rede': 'rede', 'cache': 'cache local', 'revalidado': 'cache revalidado (304)'}[resposta.source]
+            st.caption(f"{resposta.url} • HTTP {resposta.status} • {resposta.method} em "
+                       f"{resposta.elapsed * 1000:.0f} ms • origem: {origem}")
+        
+            for achado in relatorio.findings:
                 col1, col2, col3 = st.columns([2, 2, 1])
-                
+            
                 with col1:
-                    st.markdown(f"**{header}**")
+                    st.markdown(f"**{achado.header}**")
+                    st.caption(achado.protects)
                 with col2:
-                    if "MISSING" in value:
-                        st.error(value)
+                    if achado.passed:
+                        st.success(achado.value or "Coberto por CSP frame-ancestors")
+                    elif achado.weight:
+                        st.error(achado.value or "MISSING ⚠️")
                     else:
-                        st.success(value)
-                        score += 1
+                        st.info("Ausente (informativo)")
                 with col3:
-                    if st.button("ℹ️", key=f"info_{header}"):
-                        if header == "X-Frame-Options":
-                            st.info("Protege contra clickjacking attacks")
-                        elif header == "Content-Security-Policy":
-                            st.info("Previne ataques XSS e injection")
-                        elif header == "Strict-Transport-Security":
-                            st.info("Força conexões HTTPS")
-            
+                    st.markdown(achado.as_row()['Pontos'])
+        
+            for header, valor in relatorio.disclosed.items():
+                st.warning(f"**{header}: {valor}** revela a tecnologia do servidor")
+        
             # Score de segurança
-            percentage = (score / max_score) * 100
-            st.metric("🏆 Score de Segurança", f"{percentage:.0f}%")
-            
-            if percentage >= 80:
+            st.metric("🏆 Score de Segurança", f"{relatorio.score}%")
+        
+            if relatorio.grade == 'EXCELENTE':
                 st.success("✅ Site bem protegido!")
-            elif percentage >= 50:
+            elif relatorio.grade == 'MODERADO':
                 st.warning("⚠️ Proteção moderada")
             else:
                 st.error("🚨 Site muito vulnerável!")
+        
+            if relatorio.recommendations:
+                st.markdown("**💡 Recomendações:**\n" + "\n".join(f"- {r}" for r in relatorio.recommendations))
+        
+            resumo_cache = get_http_client().summary()
+            st.caption(f"Cache HTTP: {resumo_cache['entries']} respostas guardadas • "
+                       f"{resumo_cache['hit_rate']:.0%} das análises sem baixar nada de novo")
+    elif modo_headers == "📋 Auditoria em massa":
+        st.markdown("Cole uma URL por linha (linhas com `#` são comentários) ou envie um arquivo `.txt`.")
+        texto_urls = st.text_area("📋 URLs para auditar:", height=150,
+                                  placeholder="https://example.com\nhttps://example.org")
+        arquivo_urls = st.file_uploader("📁 Ou envie uma lista de URLs", type=['txt', 'csv'])
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            concorrencia = st.slider("Requisições simultâneas (total)", 1, 500, DEFAULT_CONCURRENCY)
+        with col2:
+            por_host = st.slider("Simultâneas por host", 1, 20, DEFAULT_PER_HOST)
+        with col3:
+            tempo_limite = st.slider("Timeout por URL (s)", 1, 30, int(DEFAULT_TIMEOUT))
+        
+        if st.button("🚀 Auditar em Massa"):
+            texto = texto_urls
+            if arquivo_urls is not None:
+                texto += "\n" + arquivo_urls.getvalue().decode('utf-8', errors='replace')
+            urls, invalidas = parse_urls(texto)
+            
+            if not urls:
+                st.error("Nenhuma URL válida encontrada.")
+            else:
+                progresso = st.progress(0.0, text=f"0/{len(urls)} URLs")
+                tabela_parcial = st.empty()
+                parciais = []
+                
+                def mostrar_resultado(resultado, feitos, total):
+                    parciais.append(resultado)
+                    progresso.progress(feitos / total, text=f"{feitos}/{total} URLs")
+                    # Redesenhar a tabela a cada resultado travaria o navegador com milhares de URLs
+                    if feitos == total or feitos % max(1, total // 20) == 0:
+                        tabela_parcial.dataframe([r.as_row() for r in parciais[-200:]], use_container_width=True)
                 
-        except Exception as e:
-            st.error("Erro na análise. Usando dados simulados para demonstração.")
+                relatorio_massa = asyncio.run(auditar_headers(urls, concorrencia, por_host, tempo_limite,
+                                                              on_result=mostrar_resultado))
+                tabela_parcial.empty()
+                progresso.empty()
+                st.session_state.headers_auditoria = relatorio_massa._replace(invalid=invalidas)
+                if len(urls) >= 10:
+                    adicionar_pontos(30, f"Auditoria de {len(urls)} sites!")
+        
+        relatorio_massa = st.session_state.get('headers_auditoria')
+        if relatorio_massa:
+            resultados = relatorio_massa.sorted()
+            analisados = [r for r in resultados if r.report]
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("🌐 URLs", len(resultados))
+            with col2:
+                st.metric("❌ Erros", len(relatorio_massa.failed))
+            with col3:
+                media = sum(r.score for r in analisados) / len(analisados) if analisados else 0
+                st.metric("🏆 Score médio", f"{media:.0f}%")
+            with col4:
+                st.metric("⚡ Vazão", f"{relatorio_massa.per_minute:,.0f}/min")
+            
+            st.caption(f"{relatorio_massa.elapsed:.1f}s com até {relatorio_massa.concurrency} requisições "
+                       f"simultâneas ({relatorio_massa.per_host} por host). Clique no cabeçalho de uma coluna "
+                       f"para ordenar; os piores sites aparecem primeiro.")
+            st.dataframe([r.as_row() for r in resultados], use_container_width=True)
+            
+            if relatorio_massa.invalid:
+                st.warning(f"{len(relatorio_massa.invalid)} linhas ignoradas: "
+                           + ", ".join(relatorio_massa.invalid[:5]))
+            
+            st.download_button("📥 Baixar CSV", exportar_auditoria_csv(resultados),
+                               file_name="auditoria_headers.csv", mime="text/csv")
+
+    else:
+        st.markdown("O tempo total de uma requisição junta fases bem diferentes: resolver o nome, abrir a conexão "
+                    "TCP, negociar o TLS, esperar o servidor processar e baixar o corpo. Conexões frias pagam tudo; "
+                    "conexões keep-alive reaproveitadas pagam só as duas últimas.")
+        url_tempo = st.text_input("⏱️ URL para medir:", value=get_lab().endpoint('vuln', 'search') + "?q=notebook")
+        amostras_tempo = st.slider("Amostras por modo", 1, 100, AMOSTRAS_TEMPO)
+        
+        if st.button("⏱️ Medir Fases") and url_tempo:
+            try:
+                with st.spinner(f"{amostras_tempo} requisições frias e {amostras_tempo} quentes..."):
+                    st.session_state.tempos_http = comparar_tempos(normalize_url(url_tempo), amostras_tempo)
+            except (OSError, ValueError) as e:
+                st.session_state.tempos_http = None
+                st.error(f"Erro na medição: {e}")
+        
+        relatorios_tempo = st.session_state.get('tempos_http')
+        if relatorios_tempo:
+            frio, quente = relatorios_tempo['frio'], relatorios_tempo['quente']
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("🧊 Fria (p50)", f"{frio.percentile('total', 50) * 1000:.1f} ms")
+            with col2:
+                st.metric("🔥 Keep-alive (p50)", f"{quente.percentile('total', 50) * 1000:.1f} ms",
+                          delta=f"{(quente.percentile('total', 50) - frio.percentile('total', 50)) * 1000:.1f} ms",
+                          delta_color="inverse")
+            with col3:
+                st.metric("🐢 Fria (p99)", f"{frio.percentile('total', 99) * 1000:.1f} ms")
+            
+            # Cascata: cada fase começa onde a anterior termina (p50 de cada fase)
+            barras = [{'Modo': relatorio.mode, 'Fase': PHASE_NAMES[fase], 'Início (ms)': inicio * 1000,
+                       'Fim (ms)': fim * 1000, 'Duração (ms)': round((fim - inicio) * 1000, 2)}
+                      for relatorio in relatorios_tempo.values() for fase, inicio, fim in relatorio.waterfall(50)]
+            ordem = [PHASE_NAMES[fase] for fase, _, _ in frio.waterfall()]
+            cascata = alt.Chart(alt.Data(values=barras)).mark_bar().encode(
+                x=alt.X('Início (ms):Q', title='ms desde o início da requisição'),
+                x2='Fim (ms):Q',
+                y=alt.Y('Fase:N', sort=ordem, title=None),
+                color=alt.Color('Fase:N', sort=ordem, legend=None),
+                tooltip=['Modo:N', 'Fase:N', 'Duração (ms):Q'],
+            ).properties(height=160).facet(row=alt.Row('Modo:N', title=None, sort=['frio', 'quente']))
+            st.altair_chart(cascata)
+            
+            st.dataframe(frio.summary() + quente.summary(), use_container_width=True)
+            st.caption(f"{frio.url} • percentis p{', p'.join(str(p) for p in PERCENTILES)} por fase • "
+                       f"{frio.errors + quente.errors} erros • na cascata cada fase usa o próprio p50, então a "
+                       "soma fica perto, mas não exatamente igual, do p50 total")
+            with st.expander("🔬 Amostras individuais"):
+                st.dataframe([{'Modo': relatorio.mode, **amostra.as_row()} for relatorio in relatorios_tempo.values()
+                              for amostra in relatorio.samples], use_container_width=True)
+
+# ==============================================================================
+# OSINT WEB RECON
+# ==============================================================================
+elif atividade_web == "🔍 OSINT Web Recon":
+    st.markdown("""
+    <div class="security-header">
+        <h1>🔍 OSINT Web Recon: Mapeie o Site</h1>
+        <p>Um crawler educado descobre páginas, formulários, scripts e comentários esquecidos</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    url_mapear = st.text_input(
+        "🎯 Site para mapear:",
+        placeholder="https://example.com",
+        help="⚠️ AVISO: Só mapeie sites que você possui ou tem autorização!"
+    )
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        max_paginas = st.slider("Páginas (máx.)", 10, 5000, 200, step=10)
+    with col2:
+        max_profundidade = st.slider("Profundidade", 0, 10, CRAWL_MAX_DEPTH)
+    with col3:
+        concorrencia_crawl = st.slider("Conexões simultâneas", 1, 32, CRAWL_CONCURRENCY)
+    with col4:
+        atraso_crawl = st.slider("Atraso por host (s)", 0.0, 5.0, 0.2, step=0.1)
+    respeitar_robots = st.checkbox("🤖 Respeitar robots.txt", value=True)
+    
+    if st.button("🕸️ Mapear Site") and url_mapear:
+        contadores = {'page': 0, 'url': 0, 'form': 0, 'script': 0, 'comment': 0, 'error': 0}
+        progresso = st.progress(0.0, text="Baixando robots.txt...")
+        painel = st.empty()
+        
+        def ao_descobrir(tipo, item):
+            contadores[tipo] += 1
+            if tipo == 'page':
+                progresso.progress(min(1.0, contadores['page'] / max_paginas),
+                                   text=f"{contadores['page']} páginas • {item.url}")
+                painel.markdown(f"🔗 {contadores['url']} URLs • 📝 {contadores['form']} formulários • "
+                                f"📜 {contadores['script']} scripts • 💬 {contadores['comment']} comentários")
+        
+        try:
+            st.session_state.mapa_site = crawl_site(
+                url_mapear, on_event=ao_descobrir, max_pages=max_paginas, max_depth=max_profundidade,
+                concurrency=concorrencia_crawl, delay=atraso_crawl, respect_robots=respeitar_robots
+            )
+            if st.session_state.mapa_site.forms:
+                adicionar_pontos(25, "Superfície de ataque mapeada!")
+            # Fingerprint da página inicial: o cliente compartilhado costuma servi-la do cache
+            inicial = get_http_client().get(st.session_state.mapa_site.start)
+            st.session_state.tecnologias_site = detectar_tecnologias(inicial.headers, inicial.text)
+        except ValueError as e:
+            st.error(str(e))
+        except requests.RequestException as e:
+            st.session_state.tecnologias_site = []
+            st.warning(f"Fingerprint de tecnologias indisponível: {e}")
+        progresso.empty()
+        painel.empty()
+    
+    mapa = st.session_state.get('mapa_site')
+    if mapa:
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.metric("📄 Páginas", mapa.stats.pages)
+        with col2:
+            st.metric("🔗 URLs", len(mapa.urls))
+        with col3:
+            st.metric("📝 Formulários", len(mapa.forms))
+        with col4:
+            st.metric("💬 Comentários", len(mapa.comments))
+        with col5:
+            st.metric("⚡ Páginas/s", f"{mapa.stats.pages_per_second:.1f}")
+        st.caption(f"{mapa.start} • {mapa.stats.elapsed:.1f}s • {mapa.stats.bytes / 1024:.0f} KB de HTML • "
+                   f"{mapa.stats.blocked} bloqueadas pelo robots.txt • {mapa.stats.errors} erros")
+        
+        aba_tecnologias, aba_paginas, aba_forms, aba_scripts, aba_comentarios, aba_urls = st.tabs(
+            ["🧬 Tecnologias", "📄 Páginas", "📝 Formulários", "📜 Scripts", "💬 Comentários", "🔗 URLs"])
+        with aba_tecnologias:
+            tecnologias = st.session_state.get('tecnologias_site') or []
+            st.markdown("Servidor, framework e bibliotecas com versão: o ponto de partida para procurar CVEs.")
+            if tecnologias:
+                st.dataframe([t.as_row() for t in tecnologias], use_container_width=True)
+            else:
+                st.info("Nenhuma tecnologia identificada na página inicial.")
+        with aba_paginas:
+            st.dataframe([p.as_row() for p in mapa.pages], use_container_width=True)
+        with aba_forms:
+            st.markdown("Cada formulário é um ponto de entrada: teste SQLi, XSS e CSRF aqui.")
+            st.dataframe([f.as_row() for f in mapa.forms], use_container_width=True)
+        with aba_scripts:
+            externos = sorted({s.src for s in mapa.scripts if s.src})
+            st.markdown(f"**{len(externos)} scripts externos únicos** (bibliotecas antigas = CVEs conhecidas)")
+            st.dataframe([{'Script': src} for src in externos], use_container_width=True)
+        with aba_comentarios:
+            st.markdown("Desenvolvedores esquecem senhas, TODOs e rotas internas em comentários HTML.")
+            st.dataframe(mapa.unique_comments(), use_container_width=True)
+        with aba_urls:
+            st.dataframe([{'URL': url} for url in mapa.urls], use_container_width=True)
+        if mapa.errors:
+            with st.expander(f"⚠️ {len(mapa.errors)} erros e bloqueios"):
+                st.dataframe([{'URL': url, 'Motivo': motivo} for url, motivo in mapa.errors],
+                             use_container_width=True)
 
 # ==============================================================================
 # BUG BOUNTY SIMULATOR
@@ -931,6 +1265,9 @@ elif atividade_web == "🏆 Final Boss: Hack the Bank":
     if 'stage_bank' not in st.session_state:
         st.session_state.stage_bank = 1
     
+    lab = get_lab()
+    sessao = sessao_lab()
+    
     if st.session_state.stage_bank == 1:
         st.markdown("### 🔐 Etapa 1: Bypass do Login")
         
@@ -938,40 +1275,69 @@ elif atividade_web == "🏆 Final Boss: Hack the Bank":
         bank_pass = st.text_input("🔐 Senha do banco:", type="password", placeholder="Tente SQL injection")
         
         if st.button("🚀 Tentar Login Bancário"):
-            if "' OR '1'='1" in bank_pass or "admin'--" in bank_user:
-                st.success("✅ **ETAPA 1 COMPLETA!** Login bypassed!")
+            resultado = sessao.post(lab.endpoint('vuln', 'login'), data={'username': bank_user, 'password': bank_pass},
+                                    timeout=10).json()
+            if resultado.get('ok') and (bank_user, bank_pass) not in CREDENCIAIS_LAB:
+                st.success(f"✅ **ETAPA 1 COMPLETA!** Login bypassed como {resultado['user']}!")
                 st.session_state.stage_bank = 2
                 adicionar_pontos(100, "Banco hackeado - Etapa 1!")
                 st.rerun()
+            elif resultado.get('ok'):
+                st.warning("⚠️ Login legítimo não vale: entre sem saber a senha!")
             else:
                 st.error("❌ **ACESSO NEGADO!** Tente SQL injection!")
     
     elif st.session_state.stage_bank == 2:
         st.markdown("### 💰 Etapa 2: Encontrar Conta com Dinheiro")
         
-        if st.button("🔍 Executar: ' UNION SELECT account_number, balance FROM accounts WHERE balance > 1000000--"):
-            st.success("✅ **ETAPA 2 COMPLETA!** Conta encontrada!")
-            st.markdown("""
-            <div class="hacker-terminal">
-                <h3>💰 CONTA ENCONTRADA:</h3>
-                <p>Account: 123456789</p>
-                <p>Balance: $5,247,389.12</p>
-                <p>Owner: John Millionaire</p>
-            </div>
-            """, unsafe_allow_html=True)
-            st.session_state.stage_bank = 3
-            adicionar_pontos(150, "Conta milionária encontrada!")
+        payload_union = st.text_input(
+            "🔎 Busca de produtos do banco:",
+            value="' UNION SELECT number, balance FROM accounts WHERE balance > 1000000--"
+        )
+        if st.button("🔍 Executar Busca"):
+            resultado = sessao.get(lab.endpoint('vuln', 'search'), params={'q': payload_union, 'format': 'json'},
+                                   timeout=10).json()
+            st.code(resultado['query'], language='sql')
+            if resultado['error']:
+                st.error(f"💥 {resultado['error']}")
+            contas = [(numero, saldo) for numero, saldo in resultado['rows']
+                      if isinstance(numero, str) and numero.isdigit() and float(saldo) > 1000000]
+            if contas:
+                numero, saldo = contas[0]
+                st.success("✅ **ETAPA 2 COMPLETA!** Conta encontrada!")
+                st.markdown(f"""
+                <div class="hacker-terminal">
+                    <h3>💰 CONTA ENCONTRADA:</h3>
+                    <p>Account: {numero}</p>
+                    <p>Balance: ${float(saldo):,.2f}</p>
+                </div>
+                """, unsafe_allow_html=True)
+                st.session_state.conta_alvo = numero
+                st.session_state.stage_bank = 3
+                adicionar_pontos(150, "Conta milionária encontrada!")
+            else:
+                st.dataframe([{'Coluna 1': str(a), 'Coluna 2': str(b)} for a, b in resultado['rows']], use_container_width=True)
+                st.error("❌ Nenhuma conta milionária nos resultados. Ajuste o UNION!")
     
     elif st.session_state.stage_bank == 3:
         st.markdown("### 🎯 Etapa 3: Transferir o Dinheiro")
         
+        conta_origem = st.text_input("🏦 Conta de origem:", value=st.session_state.get('conta_alvo', '123456789'))
         valor_transferir = st.number_input("💵 Valor a transferir:", min_value=1, max_value=1000000, value=1000000)
-        conta_destino = st.text_input("🏦 Sua conta:", placeholder="999888777")
+        conta_destino = st.text_input("🏦 Sua conta:", value="999888777")
         
         if st.button("💸 EXECUTAR TRANSFERÊNCIA"):
-            if valor_transferir >= 1000000:
+            dados = {'source': conta_origem, 'target': conta_destino, 'amount': str(valor_transferir)}
+            resposta = sessao.post(lab.endpoint('vuln', 'bank/transfer'), data=dados, timeout=10)
+            resultado = resposta.json()
+            for query in resultado.get('queries', []):
+                st.code(query, language='sql')
+            
+            if resultado.get('ok') and valor_transferir >= 1000000:
                 st.success("🏆 **BANCO HACKEADO COM SUCESSO!**")
                 st.balloons()
+                st.dataframe([{'Conta': numero, 'Saldo': f"${saldo:,.2f}"} for numero, saldo in resultado['balances']],
+                             use_container_width=True)
                 
                 st.markdown("""
                 <div style="background: linear-gradient(45deg, #ff6b35, #f7931e); padding: 20px; border-radius: 10px; text-align: center;">
@@ -983,11 +1349,20 @@ elif atividade_web == "🏆 Final Boss: Hack the Bank":
                 
                 adicionar_pontos(500, "BANCO COMPLETAMENTE HACKEADO!")
                 st.session_state.nivel_hacker = "Bank Hacker Legend"
-            else:
+                
+                # O mesmo pedido contra a versão corrigida, com um login legítimo do aluno
+                sessao.post(lab.endpoint('safe', 'login'), data={'username': 'aluno', 'password': 'aluno123'},
+                            timeout=10)
+                corrigida = sessao.post(lab.endpoint('safe', 'bank/transfer'), data=dados, timeout=10)
+                st.info(f"🛡️ Na versão corrigida: HTTP {corrigida.status_code} - {corrigida.json().get('error')}")
+            elif resultado.get('ok'):
                 st.warning("⚠️ Valor muito baixo! Mire alto: $1,000,000!")
+            else:
+                st.error(f"❌ Transferência falhou: {resultado.get('error')}")
     
     # Reset do jogo
     if st.button("🔄 Resetar Desafio"):
+        requests.post(f"{lab.url}/reset", timeout=10)
         st.session_state.stage_bank = 1
         st.rerun()
 
@@ -5,12 +5,15 @@ Laboratório interativo de ferramentas de rede e reconhecimento
 
 import streamlit as st
 import socket
+import ipaddress
 import subprocess
 import time
 import random
 import json
 import sys
 import os
+import io
+import tempfile
 from pathlib import Path
 
 # Adicionar diretório raiz para importações
@@ -18,6 +21,12 @@ root_dir = Path(__file__).parent.parent.parent
 sys.path.append(str(root_dir))
 
 from web_app.utils.helpers import setup_page_config, load_custom_css, display_status_alert
+from core.pcap_reader import PcapReader, build_flows, write_sample_pcap
+from core.net_inventory import collect, read_neighbors
+from core.scan_store import get_store, host_row, tcp_rows, udp_rows
+from core.scan_timing import DEFAULT_TEMPLATE, TEMPLATES, SimulatedTarget, parse_ports, scan
+from core.service_detection import STAND_INS, detect, detect_lab, service_name
+from core.udp_scan import UdpReport, discover as udp_discover, scan as scan_udp
 
 # Configuração da página
 setup_page_config()
@@ -135,8 +144,6 @@ ferramenta_rede = st.sidebar.selectbox(
 # Inicializar estados da sessão
 if 'pontos_rede' not in st.session_state:
     st.session_state.pontos_rede = 0
-if 'hosts_descobertos' not in st.session_state:
-    st.session_state.hosts_descobertos = []
 if 'rank_pentester' not in st.session_state:
     st.session_state.rank_pentester = "Script Kiddie"
 
@@ -160,7 +167,7 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("### 🏆 Status do Pentester")
 st.sidebar.metric("Pontos", st.session_state.pontos_rede)
 st.sidebar.markdown(f"**Rank:** {st.session_state.rank_pentester}")
-st.sidebar.metric("Hosts Descobertos", len(st.session_state.hosts_descobertos))
+st.sidebar.metric("Hosts Descobertos", len(get_store().known_hosts()))
 
 # ==============================================================================
 # COMMAND CENTER
@@ -178,17 +185,29 @@ if ferramenta_rede == "🏠 Command Center":
     
     st.subheader("🎯 Dashboard de Reconhecimento")
     
-    # Estatísticas em tempo real
+    # Estatísticas do banco de scans (último scan de cada alvo = estado atual)
+    resumo = get_store().summary()
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("🖥️ Hosts Ativos", "47", "+3")
+        st.metric("🖥️ Hosts Conhecidos", resumo['hosts'])
     with col2:
-        st.metric("🔓 Portas Abertas", "143", "+12")
+        st.metric("🔓 Portas Abertas", resumo['open_ports'])
     with col3:
-        st.metric("🛡️ Firewalls", "8", "")
+        st.metric("🗄️ Scans Gravados", resumo['scans'])
     with col4:
-        st.metric("🚨 Vulnerabilidades", "23", "+5")
+        st.metric("📝 Resultados", f"{resumo['results']:,}".replace(',', '.'))
+    
+    scans_recentes = get_store().scans(limit=10)
+    if scans_recentes:
+        with st.expander("🕒 Scans recentes e mudanças"):
+            st.dataframe([scan.as_row() for scan in scans_recentes], use_container_width=True)
+            for scan_info in scans_recentes:
+                mudancas = get_store().changes_since_last(scan_info.id, ('open', 'up'))
+                if mudancas:
+                    st.markdown(f"**🔄 Scan {scan_info.id} ({scan_info.kind} {scan_info.target}):** "
+                                f"{len(mudancas)} portas/hosts entraram ou saíram")
+                    st.dataframe([m.as_row() for m in mudancas], use_container_width=True)
     
     # Mapa da rede interativo
     st.subheader("🗺️ Mapa da Rede")
@@ -210,9 +229,8 @@ if ferramenta_rede == "🏠 Command Center":
             with col2:
                 if st.button(f"🎯 Scan {ip}", key=f"scan_{ip}"):
                     st.success(f"🔍 Scanning {ip}...")
+                    get_store().add_host(ip, 'command center')
                     adicionar_pontos_rede(10, f"Host {ip} scaneado!")
-                    if ip not in st.session_state.hosts_descobertos:
-                        st.session_state.hosts_descobertos.append(ip)
 
 # ==============================================================================
 # NETWORK DISCOVERY
@@ -226,12 +244,28 @@ elif ferramenta_rede == "📡 Network Discovery":
     """, unsafe_allow_html=True)
     
     # Simulador de network discovery
+    # Inventário local direto de /proc e netlink: semeia a rede alvo e os candidatos do discovery
+    inventario = collect()
+    redes_locais = inventario.local_networks()
+    with st.expander(f"🏠 Inventário local ({inventario.elapsed * 1000:.1f} ms, sem subprocessos)"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("💻 IP Local", inventario.primary_address)
+        with col2:
+            st.metric("🚪 Gateway", inventario.default_gateway or "nenhum")
+        with col3:
+            st.metric("👥 Vizinhos ARP", len([n for n in inventario.neighbors if n.complete]))
+        with col4:
+            st.metric("👂 Sockets Escutando", len(inventario.listening))
+        st.dataframe([i.as_row() for i in inventario.interfaces], use_container_width=True)
+        st.dataframe([r.as_row() for r in inventario.routes], use_container_width=True)
+    
     st.subheader("🎮 Simulador: Host Discovery")
     
     target_network = st.text_input(
         "🎯 Rede alvo (CIDR):",
-        value="192.168.1.0/24",
-        help="Ex: 192.168.1.0/24, 10.0.0.0/8"
+        value=str(redes_locais[0]) if redes_locais else "192.168.1.0/24",
+        help="Ex: 192.168.1.0/24, 10.0.0.0/8 (padrão: a sub-rede da sua interface principal)"
     )
     
     scan_technique = st.selectbox(
@@ -255,21 +289,64 @@ elif ferramenta_rede == "📡 Network Discovery":
         </div>
         """, unsafe_allow_html=True)
         
-        # Progress bar
-        progress = st.progress(0)
-        for i in range(100):
-            time.sleep(0.02)
-            progress.progress(i + 1)
+        if scan_technique in ("UDP Scan", "ARP Scan (Local)"):
+            # UDP ping real: porta alta quase nunca aberta, então um host vivo responde com ICMP port unreachable
+            try:
+                rede = ipaddress.ip_network(target_network, strict=False)
+            except ValueError as e:
+                st.error(f"❌ Rede inválida: {e}")
+                st.stop()
+            if rede.num_addresses > 1024:
+                st.error("❌ Use uma rede de até 1024 endereços (ex: /22 ou menor) para o UDP ping.")
+                st.stop()
+            arp = scan_technique == "ARP Scan (Local)"
+            if arp and not any(rede.overlaps(local) for local in redes_locais):
+                st.error(f"❌ ARP só alcança redes ligadas diretamente: {', '.join(map(str, redes_locais)) or 'nenhuma'}")
+                st.stop()
+            # Gateway e vizinhos já conhecidos primeiro; depois o resto da faixa
+            sementes = [h for h in inventario.candidate_hosts() if ipaddress.ip_address(h) in rede]
+            alvos = list(dict.fromkeys(sementes + [str(ip) for ip in (rede.hosts() if rede.num_addresses > 2 else rede)]))
+            with st.spinner(f"Enviando datagramas UDP para {len(alvos)} endereços..."):
+                vivos = udp_discover(alvos)
+            if arp:
+                # Cada datagrama para a rede local obriga o kernel a resolver o MAC: a tabela ARP vira o resultado
+                vizinhos = {n.address: n for n in read_neighbors() if n.complete and ipaddress.ip_address(n.address) in rede}
+                hosts_encontrados = [
+                    {"ip": ip, "mac": n.mac, "vendor": n.interface, "response": "ARP"}
+                    for ip, n in sorted(vizinhos.items(), key=lambda item: ipaddress.ip_address(item[0]))
+                ]
+                linhas = [host_row(ip, 'arp', info=n.mac) for ip, n in vizinhos.items()]
+            else:
+                hosts_encontrados = [
+                    {"ip": ip, "mac": getattr(inventario.neighbor(ip), 'mac', "—"), "vendor": f"UDP {r.state}",
+                     "response": f"{r.rtt * 1000:.1f}ms" if r.rtt is not None else "-"}
+                    for ip, r in sorted(vivos.items(), key=lambda item: ipaddress.ip_address(item[0]))
+                ]
+                linhas = [host_row(ip, 'udp-ping', r.rtt) for ip, r in vivos.items()]
+            discovery_id = get_store().record('discovery', str(rede), linhas, scan_technique)
+        else:
+            discovery_id = None
+            # Progress bar
+            progress = st.progress(0)
+            for i in range(100):
+                time.sleep(0.02)
+                progress.progress(i + 1)
         
-        # Hosts "descobertos" (simulados)
-        hosts_encontrados = [
-            {"ip": "192.168.1.1", "mac": "00:11:22:33:44:55", "vendor": "Cisco", "response": "20ms"},
-            {"ip": "192.168.1.10", "mac": "AA:BB:CC:DD:EE:FF", "vendor": "Dell", "response": "5ms"},
-            {"ip": "192.168.1.15", "mac": "11:22:33:44:55:66", "vendor": "HP", "response": "12ms"},
-            {"ip": "192.168.1.25", "mac": "FF:EE:DD:CC:BB:AA", "vendor": "IoT Corp", "response": "50ms"},
-            {"ip": "192.168.1.50", "mac": "12:34:56:78:90:AB", "vendor": "Epson", "response": "30ms"}
-        ]
+            # Hosts "descobertos" (simulados)
+            hosts_encontrados = [
+                {"ip": "192.168.1.1", "mac": "00:11:22:33:44:55", "vendor": "Cisco", "response": "20ms"},
+                {"ip": "192.168.1.10", "mac": "AA:BB:CC:DD:EE:FF", "vendor": "Dell", "response": "5ms"},
+                {"ip": "192.168.1.15", "mac": "11:22:33:44:55:66", "vendor": "HP", "response": "12ms"},
+                {"ip": "192.168.1.25", "mac": "FF:EE:DD:CC:BB:AA", "vendor": "IoT Corp", "response": "50ms"},
+                {"ip": "192.168.1.50", "mac": "12:34:56:78:90:AB", "vendor": "Epson", "response": "30ms"}
+            ]
         
+        # Só descobertas reais vão para o banco de scans; a simulação fica na sessão
+        st.session_state.discovery = {'hosts': hosts_encontrados, 'scan_id': discovery_id}
+    
+    if st.session_state.get('discovery'):
+        hosts_encontrados = st.session_state.discovery['hosts']
+        discovery_id = st.session_state.discovery['scan_id']
         st.success(f"✅ Discovery completo! {len(hosts_encontrados)} hosts encontrados")
         
         # Mostrar resultados em tabela
@@ -288,19 +365,33 @@ elif ferramenta_rede == "📡 Network Discovery":
                 st.metric("Response", host['response'])
             with col5:
                 if st.button("🎯 Scan", key=f"scan_host_{host['ip']}"):
+                    get_store().add_host(host['ip'], 'network discovery')
                     adicionar_pontos_rede(15, f"Host {host['ip']} adicionado ao escopo!")
-                    if host['ip'] not in st.session_state.hosts_descobertos:
-                        st.session_state.hosts_descobertos.append(host['ip'])
+        
+        if discovery_id is not None:
+            mudancas = get_store().changes_since_last(discovery_id)
+            if mudancas is None:
+                st.info("🆕 Primeira varredura desta rede: as próximas mostrarão hosts que entraram ou saíram.")
+            elif mudancas:
+                st.warning(f"🔄 {len(mudancas)} mudanças desde a varredura anterior desta rede")
+                st.dataframe([m.as_row() for m in mudancas], use_container_width=True)
+            else:
+                st.success("✅ Nenhuma mudança desde a varredura anterior desta rede")
         
         # Export dos resultados
-        if st.button("💾 Exportar Resultados"):
-            results_json = json.dumps(hosts_encontrados, indent=2)
+        col1, col2 = st.columns(2)
+        with col1:
             st.download_button(
                 "📥 Download JSON",
-                results_json,
+                get_store().export_json(discovery_id) if discovery_id is not None
+                else json.dumps(hosts_encontrados, indent=2, ensure_ascii=False),
                 "network_discovery.json",
                 "application/json"
             )
+        if discovery_id is not None:
+            with col2:
+                st.download_button("📥 Download CSV", get_store().export_csv(discovery_id),
+                                   "network_discovery.csv", "text/csv")
 
 # ==============================================================================
 # PORT SCANNER PRO
@@ -317,7 +408,7 @@ elif ferramenta_rede == "🎯 Port Scanner Pro":
     col1, col2 = st.columns(2)
     
     with col1:
-        target_host = st.text_input("🎯 Host alvo:", value="192.168.1.10")
+        target_host = st.text_input("🎯 Host alvo:", value="127.0.0.1")
         port_range = st.text_input("🔢 Range de portas:", value="1-1000")
         
     with col2:
@@ -325,35 +416,138 @@ elif ferramenta_rede == "🎯 Port Scanner Pro":
             "🔍 Tipo de scan:",
             ["TCP SYN (Stealth)", "TCP Connect", "UDP Scan", "ACK Scan", "FIN Scan"]
         )
-        scan_speed = st.slider("⚡ Velocidade:", 1, 5, 3)
+        template_id = st.select_slider(
+            "⏱️ Template de tempo:",
+            options=list(TEMPLATES),
+            value=DEFAULT_TEMPLATE,
+            format_func=lambda t: f"{TEMPLATES[t].name} {TEMPLATES[t].label}"
+        )
+    
+    simular = st.checkbox("🧪 Simular alvo remoto com latência e perda de pacotes (laboratório)")
+    if simular:
+        col_lat, col_perda = st.columns(2)
+        with col_lat:
+            latencia_ms = st.slider("📶 Latência (ms):", 5, 1500, 300)
+        with col_perda:
+            perda = st.slider("📉 Perda de pacotes (%):", 0, 40, 10)
+    
+    template = TEMPLATES[template_id]
+    st.caption(f"{template.name}: timeout inicial {template.initial_timeout:g}s (limites {template.min_timeout:g}–"
+               f"{template.max_timeout:g}s, ou 2× o RTT medido em links mais lentos), até {template.max_retries} reenvios "
+               f"conforme a perda medida, "
+               f"{template.max_window} sondas simultâneas, {template.scan_delay:g}s entre sondas")
     
     if st.button("🚀 EXECUTAR PORT SCAN"):
+        try:
+            portas_alvo = parse_ports(port_range)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        
+        udp = scan_type == "UDP Scan"
+        if scan_type not in ("TCP Connect", "UDP Scan"):
+            # SYN/ACK/FIN montam pacotes na mão (raw sockets, root); o connect() completo funciona sem privilégios
+            st.info(f"ℹ️ {scan_type} exige raw sockets (root). Executando TCP Connect com o mesmo template.")
+        if udp and simular:
+            st.info("ℹ️ A simulação de perda vale só para TCP; o scan UDP consulta o host de verdade.")
+        
         st.markdown(f"""
         <div class="hacker-console">
             <h3>[PORT SCANNING {target_host}]</h3>
-            <p>>>> Scanning ports {port_range}</p>
-            <p>>>> Using {scan_type} technique</p>
-            <p>>>> Speed level: {scan_speed}/5</p>
+            <p>>>> Scanning ports {port_range} ({len(portas_alvo)} portas)</p>
+            <p>>>> Using {"UDP (DNS/NTP/SNMP/SSDP payloads)" if udp else "TCP Connect"} technique</p>
+            <p>>>> Timing template: {template.name} ({template.label})</p>
         </div>
         """, unsafe_allow_html=True)
         
-        # Progress com velocidade baseada no slider
+        # Progresso real: cada porta concluída (aberta, fechada ou filtrada) avança a barra
         progress = st.progress(0)
-        for i in range(100):
-            time.sleep(0.01 * (6 - scan_speed))  # Mais rápido = menos delay
-            progress.progress(i + 1)
+        concluidas = []
+        def atualizar_progresso(resultado):
+            concluidas.append(resultado)
+            progress.progress(len(concluidas) / len(portas_alvo))
         
-        # Portas "encontradas" (simuladas)
-        portas_abertas = [
-            {"porta": 22, "protocolo": "TCP", "servico": "SSH", "versao": "OpenSSH 8.2", "estado": "open"},
-            {"porta": 80, "protocolo": "TCP", "servico": "HTTP", "versao": "Apache 2.4.41", "estado": "open"},
-            {"porta": 443, "protocolo": "TCP", "servico": "HTTPS", "versao": "Apache 2.4.41", "estado": "open"},
-            {"porta": 3306, "protocolo": "TCP", "servico": "MySQL", "versao": "MySQL 8.0.25", "estado": "open"},
-            {"porta": 21, "protocolo": "TCP", "servico": "FTP", "versao": "vsftpd 3.0.3", "estado": "filtered"}
-        ]
+        if udp:
+            # Um socket conectado por porta: o ICMP port unreachable volta como ConnectionRefusedError
+            relatorio = scan_udp(target_host, portas_alvo, template=template, on_result=atualizar_progresso)
+        elif simular:
+            alvo = SimulatedTarget(random.sample(portas_alvo, min(5, len(portas_alvo))),
+                                   random.sample(portas_alvo, min(20, len(portas_alvo))),
+                                   latencia_ms / 1000, latencia_ms / 10000, perda / 100)
+            relatorio = scan(target_host, portas_alvo, template, alvo.probe, atualizar_progresso)
+        else:
+            relatorio = scan(target_host, portas_alvo, template, on_result=atualizar_progresso)
         
+        st.session_state.scan_timing = relatorio
+        # Simulações não vão para o banco: o alvo seria real, mas os resultados não
+        st.session_state.port_scan_id = None if simular and not udp else get_store().record(
+            'udp' if udp else 'tcp', target_host, udp_rows(relatorio) if udp else tcp_rows(relatorio),
+            f"{template.name} {port_range}"
+        )
+        
+        # Só abertas viram cartões; fechadas e filtradas aparecem no resumo
+        if udp:
+            portas_abertas = [
+                {"porta": r.port, "protocolo": "UDP", "servico": r.service,
+                 "versao": r.info or f"{len(r.response)} bytes de resposta", "estado": "open"}
+                for r in relatorio.results if r.state == 'open'
+            ]
+        else:
+            portas_abertas = [
+                {"porta": porta, "protocolo": "TCP", "servico": service_name(porta),
+                 "versao": "use 🔍 Enumerar", "estado": "open"}
+                for porta in relatorio.open_ports
+            ]
+        
+        # Guardado na sessão: os botões de enumeração disparam um novo rerun do script
+        st.session_state.port_scan = {'host': target_host, 'portas': portas_abertas}
+
+    if st.session_state.get('port_scan'):
+        scan_host = st.session_state.port_scan['host']
+        portas_abertas = st.session_state.port_scan['portas']
         st.success(f"✅ Scan completo! {len([p for p in portas_abertas if p['estado'] == 'open'])} portas abertas")
         
+        relatorio = st.session_state.get('scan_timing')
+        if relatorio:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("⏱️ Duração", f"{relatorio.elapsed:.2f}s")
+            with col2:
+                st.metric("📨 Sondas", relatorio.probes, f"{relatorio.retries} reenvios", delta_color="off")
+            with col3:
+                st.metric("📶 RTT suavizado", f"{relatorio.srtt * 1000:.0f} ms" if relatorio.srtt is not None else "-",
+                          f"timeout {relatorio.timeout * 1000:.0f} ms", delta_color="off")
+            if isinstance(relatorio, UdpReport):
+                with col4:
+                    st.metric("❓ open|filtered", len(relatorio.ports('open|filtered')))
+                st.caption(f"❌ {len(relatorio.ports('closed'))} fechadas (ICMP port unreachable) · "
+                           f"🛡️ {len(relatorio.ports('filtered'))} filtradas (outro erro ICMP). Sem resposta não prova "
+                           "nada em UDP: o serviço pode ignorar a sonda ou um firewall pode descartá-la.")
+            else:
+                with col4:
+                    st.metric("🪟 Janela final", relatorio.window, f"{relatorio.drops} perdas", delta_color="off")
+                st.caption(f"❌ {len(relatorio.ports('closed'))} fechadas · "
+                           f"🛡️ {len(relatorio.ports('filtered'))} filtradas (sem resposta após os reenvios)")
+        
+        scan_id = st.session_state.get('port_scan_id')
+        if scan_id is not None:
+            # Só portas abertas: faixas diferentes entre scans não viram ruído de fechadas/filtradas
+            mudancas = get_store().changes_since_last(scan_id, ('open',))
+            if mudancas is None:
+                st.info(f"🆕 Primeiro scan deste tipo em {scan_host} (scan #{scan_id}); os próximos serão comparados a ele.")
+            elif mudancas:
+                st.warning(f"🔄 {len(mudancas)} portas abriram ou fecharam desde o scan anterior de {scan_host}")
+                st.dataframe([m.as_row() for m in mudancas], use_container_width=True)
+            else:
+                st.success(f"✅ Nada mudou em {scan_host} desde o scan anterior")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("📥 Download JSON", get_store().export_json(scan_id),
+                                   f"port_scan_{scan_id}.json", "application/json")
+            with col2:
+                st.download_button("📥 Download CSV", get_store().export_csv(scan_id),
+                                   f"port_scan_{scan_id}.csv", "text/csv")
+        
         # Resultados detalhados
         st.subheader("🔍 Portas e Serviços Encontrados")
         
@@ -370,15 +564,20 @@ elif ferramenta_rede == "🎯 Port Scanner Pro":
             </div>
             """, unsafe_allow_html=True)
             
-            if porta['estado'] == 'open' and st.button(f"🔍 Enumerar {porta['servico']}", key=f"enum_{porta['porta']}"):
-                adicionar_pontos_rede(20, f"Serviço {porta['servico']} enumerado!")
-                
-                if porta['servico'] == "SSH":
-                    st.info("🔐 **SSH Enumeration:** Usuários válidos: root, admin, guest")
-                elif porta['servico'] == "HTTP":
-                    st.info("🌐 **HTTP Enumeration:** /admin, /phpmyadmin, /wp-admin encontrados")
-                elif porta['servico'] == "MySQL":
-                    st.warning("⚠️ **MySQL Enumeration:** Login anônimo permitido!")
+            if porta['estado'] == 'open' and porta['protocolo'] == 'TCP' and st.button(f"🔍 Enumerar {porta['servico']}", key=f"enum_{porta['porta']}"):
+                # Banner grabbing real: conecta, envia a sonda do protocolo e compara com as assinaturas
+                with st.spinner(f"Coletando banner de {scan_host}:{porta['porta']}..."):
+                    servico = detect(scan_host, [porta['porta']])[0]
+
+                if servico.state != 'open':
+                    st.warning(f"⚠️ {scan_host}:{porta['porta']} não respondeu ({servico.state}). "
+                               "Use um host real da sua rede ou a ferramenta 🔓 Service Enumeration com o laboratório local.")
+                else:
+                    adicionar_pontos_rede(20, f"Serviço {servico.service} enumerado!")
+                    st.info(f"🔎 **{servico.service.upper()}:** {servico.description or 'versão não identificada'}")
+                    if servico.banner:
+                        st.code(servico.banner_text(), language=None)
+                    st.caption(" · ".join(f"{p.probe}: {p.latency * 1000:.1f} ms" for p in servico.probes))
 
 # ==============================================================================
 # DNS RECONNAISSANCE  
@@ -469,6 +668,160 @@ elif ferramenta_rede == "🔍 DNS Reconnaissance":
             if st.button(f"🎯 Scan {subdomain}", key=f"scan_sub_{subdomain}"):
                 adicionar_pontos_rede(15, f"Subdomain {subdomain} adicionado!")
 
+# ==============================================================================
+# SERVICE ENUMERATION
+# ==============================================================================
+elif ferramenta_rede == "🔓 Service Enumeration":
+    st.markdown("""
+    <div class="network-scanner">
+        <h1>🔓 Service Enumeration: Identificando Versões</h1>
+        <p>Banner grabbing e fingerprinting de serviços como o nmap -sV</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    usar_laboratorio = st.checkbox(
+        "🧪 Usar servidores de laboratório (loopback)",
+        value=True,
+        help="Sobe imitações locais de SSH, FTP, SMTP, HTTP, Redis e MySQL; nada sai da sua máquina"
+    )
+
+    if not usar_laboratorio:
+        col1, col2 = st.columns(2)
+        with col1:
+            enum_host = st.text_input("🎯 Host alvo:", value="127.0.0.1", key="enum_host")
+        with col2:
+            enum_portas = st.text_input("🔢 Portas (separadas por vírgula):", value="21,22,25,80,3306,6379", key="enum_portas")
+
+    if st.button("🚀 IDENTIFICAR SERVIÇOS"):
+        try:
+            with st.spinner("Conectando e enviando sondas..."):
+                if usar_laboratorio:
+                    servicos = detect_lab()
+                else:
+                    servicos = detect(enum_host, [int(p) for p in enum_portas.replace(' ', '').split(',') if p])
+        except (ValueError, OSError) as e:
+            st.error(f"❌ Erro: {str(e)}")
+            servicos = []
+
+        abertos = [s for s in servicos if s.state == 'open']
+        if servicos:
+            st.success(f"✅ {len(abertos)} de {len(servicos)} portas responderam")
+            st.dataframe([s.as_row() for s in servicos], use_container_width=True)
+
+        for servico in abertos:
+            if servico.version:
+                adicionar_pontos_rede(10, f"{servico.product} {servico.version} identificado!")
+            if servico.product == 'vsftpd' and servico.version == '2.3.4':
+                st.error("🚨 **vsftpd 2.3.4** contém uma backdoor conhecida (CVE-2011-2523) — a mesma do CTF desta página!")
+
+        if usar_laboratorio and servicos:
+            st.caption(f"Laboratório: {', '.join(STAND_INS)}. O serviço 'silencioso' não envia banner: "
+                       "a sonda NULL expira e a sonda HTTP também, como num firewall que aceita a conexão.")
+
+    st.info("💡 **Dica:** Versões expostas em banners (ex.: `OpenSSH_8.9p1`) permitem ao atacante buscar CVEs "
+            "específicas. Servidores bem configurados escondem ou genericizam o banner.")
+
+# ==============================================================================
+# TRAFFIC ANALYZER
+# ==============================================================================
+elif ferramenta_rede == "📈 Traffic Analyzer":
+    st.markdown("""
+    <div class="network-scanner">
+        <h1>📈 Traffic Analyzer: Forense de Capturas</h1>
+        <p>Analise capturas pcap/pcapng do Wireshark ou tcpdump e reconstrua as conversas da rede</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        captura_upload = st.file_uploader("📤 Enviar captura:", type=['pcap', 'pcapng', 'cap'])
+    with col2:
+        caminho_captura = st.text_input(
+            "📂 Ou caminho local (capturas de vários GB são lidas via mmap):",
+            placeholder="/capturas/incidente.pcapng"
+        )
+        if st.button("🧪 Gerar captura de exemplo"):
+            destino = os.path.join(tempfile.gettempdir(), 'cybermentor_exemplo.pcap')
+            write_sample_pcap(destino)
+            st.session_state.captura_exemplo = destino
+
+    if caminho_captura and os.path.isfile(caminho_captura):
+        fonte_captura, nome_captura = caminho_captura, os.path.basename(caminho_captura)
+    elif captura_upload is not None:
+        fonte_captura, nome_captura = captura_upload.getbuffer(), captura_upload.name
+    elif st.session_state.get('captura_exemplo') and os.path.exists(st.session_state.captura_exemplo):
+        fonte_captura, nome_captura = st.session_state.captura_exemplo, "exemplo.pcap"
+    else:
+        fonte_captura = None
+        st.info("💡 Capture tráfego com `tcpdump -i eth0 -w captura.pcap` ou Wireshark e envie o arquivo aqui.")
+
+    if fonte_captura is not None:
+        try:
+            with st.spinner("Decodificando pacotes..."):
+                tabela_fluxos = build_flows(fonte_captura)
+        except (OSError, ValueError) as e:
+            st.error(f"❌ Erro ao ler captura: {str(e)}")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("📦 Pacotes IP", f"{tabela_fluxos.packets:,}")
+            with col2:
+                st.metric("💾 Volume", f"{tabela_fluxos.bytes / 1024:,.0f} KB")
+            with col3:
+                st.metric("🔀 Fluxos", f"{len(tabela_fluxos):,}")
+            with col4:
+                st.metric("⚡ Velocidade", f"{tabela_fluxos.packets_per_second:,.0f} pkt/s")
+
+            if tabela_fluxos.truncated:
+                st.warning("⚠️ A captura termina no meio de um pacote (arquivo truncado); os pacotes completos foram analisados.")
+            if tabela_fluxos.skipped:
+                st.caption(f"{tabela_fluxos.skipped:,} quadros não-IP (ARP, STP...) ignorados.")
+
+            st.subheader("🔀 Principais Conversas")
+            st.dataframe([{
+                "Protocolo": fluxo['protocol'],
+                "Origem": f"{fluxo['src']}:{fluxo['sport']}",
+                "Destino": f"{fluxo['dst']}:{fluxo['dport']}",
+                "Pacotes (→/←)": f"{fluxo['packets']} / {fluxo['packets_back']}",
+                "Bytes (→/←)": f"{fluxo['bytes']:,} / {fluxo['bytes_back']:,}",
+                "Duração (s)": fluxo['duration'],
+                "Flags TCP": fluxo['flags']
+            } for fluxo in (f.to_dict() for f in tabela_fluxos.top(50))], use_container_width=True)
+
+            st.subheader("📊 Protocolos")
+            st.bar_chart(tabela_fluxos.protocol_summary())
+
+            varreduras = tabela_fluxos.suspected_scans()
+            for scanner, alvo, portas, abertas in varreduras:
+                st.error(f"🚨 **Possível port scan:** {scanner} enviou SYN para {portas} portas de {alvo} "
+                         f"({abertas} responderam SYN/ACK)")
+            if varreduras:
+                adicionar_pontos_rede(25, "Port scan identificado na captura!")
+
+            with st.expander("🔬 Primeiros pacotes"):
+                with PcapReader(fonte_captura) as leitor:
+                    primeiros = []
+                    for pacote in leitor.packets():
+                        primeiros.append(pacote._asdict())
+                        if len(primeiros) >= 100:
+                            break
+                st.dataframe(primeiros, use_container_width=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                saida_csv = io.StringIO()
+                tabela_fluxos.write_csv(saida_csv)
+                st.download_button("📥 Exportar fluxos (CSV)", saida_csv.getvalue(),
+                                   f"{nome_captura}.flows.csv", "text/csv")
+            with col2:
+                saida_json = io.StringIO()
+                tabela_fluxos.write_json(saida_json)
+                st.download_button("📥 Exportar fluxos (JSON)", saida_json.getvalue(),
+                                   f"{nome_captura}.flows.json", "application/json")
+
+            st.info("💡 **Dica forense:** Um fluxo com muitos SYN e nenhum ACK de volta indica varredura; "
+                    "fluxos longos com poucos bytes em intervalos regulares podem ser beaconing de malware (C2).")
+
 # ==============================================================================
 # CTF: HACK THE NETWORK
 # ==============================================================================
@@ -18,6 +18,24 @@ import pandas as pd
 from datetime import datetime
 import io
 import mimetypes
+import sys
+import tempfile
+from pathlib import Path
+
+# Adicionar diretório raiz para importações
+root_dir = Path(__file__).parent.parent.parent
+sys.path.append(str(root_dir))
+
+from core.hex_viewer import HexViewer, parse_hex_pattern
+from core.strings_extractor import IOC_LABELS, extract_strings, extract_from_file, page, export_jsonl
+from core.timeline import Timeline, KIND_LABELS
+from core.doc_metadata import FIELD_LABELS as DOC_FIELD_LABELS, extract_metadata as extrair_metadados_documento
+from core.analysis_cache import get_cache
+from core.image_tamper import error_level_analysis, detect_copy_move, heatmap, overlay
+from core.perceptual_hash import DEFAULT_RADIUS, hash_image, triage_directory
+from core.fs_image import open_image
+from core.log_analyzer import analyze, incident_timeline, rotation_order, write_sample_logs
+from core.rule_engine import DEFAULT_RULES, RuleSet
 
 # Configuração da página
 st.set_page_config(
@@ -191,6 +209,9 @@ with tab1:
         arquivo_bytes = arquivo_upload.read()
         tamanho_arquivo = len(arquivo_bytes)
         
+        # Resultados indexados pelo conteúdo: reruns e outros usuários com a mesma evidência não recalculam
+        cache_analise = get_cache()
+        
         st.markdown("""
         <div class="evidence-card">
             <h3>📋 Informações Básicas da Evidência</h3>
@@ -217,7 +238,9 @@ with tab1:
         """, unsafe_allow_html=True)
         
         with st.spinner("Calculando hashes..."):
-            md5, sha1, sha256 = calcular_hashes(arquivo_bytes)
+            md5, sha1, sha256 = cache_analise.get_or_compute(
+                'hashes', arquivo_bytes, lambda: calcular_hashes(arquivo_bytes)
+            )
         
         st.markdown(f"""
         <div class="analysis-result">
@@ -234,7 +257,10 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
-        tipo_real, tipo_extensao = detectar_tipo_arquivo(arquivo_bytes, arquivo_upload.name)
+        tipo_real, tipo_extensao = cache_analise.get_or_compute(
+            f'tipo:{arquivo_upload.name}', arquivo_bytes,
+            lambda: detectar_tipo_arquivo(arquivo_bytes, arquivo_upload.name)
+        )
         
         col1, col2 = st.columns(2)
         with col1:
@@ -266,8 +292,9 @@ with tab1:
             """, unsafe_allow_html=True)
             
             try:
-                imagem = Image.open(io.BytesIO(arquivo_bytes))
-                metadados = extrair_exif(imagem)
+                metadados = cache_analise.get_or_compute(
+                    'exif', arquivo_bytes, lambda: extrair_exif(Image.open(io.BytesIO(arquivo_bytes)))
+                )
                 
                 if metadados and len(metadados) > 1:
                     # Criar DataFrame para exibir metadados
@@ -286,7 +313,140 @@ with tab1:
                     
             except Exception as e:
                 st.error(f"Erro ao processar imagem: {str(e)}")
-        
+
+            st.markdown("""
+            <div class="evidence-card">
+                <h3>🧪 Detecção de Adulteração (ELA e Clonagem)</h3>
+            </div>
+            """, unsafe_allow_html=True)
+
+            st.markdown("""
+            **Error Level Analysis:** recomprime a imagem em JPEG com qualidade conhecida; regiões coladas
+            de outra fonte recomprimem de forma diferente e se destacam no mapa de calor.
+            **Copy-Move:** blocos 8x8 viram coeficientes DCT quantizados, ordenados lexicograficamente;
+            blocos idênticos com o mesmo deslocamento indicam uma região clonada dentro da própria imagem.
+            """)
+
+            try:
+                hashes_perceptuais = cache_analise.get_or_compute(
+                    'perceptual', arquivo_bytes, lambda: hash_image(Image.open(io.BytesIO(arquivo_bytes))).hex()
+                )
+                st.markdown("**Hashes perceptuais** (resistem a recompressão e redimensionamento): " +
+                            " | ".join(f"{nome}: `{valor}`" for nome, valor in hashes_perceptuais.items()))
+            except Exception as e:
+                st.error(f"Erro ao calcular hashes perceptuais: {str(e)}")
+
+            qualidade_ela = st.slider("Qualidade JPEG da recompressão (ELA):", 70, 98, 90)
+
+            if st.button("🧪 Analisar Adulteração"):
+                try:
+                    imagem_analise = Image.open(io.BytesIO(arquivo_bytes))
+                    with st.spinner("Calculando ELA e procurando regiões clonadas..."):
+                        resultado_ela = error_level_analysis(imagem_analise, quality=qualidade_ela)
+                        resultado_clone = detect_copy_move(imagem_analise)
+
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.image(heatmap(resultado_ela.levels), caption="🔥 Mapa de Calor ELA", use_container_width=True)
+                        st.metric("Erro Máximo", resultado_ela.max_error,
+                                  f"{resultado_ela.megapixels_per_second:.1f} MP/s", delta_color="off")
+                    with col2:
+                        st.image(overlay(imagem_analise, resultado_clone.mask), caption="🧬 Regiões Clonadas",
+                                 use_container_width=True)
+                        st.metric("Blocos Duplicados", resultado_clone.blocks,
+                                  f"{resultado_clone.megapixels_per_second:.1f} MP/s", delta_color="off")
+
+                    if resultado_clone.shifts:
+                        dy, dx, blocos = resultado_clone.shifts[0]
+                        st.warning(f"🔍 **Possível clonagem:** {blocos} blocos repetidos com deslocamento de "
+                                   f"({dx}, {dy}) pixels. Compare as regiões destacadas.")
+                    else:
+                        st.success("✅ Nenhuma região clonada detectada.")
+                    st.info("💡 **Dica forense:** ELA é indicativo, não prova. Bordas e texturas sempre têm erro alto; "
+                            "procure regiões com nível de erro diferente do entorno com conteúdo semelhante.")
+                except Exception as e:
+                    st.error(f"Erro na análise de adulteração: {str(e)}")
+
+        # Análise específica para documentos (PDF, Office, ODF)
+        if arquivo_bytes[:4] in (b'%PDF', b'PK\x03\x04'):
+            st.markdown("""
+            <div class="evidence-card">
+                <h3>📄 Metadados do Documento</h3>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # O SHA256 já calculado serve de chave do cache: reenviar o mesmo arquivo não reprocessa
+            metadados_doc = extrair_metadados_documento(arquivo_bytes, content_hash=sha256)
+
+            if metadados_doc.get('erro'):
+                st.error(f"Erro ao ler metadados: {metadados_doc['erro']}")
+            elif len(metadados_doc) > 1:
+                df_doc = pd.DataFrame(
+                    [(DOC_FIELD_LABELS.get(campo, campo), valor) for campo, valor in metadados_doc.items()],
+                    columns=['Campo', 'Valor']
+                )
+                st.dataframe(df_doc, use_container_width=True)
+
+                sensiveis = [DOC_FIELD_LABELS[c] for c in ('author', 'last_modified_by', 'company', 'creator_tool') if c in metadados_doc]
+                if sensiveis:
+                    st.warning(f"🔍 **Dados potencialmente sensíveis encontrados:** {', '.join(sensiveis)}")
+                    st.info("💡 **Dica forense:** Foi um metadado 'Last Modified By' de um disquete que identificou o BTK Killer!")
+            else:
+                st.info("📝 Nenhum metadado de documento encontrado.")
+
+        # Regras de detecção: todas as strings de todas as regras são buscadas numa única passada
+        st.markdown("""
+        <div class="evidence-card">
+            <h3>🧬 Regras de Detecção (estilo YARA)</h3>
+        </div>
+        """, unsafe_allow_html=True)
+
+        with st.expander("✏️ Editar regras"):
+            texto_regras = st.text_area("Regras:", DEFAULT_RULES.strip(), height=320, key="regras_texto")
+            st.caption("Sintaxe: strings `\"texto\"` (nocase, wide, ascii, fullword), hex `{ 4D 5A ?? [2-4] ( 01 | 02 ) }`, "
+                       "`/regex/` e condições com and/or/not, `any/all/N of them`, `#a`, `@a[1]`, `$a at 0`, "
+                       "`filesize` e `uint16(0)`.")
+
+        try:
+            regras = RuleSet(texto_regras)
+        except ValueError as e:
+            st.error(f"Erro nas regras: {str(e)}")
+        else:
+            def aplicar_regras():
+                return [{
+                    "Regra": deteccao.rule,
+                    "Tags": ", ".join(deteccao.tags),
+                    "Severidade": deteccao.meta.get('severity', ''),
+                    "Descrição": deteccao.meta.get('description', ''),
+                    "Strings": ", ".join(f"{s.identifier}@0x{s.offset:X}" for s in deteccao.strings[:5])
+                               + (" …" if len(deteccao.strings) > 5 else "")
+                } for deteccao in regras.scan(arquivo_bytes)]
+
+            chave_regras = hashlib.sha256(texto_regras.encode('utf-8')).hexdigest()[:16]
+            deteccoes = cache_analise.get_or_compute(f"regras:{chave_regras}", arquivo_bytes, aplicar_regras)
+
+            if deteccoes:
+                st.warning(f"🚨 {len(deteccoes)} regra(s) disparada(s) de {len(regras)}")
+                st.dataframe(pd.DataFrame(deteccoes), use_container_width=True)
+            else:
+                st.success(f"✅ Nenhuma das {len(regras)} regras disparou.")
+            st.info("💡 **Dica forense:** Regras YARA descrevem famílias de malware por strings e estrutura, "
+                    "não por hash — uma variante recompilada muda o SHA256, mas continua sendo detectada.")
+
+        with st.expander("⚡ Cache de Análise"):
+            resumo_cache = cache_analise.summary()
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Taxa de Acerto", f"{resumo_cache['hit_rate']:.0%}")
+            with col2:
+                st.metric("Acertos (memória / disco)", f"{resumo_cache['memory']} / {resumo_cache['disk']}")
+            with col3:
+                st.metric("Recálculos", resumo_cache['miss'])
+            with col4:
+                st.metric("Entradas Salvas", f"{resumo_cache['entries']} ({resumo_cache['disk_bytes'] / 1024:.0f} KB)")
+            st.caption("Hashes, tipo e EXIF ficam indexados pela impressão digital do conteúdo (tamanho + amostras), "
+                       "confirmada pelo digest completo. Reenvios da mesma evidência, por qualquer usuário, não recalculam.")
+
         # Análise hexadecimal (primeiros bytes)
         st.markdown("""
         <div class="evidence-card">
@@ -294,8 +454,7 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
-        primeiros_bytes = arquivo_bytes[:32]
-        hex_string = ' '.join(f'{byte:02X}' for byte in primeiros_bytes)
+        hex_string = arquivo_bytes[:32].hex(' ').upper()
         
         st.markdown(f"""
         <div class="analysis-result">
@@ -321,6 +480,150 @@ with tab1:
         else:
             st.info("🔍 Magic number não reconhecido na base de dados.")
 
+        # Visualizador hexadecimal paginado (renderiza apenas a janela visível)
+        st.markdown("""
+        <div class="evidence-card">
+            <h3>🧮 Visualizador Hexadecimal</h3>
+        </div>
+        """, unsafe_allow_html=True)
+
+        caminho_local = st.text_input(
+            "📂 Caminho local da evidência (opcional, para arquivos grandes via mmap):",
+            placeholder="/evidencias/disco.img",
+            key="hex_caminho"
+        )
+
+        if caminho_local and os.path.isfile(caminho_local):
+            viewer = HexViewer(caminho_local)
+            fonte_hex = caminho_local
+        else:
+            viewer = HexViewer(arquivo_upload.getbuffer())
+            fonte_hex = arquivo_upload.name
+
+        try:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                linhas = st.selectbox("Linhas por página:", [16, 32, 64, 128], key="hex_linhas")
+            with col2:
+                total_paginas = viewer.page_count(linhas)
+                pagina = st.number_input(f"Página (de {total_paginas:,}):", min_value=1, max_value=total_paginas, value=1, key="hex_pagina")
+            with col3:
+                offset_texto = st.text_input("Ir para offset (ex: 0x1F40):", key="hex_offset")
+
+            offset = (pagina - 1) * linhas * viewer.width
+            if offset_texto:
+                try:
+                    offset = int(offset_texto, 0)
+                except ValueError:
+                    st.error("Offset inválido. Use decimal ou hexadecimal (0x...).")
+
+            # Busca por padrão de bytes
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                padrao = st.text_input("🔎 Buscar padrão:", placeholder="texto ou hex: FF D8 ?? E0", key="hex_busca")
+            with col2:
+                modo_busca = st.radio("Modo:", ["Texto", "Hex"], key="hex_modo")
+
+            destaque = None
+            if padrao:
+                try:
+                    if modo_busca == "Hex":
+                        ocorrencias = list(viewer.search(parse_hex_pattern(padrao), limit=50))
+                    else:
+                        ocorrencias = [(pos, padrao.encode()) for pos in viewer.find_all(padrao.encode(), limit=50)]
+
+                    if ocorrencias:
+                        st.success(f"🎯 {len(ocorrencias)} ocorrência(s) (máx. 50). Primeira em 0x{ocorrencias[0][0]:X}")
+                        escolha = st.selectbox(
+                            "Saltar para ocorrência:",
+                            [f"0x{pos:X}" for pos, _ in ocorrencias],
+                            key="hex_ocorrencia"
+                        )
+                        offset = int(escolha, 16)
+                        destaque = (offset, len(ocorrencias[0][1]))
+                    else:
+                        st.info("Padrão não encontrado.")
+                except ValueError as e:
+                    st.error(str(e))
+
+            st.caption(f"{fonte_hex} — {viewer.size:,} bytes — janela a partir de 0x{viewer.align(offset):X}")
+            st.code(viewer.render(offset, linhas, highlight=destaque) or "(arquivo vazio)", language=None)
+        finally:
+            viewer.close()
+
+        # Extração de strings com classificação de IOCs
+        st.markdown("""
+        <div class="evidence-card">
+            <h3>🧵 Strings e Indicadores (IOCs)</h3>
+        </div>
+        """, unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            tamanho_minimo = st.number_input("Tamanho mínimo:", min_value=3, max_value=64, value=6, key="str_min")
+        with col2:
+            incluir_utf16 = st.checkbox("Incluir UTF-16LE", value=True, key="str_utf16")
+        with col3:
+            filtro_iocs = st.multiselect(
+                "Filtrar por IOC:",
+                list(IOC_LABELS),
+                format_func=IOC_LABELS.get,
+                key="str_filtro"
+            )
+
+        def fonte_strings(inicio=0):
+            if caminho_local and os.path.isfile(caminho_local):
+                return extract_from_file(caminho_local, tamanho_minimo, incluir_utf16, inicio)
+            return extract_strings(arquivo_upload.getbuffer(), tamanho_minimo, incluir_utf16, inicio)
+
+        # Cada página guarda apenas o offset onde a próxima começa
+        chave_strings = (fonte_hex, tamanho_minimo, incluir_utf16, tuple(filtro_iocs))
+        if st.session_state.get('strings_chave') != chave_strings:
+            st.session_state.strings_chave = chave_strings
+            st.session_state.strings_offsets = [0]
+            st.session_state.strings_pagina = 0
+
+        pagina_atual = st.session_state.strings_pagina
+        resultados, proximo = page(fonte_strings(st.session_state.strings_offsets[pagina_atual]), 100, filtro_iocs)
+
+        if resultados:
+            df_strings = pd.DataFrame([{
+                "Offset": f"0x{hit.offset:X}",
+                "Codificação": hit.encoding,
+                "IOCs": ", ".join(IOC_LABELS[t] for t in hit.tags),
+                "String": hit.text[:200]
+            } for hit in resultados])
+            st.dataframe(df_strings, use_container_width=True)
+        else:
+            st.info("Nenhuma string encontrada com os filtros atuais.")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if pagina_atual > 0 and st.button("⬅️ Página anterior", key="str_prev"):
+                st.session_state.strings_pagina -= 1
+                st.rerun()
+        with col2:
+            st.caption(f"Página {pagina_atual + 1}")
+        with col3:
+            if proximo is not None and st.button("Próxima página ➡️", key="str_next"):
+                if len(st.session_state.strings_offsets) == pagina_atual + 1:
+                    st.session_state.strings_offsets.append(proximo)
+                st.session_state.strings_pagina += 1
+                st.rerun()
+
+        if st.button("📤 Exportar JSON-lines", key="str_export"):
+            # Serializa direto do gerador: a lista de StringHit nunca fica em memória, só o texto
+            # que o download_button precisa de qualquer forma (sem arquivo temporário para limpar)
+            destino = io.StringIO()
+            total_exportado = export_jsonl(fonte_strings(), destino, filtro_iocs)
+            st.success(f"✅ {total_exportado:,} strings exportadas")
+            st.download_button(
+                "📥 Download JSONL",
+                destino.getvalue().encode('utf-8'),
+                f"{arquivo_upload.name}.strings.jsonl",
+                "application/jsonl"
+            )
+
 with tab2:
     st.subheader("📊 Casos Famosos de Forense Digital")
     
@@ -416,6 +719,213 @@ with tab3:
             else:
                 st.error("❌ **Incorreto.** Atividade às 2:15 AM em arquivo sensível é altamente suspeita!")
 
+    # Linha do tempo real a partir de um diretório
+    st.markdown("---")
+    st.subheader("📜 Análise de Logs: Resposta a Incidentes")
+
+    st.markdown("""
+    <div class="evidence-card">
+        <p>O próximo passo da investigação são os logs. Envie <strong>auth.log</strong> (SSH),
+        logs de acesso <strong>Apache/Nginx</strong> ou <strong>JSON-lines</strong>, inclusive rotacionados
+        em <code>.gz</code>. Os arquivos são lidos em streaming, intercalados por horário, e detectores com
+        janela deslizante apontam força bruta, varreduras e requisições com cara de SQLi/XSS.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    logs_enviados = st.file_uploader("📤 Arquivos de log:", accept_multiple_files=True, key="log_upload")
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        usar_exemplo = st.button("🧪 Usar Logs de Exemplo")
+    with col2:
+        janela_logs = st.slider("Janela de detecção (segundos):", 10, 600, 60, key="log_janela")
+
+    fontes_log = None
+    if usar_exemplo:
+        fontes_log = rotation_order(write_sample_logs(os.path.join(tempfile.gettempdir(), "cybermentor_logs")))
+    elif logs_enviados:
+        fontes_log = [(arquivo.name, arquivo) for arquivo in logs_enviados]
+
+    if fontes_log:
+        estatisticas_logs = {}
+        with st.spinner("Processando logs em streaming..."):
+            incidentes = incident_timeline(analyze(fontes_log, janela_logs, stats=estatisticas_logs))
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Linhas Processadas", f"{estatisticas_logs['lines']:,}")
+        with col2:
+            st.metric("Velocidade", f"{estatisticas_logs['lines_per_second']:,.0f} linhas/s")
+        with col3:
+            st.metric("Incidentes", len(incidentes))
+
+        if incidentes:
+            st.markdown("**🕒 Linha do tempo do incidente:**")
+            st.dataframe(pd.DataFrame([i.as_row() for i in incidentes]), use_container_width=True)
+            if any(i.severity == 'crítica' for i in incidentes):
+                st.error("🚨 **Crítico:** houve login bem-sucedido vindo de uma origem que fazia força bruta. "
+                         "Trate a conta como comprometida: isole o host, troque credenciais e preserve os logs.")
+        else:
+            st.success("✅ Nenhum padrão suspeito encontrado nesses logs.")
+
+    st.subheader("🕒 Linha do Tempo MAC(B)")
+
+    st.markdown("""
+    <div class="evidence-card">
+        <p>Monte a linha do tempo de uma árvore de diretórios: cada arquivo gera eventos de
+        <strong>M</strong>odificação, <strong>A</strong>cesso, <strong>C</strong>hange (metadados) e
+        <strong>B</strong>irth (quando o sistema registra). Depois filtre por janela de tempo,
+        como faria com a madrugada do vazamento.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    diretorio_timeline = st.text_input("📂 Diretório para analisar:", value=str(root_dir), key="tl_dir")
+
+    if st.button("🕒 Construir Linha do Tempo"):
+        if os.path.isdir(diretorio_timeline):
+            with st.spinner("Percorrendo diretórios e ordenando eventos..."):
+                caminho_timeline = os.path.join(tempfile.gettempdir(), "cybermentor_timeline.bin")
+                timeline = Timeline.build([diretorio_timeline], caminho_timeline)
+            st.session_state.timeline_path = caminho_timeline
+            st.success(f"✅ {len(timeline):,} eventos indexados")
+        else:
+            st.error("❌ Diretório não encontrado!")
+
+    if st.session_state.get('timeline_path') and os.path.exists(st.session_state.timeline_path):
+        timeline = Timeline(st.session_state.timeline_path)
+        inicio_ns, fim_ns = timeline.bounds()
+
+        if inicio_ns is not None:
+            primeiro = datetime.fromtimestamp(inicio_ns / 1e9)
+            ultimo = datetime.fromtimestamp(fim_ns / 1e9)
+            st.caption(f"Eventos de {primeiro:%Y-%m-%d %H:%M} até {ultimo:%Y-%m-%d %H:%M}")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                data_inicio = st.date_input("Data inicial:", value=ultimo.date(), key="tl_data_ini")
+                hora_inicio = st.time_input("Hora inicial:", value=datetime.min.time(), key="tl_hora_ini")
+            with col2:
+                data_fim = st.date_input("Data final:", value=ultimo.date(), key="tl_data_fim")
+                hora_fim = st.time_input("Hora final:", value=datetime.max.time().replace(microsecond=0), key="tl_hora_fim")
+            with col3:
+                tipos = st.multiselect(
+                    "Tipos de evento:",
+                    list(KIND_LABELS),
+                    default=list(KIND_LABELS),
+                    format_func=lambda k: f"{k} - {KIND_LABELS[k]}",
+                    key="tl_tipos"
+                )
+
+            janela_inicio = int(datetime.combine(data_inicio, hora_inicio).timestamp() * 1e9)
+            janela_fim = int(datetime.combine(data_fim, hora_fim).timestamp() * 1e9)
+
+            eventos = []
+            for evento in timeline.query(janela_inicio, janela_fim, ''.join(tipos)):
+                eventos.append({
+                    "Horário": evento.when.strftime('%Y-%m-%d %H:%M:%S'),
+                    "Evento": evento.kind,
+                    "Arquivo": evento.path
+                })
+                if len(eventos) >= 1000:
+                    break
+
+            if eventos:
+                st.dataframe(pd.DataFrame(eventos), use_container_width=True)
+                if len(eventos) >= 1000:
+                    st.info("📋 Exibindo os primeiros 1.000 eventos da janela. Reduza o intervalo para detalhar.")
+            else:
+                st.info("Nenhum evento nesta janela de tempo.")
+
+    st.subheader("🖼️ Triagem de Imagens por Similaridade")
+
+    st.markdown("""
+    <div class="evidence-card">
+        <p>Hashes criptográficos mudam com um único bit; <strong>hashes perceptuais</strong> (aHash, dHash, pHash)
+        mudam pouco quando a mesma foto é recomprimida, redimensionada ou convertida. Agrupe as imagens
+        de um diretório pela distância de Hamming entre os hashes para achar cópias da mesma evidência.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        diretorio_imagens = st.text_input("📂 Diretório de imagens:", value=str(root_dir), key="ph_dir")
+    with col2:
+        tipo_hash = st.selectbox("Hash:", ['phash', 'dhash', 'ahash'], key="ph_tipo")
+    with col3:
+        raio_hash = st.slider("Distância máxima:", 0, 20, DEFAULT_RADIUS, key="ph_raio")
+
+    if st.button("🖼️ Agrupar Imagens Semelhantes"):
+        if os.path.isdir(diretorio_imagens):
+            with st.spinner("Calculando hashes perceptuais em paralelo..."):
+                ilegiveis = []
+                hashes_imagens, grupos = triage_directory(diretorio_imagens, raio_hash, tipo_hash, errors=ilegiveis)
+            st.success(f"✅ {len(hashes_imagens):,} imagens analisadas, {len(grupos)} grupos de quase-duplicatas")
+            if ilegiveis:
+                with st.expander(f"⚠️ {len(ilegiveis)} arquivos não puderam ser decodificados"):
+                    st.dataframe(pd.DataFrame(ilegiveis, columns=['Arquivo', 'Erro']), use_container_width=True)
+            for numero, grupo in enumerate(grupos[:20], 1):
+                with st.expander(f"Grupo {numero}: {len(grupo)} imagens"):
+                    st.dataframe(pd.DataFrame(grupo, columns=['Distância', 'Arquivo']), use_container_width=True)
+        else:
+            st.error("❌ Diretório não encontrado!")
+
+    st.subheader("💽 Imagem de Disco: Arquivos Apagados")
+
+    st.markdown("""
+    <div class="evidence-card">
+        <p>Apagar um arquivo raramente apaga os dados: no FAT só o primeiro byte do nome vira 0xE5 e a
+        cadeia de clusters é zerada; no ext o nome sobrevive no espaço livre (slack) da entrada anterior.
+        Abra uma imagem <strong>FAT12/16/32</strong> ou <strong>ext2/3/4</strong> (dd, com ou sem tabela
+        de partições MBR) e recupere o que foi "apagado", como no caso Politkovskaya.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    caminho_imagem = st.text_input("💾 Caminho da imagem (.img/.dd):", key="fs_img")
+    somente_apagados = st.checkbox("Mostrar somente entradas apagadas", value=True, key="fs_apagados")
+
+    if caminho_imagem:
+        if not os.path.isfile(caminho_imagem):
+            st.error("❌ Arquivo de imagem não encontrado!")
+        else:
+            try:
+                with open_image(caminho_imagem) as imagem_fs:
+                    entradas = []
+                    # O walk é preguiçoso: lê só blocos de diretório, nunca o conteúdo dos arquivos
+                    for entrada in imagem_fs.walk():
+                        if somente_apagados and not entrada.deleted:
+                            continue
+                        entradas.append(entrada)
+                        if len(entradas) >= 2000:
+                            break
+
+                    st.success(f"✅ {imagem_fs.kind} detectado (offset {imagem_fs.offset:,}) - "
+                               f"{len(entradas):,} entradas listadas")
+
+                    if entradas:
+                        st.dataframe(pd.DataFrame([{
+                            "Caminho": e.path,
+                            "Tipo": "📁" if e.is_dir else "📄",
+                            "Tamanho": e.size,
+                            "Modificado": e.modified.strftime('%Y-%m-%d %H:%M:%S') if e.modified else "",
+                            "Apagado": "🗑️" if e.deleted else "",
+                            "Recuperável": "✅" if e.recoverable else "❌"
+                        } for e in entradas]), use_container_width=True)
+                        if len(entradas) >= 2000:
+                            st.info("📋 Exibindo as primeiras 2.000 entradas.")
+
+                        recuperaveis = [e for e in entradas if e.deleted and e.recoverable and not e.is_dir]
+                        if recuperaveis:
+                            escolhido = st.selectbox("Arquivo apagado para recuperar:", range(len(recuperaveis)),
+                                                     format_func=lambda i: f"{recuperaveis[i].path} ({recuperaveis[i].size:,} bytes)",
+                                                     key="fs_escolha")
+                            if st.button("♻️ Recuperar Arquivo", key="fs_recuperar"):
+                                alvo = recuperaveis[escolhido]
+                                recuperado = io.BytesIO()
+                                imagem_fs.export(alvo, recuperado)
+                                st.download_button("📥 Download do Arquivo Recuperado", recuperado.getvalue(),
+                                                   alvo.name, "application/octet-stream")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+
 with tab4:
     st.subheader("📚 Teoria: Forense Digital")
     